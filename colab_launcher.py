@@ -202,12 +202,16 @@ REMOTE_URL = f"git@github.com:{GITHUB_USER}/{GITHUB_REPO}.git"
 # ----------------------------
 from supervisor.state import (
     init as state_init, load_state, save_state, append_jsonl,
-    update_budget_from_usage, status_text, rotate_chat_log_if_needed,
-    init_state,
+    update_budget_from_usage, status_text, rotate_logs_if_needed,
+    init_state, rebuild_budget_aggregates, flush_state_if_due,
 )
 state_init(DRIVE_ROOT, TOTAL_BUDGET_LIMIT)
 init_state()
 
+# Telemetry database (index/telemetry.sqlite3): mirrors logs/ for indexed queries
+from ouroboros.telemetry import init as telemetry_init
+telemetry_init(DRIVE_ROOT)
+
 from supervisor.telegram import (
     init as telegram_init, TelegramClient, send_with_budget, log_chat,
 )
@@ -237,7 +241,7 @@ from supervisor.queue import (
 from supervisor.workers import (
     init as workers_init, get_event_q, WORKERS, PENDING, RUNNING,
     spawn_workers, kill_workers, assign_tasks, ensure_workers_healthy,
-    handle_chat_direct, _get_chat_agent, auto_resume_after_restart,
+    handle_chat_direct, _get_chat_agent, auto_resume_after_restart, get_log_q,
 )
 workers_init(
     repo_dir=REPO_DIR, drive_root=DRIVE_ROOT, max_workers=MAX_WORKERS,
@@ -247,6 +251,10 @@ workers_init(
 )
 
 from supervisor.events import dispatch_event
+from supervisor.log_writer import start as start_log_writer
+from supervisor.health import (
+    init as health_init, observe_event as observe_health_event, publish_if_due as publish_health_if_due,
+)
 
 # ----------------------------
 # 5) Bootstrap repo
@@ -260,6 +268,7 @@ assert ok, f"Bootstrap failed: {msg}"
 # ----------------------------
 kill_workers()
 spawn_workers(MAX_WORKERS)
+start_log_writer(drive_root=DRIVE_ROOT, get_queue=get_log_q)  # Writes worker log records
 restored_pending = restore_pending_from_snapshot()
 persist_queue_snapshot(reason="startup")
 if restored_pending > 0:
@@ -281,6 +290,9 @@ append_jsonl(DRIVE_ROOT / "logs" / "supervisor.jsonl", {
     "diag_slow_cycle_sec": DIAG_SLOW_CYCLE_SEC,
 })
 
+# Health invariants snapshot (state/health.json), kept current from dispatched events
+health_init(drive_root=DRIVE_ROOT, repo_dir=REPO_DIR)
+
 # ----------------------------
 # 6.1) Auto-resume after restart
 # ----------------------------
@@ -352,6 +364,14 @@ _consciousness = BackgroundConsciousness(
     owner_chat_id_fn=_get_owner_chat_id,
 )
 
+# Cost corrections for supervisor-side LLM calls go through the normal event queue
+from ouroboros.cost_reconciler import get_reconciler, queue_sink
+get_reconciler().set_default_sink(queue_sink(get_event_q()))
+
+from ouroboros import circuit_breaker, pricing
+pricing.configure(DRIVE_ROOT)
+circuit_breaker.configure(DRIVE_ROOT)
+
 def reset_chat_agent():
     """Reset the direct-mode chat agent (called by watchdog on hangs)."""
     import supervisor.workers as _w
@@ -385,6 +405,7 @@ _event_ctx = types.SimpleNamespace(
     spawn_workers=spawn_workers,
     sort_pending=sort_pending,
     consciousness=_consciousness,
+    observe_health_event=observe_health_event,
 )
 
 
@@ -472,6 +493,8 @@ def _handle_supervisor_command(text: str, chat_id: int, tg_offset: int = 0):
 
     # Dual-path commands: supervisor handles + LLM sees a note
     if lowered.startswith("/status"):
+        if lowered.split()[1:2] == ["rebuild"]:
+            rebuild_budget_aggregates()
         status = status_text(WORKERS, PENDING, RUNNING, SOFT_TIMEOUT_SEC, HARD_TIMEOUT_SEC)
         send_with_budget(chat_id, status, force_budget=True)
         return "[Supervisor handled /status — status text already sent to chat]\n"
@@ -530,7 +553,7 @@ except Exception as e:
 
 while True:
     loop_started_ts = time.time()
-    rotate_chat_log_if_needed(DRIVE_ROOT)
+    rotate_logs_if_needed(DRIVE_ROOT)
     ensure_workers_healthy()
 
     # Drain worker events
@@ -541,6 +564,8 @@ while True:
         except _queue_mod.Empty:
             break
         dispatch_event(evt, _event_ctx)
+    publish_health_if_due()
+    flush_state_if_due()
 
     enforce_task_timeouts()
     enqueue_evolution_task_if_needed()
@@ -1,13 +1,14 @@
 """
 Ouroboros agent core — thin orchestrator.
 
-Delegates to: loop.py (LLM tool loop), tools/ (tool schemas/execution),
+Delegates to: loop.py / loop_async.py (LLM tool loop), tools/ (tool schemas/execution),
 llm.py (LLM calls), memory.py (scratchpad/identity),
 context.py (context building), review.py (code collection/metrics).
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
@@ -26,12 +27,16 @@ from ouroboros.utils import (
     safe_relpath, truncate_for_log,
     get_git_info, sanitize_task_for_event,
 )
-from ouroboros.llm import LLMClient, add_usage
+from ouroboros.llm import LLMClient, add_usage, cache_hit_ratio
+from ouroboros.http_pool import pool_stats
+from ouroboros.tool_executor import executor_stats
+from ouroboros import circuit_breaker, pricing
 from ouroboros.tools import ToolRegistry
 from ouroboros.tools.registry import ToolContext
 from ouroboros.memory import Memory
 from ouroboros.context import build_llm_messages
 from ouroboros.loop import run_llm_loop
+from ouroboros.loop_async import run_llm_loop_async, shared_browser_executor
 
 
 # ---------------------------------------------------------------------------
@@ -167,7 +172,7 @@ class Env:
 # ---------------------------------------------------------------------------
 
 class OuroborosAgent:
-    """One agent instance per worker process. Mostly stateless; long-term state lives on Drive."""
+    """One agent instance per worker process (per task slot in multi-task workers). Mostly stateless; long-term state lives on Drive."""
 
     def __init__(self, env: Env, event_queue: Any = None):
         self.env = env
@@ -186,6 +191,9 @@ class OuroborosAgent:
         self.llm = LLMClient()
         self.tools = ToolRegistry(repo_dir=env.repo_dir, drive_root=env.drive_root)
         self.memory = Memory(drive_root=env.drive_root, repo_dir=env.repo_dir)
+        # Prices come from the Drive cache; a stale cache refreshes in the background
+        pricing.configure(env.drive_root)
+        circuit_breaker.configure(env.drive_root)
 
         self._log_worker_boot_once()
 
@@ -467,7 +475,7 @@ class OuroborosAgent:
             review_context_builder=self._build_review_context,
         )
 
-        if cap_info.get("trimmed_sections"):
+        if cap_info.get("trimmed_sections") or cap_info.get("truncated_sections"):
             try:
                 append_jsonl(drive_logs / "events.jsonl", {
                     "ts": utc_now_iso(), "type": "context_soft_cap_trim",
@@ -492,77 +500,102 @@ class OuroborosAgent:
         cap_info["budget_remaining"] = budget_remaining
         return ctx, messages, cap_info
 
-    def handle_task(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
-        # _chat_lock is acquired externally before handle_task is called
+    def _begin_task(self, task: Dict[str, Any]) -> Tuple[float, pathlib.Path, Optional[threading.Event]]:
         start_time = time.time()
         self._task_started_ts = start_time
         self._last_progress_ts = start_time
         self._pending_events = []
         self._current_chat_id = int(task.get("chat_id") or 0) or None
         self._current_task_type = str(task.get("type") or "")
-
-        drive_logs = self.env.drive_path("logs")
         heartbeat_stop = self._start_task_heartbeat_loop(str(task.get("id") or ""))
+        return start_time, self.env.drive_path("logs"), heartbeat_stop
+
+    def _loop_kwargs(
+        self, task: Dict[str, Any], messages: List[Dict[str, Any]],
+        cap_info: Dict[str, Any], drive_logs: pathlib.Path,
+    ) -> Dict[str, Any]:
+        """Arguments for run_llm_loop / run_llm_loop_async."""
+        # Set initial reasoning effort based on task type
+        task_type_str = str(task.get("type") or "").lower()
+        if task_type_str in ("evolution", "review"):
+            initial_effort = "high"
+        else:
+            initial_effort = "medium"
+
+        # Conversation Router: route simple messages to light model
+        _light_model = os.environ.get("OUROBOROS_MODEL_LIGHT", "")
+        _routing = _classify_message_for_routing(
+            message_text=task.get("text", "") or task.get("description", "") or "",
+            task_type=task_type_str,
+        )
+        if _routing == "light" and _light_model:
+            initial_model = _light_model
+        else:
+            initial_model = None  # will use default
+
+        return dict(
+            messages=messages,
+            tools=self.tools,
+            llm=self.llm,
+            drive_logs=drive_logs,
+            emit_progress=self._emit_progress,
+            incoming_messages=self._incoming_messages,
+            task_type=task_type_str,
+            task_id=str(task.get("id") or ""),
+            budget_remaining_usd=cap_info.get("budget_remaining"),
+            event_queue=self._event_queue,
+            initial_effort=initial_effort,
+            initial_model=initial_model,
+            drive_root=self.env.drive_root,
+        )
+
+    def _task_error_text(self, task: Dict[str, Any], e: Exception, drive_logs: pathlib.Path) -> str:
+        tb = traceback.format_exc()
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": "task_error",
+            "task_id": task.get("id"), "error": repr(e),
+            "traceback": truncate_for_log(tb, 2000),
+        })
+        return f"⚠️ Error during processing: {type(e).__name__}: {e}"
 
+    def _complete_task(
+        self, task: Dict[str, Any], text: Any,
+        usage: Dict[str, Any], llm_trace: Dict[str, Any],
+        start_time: float, drive_logs: pathlib.Path,
+    ) -> List[Dict[str, Any]]:
+        # Empty response guard
+        if not isinstance(text, str) or not text.strip():
+            text = "⚠️ Model returned an empty response. Try rephrasing your request."
+
+        # Emit events for supervisor
+        self._emit_task_results(task, text, usage, llm_trace, start_time, drive_logs)
+        return list(self._pending_events)
+
+    def _end_task(self, heartbeat_stop: Optional[threading.Event]) -> None:
+        while not self._incoming_messages.empty():
+            try:
+                self._incoming_messages.get_nowait()
+            except queue.Empty:
+                break
+        if heartbeat_stop is not None:
+            heartbeat_stop.set()
+        self._current_task_type = None
+
+    def handle_task(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # _chat_lock is acquired externally before handle_task is called
+        start_time, drive_logs, heartbeat_stop = self._begin_task(task)
         try:
             # --- Prepare task context ---
             ctx, messages, cap_info = self._prepare_task_context(task)
-            budget_remaining = cap_info.get("budget_remaining")
 
             # --- LLM loop (delegated to loop.py) ---
             usage: Dict[str, Any] = {}
             llm_trace: Dict[str, Any] = {"assistant_notes": [], "tool_calls": []}
-
-            # Set initial reasoning effort based on task type
-            task_type_str = str(task.get("type") or "").lower()
-            if task_type_str in ("evolution", "review"):
-                initial_effort = "high"
-            else:
-                initial_effort = "medium"
-
-            # Conversation Router: route simple messages to light model
-            _light_model = os.environ.get("OUROBOROS_MODEL_LIGHT", "")
-            _routing = _classify_message_for_routing(
-                message_text=task.get("text", "") or task.get("description", "") or "",
-                task_type=task_type_str,
-            )
-            if _routing == "light" and _light_model:
-                initial_model = _light_model
-            else:
-                initial_model = None  # will use default
-
             try:
-                text, usage, llm_trace = run_llm_loop(
-                    messages=messages,
-                    tools=self.tools,
-                    llm=self.llm,
-                    drive_logs=drive_logs,
-                    emit_progress=self._emit_progress,
-                    incoming_messages=self._incoming_messages,
-                    task_type=task_type_str,
-                    task_id=str(task.get("id") or ""),
-                    budget_remaining_usd=budget_remaining,
-                    event_queue=self._event_queue,
-                    initial_effort=initial_effort,
-                    initial_model=initial_model,
-                    drive_root=self.env.drive_root,
-                )
+                text, usage, llm_trace = run_llm_loop(**self._loop_kwargs(task, messages, cap_info, drive_logs))
             except Exception as e:
-                tb = traceback.format_exc()
-                append_jsonl(drive_logs / "events.jsonl", {
-                    "ts": utc_now_iso(), "type": "task_error",
-                    "task_id": task.get("id"), "error": repr(e),
-                    "traceback": truncate_for_log(tb, 2000),
-                })
-                text = f"⚠️ Error during processing: {type(e).__name__}: {e}"
-
-            # Empty response guard
-            if not isinstance(text, str) or not text.strip():
-                text = "⚠️ Model returned an empty response. Try rephrasing your request."
-
-            # Emit events for supervisor
-            self._emit_task_results(task, text, usage, llm_trace, start_time, drive_logs)
-            return list(self._pending_events)
+                text = self._task_error_text(task, e, drive_logs)
+            return self._complete_task(task, text, usage, llm_trace, start_time, drive_logs)
 
         finally:
             # _chat_lock is released externally after handle_task returns
@@ -573,14 +606,34 @@ class OuroborosAgent:
             except Exception:
                 log.debug("Failed to cleanup browser", exc_info=True)
                 pass
-            while not self._incoming_messages.empty():
-                try:
-                    self._incoming_messages.get_nowait()
-                except queue.Empty:
-                    break
-            if heartbeat_stop is not None:
-                heartbeat_stop.set()
-            self._current_task_type = None
+            self._end_task(heartbeat_stop)
+
+    async def handle_task_async(self, task: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        handle_task() on an event loop (multi-task workers). Each concurrent task
+        needs its own agent: tool context and pending events are per agent.
+        """
+        start_time, drive_logs, heartbeat_stop = self._begin_task(task)
+        try:
+            ctx, messages, cap_info = await asyncio.to_thread(self._prepare_task_context, task)
+            usage: Dict[str, Any] = {}
+            llm_trace: Dict[str, Any] = {"assistant_notes": [], "tool_calls": []}
+            try:
+                text, usage, llm_trace = await run_llm_loop_async(
+                    **self._loop_kwargs(task, messages, cap_info, drive_logs))
+            except Exception as e:
+                text = self._task_error_text(task, e, drive_logs)
+            return await asyncio.to_thread(
+                self._complete_task, task, text, usage, llm_trace, start_time, drive_logs)
+
+        finally:
+            # Browser tools ran on the process-wide sticky thread; close them there too
+            try:
+                from ouroboros.tools.browser import cleanup_browser
+                await asyncio.wrap_future(shared_browser_executor().submit(cleanup_browser, self.tools._ctx))
+            except Exception:
+                log.debug("Failed to cleanup browser", exc_info=True)
+            self._end_task(heartbeat_stop)
 
     # =====================================================================
     # Task result emission
@@ -618,6 +671,9 @@ class OuroborosAgent:
                 "tool_calls": n_tool_calls,
                 "tool_errors": n_tool_errors,
                 "response_len": len(text),
+                "cache_hit_ratio": cache_hit_ratio(usage),
+                "http_pool": pool_stats()["hosts"],
+                "tool_executor": executor_stats(),
             })
         except Exception:
             log.warning("Failed to log task eval event", exc_info=True)
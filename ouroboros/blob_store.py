@@ -0,0 +1,107 @@
+"""
+Ouroboros — Content-addressed store for oversized tool results.
+
+A tool result longer than the inline limit is written once to
+Drive/blobs/<aa>/<sha256>.txt; the LLM sees a preview (head and tail)
+plus a handle ("blob:<16 hex>") and pages through the rest with the
+read_result tool instead of re-running the command. Identical results
+share one file. Blobs older than OUROBOROS_BLOB_TTL_DAYS are pruned
+once per process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pathlib
+import re
+import threading
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+HANDLE_PREFIX = "blob:"
+_HANDLE_HEX = 16
+_HANDLE_RE = re.compile(r"^(?:blob:)?([0-9a-f]{%d,64})$" % _HANDLE_HEX)
+_PREVIEW_HEAD = 6000
+_PREVIEW_TAIL = 2000
+
+_pruned_roots: set = set()
+_prune_lock = threading.Lock()
+
+
+def _blob_dir(drive_root: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(drive_root) / "blobs"
+
+
+def _ttl_days() -> float:
+    try:
+        return float(os.environ.get("OUROBOROS_BLOB_TTL_DAYS", "7"))
+    except (TypeError, ValueError):
+        log.warning("Invalid OUROBOROS_BLOB_TTL_DAYS, defaulting to 7")
+        return 7.0
+
+
+def put(drive_root: pathlib.Path, text: str) -> str:
+    """Store text (idempotent) and return its handle."""
+    data = text.encode("utf-8", errors="replace")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_dir(drive_root) / digest[:2] / f"{digest}.txt"
+    if path.exists():
+        os.utime(path)  # Referenced again: restart its TTL
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".tmp_{digest}.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    _maybe_prune(drive_root)
+    return HANDLE_PREFIX + digest[:_HANDLE_HEX]
+
+
+def get(drive_root: pathlib.Path, handle: str) -> Optional[str]:
+    """Full text for a handle (or any unambiguous sha256 prefix of 16+ hex chars), None if unknown."""
+    m = _HANDLE_RE.match(str(handle or "").strip().lower())
+    if not m:
+        return None
+    prefix = m.group(1)
+    shard = _blob_dir(drive_root) / prefix[:2]
+    matches = sorted(shard.glob(f"{prefix}*.txt")) if shard.is_dir() else []
+    if len(matches) != 1:
+        return None
+    return matches[0].read_text(encoding="utf-8", errors="replace")
+
+
+def preview(text: str, handle: str) -> str:
+    """Head and tail of an oversized result with instructions for paging the rest."""
+    lines = text.count("\n") + 1
+    return (
+        f"{text[:_PREVIEW_HEAD]}\n"
+        f"...({len(text) - _PREVIEW_HEAD - _PREVIEW_TAIL} chars omitted)...\n"
+        f"{text[-_PREVIEW_TAIL:]}\n"
+        f"[Full result: {len(text)} chars, {lines} lines, stored as {handle}. "
+        f"Use read_result(handle=\"{handle}\", offset=..., length=..., grep=...) to see the rest.]"
+    )
+
+
+def _maybe_prune(drive_root: pathlib.Path) -> None:
+    root = _blob_dir(drive_root)
+    with _prune_lock:
+        if root in _pruned_roots:
+            return
+        _pruned_roots.add(root)
+    cutoff = time.time() - _ttl_days() * 86400
+    removed = 0
+    try:
+        for path in root.glob("*/*.txt"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                log.debug("Failed to prune blob %s", path, exc_info=True)
+    except OSError:
+        log.debug("Failed to scan blob store", exc_info=True)
+    if removed:
+        log.info("Pruned %d expired result blobs", removed)
@@ -0,0 +1,272 @@
+"""
+Ouroboros — Circuit breaker and retry budget for LLM calls.
+
+State is shared by every process on the box (workers, direct-chat agent,
+consciousness, review) through a small JSON file on Drive:
+state/circuit_breakers.json, written under an flock and replaced atomically.
+Reads are mtime-cached, so a healthy system pays one stat() per call.
+
+Per key (a model id, or "*" for the OpenRouter transport itself):
+  closed    — calls flow; consecutive failures are counted.
+  open      — calls fail fast with CircuitOpenError until open_until.
+              Entered after N consecutive failures (cooldown doubles on
+              every re-open) or immediately on 429, honouring Retry-After.
+  half_open — cooldown elapsed; exactly one probe call is let through.
+              Success closes the circuit, failure re-opens it.
+
+A global token bucket caps retries across all processes, so a degraded
+provider is not hammered by every worker retrying at once.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import fcntl
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+TRANSPORT_KEY = "*"
+_PROBE_TIMEOUT_SEC = 120.0
+_FAILURE_MEMORY_SEC = 300.0
+_MAX_COOLDOWN_SEC = 300.0
+# Client errors say nothing about provider health
+_IGNORED_STATUSES = frozenset({400, 401, 402, 403, 404, 413, 422})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open."""
+
+    def __init__(self, model: str, retry_in: float):
+        super().__init__(f"Circuit open for {model}; retry in {retry_in:.0f}s")
+        self.model = model
+        self.retry_in = retry_in
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, str(default)))
+    except (TypeError, ValueError):
+        log.warning("Invalid %s, defaulting to %s", name, default)
+        return default
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Retry-After header: delta-seconds or an HTTP date. Returns seconds or None."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        dt = email.utils.parsedate_to_datetime(text)
+        return max(0.0, dt.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_exception(exc: BaseException) -> Tuple[Optional[int], Optional[float]]:
+    """(status_code, retry_after_sec) from an OpenAI/httpx exception, where available."""
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    retry_after = None
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            retry_after = parse_retry_after(headers.get("retry-after"))
+        except Exception:
+            log.debug("Failed to read Retry-After header", exc_info=True)
+    return (int(status) if status is not None else None), retry_after
+
+
+class CircuitBreakerStore:
+    """File-backed breaker table (in-memory only when no path is configured)."""
+
+    def __init__(self, path: Optional[pathlib.Path] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Any] = {}
+        self._cache_key: Tuple[int, int] = (-1, -1)
+
+    # -- storage ---------------------------------------------------------
+
+    def _read(self) -> Dict[str, Any]:
+        if self._path is None:
+            return self._cache
+        try:
+            st = self._path.stat()
+        except FileNotFoundError:
+            return {}
+        key = (st.st_mtime_ns, st.st_size)
+        if key != self._cache_key:
+            try:
+                self._cache = json.loads(self._path.read_text(encoding="utf-8") or "{}")
+                self._cache_key = key
+            except (OSError, ValueError):
+                log.debug("Failed to read %s", self._path, exc_info=True)
+                return self._cache
+        return self._cache
+
+    def _update(self, fn) -> Any:
+        """Read-modify-write under an exclusive lock (flock across processes)."""
+        with self._lock:
+            if self._path is None:
+                return fn(self._cache)
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            lock_path = self._path.with_name(self._path.name + ".lock")
+            with open(lock_path, "a+") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._cache_key = (-1, -1)
+                    data = dict(self._read())
+                    result = fn(data)
+                    tmp = self._path.with_name(f".tmp_{self._path.name}.{os.getpid()}")
+                    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+                    os.replace(tmp, self._path)
+                    self._cache = data
+                    return result
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # -- breaker ---------------------------------------------------------
+
+    @staticmethod
+    def _admits(entry: Optional[Dict[str, Any]], now: float) -> Tuple[bool, float]:
+        """(admits a call, retry_in_sec) for one circuit entry, without changing it."""
+        if not entry or entry.get("state") == "closed":
+            return True, 0.0
+        if entry.get("state") == "open" and now < float(entry.get("open_until") or 0):
+            return False, float(entry["open_until"]) - now
+        if entry.get("state") == "half_open" and now < float(entry.get("probe_until") or 0):
+            return False, float(entry["probe_until"]) - now  # Probe in flight
+        return True, 0.0
+
+    def _check_key(self, key: str) -> Tuple[bool, float]:
+        entry = (self._read().get("circuits") or {}).get(key)
+        if not entry or entry.get("state") == "closed":
+            return True, 0.0
+        ok, retry_in = self._admits(entry, time.time())
+        if not ok:
+            return False, retry_in
+
+        def _to_half_open(data: Dict[str, Any]) -> bool:
+            e = data.setdefault("circuits", {}).get(key) or {}
+            t = time.time()
+            if not self._admits(e, t)[0]:
+                return False  # Re-opened, or another process won the probe
+            e.update({"state": "half_open", "probe_until": t + _PROBE_TIMEOUT_SEC})
+            data["circuits"][key] = e
+            return True
+
+        if self._update(_to_half_open):
+            return True, 0.0
+        return False, _PROBE_TIMEOUT_SEC
+
+    def allow(self, model: str) -> Tuple[bool, float]:
+        """(allowed, retry_in_sec). Checks the transport circuit, then the model."""
+        for key in (TRANSPORT_KEY, model):
+            ok, retry_in = self._check_key(key)
+            if not ok:
+                return False, retry_in
+        return True, 0.0
+
+    def is_available(self, model: str) -> bool:
+        """Non-mutating allow() used when picking a fallback model."""
+        now = time.time()
+        circuits = self._read().get("circuits") or {}
+        return all(self._admits(circuits.get(key), now)[0] for key in (TRANSPORT_KEY, model))
+
+    def record_success(self, model: str) -> None:
+        circuits = self._read().get("circuits") or {}
+
+        def _dirty(e: Optional[Dict[str, Any]]) -> bool:
+            return bool(e) and bool(e.get("failures") or e.get("state", "closed") != "closed")
+
+        if not any(_dirty(circuits.get(k)) for k in (TRANSPORT_KEY, model)):
+            return  # Healthy: no write on the hot path
+
+        def _close(data: Dict[str, Any]) -> None:
+            c = data.setdefault("circuits", {})
+            for k in (TRANSPORT_KEY, model):
+                if k in c:
+                    c[k] = {"state": "closed", "failures": 0, "cooldown_sec": 0}
+        self._update(_close)
+
+    def record_failure(self, key: str, status_code: Optional[int] = None,
+                       retry_after: Optional[float] = None) -> str:
+        """Count a failure for key; returns the resulting state."""
+        threshold = max(1, int(_env_float("OUROBOROS_BREAKER_FAILURES", 5)))
+        base_cooldown = max(1.0, _env_float("OUROBOROS_BREAKER_COOLDOWN_SEC", 30.0))
+
+        def _fail(data: Dict[str, Any]) -> str:
+            now = time.time()
+            c = data.setdefault("circuits", {})
+            e = c.get(key) or {"state": "closed", "failures": 0, "cooldown_sec": 0}
+            if now - float(e.get("last_failure_at") or 0) > _FAILURE_MEMORY_SEC:
+                e["failures"] = 0
+            e["failures"] = int(e.get("failures") or 0) + 1
+            e["last_failure_at"] = now
+            e["last_status"] = status_code
+            trip = (status_code == 429 or e["state"] == "half_open" or e["failures"] >= threshold)
+            if trip:
+                prev = float(e.get("cooldown_sec") or 0)
+                cooldown = min(_MAX_COOLDOWN_SEC, prev * 2 if prev else base_cooldown)
+                if retry_after is not None:
+                    cooldown = min(_MAX_COOLDOWN_SEC * 2, max(retry_after, 1.0))
+                e.update({"state": "open", "open_until": now + cooldown, "cooldown_sec": cooldown})
+            c[key] = e
+            return e["state"]
+        return self._update(_fail)
+
+    def record_exception(self, model: str, exc: BaseException) -> Optional[str]:
+        """Classify an LLM call failure and record it. Returns new state, or None if ignored."""
+        status, retry_after = classify_exception(exc)
+        if status in _IGNORED_STATUSES:
+            return None
+        if status is None:
+            # No HTTP status: connection/timeout — the transport itself is suspect
+            self.record_failure(TRANSPORT_KEY, None, None)
+        return self.record_failure(model, status, retry_after)
+
+    # -- retry budget ----------------------------------------------------
+
+    def take_retry_token(self) -> bool:
+        """Global token bucket (capacity = refill per minute). False = budget exhausted."""
+        per_min = max(1.0, _env_float("OUROBOROS_RETRY_BUDGET_PER_MIN", 30.0))
+
+        def _take(data: Dict[str, Any]) -> bool:
+            now = time.time()
+            b = data.get("retry_budget") or {"tokens": per_min, "updated": now}
+            tokens = min(per_min, float(b.get("tokens", per_min)) + (now - float(b.get("updated", now))) * per_min / 60.0)
+            ok = tokens >= 1.0
+            data["retry_budget"] = {"tokens": tokens - 1.0 if ok else tokens, "updated": now}
+            return ok
+        return bool(self._update(_take))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return json.loads(json.dumps(self._read()))
+
+
+_store = CircuitBreakerStore()
+
+
+def configure(drive_root: pathlib.Path) -> None:
+    """Share breaker state through Drive with every other process."""
+    global _store
+    path = pathlib.Path(drive_root) / "state" / "circuit_breakers.json"
+    if _store._path != path:
+        _store = CircuitBreakerStore(path)
+
+
+def get_breaker() -> CircuitBreakerStore:
+    return _store
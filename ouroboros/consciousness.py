@@ -23,24 +23,35 @@ import logging
 import os
 import pathlib
 import queue
+import sqlite3
 import threading
 import time
 import traceback
 from typing import Any, Callable, Dict, List, Optional
 
 from ouroboros.utils import (
-    utc_now_iso, read_text, append_jsonl, clip_text,
+    utc_now_iso, read_text, append_jsonl,
     truncate_for_log, sanitize_tool_result_for_log, sanitize_tool_args_for_log,
 )
+from ouroboros import file_cache, jsonl_tail, telemetry
 from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
 
 log = logging.getLogger(__name__)
 
 
+def _last_incoming_message(chat_path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """Newest chat.jsonl entry not sent by Ouroboros, scanning backwards from EOF."""
+    for entry in jsonl_tail.iter_jsonl_reverse(chat_path):
+        if entry.get("direction", "") != "out":
+            return entry
+    return None
+
+
 class BackgroundConsciousness:
     """Persistent background thinking loop for Ouroboros."""
 
     _MAX_BG_ROUNDS = 5
+    _ORPHAN_WINDOW_SEC = 86400.0
 
     def __init__(
         self,
@@ -278,6 +289,7 @@ class BackgroundConsciousness:
 
     def _think(self) -> None:
         """One thinking cycle: build context, call LLM, execute tools iteratively."""
+        self._registry.result_cache.clear()  # Tool results are cached per cycle, like per task
         context = self._build_context()
         model = self._model
 
@@ -354,6 +366,9 @@ class BackgroundConsciousness:
                         "ts": utc_now_iso(),
                         "category": "consciousness",
                     })
+                    from ouroboros.cost_reconciler import queue_sink, reconcile_estimate
+                    reconcile_estimate(usage, model, category="consciousness", cost=cost,
+                                       sink=queue_sink(self._event_queue))
 
                 content = msg.get("content") or ""
                 tool_calls = msg.get("tool_calls") or []
@@ -412,38 +427,26 @@ class BackgroundConsciousness:
 
     def _load_bg_prompt(self) -> str:
         """Load consciousness system prompt from file."""
-        prompt_path = self._repo_dir / "prompts" / "CONSCIOUSNESS.md"
-        if prompt_path.exists():
-            return read_text(prompt_path)
-        return "You are Ouroboros in background consciousness mode. Think."
+        return file_cache.read(
+            self._repo_dir / "prompts" / "CONSCIOUSNESS.md",
+            fallback="You are Ouroboros in background consciousness mode. Think.",
+        )
 
     def _build_context(self) -> str:
         parts = [self._load_bg_prompt()]
 
-        # Bible (abbreviated)
-        bible_path = self._repo_dir / "BIBLE.md"
-        if bible_path.exists():
-            bible = read_text(bible_path)
-            parts.append("## BIBLE.md\n\n" + clip_text(bible, 12000))
-
-        # Identity
-        identity_path = self._drive_root / "memory" / "identity.md"
-        if identity_path.exists():
-            parts.append("## Identity\n\n" + clip_text(
-                read_text(identity_path), 6000))
-
-        # Scratchpad
-        scratchpad_path = self._drive_root / "memory" / "scratchpad.md"
-        if scratchpad_path.exists():
-            parts.append("## Scratchpad\n\n" + clip_text(
-                read_text(scratchpad_path), 8000))
-
-        # Dialogue summary for continuity
-        summary_path = self._drive_root / "memory" / "dialogue_summary.md"
-        if summary_path.exists():
-            summary_text = read_text(summary_path)
-            if summary_text.strip():
-                parts.append("## Dialogue Summary\n\n" + clip_text(summary_text, 4000))
+        # Static and memory files: rendered sections are cached until the file changes
+        # (shared with the task context builder, see file_cache.py)
+        memory_dir = self._drive_root / "memory"
+        for path, title, max_chars in (
+            (self._repo_dir / "BIBLE.md", "BIBLE.md", 12000),  # Abbreviated
+            (memory_dir / "identity.md", "Identity", 6000),
+            (memory_dir / "scratchpad.md", "Scratchpad", 8000),
+            (memory_dir / "dialogue_summary.md", "Dialogue Summary", 4000),  # Continuity
+        ):
+            section = file_cache.section(path, title, max_chars)
+            if section:
+                parts.append(section)
 
         # Recent observations
         observations = []
@@ -507,48 +510,29 @@ class BackgroundConsciousness:
         except Exception as e:
             log.debug("Failed to get running tasks for consciousness context: %s", e)
 
-        # Recent events
+        # Recent events (one backwards read serves both sections below)
+        events_path = self._drive_root / "logs" / "events.jsonl"
         try:
-            events_path = self._drive_root / "logs" / "events.jsonl"
-            if events_path.exists():
-                lines = read_text(events_path).strip().split("\n")
-                recent = []
-                for line in lines[-5:]:
-                    try:
-                        ev = json.loads(line)
-                        ev_type = ev.get("type", "?")
-                        ev_ts = ev.get("ts", "")[:16]
-                        ev_err = ev.get("error", "")
-                        if ev_err:
-                            recent.append(f"  {ev_ts} [{ev_type}] ERROR: {ev_err[:60]}")
-                        else:
-                            recent.append(f"  {ev_ts} [{ev_type}]")
-                    except Exception:
-                        pass
-                if recent:
-                    parts.append("## Recent Events\n\n" + "\n".join(recent))
+            events_tail = jsonl_tail.read_jsonl_tail(events_path, 50)
         except Exception as e:
             log.debug("Failed to read recent events: %s", e)
+            events_tail = []
+        recent = []
+        for ev in events_tail[-5:]:
+            ev_type = ev.get("type", "?")
+            ev_ts = str(ev.get("ts", ""))[:16]
+            ev_err = str(ev.get("error", "") or "")
+            if ev_err:
+                recent.append(f"  {ev_ts} [{ev_type}] ERROR: {ev_err[:60]}")
+            else:
+                recent.append(f"  {ev_ts} [{ev_type}]")
+        if recent:
+            parts.append("## Recent Events\n\n" + "\n".join(recent))
 
-        # Orphaned task detection
+        # Orphaned task detection: started (task_received) with no task_done, and not running
         try:
-            events_path = self._drive_root / "logs" / "events.jsonl"
-            if events_path.exists():
-                import time as _time
-                cutoff = _time.time() - 1800  # 30 min
-                lines = read_text(events_path).strip().split("\n")
-                # Look for task_started with no task_done in recent events
-                started_tasks = {}
-                for line in lines[-50:]:
-                    try:
-                        ev = json.loads(line)
-                        if ev.get("type") == "task_started":
-                            started_tasks[ev.get("task_id")] = ev.get("description", "")
-                        elif ev.get("type") in ("task_done", "task_failed", "task_cancelled"):
-                            started_tasks.pop(ev.get("task_id"), None)
-                    except Exception:
-                        pass
-                # Check against currently running
+            started_tasks = self._open_tasks(events_tail)
+            if started_tasks:
                 from supervisor.workers import RUNNING
                 orphaned = {tid: desc for tid, desc in started_tasks.items() if tid not in RUNNING}
                 if orphaned:
@@ -559,6 +543,26 @@ class BackgroundConsciousness:
 
         return "\n\n".join(parts)
 
+    def _open_tasks(self, events_tail: List[Dict[str, Any]]) -> Dict[str, str]:
+        """task_id -> description of recently started tasks without a terminal event."""
+        store = telemetry.get(self._drive_root)
+        if store is not None:
+            try:
+                return {t["task_id"]: t["description"]
+                        for t in store.open_tasks(since=time.time() - self._ORPHAN_WINDOW_SEC)}
+            except sqlite3.Error:
+                log.debug("Telemetry open-task query failed, using recent events", exc_info=True)
+        started_tasks: Dict[str, str] = {}
+        for ev in events_tail:
+            if ev.get("type") in telemetry.TASK_START_TYPES:
+                task = ev.get("task") if isinstance(ev.get("task"), dict) else {}
+                tid = ev.get("task_id") or task.get("id")
+                if tid:
+                    started_tasks[tid] = str(ev.get("description") or task.get("text") or "")
+            elif ev.get("type") in telemetry.TASK_END_TYPES:
+                started_tasks.pop(ev.get("task_id"), None)
+        return started_tasks
+
     # -------------------------------------------------------------------
     # Daily chat backup
     # -------------------------------------------------------------------
@@ -663,24 +667,11 @@ class BackgroundConsciousness:
     def _is_quiet_mode(self) -> bool:
         """Return True if the owner said goodbye within the last 8 hours."""
         try:
+            # No exists() check: right after a rotation the history is only in closed segments
             chat_path = self._drive_root / "logs" / "chat.jsonl"
-            if not chat_path.exists():
-                return False
 
             # Find the last incoming message by reading from the end
-            last_incoming = None
-            with open(chat_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except (json.JSONDecodeError, ValueError):
-                        continue
-                    direction = entry.get("direction", "")
-                    if direction != "out":
-                        last_incoming = entry
+            last_incoming = _last_incoming_message(chat_path)
 
             if last_incoming is None:
                 return False
@@ -712,23 +703,11 @@ class BackgroundConsciousness:
         or schedule new tasks independently.
         """
         try:
+            # No exists() check: right after a rotation the history is only in closed segments
             chat_path = self._drive_root / "logs" / "chat.jsonl"
-            if not chat_path.exists():
-                return False
 
             # Find the last incoming message
-            last_incoming = None
-            with open(chat_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except (json.JSONDecodeError, ValueError):
-                        continue
-                    if entry.get("direction", "") != "out":
-                        last_incoming = entry
+            last_incoming = _last_incoming_message(chat_path)
 
             if last_incoming is None:
                 return False
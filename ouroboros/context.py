@@ -7,20 +7,27 @@ Extracted from agent.py to keep the agent thin and focused.
 
 from __future__ import annotations
 
-import copy
 import json
 import logging
 import os
 import pathlib
+import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from ouroboros.utils import (
-    utc_now_iso, read_text, clip_text, estimate_tokens, get_git_info,
+    utc_now_iso, clip_text, get_git_info,
 )
+from ouroboros import file_cache
+from ouroboros.cost_reconciler import queue_sink, reconcile_estimate
 from ouroboros.memory import Memory
+from ouroboros.context_sections import SectionedContext, fit_messages
+from ouroboros.tokenizer import message_tokens, model_family
 
 log = logging.getLogger(__name__)
 
+_SOFT_CAP_TOKENS = 200000
+_HEALTH_SNAPSHOT_MAX_AGE_SEC = 900  # Supervisor heartbeat is 300s
+
 
 def _build_user_content(task: Dict[str, Any]) -> Any:
     """Build user message content. Supports text + optional image."""
@@ -68,7 +75,7 @@ def _build_runtime_section(env: Any, task: Dict[str, Any]) -> str:
     # --- Budget calculation ---
     budget_info = None
     try:
-        state_json = _safe_read(env.drive_path("state/state.json"), fallback="{}")
+        state_json = file_cache.read(env.drive_path("state/state.json"), fallback="{}")
         state_data = json.loads(state_json)
         spent_usd = float(state_data.get("spent_usd", 0))
         total_usd = float(os.environ.get("TOTAL_BUDGET", "1"))
@@ -97,27 +104,32 @@ def _build_memory_sections(memory: Memory) -> List[str]:
     """Build scratchpad, identity, dialogue summary sections."""
     sections = []
 
-    scratchpad_raw = memory.load_scratchpad()
-    sections.append("## Scratchpad\n\n" + clip_text(scratchpad_raw, 90000))
+    # Rendered sections are cached per file until it changes (file_cache.py)
+    scratchpad = file_cache.section(memory.scratchpad_path(), "Scratchpad", 90000)
+    if not scratchpad:  # Missing or blank: load_scratchpad() restores the default
+        scratchpad = "## Scratchpad\n\n" + clip_text(memory.load_scratchpad(), 90000)
+    sections.append(scratchpad)
 
-    identity_raw = memory.load_identity()
-    sections.append("## Identity\n\n" + clip_text(identity_raw, 80000))
+    identity = file_cache.section(memory.identity_path(), "Identity", 80000)
+    if not identity:
+        identity = "## Identity\n\n" + clip_text(memory.load_identity(), 80000)
+    sections.append(identity)
 
     # Load wisdom.md (super long-term memory)
-    wisdom_path = memory.drive_root / "memory" / "wisdom.md"
-    if wisdom_path.exists():
-        wisdom_raw = read_text(wisdom_path)
-        if wisdom_raw.strip():
-            sections.append("## Wisdom\n\n" + clip_text(wisdom_raw, 30000))
+    sections.append(file_cache.section(memory.drive_root / "memory" / "wisdom.md", "Wisdom", 30000))
 
     # Dialogue summary (key moments from chat history)
-    summary_path = memory.drive_root / "memory" / "dialogue_summary.md"
-    if summary_path.exists():
-        summary_text = read_text(summary_path)
-        if summary_text.strip():
-            sections.append("## Dialogue Summary\n\n" + clip_text(summary_text, 20000))
+    sections.append(file_cache.section(
+        memory.drive_root / "memory" / "dialogue_summary.md", "Dialogue Summary", 20000))
 
-    return sections
+    return [section for section in sections if section]
+
+
+def _read_task_scoped(memory: Memory, log_name: str, task_id: str) -> List[Dict[str, Any]]:
+    """This task's recent records (per-task offset index), or the log tail without a task."""
+    if task_id:
+        return memory.read_task_jsonl(log_name, task_id, 200)
+    return memory.read_jsonl_tail(log_name, 200)
 
 
 def _build_recent_sections(memory: Memory, env: Any, task_id: str = "") -> List[str]:
@@ -129,24 +141,20 @@ def _build_recent_sections(memory: Memory, env: Any, task_id: str = "") -> List[
     if chat_summary:
         sections.append("## Recent chat\n\n" + chat_summary)
 
-    progress_entries = memory.read_jsonl_tail("progress.jsonl", 200)
-    if task_id:
-        progress_entries = [e for e in progress_entries if e.get("task_id") == task_id]
+    progress_entries = _read_task_scoped(memory, "progress.jsonl", task_id)
     progress_summary = memory.summarize_progress(progress_entries, limit=15)
     if progress_summary:
         sections.append("## Recent progress\n\n" + progress_summary)
 
-    tools_entries = memory.read_jsonl_tail("tools.jsonl", 200)
-    if task_id:
-        tools_entries = [e for e in tools_entries if e.get("task_id") == task_id]
+    tools_entries = _read_task_scoped(memory, "tools.jsonl", task_id)
     tools_summary = memory.summarize_tools(tools_entries)
     if tools_summary:
         sections.append("## Recent tools\n\n" + tools_summary)
 
-    events_entries = memory.read_jsonl_tail("events.jsonl", 200)
     if task_id:
-        events_entries = [e for e in events_entries if e.get("task_id") == task_id]
-    events_summary = memory.summarize_events(events_entries)
+        events_summary = memory.summarize_task_events(task_id)
+    else:
+        events_summary = memory.summarize_events(memory.read_jsonl_tail("events.jsonl", 200))
     if events_summary:
         sections.append("## Recent events\n\n" + events_summary)
 
@@ -163,121 +171,20 @@ def _build_health_invariants(env: Any) -> str:
 
     Surfaces anomalies as informational text. The LLM (not code) decides
     what action to take based on what it reads here. (Bible P0+P3)
+    The supervisor keeps the checks current in state/health.json
+    (supervisor/health.py); without a live snapshot they are computed
+    from the logs here.
     """
-    checks = []
-
-    # 1. Version sync: VERSION file vs pyproject.toml
-    try:
-        ver_file = read_text(env.repo_path("VERSION")).strip()
-        pyproject = read_text(env.repo_path("pyproject.toml"))
-        pyproject_ver = ""
-        for line in pyproject.splitlines():
-            if line.strip().startswith("version"):
-                pyproject_ver = line.split("=", 1)[1].strip().strip('"').strip("'")
-                break
-        if ver_file and pyproject_ver and ver_file != pyproject_ver:
-            checks.append(f"CRITICAL: VERSION DESYNC — VERSION={ver_file}, pyproject.toml={pyproject_ver}")
-        elif ver_file:
-            checks.append(f"OK: version sync ({ver_file})")
-    except Exception:
-        pass
-
-    # 2. Budget drift
+    checks: List[str] = []
     try:
-        state_json = read_text(env.drive_path("state/state.json"))
-        state_data = json.loads(state_json)
-        if state_data.get("budget_drift_alert"):
-            drift_pct = state_data.get("budget_drift_pct", 0)
-            our = state_data.get("spent_usd", 0)
-            theirs = state_data.get("openrouter_total_usd", 0)
-            checks.append(f"WARNING: BUDGET DRIFT {drift_pct:.1f}% — tracked=${our:.2f} vs OpenRouter=${theirs:.2f}")
+        snapshot = json.loads(file_cache.read(env.drive_path("state/health.json"), fallback="{}"))
+        if time.time() - float(snapshot.get("updated_at") or 0) < _HEALTH_SNAPSHOT_MAX_AGE_SEC:
+            checks = [str(c) for c in snapshot.get("checks") or []]
         else:
-            checks.append("OK: budget drift within tolerance")
-    except Exception:
-        pass
-
-    # 3. Per-task cost anomalies
-    try:
-        from supervisor.state import per_task_cost_summary
-        costly = [t for t in per_task_cost_summary(5) if t["cost"] > 5.0]
-        for t in costly:
-            checks.append(
-                f"WARNING: HIGH-COST TASK — task_id={t['task_id']} "
-                f"cost=${t['cost']:.2f} rounds={t['rounds']}"
-            )
-        if not costly:
-            checks.append("OK: no high-cost tasks (>$5)")
+            from supervisor.health import snapshot_from_logs
+            checks = snapshot_from_logs(pathlib.Path(env.drive_root), pathlib.Path(env.repo_dir))
     except Exception:
-        pass
-
-    # 4. Stale identity.md
-    try:
-        import time as _time
-        identity_path = env.drive_path("memory/identity.md")
-        if identity_path.exists():
-            age_hours = (_time.time() - identity_path.stat().st_mtime) / 3600
-            if age_hours > 8:
-                checks.append(f"WARNING: STALE IDENTITY — identity.md last updated {age_hours:.0f}h ago")
-            else:
-                checks.append("OK: identity.md recent")
-    except Exception:
-        pass
-
-    # 5. Duplicate processing detection: same owner message text appearing in multiple tasks
-    try:
-        import hashlib
-        msg_hash_to_tasks: Dict[str, set] = {}
-        tail_bytes = 256_000
-
-        def _scan_file_for_injected(path, type_field="type", type_value="owner_message_injected"):
-            if not path.exists():
-                return
-            file_size = path.stat().st_size
-            with path.open("r", encoding="utf-8") as f:
-                if file_size > tail_bytes:
-                    f.seek(file_size - tail_bytes)
-                    f.readline()
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        ev = json.loads(line)
-                        if ev.get(type_field) != type_value:
-                            continue
-                        text = ev.get("text", "")
-                        if not text and "event_repr" in ev:
-                            # Historical entries in supervisor.jsonl lack "text";
-                            # try to extract task_id at least for presence detection
-                            text = ev.get("event_repr", "")[:200]
-                        if not text:
-                            continue
-                        text_hash = hashlib.md5(text.encode()).hexdigest()[:12]
-                        tid = ev.get("task_id") or "unknown"
-                        if text_hash not in msg_hash_to_tasks:
-                            msg_hash_to_tasks[text_hash] = set()
-                        msg_hash_to_tasks[text_hash].add(tid)
-                    except (json.JSONDecodeError, ValueError):
-                        continue
-
-        _scan_file_for_injected(env.drive_path("logs/events.jsonl"))
-        # Also check supervisor.jsonl for historically unhandled events
-        _scan_file_for_injected(
-            env.drive_path("logs/supervisor.jsonl"),
-            type_field="event_type",
-            type_value="owner_message_injected",
-        )
-
-        dupes = {h: tids for h, tids in msg_hash_to_tasks.items() if len(tids) > 1}
-        if dupes:
-            checks.append(
-                f"CRITICAL: DUPLICATE PROCESSING — {len(dupes)} message(s) "
-                f"appeared in multiple tasks: {', '.join(str(sorted(tids)) for tids in dupes.values())}"
-            )
-        else:
-            checks.append("OK: no duplicate message processing detected")
-    except Exception:
-        pass
+        log.debug("Failed to build health invariants", exc_info=True)
 
     if not checks:
         return ""
@@ -301,190 +208,69 @@ def build_llm_messages(
 
     Returns:
         (messages, cap_info) tuple:
-            - messages: List of message dicts ready for LLM
-            - cap_info: Dict with token trimming metadata
+            - messages: [system, user] message dicts ready for LLM
+            - cap_info: Dict with token budget metadata (trimmed/truncated sections)
     """
     # --- Extract task type for adaptive context ---
     task_type = str(task.get("type") or "user")
 
     # --- Read base prompts and state ---
-    base_prompt = _safe_read(
+    base_prompt = file_cache.read(
         env.repo_path("prompts/SYSTEM.md"),
         fallback="You are Ouroboros. Your base prompt could not be loaded."
     )
-    bible_md = _safe_read(env.repo_path("BIBLE.md"))
-    readme_md = _safe_read(env.repo_path("README.md"))
-    state_json = _safe_read(env.drive_path("state/state.json"), fallback="{}")
 
     # --- Load memory ---
     memory.ensure_files()
 
-    # --- Assemble messages with 3-block prompt caching ---
-    # Block 1: Static content (SYSTEM.md + BIBLE.md + README) — cached
-    # Block 2: Semi-stable content (identity + scratchpad + knowledge) — cached
-    # Block 3: Dynamic content (state + runtime + recent logs) — uncached
+    # --- Assemble sections into 3 prompt-cache blocks ---
+    # static: SYSTEM.md + BIBLE.md + README — cached 1h
+    # semi: identity + scratchpad + knowledge — cached, changes ~once per task
+    # dynamic: state + runtime + recent logs — uncached
+    # Budgeting and trimming policy per section: see context_sections.py
+    ctx = SectionedContext(task_type=task_type)
 
     # BIBLE.md always included (Constitution requires it for every decision)
     # README.md only for evolution/review (architecture context)
     needs_full_context = task_type in ("evolution", "review", "scheduled")
-    static_text = (
-        base_prompt + "\n\n"
-        + "## BIBLE.md\n\n" + clip_text(bible_md, 180000)
-    )
+    ctx.add("static", base_prompt, name="System prompt")
+    ctx.add("static", file_cache.section(env.repo_path("BIBLE.md"), "BIBLE.md", 180000))
     if needs_full_context:
-        static_text += "\n\n## README.md\n\n" + clip_text(readme_md, 180000)
-
-    # Semi-stable content: identity, scratchpad, knowledge
-    # These change ~once per task, not per round
-    semi_stable_parts = []
-    semi_stable_parts.extend(_build_memory_sections(memory))
+        ctx.add("static", file_cache.section(env.repo_path("README.md"), "README.md", 180000))
 
-    kb_index_path = env.drive_path("memory/knowledge/_index.md")
-    if kb_index_path.exists():
-        kb_index = kb_index_path.read_text(encoding="utf-8")
-        if kb_index.strip():
-            semi_stable_parts.append("## Knowledge base\n\n" + clip_text(kb_index, 50000))
+    for section in _build_memory_sections(memory):
+        ctx.add("semi", section)
 
-    semi_stable_text = "\n\n".join(semi_stable_parts)
+    ctx.add("semi", file_cache.section(env.drive_path("memory/knowledge/_index.md"), "Knowledge base", 50000))
 
-    # Dynamic content: changes every round
-    dynamic_parts = [
-        "## Drive state\n\n" + clip_text(state_json, 90000),
-        _build_runtime_section(env, task),
-    ]
+    ctx.add("dynamic", file_cache.section(env.drive_path("state/state.json"), "Drive state", 90000)
+            or "## Drive state\n\n{}")
+    ctx.add("dynamic", _build_runtime_section(env, task))
 
     # Health invariants — surfaces anomalies for LLM-first self-detection (Bible P0+P3)
-    health_section = _build_health_invariants(env)
-    if health_section:
-        dynamic_parts.append(health_section)
+    ctx.add("dynamic", _build_health_invariants(env))
 
-    dynamic_parts.extend(_build_recent_sections(memory, env, task_id=task.get("id", "")))
+    for section in _build_recent_sections(memory, env, task_id=task.get("id", "")):
+        ctx.add("dynamic", section)
 
-    if str(task.get("type") or "") == "review" and review_context_builder is not None:
+    if task_type == "review" and review_context_builder is not None:
         try:
-            review_ctx = review_context_builder()
-            if review_ctx:
-                dynamic_parts.append(review_ctx)
+            ctx.add("dynamic", review_context_builder() or "")
         except Exception:
             log.debug("Failed to build review context", exc_info=True)
-            pass
-
-    dynamic_text = "\n\n".join(dynamic_parts)
-
-    # System message with 3 content blocks for optimal caching
-    messages: List[Dict[str, Any]] = [
-        {
-            "role": "system",
-            "content": [
-                {
-                    "type": "text",
-                    "text": static_text,
-                    "cache_control": {"type": "ephemeral", "ttl": "1h"},
-                },
-                {
-                    "type": "text",
-                    "text": semi_stable_text,
-                    "cache_control": {"type": "ephemeral"},
-                },
-                {
-                    "type": "text",
-                    "text": dynamic_text,
-                },
-            ],
-        },
-        {"role": "user", "content": _build_user_content(task)},
-    ]
-
-    # --- Soft-cap token trimming ---
-    messages, cap_info = apply_message_token_soft_cap(messages, 200000)
-
-    return messages, cap_info
-
-
-def apply_message_token_soft_cap(
-    messages: List[Dict[str, Any]],
-    soft_cap_tokens: int,
-) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    """
-    Trim prunable context sections if estimated tokens exceed soft cap.
 
-    Returns (pruned_messages, cap_info_dict).
-    """
-    def _estimate_message_tokens(msg: Dict[str, Any]) -> int:
-        """Estimate tokens for a message, handling multipart content."""
-        content = msg.get("content", "")
-        if isinstance(content, list):
-            # Multipart content: sum tokens from all text blocks
-            total = 0
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    total += estimate_tokens(str(block.get("text", "")))
-            return total + 6
-        return estimate_tokens(str(content)) + 6
-
-    estimated = sum(_estimate_message_tokens(m) for m in messages)
-    info: Dict[str, Any] = {
-        "estimated_tokens_before": estimated,
-        "estimated_tokens_after": estimated,
-        "soft_cap_tokens": soft_cap_tokens,
-        "trimmed_sections": [],
-    }
-
-    if soft_cap_tokens <= 0 or estimated <= soft_cap_tokens:
-        return messages, info
-
-    # Prune log summaries from the dynamic text block in multipart system messages
-    prunable = ["## Recent chat", "## Recent progress", "## Recent tools", "## Recent events", "## Supervisor"]
-    pruned = copy.deepcopy(messages)
-    for prefix in prunable:
-        if estimated <= soft_cap_tokens:
-            break
-        for i, msg in enumerate(pruned):
-            content = msg.get("content")
-
-            # Handle multipart content (trim from dynamic text block)
-            if isinstance(content, list) and msg.get("role") == "system":
-                # Find the dynamic text block (the block without cache_control)
-                for j, block in enumerate(content):
-                    if (isinstance(block, dict) and
-                        block.get("type") == "text" and
-                        "cache_control" not in block):
-                        text = block.get("text", "")
-                        if prefix in text:
-                            # Remove this section from the dynamic text
-                            lines = text.split("\n\n")
-                            new_lines = []
-                            skip_section = False
-                            for line in lines:
-                                if line.startswith(prefix):
-                                    skip_section = True
-                                    info["trimmed_sections"].append(prefix)
-                                    continue
-                                if line.startswith("##"):
-                                    skip_section = False
-                                if not skip_section:
-                                    new_lines.append(line)
-
-                            block["text"] = "\n\n".join(new_lines)
-                            estimated = sum(_estimate_message_tokens(m) for m in pruned)
-                            break
-                break
-
-            # Handle legacy string content (for backwards compatibility)
-            elif isinstance(content, str) and content.startswith(prefix):
-                pruned.pop(i)
-                info["trimmed_sections"].append(prefix)
-                estimated = sum(_estimate_message_tokens(m) for m in pruned)
-                break
-
-    info["estimated_tokens_after"] = estimated
-    return pruned, info
+    # --- Soft-cap token budget ---
+    user_message = {"role": "user", "content": _build_user_content(task)}
+    return fit_messages(ctx, user_message, _SOFT_CAP_TOKENS)
 
 
 def _compact_tool_result(msg: dict, content: str) -> dict:
     """
     Compact a single tool result message.
 
+    Idempotent: a summary is short enough to be kept as-is when compacted
+    again, so already-compacted history never changes (prompt cache prefix).
+
     Args:
         msg: Original tool result message dict
         content: Content string to compact
@@ -494,13 +280,12 @@ def _compact_tool_result(msg: dict, content: str) -> dict:
     """
     is_error = content.startswith("⚠️")
     # Create a short summary
-    if is_error:
+    if is_error or len(content) <= 200:
         summary = content[:200]  # Keep error details
     else:
         # Keep first line or first 80 chars
         first_line = content.split('\n')[0][:80]
-        char_count = len(content)
-        summary = f"{first_line}... ({char_count} chars)" if char_count > 80 else content[:200]
+        summary = f"{first_line}... ({len(content)} chars)"
 
     return {**msg, "content": summary}
 
@@ -548,7 +333,104 @@ def _compact_assistant_msg(msg: dict) -> dict:
     return compacted_msg
 
 
-def compact_tool_history(messages: list, keep_recent: int = 6) -> list:
+def _tool_round_starts(messages: list) -> List[int]:
+    """Indices of assistant messages with tool_calls (one per tool round)."""
+    if isinstance(messages, ConversationLog):
+        return messages.round_starts
+    return [i for i, msg in enumerate(messages)
+            if msg.get("role") == "assistant" and msg.get("tool_calls")]
+
+
+def _rounds_to_compact(n_rounds: int, keep_recent: int, checkpoint_every: int) -> int:
+    """How many leading rounds are compacted: whole multiples of checkpoint_every only."""
+    n = max(0, n_rounds - keep_recent)
+    return n - n % max(1, checkpoint_every)
+
+
+class ConversationLog(list):
+    """
+    Message list for the tool loop that knows its rounds.
+
+    Each appended message is filed under the current tool round (an
+    assistant message with tool_calls opens a new one), and the log
+    remembers how many leading rounds are already compacted, so
+    compaction only touches rounds that crossed the window since the last
+    call: O(new messages) instead of rescanning the whole history.
+
+    Token counts are kept per message and only recomputed for messages
+    that were replaced (or whose content object changed).
+
+    Only append()/extend() may grow it; replacing a message in place is fine.
+    """
+
+    def __init__(self, messages: Any = ()):
+        super().__init__()
+        self._round_starts: List[int] = []
+        self._round_results: List[List[int]] = []  # per round: indices of its tool messages
+        self._tokens: List[Optional[Tuple[str, int, int]]] = []  # (family, id(content), count)
+        self.compacted_rounds = 0
+        self.extend(messages)
+
+    def __setitem__(self, idx: Any, msg: Any) -> None:
+        super().__setitem__(idx, msg)
+        if isinstance(idx, int):
+            self._tokens[idx] = None
+        else:
+            self._tokens = [None] * len(self)
+
+    def append(self, msg: Dict[str, Any]) -> None:
+        idx = len(self)
+        super().append(msg)
+        self._tokens.append(None)
+        if msg.get("role") == "assistant" and msg.get("tool_calls"):
+            self._round_starts.append(idx)
+            self._round_results.append([])
+        elif msg.get("role") == "tool" and self._round_starts:
+            self._round_results[-1].append(idx)
+
+    def extend(self, messages: Any) -> None:
+        for msg in messages:
+            self.append(msg)
+
+    @property
+    def round_starts(self) -> List[int]:
+        return list(self._round_starts)
+
+    def token_count(self, model: Optional[str] = None) -> int:
+        """Total tokens, counting only messages not seen before."""
+        family = model_family(model)
+        total = 0
+        for i, msg in enumerate(self):
+            cached = self._tokens[i]
+            content_id = id(msg.get("content"))
+            if cached is None or cached[0] != family or cached[1] != content_id:
+                cached = (family, content_id, message_tokens(msg, model))
+                self._tokens[i] = cached
+            total += cached[2]
+        return total
+
+    def pending_results(self, keep_recent: int) -> List[int]:
+        """Indices of tool results in rounds outside the recent window that are not compacted yet."""
+        end = max(0, len(self._round_starts) - keep_recent)
+        return [i for r in range(self.compacted_rounds, end) for i in self._round_results[r]]
+
+    def compact(self, keep_recent: int = 6, checkpoint_every: int = 1,
+                summaries: Optional[Dict[int, str]] = None) -> "ConversationLog":
+        """Compact newly eligible rounds in place; summaries maps message index -> replacement text."""
+        n_compact = _rounds_to_compact(len(self._round_starts), keep_recent, checkpoint_every)
+        for r in range(self.compacted_rounds, n_compact):
+            start = self._round_starts[r]
+            self[start] = _compact_assistant_msg(self[start])
+            for idx in self._round_results[r]:
+                msg = self[idx]
+                summary = (summaries or {}).get(idx)
+                self[idx] = ({**msg, "content": summary} if summary
+                             else _compact_tool_result(msg, str(msg.get("content") or "")))
+        self.compacted_rounds = max(self.compacted_rounds, n_compact)
+        return self
+
+
+def compact_tool_history(messages: list, keep_recent: int = 6, checkpoint_every: int = 1) -> list:
     """
     Compress old tool call/result message pairs into compact summaries.
 
@@ -556,91 +438,83 @@ def compact_tool_history(messages: list, keep_recent: int = 6) -> list:
     referenced by the LLM). Older rounds get their tool results truncated
     to a short summary line, and tool_call arguments are compacted.
 
+    With checkpoint_every=N, rounds are collapsed N at a time, so the
+    message prefix (and the provider's prompt cache for it) only changes
+    at those checkpoints instead of every round.
+
+    A ConversationLog is compacted in place and incrementally; a plain list
+    is left untouched and a compacted copy is returned.
+
     This dramatically reduces prompt tokens in long tool-use conversations
     without losing important context (the tool names and whether they succeeded
     are preserved).
     """
-    # Find all indices that are tool-call assistant messages
-    # (messages with tool_calls field)
-    tool_round_starts = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") == "assistant" and msg.get("tool_calls"):
-            tool_round_starts.append(i)
-
-    if len(tool_round_starts) <= keep_recent:
-        return messages  # Nothing to compact
-
-    # Rounds to compact: all except the last keep_recent
-    rounds_to_compact = set(tool_round_starts[:-keep_recent])
-
-    # Build compacted message list
-    result = []
-    for i, msg in enumerate(messages):
-        # Skip system messages with multipart content (prompt caching format)
-        if msg.get("role") == "system" and isinstance(msg.get("content"), list):
-            result.append(msg)
-            continue
-
-        if msg.get("role") == "tool" and i > 0:
-            # Check if the preceding assistant message (with tool_calls)
-            # is one we want to compact
-            # Find which round this tool result belongs to
-            parent_round = None
-            for rs in reversed(tool_round_starts):
-                if rs < i:
-                    parent_round = rs
-                    break
-
-            if parent_round is not None and parent_round in rounds_to_compact:
-                # Compact this tool result
-                content = str(msg.get("content") or "")
-                result.append(_compact_tool_result(msg, content))
-                continue
-
-        # For compacted assistant messages, also trim the content (progress notes)
-        # AND compact tool_call arguments
-        if i in rounds_to_compact and msg.get("role") == "assistant":
-            result.append(_compact_assistant_msg(msg))
-            continue
-
-        result.append(msg)
-
-    return result
-
-
-def compact_tool_history_llm(messages: list, keep_recent: int = 6) -> list:
-    """LLM-driven compaction: summarize old tool results via a light model.
+    if not isinstance(messages, ConversationLog):
+        if _rounds_to_compact(len(_tool_round_starts(messages)), keep_recent, checkpoint_every) <= 0:
+            return messages  # Nothing to compact
+        messages = ConversationLog(messages)
+    return messages.compact(keep_recent, checkpoint_every)
 
-    Falls back to simple truncation (compact_tool_history) on any error.
-    Called when the agent explicitly invokes the compact_context tool.
+
+def add_compaction_cache_breakpoint(messages: list, keep_recent: int = 6, checkpoint_every: int = 1) -> list:
     """
-    tool_round_starts = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") == "assistant" and msg.get("tool_calls"):
-            tool_round_starts.append(i)
+    Copy of messages with a cache_control breakpoint on the last message of
+    the compacted block (the one before the first round kept intact).
 
-    if len(tool_round_starts) <= keep_recent:
+    The block only changes at compaction checkpoints, so everything up to
+    the breakpoint is served from the provider's prompt cache in between.
+    The breakpoint is added per request and never stored in history.
+    """
+    starts = _tool_round_starts(messages)
+    n_compact = _rounds_to_compact(len(starts), keep_recent, checkpoint_every)
+    if n_compact <= 0 or n_compact >= len(starts):
         return messages
+    idx = starts[n_compact] - 1
+    msg = messages[idx]
+    content = msg.get("content")
+    if isinstance(content, str) and content:
+        blocks = [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict) and content[-1].get("type") == "text":
+        blocks = content[:-1] + [{**content[-1], "cache_control": {"type": "ephemeral"}}]
+    else:
+        return messages
+    out = list(messages)
+    out[idx] = {**msg, "content": blocks}
+    return out
+
 
-    rounds_to_compact = set(tool_round_starts[:-keep_recent])
+def _report_usage(event_queue: Any, task_id: str, model: str, usage: Dict[str, Any]) -> None:
+    if event_queue is None:
+        return
+    try:
+        event_queue.put_nowait({"type": "llm_usage", "ts": utc_now_iso(), "task_id": task_id, "model": model,
+                                "usage": usage, "category": "summarize"})
+    except Exception:
+        log.debug("Failed to emit compaction usage event", exc_info=True)
+        return
+    reconcile_estimate(usage, model, task_id=task_id, category="summarize", sink=queue_sink(event_queue))
+
+
+def compact_tool_history_llm(messages: list, keep_recent: int = 6, event_queue: Any = None,
+                             task_id: str = "") -> list:
+    """LLM-driven compaction: summarize old tool results via a light model.
+
+    Falls back to simple truncation (compact_tool_history) on any error.
+    Called when the agent explicitly invokes the compact_context tool.
+    Like compact_tool_history, a ConversationLog is updated in place.
+    The summary call's usage is reported on event_queue (category "summarize").
+    """
+    conv = messages if isinstance(messages, ConversationLog) else ConversationLog(messages)
 
     old_results = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") != "tool" or i == 0:
-            continue
-        parent_round = None
-        for rs in reversed(tool_round_starts):
-            if rs < i:
-                parent_round = rs
-                break
-        if parent_round is not None and parent_round in rounds_to_compact:
-            content = str(msg.get("content") or "")
-            if len(content) > 120:
-                tool_call_id = msg.get("tool_call_id", "")
-                old_results.append({"idx": i, "tool_call_id": tool_call_id, "content": content[:1500]})
+    for i in conv.pending_results(keep_recent):
+        content = str(conv[i].get("content") or "")
+        if len(content) > 120:
+            tool_call_id = conv[i].get("tool_call_id", "")
+            old_results.append({"idx": i, "tool_call_id": tool_call_id, "content": content[:1500]})
 
     if not old_results:
-        return compact_tool_history(messages, keep_recent=keep_recent)
+        return compact_tool_history(conv, keep_recent=keep_recent)
 
     batch_text = "\n---\n".join(
         f"[{r['tool_call_id']}]\n{r['content']}" for r in old_results[:20]
@@ -652,21 +526,22 @@ def compact_tool_history_llm(messages: list, keep_recent: int = 6) -> list:
     )
 
     try:
-        from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
+        from ouroboros.llm import shared_llm_client, DEFAULT_LIGHT_MODEL
         light_model = os.environ.get("OUROBOROS_MODEL_LIGHT") or DEFAULT_LIGHT_MODEL
-        client = LLMClient()
-        resp_msg, _usage = client.chat(
+        client = shared_llm_client()
+        resp_msg, usage = client.chat(
             messages=[{"role": "user", "content": prompt}],
             model=light_model,
             reasoning_effort="low",
             max_tokens=1024,
         )
+        _report_usage(event_queue, task_id, light_model, usage)
         summary_text = resp_msg.get("content") or ""
         if not summary_text.strip():
             raise ValueError("empty summary response")
     except Exception:
         log.warning("LLM compaction failed, falling back to truncation", exc_info=True)
-        return compact_tool_history(messages, keep_recent=keep_recent)
+        return compact_tool_history(conv, keep_recent=keep_recent)
 
     summary_lines = summary_text.strip().split("\n")
     summary_map: Dict[str, str] = {}
@@ -692,30 +567,7 @@ def compact_tool_history_llm(messages: list, keep_recent: int = 6) -> list:
         if s:
             idx_to_summary[r["idx"]] = s
 
-    result = []
-    for i, msg in enumerate(messages):
-        if msg.get("role") == "system" and isinstance(msg.get("content"), list):
-            result.append(msg)
-            continue
-        if i in idx_to_summary:
-            result.append({**msg, "content": idx_to_summary[i]})
-            continue
-        if msg.get("role") == "tool" and i > 0:
-            parent_round = None
-            for rs in reversed(tool_round_starts):
-                if rs < i:
-                    parent_round = rs
-                    break
-            if parent_round is not None and parent_round in rounds_to_compact:
-                content = str(msg.get("content") or "")
-                result.append(_compact_tool_result(msg, content))
-                continue
-        if i in rounds_to_compact and msg.get("role") == "assistant":
-            result.append(_compact_assistant_msg(msg))
-            continue
-        result.append(msg)
-
-    return result
+    return conv.compact(keep_recent, summaries=idx_to_summary)
 
 
 def _compact_tool_call_arguments(tool_name: str, args_json: str) -> Dict[str, Any]:
@@ -764,14 +616,3 @@ def _compact_tool_call_arguments(tool_name: str, args_json: str) -> Dict[str, An
         if len(args_json) > 500:
             return {"name": tool_name, "arguments": args_json[:200] + "..."}
         return {"name": tool_name, "arguments": args_json}
-
-
-def _safe_read(path: pathlib.Path, fallback: str = "") -> str:
-    """Read a file, returning fallback if it doesn't exist or errors."""
-    try:
-        if path.exists():
-            return read_text(path)
-    except Exception:
-        log.debug(f"Failed to read file {path} in _safe_read", exc_info=True)
-        pass
-    return fallback
@@ -0,0 +1,208 @@
+"""
+Ouroboros — Sectioned system prompt with a token budget allocator.
+
+build_llm_messages() assembles the system prompt from named sections
+(SYSTEM.md, BIBLE.md, Identity, Recent chat, ...), each placed in one of
+the three cache blocks and carrying a priority, a floor and an optional
+ceiling in tokens. When the whole prompt exceeds the soft cap, fit()
+grants every section its floor, hands out the remaining budget by
+priority in a single pass, then truncates or drops what did not fit.
+
+Required sections (floor None) are never cut. Policies can be tuned per
+task type, e.g. recent chat matters more for a direct user task than for
+evolution.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ouroboros.tokenizer import count_tokens, message_tokens
+
+log = logging.getLogger(__name__)
+
+BLOCKS = ("static", "semi", "dynamic")
+_BLOCK_CACHE_CONTROL: Dict[str, Optional[Dict[str, str]]] = {
+    "static": {"type": "ephemeral", "ttl": "1h"},
+    "semi": {"type": "ephemeral"},
+    "dynamic": None,
+}
+
+# name -> (priority, floor tokens or None for required, ceiling tokens or None)
+Policy = Tuple[int, Optional[int], Optional[int]]
+_DEFAULT_POLICY: Policy = (50, 0, None)
+SECTION_POLICIES: Dict[str, Policy] = {
+    "System prompt": (100, None, None),
+    "BIBLE.md": (100, None, None),
+    "Runtime context": (100, None, None),
+    "Identity": (95, None, None),
+    "Scratchpad": (90, None, None),
+    "Drive state": (90, None, None),
+    "Health Invariants": (85, None, None),
+    "Code Review Context": (80, 4000, None),
+    "Recent chat": (70, 0, None),
+    "Wisdom": (60, 2000, None),
+    "Dialogue Summary": (55, 2000, None),
+    "Knowledge base": (50, 2000, None),
+    "Recent progress": (45, 0, None),
+    "README.md": (40, 4000, None),
+    "Recent tools": (35, 0, None),
+    "Recent events": (30, 0, None),
+    "Supervisor": (20, 0, None),
+}
+TASK_TYPE_POLICIES: Dict[str, Dict[str, Policy]] = {
+    "user": {"Recent chat": (88, 0, None), "Dialogue Summary": (75, 2000, None)},
+    "evolution": {"Recent chat": (40, 0, None), "README.md": (80, 8000, None)},
+    "review": {"Recent chat": (40, 0, None), "README.md": (75, 8000, None)},
+}
+
+# Log sections keep their newest (last) lines when truncated
+_KEEP_TAIL = frozenset({"Recent chat", "Recent progress", "Recent tools", "Recent events", "Supervisor"})
+_MIN_USEFUL_TOKENS = 100  # A truncated section smaller than this is dropped instead
+
+
+@dataclass
+class ContextSection:
+    """One named part of the system prompt."""
+
+    name: str
+    text: str
+    block: str = "dynamic"
+    priority: int = 50
+    min_tokens: Optional[int] = 0  # None: required, never truncated
+    max_tokens: Optional[int] = None
+    tokens: int = 0
+
+    @property
+    def required(self) -> bool:
+        return self.min_tokens is None
+
+
+def section_name(text: str) -> str:
+    """Name of a section from its "## Title" heading."""
+    return text.split("\n", 1)[0].lstrip("#").strip()
+
+
+def _truncate(text: str, tokens: int, target: int, keep_tail: bool) -> str:
+    header, sep, body = text.partition("\n\n")
+    if not sep:
+        header, body = "", text
+    keep_chars = max(0, int(len(body) * target / max(tokens, 1)) - 80)
+    marker = f"...({tokens - target} tokens trimmed to fit the context budget)..."
+    if keep_tail:
+        kept = body[len(body) - keep_chars:]
+        nl = kept.find("\n")
+        kept = kept[nl + 1:] if 0 <= nl < len(kept) - 1 else kept
+        body = marker + "\n" + kept
+    else:
+        kept = body[:keep_chars]
+        nl = kept.rfind("\n")
+        kept = kept[:nl] if nl > 0 else kept
+        body = kept + "\n" + marker
+    return f"{header}\n\n{body}" if header else body
+
+
+class SectionedContext:
+    """Ordered sections of the system prompt, fitted to a token budget."""
+
+    def __init__(self, task_type: str = "user", model: Optional[str] = None):
+        self.task_type = task_type
+        self.model = model
+        self.sections: List[ContextSection] = []
+
+    def policy(self, name: str) -> Policy:
+        override = TASK_TYPE_POLICIES.get(self.task_type, {})
+        return override.get(name) or SECTION_POLICIES.get(name, _DEFAULT_POLICY)
+
+    def add(self, block: str, text: str, name: Optional[str] = None) -> Optional[ContextSection]:
+        """Append a section to a cache block; empty text is skipped."""
+        if block not in BLOCKS:
+            raise ValueError(f"Unknown context block: {block}")
+        if not text or not text.strip():
+            return None
+        name = name or section_name(text)
+        priority, floor, ceiling = self.policy(name)
+        section = ContextSection(
+            name=name, text=text, block=block, priority=priority,
+            min_tokens=floor, max_tokens=ceiling, tokens=count_tokens(text, self.model),
+        )
+        self.sections.append(section)
+        return section
+
+    def total_tokens(self) -> int:
+        return sum(s.tokens for s in self.sections)
+
+    def fit(self, budget: int, reserved: int = 0) -> Dict[str, Any]:
+        """Shrink flexible sections so sections + reserved fit the budget.
+
+        Returns the trim report: dropped section names and the token count
+        each truncated section was cut to.
+        """
+        flexible = [s for s in self.sections if not s.required]
+        available = budget - reserved - sum(s.tokens for s in self.sections if s.required)
+        wants = {id(s): min(s.tokens, s.max_tokens or s.tokens) for s in flexible}
+        floors = {id(s): min(s.min_tokens or 0, wants[id(s)]) for s in flexible}
+
+        by_priority = sorted(flexible, key=lambda s: -s.priority)
+        # Floors first; if even they do not fit, the lowest priorities give theirs up
+        floor_total = sum(floors.values())
+        for s in reversed(by_priority):
+            if floor_total <= available:
+                break
+            floor_total -= floors[id(s)]
+            floors[id(s)] = 0
+        remaining = max(0, available - floor_total)
+        grants: Dict[int, int] = {}
+        for s in by_priority:
+            extra = min(wants[id(s)] - floors[id(s)], remaining)
+            remaining -= extra
+            grants[id(s)] = floors[id(s)] + extra
+
+        dropped: List[str] = []
+        truncated: Dict[str, int] = {}
+        for s in flexible:
+            grant = grants[id(s)]
+            if grant >= s.tokens:
+                continue
+            if grant < _MIN_USEFUL_TOKENS:
+                dropped.append(s.name)
+                s.text, s.tokens = "", 0
+                continue
+            s.text = _truncate(s.text, s.tokens, grant, s.name in _KEEP_TAIL)
+            s.tokens = count_tokens(s.text, self.model)
+            truncated[s.name] = s.tokens
+        self.sections = [s for s in self.sections if s.text]
+        return {"trimmed_sections": dropped, "truncated_sections": truncated}
+
+    def system_message(self) -> Dict[str, Any]:
+        """System message with one text block per cache block."""
+        content: List[Dict[str, Any]] = []
+        for block in BLOCKS:
+            part: Dict[str, Any] = {
+                "type": "text",
+                "text": "\n\n".join(s.text for s in self.sections if s.block == block),
+            }
+            if _BLOCK_CACHE_CONTROL[block]:
+                part["cache_control"] = dict(_BLOCK_CACHE_CONTROL[block])
+            content.append(part)
+        return {"role": "system", "content": content}
+
+
+def fit_messages(context: SectionedContext, user_message: Dict[str, Any],
+                 soft_cap_tokens: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Fit the sections under the soft cap and build [system, user] messages."""
+    reserved = message_tokens(user_message, context.model) + message_tokens({"content": ""}, context.model)
+    before = context.total_tokens() + reserved
+    info: Dict[str, Any] = {
+        "estimated_tokens_before": before,
+        "estimated_tokens_after": before,
+        "soft_cap_tokens": soft_cap_tokens,
+        "trimmed_sections": [],
+        "truncated_sections": {},
+    }
+    if soft_cap_tokens > 0 and before > soft_cap_tokens:
+        info.update(context.fit(soft_cap_tokens, reserved))
+        info["estimated_tokens_after"] = context.total_tokens() + reserved
+    return [context.system_message(), user_message], info
@@ -0,0 +1,233 @@
+"""
+Ouroboros — Generation cost reconciler.
+
+When OpenRouter omits usage.cost, LLMClient.chat() returns an estimate
+instead of blocking on the Generation API. The estimate is submitted here;
+a background thread fetches the real cost in batches (the generation record
+is usually available about a second after the response) and emits an
+llm_usage correction carrying only the cost delta. Corrections travel the
+normal llm_usage path, so update_budget_from_usage and the per-category
+breakdown converge on the billed amount.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ouroboros.utils import utc_now_iso
+
+log = logging.getLogger(__name__)
+
+Sink = Callable[[Dict[str, Any]], None]
+
+# Generation stats lag the completion itself; first lookup waits this long.
+_FIRST_DELAY_SEC = 1.0
+_MAX_ATTEMPTS = 5
+_BATCH_SIZE = 20
+
+
+class CostReconciler:
+    """Queue of pending generation ids, drained by one daemon thread."""
+
+    def __init__(
+        self,
+        fetch_fn: Optional[Callable[[str], Optional[float]]] = None,
+        first_delay_sec: float = _FIRST_DELAY_SEC,
+        max_attempts: int = _MAX_ATTEMPTS,
+        batch_size: int = _BATCH_SIZE,
+    ):
+        self._fetch_fn = fetch_fn
+        self._first_delay = first_delay_sec
+        self._max_attempts = max_attempts
+        self._batch_size = batch_size
+        self._pending: List[Dict[str, Any]] = []
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._default_sink: Optional[Sink] = None
+        self._stats = {"submitted": 0, "reconciled": 0, "gave_up": 0, "abs_delta_usd": 0.0}
+
+    def set_default_sink(self, sink: Optional[Sink]) -> None:
+        """Sink for corrections submitted without an explicit one."""
+        self._default_sink = sink
+
+    def submit(
+        self,
+        generation_id: str,
+        model: str,
+        estimated_cost: float,
+        task_id: str = "",
+        category: str = "task",
+        sink: Optional[Sink] = None,
+    ) -> None:
+        if not generation_id:
+            return
+        item = {
+            "generation_id": generation_id, "model": model,
+            "estimated_cost": float(estimated_cost or 0.0),
+            "task_id": task_id, "category": category, "sink": sink,
+            "attempts": 0, "due": time.monotonic() + self._first_delay,
+        }
+        with self._cond:
+            self._pending.append(item)
+            self._stats["submitted"] += 1
+            self._ensure_thread()
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending)}
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Process everything pending now, ignoring delays (shutdown and tests)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._cond:
+                if not self._pending and not self._inflight:
+                    return
+                for item in self._pending:
+                    item["due"] = 0.0
+                batch = self._take_due_locked()
+            if batch:
+                self._process(batch)
+            else:
+                time.sleep(0.01)  # The worker thread holds the remaining items
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="cost_reconciler", daemon=True)
+            self._thread.start()
+
+    def _take_due_locked(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        due = [it for it in self._pending if it["due"] <= now][:self._batch_size]
+        ids = {id(it) for it in due}
+        self._pending = [it for it in self._pending if id(it) not in ids]
+        self._inflight += len(due)
+        return due
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._take_due_locked()
+                if not batch:
+                    if self._pending:
+                        wait = max(0.05, min(it["due"] for it in self._pending) - time.monotonic())
+                    else:
+                        wait = None
+                    self._cond.wait(timeout=wait)
+                    continue
+            self._process(batch)
+
+    def _process(self, batch: List[Dict[str, Any]]) -> None:
+        fetch = self._fetch_fn or _default_fetch
+        retry: List[Dict[str, Any]] = []
+        for item in batch:
+            actual: Optional[float] = None
+            try:
+                actual = fetch(item["generation_id"])
+            except Exception:
+                log.debug("Generation cost fetch failed for %s", item["generation_id"], exc_info=True)
+            item["attempts"] += 1
+            if actual is None:
+                if item["attempts"] < self._max_attempts:
+                    item["due"] = time.monotonic() + self._first_delay * (2 ** item["attempts"])
+                    retry.append(item)
+                else:
+                    with self._cond:
+                        self._stats["gave_up"] += 1
+                    log.debug("Giving up on generation cost for %s; estimate stands", item["generation_id"])
+                continue
+            self._emit_correction(item, float(actual))
+        with self._cond:
+            self._pending.extend(retry)
+            self._inflight -= len(batch)
+            self._cond.notify()
+
+    def _emit_correction(self, item: Dict[str, Any], actual: float) -> None:
+        delta = round(actual - item["estimated_cost"], 8)
+        with self._cond:
+            self._stats["reconciled"] += 1
+            self._stats["abs_delta_usd"] += abs(delta)
+        if abs(delta) < 1e-9:
+            return
+        sink = item["sink"] or self._default_sink
+        if sink is None:
+            log.debug("No sink for cost correction of %s (delta %.6f)", item["generation_id"], delta)
+            return
+        evt = {
+            "type": "llm_usage",
+            "ts": utc_now_iso(),
+            "task_id": item["task_id"],
+            "model": item["model"],
+            "category": item["category"],
+            "cost": delta,
+            "cost_correction": True,
+            "generation_id": item["generation_id"],
+            "estimated_cost": item["estimated_cost"],
+            "actual_cost": actual,
+            # rounds=0: a correction adjusts spend without counting as another call
+            "usage": {"cost": delta, "rounds": 0},
+        }
+        try:
+            sink(evt)
+        except Exception:
+            log.debug("Failed to deliver cost correction", exc_info=True)
+
+
+def _default_fetch(generation_id: str) -> Optional[float]:
+    from ouroboros.llm import fetch_generation_cost
+    return fetch_generation_cost(generation_id)
+
+
+_reconciler: Optional[CostReconciler] = None
+_reconciler_lock = threading.Lock()
+
+
+def get_reconciler() -> CostReconciler:
+    """Process-wide reconciler."""
+    global _reconciler
+    with _reconciler_lock:
+        if _reconciler is None:
+            _reconciler = CostReconciler()
+        return _reconciler
+
+
+def reconcile_estimate(
+    usage: Dict[str, Any],
+    model: str,
+    task_id: str = "",
+    category: str = "other",
+    sink: Optional[Sink] = None,
+    cost: Optional[float] = None,
+) -> None:
+    """Submit a call whose cost LLMClient estimated (usage["cost_estimated"]); no-op otherwise.
+
+    cost is the amount already reported for the call (default usage["cost"]).
+    Without a sink the correction goes to the reconciler's default sink, which
+    the supervisor points at its event queue before forking workers.
+    """
+    if not (usage.get("cost_estimated") and usage.get("generation_id")):
+        return
+    get_reconciler().submit(
+        usage["generation_id"], model, float(usage.get("cost") or 0.0) if cost is None else cost,
+        task_id=task_id, category=category, sink=sink,
+    )
+
+
+def queue_sink(q: Any) -> Sink:
+    """Deliver corrections through an event queue (worker → supervisor)."""
+    def _put(evt: Dict[str, Any]) -> None:
+        try:
+            q.put_nowait(evt)
+        except queue.Full:
+            log.warning("Event queue full; dropping cost correction %s", evt.get("generation_id"))
+    return _put
@@ -0,0 +1,85 @@
+"""
+Ouroboros — Process-level cache of rendered context files.
+
+Every task re-reads SYSTEM.md, BIBLE.md, README.md, identity, scratchpad
+and the other context files and clips them again; on a network-mounted
+drive that is most of the context build time. render() keeps the
+formatted section text per (path, variant), valid while the file's
+(mtime_ns, size) is unchanged, so an unchanged file costs one stat().
+
+Files modified in the last couple of seconds are not stored: a second
+write within the same mtime tick and with the same size would otherwise
+go unnoticed (git's "racily clean" problem).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pathlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ouroboros.utils import clip_text, read_text
+
+log = logging.getLogger(__name__)
+
+_MAX_ENTRIES = 128
+_RACY_WINDOW_NS = 2_000_000_000
+
+_entries: "OrderedDict[Tuple[str, str], Tuple[int, int, str]]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def render(path: pathlib.Path, variant: str, fn: Callable[[str], str]) -> Optional[str]:
+    """fn(file text), cached until the file changes; None if the file is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (str(path), variant)
+    with _lock:
+        cached = _entries.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return cached[2]
+        _stats["misses"] += 1
+    try:
+        text = fn(read_text(pathlib.Path(path)))
+    except (OSError, ValueError):
+        log.debug("Failed to read %s", path, exc_info=True)
+        return None
+    if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+        with _lock:
+            _entries[key] = (st.st_mtime_ns, st.st_size, text)
+            _entries.move_to_end(key)
+            while len(_entries) > _MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return text
+
+
+def read(path: pathlib.Path, fallback: str = "") -> str:
+    """Whole file text, or fallback if it is missing."""
+    text = render(path, "raw", lambda t: t)
+    return fallback if text is None else text
+
+
+def section(path: pathlib.Path, title: str, max_chars: int) -> str:
+    """"## title" section with the clipped file text; "" if missing or blank."""
+    def _format(text: str) -> str:
+        return f"## {title}\n\n" + clip_text(text, max_chars) if text.strip() else ""
+    return render(path, f"section:{title}:{max_chars}", _format) or ""
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {**_stats, "entries": len(_entries)}
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,205 @@
+"""
+Ouroboros — Hedged LLM requests.
+
+Per-model latency histograms (process-wide) drive a hedge timer: if the
+primary model has not answered by its observed p95, the same request is
+sent to the next fallback model in parallel. The first successful answer
+wins; the other call is cancelled (streamed calls are aborted at the next
+chunk) and whatever it cost is still reported through on_loser.
+
+Enabled with OUROBOROS_LLM_HEDGING=1. Until a model has enough samples,
+OUROBOROS_HEDGE_DEFAULT_DELAY_SEC is used as its hedge delay.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Bucket upper bounds in seconds (roughly log-spaced; last bucket is open-ended)
+_BUCKETS = (0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+_MIN_HEDGE_DELAY_SEC = 2.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, str(default)))
+    except (TypeError, ValueError):
+        log.warning("Invalid %s, defaulting to %s", name, default)
+        return default
+
+
+def hedging_enabled() -> bool:
+    return os.environ.get("OUROBOROS_LLM_HEDGING", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+# ---------------------------------------------------------------------------
+# Latency histograms
+# ---------------------------------------------------------------------------
+
+class LatencyTracker:
+    """Fixed-bucket latency histogram per model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[str, List[int]] = {}
+        self._count: Dict[str, int] = {}
+
+    def observe(self, model: str, seconds: float) -> None:
+        idx = bisect.bisect_left(_BUCKETS, seconds)
+        with self._lock:
+            hist = self._hist.setdefault(model, [0] * (len(_BUCKETS) + 1))
+            hist[idx] += 1
+            self._count[model] = self._count.get(model, 0) + 1
+
+    def samples(self, model: str) -> int:
+        with self._lock:
+            return self._count.get(model, 0)
+
+    def percentile(self, model: str, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th sample, or None without data."""
+        with self._lock:
+            hist = self._hist.get(model)
+            total = self._count.get(model, 0)
+            if not hist or not total:
+                return None
+            rank = pct / 100.0 * total
+            seen = 0
+            for idx, n in enumerate(hist):
+                seen += n
+                if seen >= rank:
+                    return float(_BUCKETS[idx]) if idx < len(_BUCKETS) else float(_BUCKETS[-1]) * 2
+        return None
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for the primary before hedging."""
+        min_samples = int(_env_float("OUROBOROS_HEDGE_MIN_SAMPLES", 20))
+        p95 = self.percentile(model, 95) if self.samples(model) >= min_samples else None
+        if p95 is None:
+            return _env_float("OUROBOROS_HEDGE_DEFAULT_DELAY_SEC", 60.0)
+        return max(_MIN_HEDGE_DELAY_SEC, p95)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        models = list(self._count)
+        return {
+            m: {"samples": self.samples(m), "p50": self.percentile(m, 50), "p95": self.percentile(m, 95)}
+            for m in models
+        }
+
+
+_tracker = LatencyTracker()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tracker() -> LatencyTracker:
+    return _tracker
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm_hedge")
+        return _executor
+
+
+# ---------------------------------------------------------------------------
+# Hedged call
+# ---------------------------------------------------------------------------
+
+LoserCallback = Callable[[str, Optional[Dict[str, Any]], str], None]
+
+
+def timed_chat(llm: Any, model: str, kwargs: Dict[str, Any],
+               tracker: Optional[LatencyTracker] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """llm.chat() that records its latency (successful and cancelled calls)."""
+    from ouroboros.llm import LLMCancelled
+    tracker = tracker or _tracker
+    t0 = time.monotonic()
+    try:
+        result = llm.chat(**{**kwargs, "model": model})
+    except LLMCancelled:
+        # A cancelled call was at least this slow: keep it as a censored sample
+        tracker.observe(model, time.monotonic() - t0)
+        raise
+    tracker.observe(model, time.monotonic() - t0)
+    return result
+
+
+def _settle_loser(future: Future, model: str, on_loser: Optional[LoserCallback]) -> None:
+    """Report what a losing call cost once it finishes or is aborted."""
+    from ouroboros.llm import LLMCancelled
+    if on_loser is None:
+        return
+    try:
+        _msg, usage = future.result()
+        on_loser(model, usage, str(usage.get("generation_id") or ""))
+    except LLMCancelled as e:
+        on_loser(model, None, e.generation_id)
+    except Exception:
+        log.debug("Hedged loser call for %s failed", model, exc_info=True)
+
+
+def hedged_chat(
+    llm: Any,
+    kwargs: Dict[str, Any],
+    primary_model: str,
+    hedge_model: str,
+    on_loser: Optional[LoserCallback] = None,
+    tracker: Optional[LatencyTracker] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any], str, bool]:
+    """
+    Run kwargs on primary_model, hedging onto hedge_model after the p95 delay.
+
+    Both calls are streamed with a cancel event so the loser can be aborted;
+    on_tool_call (early tool dispatch) is only wired to the primary call.
+    Returns: (msg, usage, winning_model, hedge_fired). Raises the last error
+    if every launched call fails.
+    """
+    tracker = tracker or _tracker
+    delay = tracker.hedge_delay(primary_model)
+    pool = _get_executor()
+    cancels: Dict[str, threading.Event] = {}
+    futures: Dict[Future, str] = {}
+
+    def _launch(model: str, extra: Dict[str, Any]) -> None:
+        cancels[model] = threading.Event()
+        call_kwargs = {**kwargs, **extra, "stream": True, "cancel": cancels[model]}
+        futures[pool.submit(timed_chat, llm, model, call_kwargs, tracker)] = model
+
+    _launch(primary_model, {})
+    done, _ = wait(list(futures), timeout=delay)
+    hedged = False
+    if not done:
+        hedged = True
+        log.info("Hedging %s -> %s after %.1fs", primary_model, hedge_model, delay)
+        _launch(hedge_model, {"on_tool_call": None})
+
+    pending = set(futures)
+    last_error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner: Optional[Future] = None
+        for fut in done:
+            if fut.exception() is None and winner is None:
+                winner = fut
+            elif fut.exception() is None:
+                _settle_loser(fut, futures[fut], on_loser)  # Both finished together
+            else:
+                last_error = fut.exception()
+        if winner is not None:
+            for fut in pending:
+                cancels[futures[fut]].set()
+                fut.add_done_callback(lambda f, m=futures[fut]: _settle_loser(f, m, on_loser))
+            msg, usage = winner.result()
+            return msg, usage, futures[winner], hedged
+    assert last_error is not None
+    raise last_error
@@ -0,0 +1,212 @@
+"""
+Ouroboros — Shared HTTP transport.
+
+One keep-alive connection pool per process for every OpenRouter caller:
+the OpenAI SDK client, generation/pricing lookups, helper LLM calls and
+multi-model review. HTTP/2 is negotiated when the optional `h2` package is
+installed. Per-host request counters are kept for diagnostics.
+
+Async callers run on a single background event loop that owns the shared
+AsyncClient (an httpx.AsyncClient is bound to the loop that opened its
+connections, so per-call asyncio.run() would defeat pooling). Synchronous
+code uses run_async(); coroutines on another loop (async workers) use arun().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0, read=90.0)
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_owner_pid: int = 0
+_host_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        log.warning("Invalid %s, defaulting to %d", name, default)
+        return default
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_env_int("OUROBOROS_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("OUROBOROS_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=60.0,
+    )
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Per-host statistics
+# ---------------------------------------------------------------------------
+
+def _record_request(request: httpx.Request) -> None:
+    request.extensions["ouroboros_t0"] = time.monotonic()
+    with _stats_lock:
+        st = _host_stats.setdefault(request.url.host, {
+            "requests": 0, "errors": 0, "latency_sec_total": 0.0, "http_versions": {},
+        })
+        st["requests"] += 1
+
+
+def _record_response(response: httpx.Response) -> None:
+    t0 = response.request.extensions.get("ouroboros_t0")
+    with _stats_lock:
+        st = _host_stats.get(response.request.url.host)
+        if st is None:
+            return
+        if response.status_code >= 400:
+            st["errors"] += 1
+        if t0 is not None:
+            st["latency_sec_total"] += time.monotonic() - t0
+        ver = response.http_version or "?"
+        st["http_versions"][ver] = st["http_versions"].get(ver, 0) + 1
+
+
+async def _arecord_request(request: httpx.Request) -> None:
+    _record_request(request)
+
+
+async def _arecord_response(response: httpx.Response) -> None:
+    _record_response(response)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Snapshot of per-host counters for this process."""
+    with _stats_lock:
+        hosts = {}
+        for host, st in _host_stats.items():
+            n = max(1, st["requests"])
+            hosts[host] = {
+                "requests": st["requests"],
+                "errors": st["errors"],
+                "avg_latency_sec": round(st["latency_sec_total"] / n, 3),
+                "http_versions": dict(st["http_versions"]),
+            }
+    limits = _limits()
+    return {
+        "pid": os.getpid(),
+        "http2": _http2_available(),
+        "max_connections": limits.max_connections,
+        "max_keepalive_connections": limits.max_keepalive_connections,
+        "hosts": hosts,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+def _reset_after_fork() -> None:
+    """Connections are not fork-safe: a child process starts with a fresh pool."""
+    global _client, _async_client, _loop, _owner_pid
+    if _owner_pid and _owner_pid != os.getpid():
+        _client = None
+        _async_client = None
+        _loop = None
+        with _stats_lock:
+            _host_stats.clear()
+    _owner_pid = os.getpid()
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide synchronous client (keep-alive, bounded pool)."""
+    global _client
+    with _lock:
+        _reset_after_fork()
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                http2=_http2_available(),
+                limits=_limits(),
+                timeout=DEFAULT_TIMEOUT,
+                event_hooks={"request": [_record_request], "response": [_record_response]},
+            )
+        return _client
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        _reset_after_fork()
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="http_pool_loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared AsyncClient. Only use it from coroutines started via run_async()."""
+    global _async_client
+    _get_loop()
+    with _lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(
+                http2=_http2_available(),
+                limits=_limits(),
+                timeout=DEFAULT_TIMEOUT,
+                event_hooks={"request": [_arecord_request], "response": [_arecord_response]},
+            )
+        return _async_client
+
+
+def run_async(coro, timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared transport loop and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    return future.result(timeout=timeout)
+
+
+async def arun(coro) -> Any:
+    """Await a coroutine on the shared transport loop from any other event loop."""
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def close_pool() -> None:
+    """Close shared clients (used on shutdown and in tests)."""
+    global _client, _async_client, _loop
+    with _lock:
+        client, aclient, loop = _client, _async_client, _loop
+        _client = _async_client = _loop = None
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            log.debug("Failed to close shared HTTP client", exc_info=True)
+    if loop is not None and not loop.is_closed():
+        if aclient is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(aclient.aclose(), loop).result(timeout=5)
+            except Exception:
+                log.debug("Failed to close shared async HTTP client", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,312 @@
+"""
+Ouroboros — Reading the end of JSONL logs.
+
+Logs only grow, so reading a whole file to get its last few records makes
+every context build slower the longer the system runs. These helpers read
+fixed-size blocks backwards from EOF and stop as soon as they have enough
+records; JsonlFollower remembers its offset and reads only what was
+appended since the previous call.
+
+read_task_jsonl() reads one task's records directly through the offset
+sidecar append_jsonl keeps for every record with a task_id (see
+utils.task_index_path), so busy neighbours cannot push them out of view.
+
+Logs are segmented (see ouroboros.log_segments): tail reads continue into
+closed segments, newest first, when the active file runs out, and
+iter_jsonl_range() walks a log oldest first, optionally by time range.
+
+Records are returned oldest first. Blank and unparseable lines are
+skipped; a final line without its newline (a write in progress) is left
+for the next follow-up read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from ouroboros.log_segments import ROTATED_MARKER, Segment, list_segments, open_segment, parse_ts
+from ouroboros.utils import flush_jsonl, task_index_path
+
+log = logging.getLogger(__name__)
+
+_BLOCK_SIZE = 64 * 1024
+_TASK_INDEX_TTL_SEC = 14 * 86400
+
+_pruned_dirs: set = set()
+_prune_lock = threading.Lock()
+
+
+def iter_lines_reverse(path: pathlib.Path, block_size: int = _BLOCK_SIZE) -> Iterator[bytes]:
+    """Non-empty lines of a file, newest first, reading blocks backwards from EOF."""
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines[0]  # May continue in the previous block
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if rest.strip():
+            yield rest
+
+
+def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        log.debug("Skipping unparseable JSONL line: %r", line[:100])
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def _segment_lines(segment: Segment) -> Iterator[bytes]:
+    """Non-empty lines of a closed segment, oldest first."""
+    try:
+        with open_segment(segment) as f:
+            for line in f:
+                if line.strip():
+                    yield line
+    except FileNotFoundError:
+        if not segment.compressed:  # Compressed since it was listed
+            gz = Segment(segment.path.with_name(segment.path.name + ".gz"), segment.start, segment.end, True)
+            yield from _segment_lines(gz)
+    except (OSError, EOFError):
+        log.warning("Unreadable log segment %s", segment.path, exc_info=True)
+
+
+def read_segment(segment: Segment) -> bytes:
+    """Uncompressed JSONL of one closed segment (blank lines dropped)."""
+    return b"".join(_segment_lines(segment))
+
+
+def iter_segment(segment: Segment, offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """Records of one closed segment, oldest first (from a byte offset, if uncompressed)."""
+    if offset and not segment.compressed:
+        try:
+            with open(segment.path, "rb") as f:
+                f.seek(offset)
+                lines: Iterable[bytes] = [line for line in f if line.strip()]
+        except FileNotFoundError:  # Compressed since it was listed: offsets no longer apply
+            return
+    else:
+        lines = _segment_lines(segment)
+    for line in lines:
+        obj = _parse(line)
+        if obj is not None:
+            yield obj
+
+
+def iter_jsonl_reverse(path: pathlib.Path, segments: bool = True) -> Iterator[Dict[str, Any]]:
+    """Records of a log, newest first: the active file, then (if segments) its closed segments."""
+    flush_jsonl(path)  # Include this process's group-committed records
+    closed = list_segments(path) if segments else []  # Listed first: a rotation mid-read is not read twice
+    try:
+        for line in iter_lines_reverse(path):
+            obj = _parse(line)
+            if obj is not None:
+                yield obj
+    except FileNotFoundError:
+        pass
+    yield from _iter_segments_reverse(closed)
+
+
+def _iter_segments_reverse(closed: List[Segment]) -> Iterator[Dict[str, Any]]:
+    for segment in reversed(closed):
+        # Segments are bounded (OUROBOROS_LOG_SEGMENT_MB), so one is reversed in memory
+        for line in reversed(list(_segment_lines(segment))):
+            obj = _parse(line)
+            if obj is not None:
+                yield obj
+
+
+def iter_jsonl_range(path: pathlib.Path, since: Optional[float] = None,
+                     until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Records of a log, oldest first, across closed segments and the active file.
+
+    With since/until (epoch seconds) only segments overlapping the range are
+    opened and only records whose ts falls inside it are returned.
+    """
+    flush_jsonl(path)
+    bounded = since is not None or until is not None
+
+    def _in_range(obj: Dict[str, Any]) -> bool:
+        if not bounded:
+            return True
+        ts = parse_ts(obj.get("ts"))
+        return ts is not None and (since is None or ts >= since) and (until is None or ts <= until)
+
+    for segment in list_segments(path):
+        if (since is not None and segment.end < since) or (until is not None and segment.start > until):
+            continue
+        for line in _segment_lines(segment):
+            obj = _parse(line)
+            if obj is not None and _in_range(obj):
+                yield obj
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    obj = _parse(line)
+                    if obj is not None and _in_range(obj):
+                        yield obj
+    except FileNotFoundError:
+        return
+
+
+def read_jsonl_tail(path: pathlib.Path, max_entries: int = 100,
+                    match: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+    """Last max_entries records (optionally only those matching), oldest first."""
+    out: List[Dict[str, Any]] = []
+    if max_entries <= 0:
+        return out
+    for obj in iter_jsonl_reverse(path):
+        if match is None or match(obj):
+            out.append(obj)
+            if len(out) >= max_entries:
+                break
+    out.reverse()
+    return out
+
+
+def read_task_jsonl(path: pathlib.Path, task_id: str, max_entries: int = 100,
+                    scan_fallback: int = 200) -> List[Dict[str, Any]]:
+    """Last max_entries records of one task, oldest first.
+
+    Uses the task's offset sidecar; without one (records written before
+    indexing existed) falls back to filtering the last scan_fallback lines.
+    When the log was rotated since the task's first record, the last
+    scan_fallback records of the closed segments fill up the result.
+    """
+    path = pathlib.Path(path)
+    flush_jsonl(path)
+    _maybe_prune_task_index(path.parent)
+    try:
+        offsets = task_index_path(path, task_id).read_bytes().split()
+    except FileNotFoundError:
+        tail = read_jsonl_tail(path, scan_fallback)
+        return [e for e in tail if e.get("task_id") == task_id][-max_entries:]
+    rotated = ROTATED_MARKER in offsets
+    if rotated:
+        offsets = offsets[len(offsets) - offsets[::-1].index(ROTATED_MARKER):]
+    out: List[Dict[str, Any]] = []
+    try:
+        with open(path, "rb") as f:
+            for raw in offsets[-max_entries:] if max_entries > 0 else []:
+                if not raw.isdigit():
+                    continue
+                f.seek(int(raw))
+                obj = _parse(f.readline())
+                # A log replaced since the offset was recorded yields a foreign record
+                if obj is not None and str(obj.get("task_id")) == str(task_id):
+                    out.append(obj)
+    except FileNotFoundError:
+        pass
+    if rotated and len(out) < max_entries:
+        earlier: List[Dict[str, Any]] = []
+        for n, obj in enumerate(_iter_segments_reverse(list_segments(path))):
+            if n >= scan_fallback or len(earlier) + len(out) >= max_entries:
+                break
+            if str(obj.get("task_id")) == str(task_id):
+                earlier.append(obj)
+        out = earlier[::-1] + out
+    return out
+
+
+def _maybe_prune_task_index(logs_dir: pathlib.Path) -> None:
+    """Once per process: drop task index dirs untouched for two weeks."""
+    root = logs_dir / ".task_index"
+    with _prune_lock:
+        if root in _pruned_dirs:
+            return
+        _pruned_dirs.add(root)
+    cutoff = time.time() - _TASK_INDEX_TTL_SEC
+    try:
+        for task_dir in root.iterdir():
+            # Appends touch the .off files, not the directory
+            if max((p.stat().st_mtime for p in task_dir.iterdir()), default=0) < cutoff:
+                shutil.rmtree(task_dir, ignore_errors=True)
+    except FileNotFoundError:
+        return
+    except OSError:
+        log.debug("Failed to prune task index in %s", logs_dir, exc_info=True)
+
+
+class JsonlFollower:
+    """Reads records appended to a JSONL file since the previous call.
+
+    The file stays open between calls, so when the log is rotated the rest
+    of the closed segment is still read (through the old descriptor) before
+    switching to the new file.
+    """
+
+    def __init__(self, path: pathlib.Path, offset: Optional[int] = None):
+        self.path = pathlib.Path(path)
+        if offset is None:  # Follow from the current end
+            try:
+                offset = self.path.stat().st_size
+            except OSError:
+                offset = 0
+        self.offset = max(0, int(offset))
+        self._f: Any = None
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        flush_jsonl(self.path)
+        out: List[Dict[str, Any]] = []
+        for _ in range(2):  # The current file, then its successor if it was rotated
+            if self._f is None:
+                try:
+                    self._f = open(self.path, "rb")
+                except FileNotFoundError:
+                    break
+            out.extend(self._read_available())
+            if not self._rotated():
+                break
+            self.close()
+            self.offset = 0
+        return out
+
+    def inode(self) -> Optional[int]:
+        """Inode of the file the offset refers to (None until it has been opened)."""
+        return os.fstat(self._f.fileno()).st_ino if self._f is not None else None
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def _read_available(self) -> List[Dict[str, Any]]:
+        size = self._f.seek(0, os.SEEK_END)
+        if size < self.offset:  # Truncated in place: start over
+            self.offset = 0
+        self._f.seek(self.offset)
+        data = self._f.read(size - self.offset)
+        end = data.rfind(b"\n")
+        if end < 0:
+            return []
+        self.offset += end + 1  # A trailing partial line is read next time
+        out = []
+        for line in data[:end].split(b"\n"):
+            if line.strip():
+                obj = _parse(line)
+                if obj is not None:
+                    out.append(obj)
+        return out
+
+    def _rotated(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False  # Renamed, successor not created yet: keep the old file
+        fst = os.fstat(self._f.fileno())
+        return (st.st_dev, st.st_ino) != (fst.st_dev, fst.st_ino)
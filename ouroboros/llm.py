@@ -2,16 +2,21 @@
 Ouroboros — LLM client.
 
 The only module that communicates with the LLM API (OpenRouter).
-Contract: chat(), default_model(), available_models(), add_usage().
+Contract: chat() / achat(), default_model(), available_models(), add_usage().
+HTTP goes through the process-wide pool in http_pool.py.
 """
 
 from __future__ import annotations
 
+import copy
+import json
 import logging
 import os
+import threading
 import httpx
-import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ouroboros.circuit_breaker import CircuitOpenError, get_breaker
 
 log = logging.getLogger(__name__)
 
@@ -37,6 +42,12 @@ def add_usage(total: Dict[str, Any], usage: Dict[str, Any]) -> None:
         total["cost"] = float(total.get("cost") or 0) + float(usage["cost"])
 
 
+def cache_hit_ratio(usage: Dict[str, Any]) -> float:
+    """cached_tokens / prompt_tokens (0.0 without prompt tokens)."""
+    prompt = int(usage.get("prompt_tokens") or 0)
+    return round(int(usage.get("cached_tokens") or 0) / prompt, 3) if prompt else 0.0
+
+
 def fetch_openrouter_pricing() -> Dict[str, Tuple[float, float, float]]:
     """
     Fetch current pricing from OpenRouter API.
@@ -44,18 +55,11 @@ def fetch_openrouter_pricing() -> Dict[str, Tuple[float, float, float]]:
     Returns dict of {model_id: (input_per_1m, cached_per_1m, output_per_1m)}.
     Returns empty dict on failure.
     """
-    import logging
-    log = logging.getLogger("ouroboros.llm")
-
-    try:
-        import requests
-    except ImportError:
-        log.warning("requests not installed, cannot fetch pricing")
-        return {}
+    from ouroboros.http_pool import get_http_client
 
     try:
         url = "https://openrouter.ai/api/v1/models"
-        resp = requests.get(url, timeout=15)
+        resp = get_http_client().get(url, timeout=15)
         resp.raise_for_status()
 
         data = resp.json()
@@ -98,11 +102,150 @@ def fetch_openrouter_pricing() -> Dict[str, Tuple[float, float, float]]:
         log.info(f"Fetched pricing for {len(pricing_dict)} models from OpenRouter")
         return pricing_dict
 
-    except (requests.RequestException, ValueError, KeyError) as e:
+    except (httpx.HTTPError, ValueError, KeyError) as e:
         log.warning(f"Failed to fetch OpenRouter pricing: {e}")
         return {}
 
 
+
+def fetch_generation_cost(
+    generation_id: str,
+    api_key: Optional[str] = None,
+    base_url: str = "https://openrouter.ai/api/v1",
+) -> Optional[float]:
+    """
+    Look up the billed cost of one generation via the OpenRouter Generation API.
+
+    Single attempt; returns None if the record is not ready yet or on error.
+    Retries and batching live in cost_reconciler.
+    """
+    from ouroboros.http_pool import get_http_client
+    key = api_key or os.environ.get("OPENROUTER_API_KEY", "")
+    try:
+        url = f"{base_url.rstrip('/')}/generation?id={generation_id}"
+        resp = get_http_client().get(url, headers={"Authorization": f"Bearer {key}"}, timeout=5)
+        if resp.status_code == 200:
+            data = resp.json().get("data") or {}
+            cost = data.get("total_cost") or data.get("usage", {}).get("cost")
+            if cost is not None:
+                return float(cost)
+    except Exception:
+        log.debug("Failed to fetch generation cost from OpenRouter", exc_info=True)
+    return None
+
+
+class LLMCancelled(Exception):
+    """A streamed chat() call was aborted via its cancel event."""
+
+    def __init__(self, generation_id: str = ""):
+        super().__init__(f"LLM call cancelled (generation {generation_id or 'unknown'})")
+        self.generation_id = generation_id
+
+
+def _normalize_cache_usage(usage: Dict[str, Any]) -> None:
+    """Lift cached/cache-write token counts out of prompt_tokens_details."""
+    # Extract cached_tokens from prompt_tokens_details if available
+    if not usage.get("cached_tokens"):
+        prompt_details = usage.get("prompt_tokens_details") or {}
+        if isinstance(prompt_details, dict) and prompt_details.get("cached_tokens"):
+            usage["cached_tokens"] = int(prompt_details["cached_tokens"])
+
+    # Extract cache_write_tokens from prompt_tokens_details if available
+    # OpenRouter: "cache_write_tokens"
+    # Native Anthropic: "cache_creation_tokens" or "cache_creation_input_tokens"
+    if not usage.get("cache_write_tokens"):
+        prompt_details_for_write = usage.get("prompt_tokens_details") or {}
+        if isinstance(prompt_details_for_write, dict):
+            cache_write = (prompt_details_for_write.get("cache_write_tokens")
+                          or prompt_details_for_write.get("cache_creation_tokens")
+                          or prompt_details_for_write.get("cache_creation_input_tokens"))
+            if cache_write:
+                usage["cache_write_tokens"] = int(cache_write)
+
+
+class _StreamAssembler:
+    """
+    Rebuilds a chat completion message from streamed chunks.
+
+    Tool-call deltas arrive keyed by index: the first delta for an index
+    carries id and function name, later ones append argument fragments.
+    A call is considered finished once a higher index starts (or the stream
+    ends) and its arguments parse as JSON; it is then passed to on_tool_call
+    exactly once.
+    """
+
+    def __init__(self, on_tool_call: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self._on_tool_call = on_tool_call
+        self._content: List[str] = []
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+        self._emitted: set = set()
+        self._usage: Dict[str, Any] = {}
+        self._gen_id = ""
+        self._role = "assistant"
+
+    def feed(self, chunk: Dict[str, Any]) -> None:
+        if chunk.get("id") and not self._gen_id:
+            self._gen_id = str(chunk["id"])
+        if chunk.get("usage"):
+            self._usage = dict(chunk["usage"])
+        for choice in chunk.get("choices") or []:
+            delta = choice.get("delta") or {}
+            if delta.get("role"):
+                self._role = delta["role"]
+            if delta.get("content"):
+                self._content.append(delta["content"])
+            for tc_delta in delta.get("tool_calls") or []:
+                self._merge_tool_delta(tc_delta)
+
+    @property
+    def generation_id(self) -> str:
+        return self._gen_id
+
+    def _merge_tool_delta(self, tc_delta: Dict[str, Any]) -> None:
+        idx = int(tc_delta.get("index") or 0)
+        if idx not in self._tool_calls:
+            # A new index means every earlier call has received all its fragments
+            for prev in sorted(self._tool_calls):
+                if prev < idx:
+                    self._emit(prev, require_json=True)
+            self._tool_calls[idx] = {
+                "id": "", "type": "function", "function": {"name": "", "arguments": ""},
+            }
+        tc = self._tool_calls[idx]
+        if tc_delta.get("id"):
+            tc["id"] = tc_delta["id"]
+        fn = tc_delta.get("function") or {}
+        if fn.get("name"):
+            tc["function"]["name"] += fn["name"]
+        if fn.get("arguments"):
+            tc["function"]["arguments"] += fn["arguments"]
+
+    def _emit(self, idx: int, require_json: bool) -> None:
+        if idx in self._emitted or self._on_tool_call is None:
+            return
+        tc = self._tool_calls[idx]
+        if not tc["id"] or not tc["function"]["name"]:
+            return
+        if require_json:
+            try:
+                json.loads(tc["function"]["arguments"] or "{}")
+            except ValueError:
+                return  # Interleaved or truncated fragments; wait for end of stream
+        self._emitted.add(idx)
+        try:
+            self._on_tool_call(copy.deepcopy(tc))
+        except Exception:
+            log.debug("on_tool_call callback failed", exc_info=True)
+
+    def finish(self) -> Tuple[Dict[str, Any], Dict[str, Any], str]:
+        for idx in sorted(self._tool_calls):
+            self._emit(idx, require_json=False)
+        msg: Dict[str, Any] = {"role": self._role, "content": "".join(self._content) or None}
+        if self._tool_calls:
+            msg["tool_calls"] = [self._tool_calls[i] for i in sorted(self._tool_calls)]
+        return msg, self._usage, self._gen_id
+
+
 class LLMClient:
     """OpenRouter API wrapper. All LLM calls go through this class."""
 
@@ -114,10 +257,15 @@ class LLMClient:
         self._api_key = api_key or os.environ.get("OPENROUTER_API_KEY", "")
         self._base_url = base_url
         self._client = None
+        self._client_pid = 0
+        self._async_client = None
+        self._async_client_pid = 0
 
     def _get_client(self):
-        if self._client is None:
+        # Rebuild after fork: the shared pool hands the child a fresh transport
+        if self._client is None or self._client_pid != os.getpid():
             from openai import OpenAI
+            from ouroboros.http_pool import get_http_client
             self._client = OpenAI(
                 timeout=httpx.Timeout(60.0, connect=10.0, read=90.0),
                 base_url=self._base_url,
@@ -126,32 +274,28 @@ class LLMClient:
                     "HTTP-Referer": "https://github.com/Salen79/ouroboros",
                     "X-Title": "Ouroboros",
                 },
+                http_client=get_http_client(),
             )
+            self._client_pid = os.getpid()
         return self._client
 
-    def _fetch_generation_cost(self, generation_id: str) -> Optional[float]:
-        """Fetch cost from OpenRouter Generation API as fallback."""
-        try:
-            import requests
-            url = f"{self._base_url.rstrip('/')}/generation?id={generation_id}"
-            resp = requests.get(url, headers={"Authorization": f"Bearer {self._api_key}"}, timeout=5)
-            if resp.status_code == 200:
-                data = resp.json().get("data") or {}
-                cost = data.get("total_cost") or data.get("usage", {}).get("cost")
-                if cost is not None:
-                    return float(cost)
-            # Generation might not be ready yet — retry once after short delay
-            time.sleep(0.5)
-            resp = requests.get(url, headers={"Authorization": f"Bearer {self._api_key}"}, timeout=5)
-            if resp.status_code == 200:
-                data = resp.json().get("data") or {}
-                cost = data.get("total_cost") or data.get("usage", {}).get("cost")
-                if cost is not None:
-                    return float(cost)
-        except Exception:
-            log.debug("Failed to fetch generation cost from OpenRouter", exc_info=True)
-            pass
-        return None
+    def _get_async_client(self):
+        # Bound to the shared AsyncClient, so it must only be used on the transport loop
+        if self._async_client is None or self._async_client_pid != os.getpid():
+            from openai import AsyncOpenAI
+            from ouroboros.http_pool import get_async_http_client
+            self._async_client = AsyncOpenAI(
+                timeout=httpx.Timeout(60.0, connect=10.0, read=90.0),
+                base_url=self._base_url,
+                api_key=self._api_key,
+                default_headers={
+                    "HTTP-Referer": "https://github.com/Salen79/ouroboros",
+                    "X-Title": "Ouroboros",
+                },
+                http_client=get_async_http_client(),
+            )
+            self._async_client_pid = os.getpid()
+        return self._async_client
 
     def chat(
         self,
@@ -161,9 +305,122 @@ class LLMClient:
         reasoning_effort: str = "medium",
         max_tokens: int = 16384,
         tool_choice: str = "auto",
+        stream: bool = False,
+        on_tool_call: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None,
     ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-        """Single LLM call. Returns: (response_message_dict, usage_dict with cost)."""
+        """
+        Single LLM call. Returns: (response_message_dict, usage_dict with cost).
+
+        With stream=True the response is consumed as server-sent chunks and
+        assembled into the same message dict. Each tool call is handed to
+        on_tool_call as soon as its arguments are complete, before the model
+        finishes the rest of its turn. Setting `cancel` aborts a streamed call
+        at the next chunk with LLMCancelled (the connection is closed, so the
+        provider stops generating).
+        """
         client = self._get_client()
+        kwargs = self._build_chat_kwargs(messages, model, tools, reasoning_effort, max_tokens, tool_choice)
+
+        # Shared circuit breaker: fail fast instead of piling onto a degraded model
+        breaker = get_breaker()
+        allowed, retry_in = breaker.allow(model)
+        if not allowed:
+            raise CircuitOpenError(model, retry_in)
+
+        try:
+            if stream:
+                kwargs["stream"] = True
+                kwargs["stream_options"] = {"include_usage": True}
+                assembler = _StreamAssembler(on_tool_call)
+                with client.chat.completions.create(**kwargs) as chunks:
+                    for chunk in chunks:
+                        if cancel is not None and cancel.is_set():
+                            raise LLMCancelled(assembler.generation_id)
+                        assembler.feed(chunk.model_dump())
+                msg, usage, gen_id = assembler.finish()
+            else:
+                resp = client.chat.completions.create(**kwargs)
+                msg, usage, gen_id = self._parse_response(resp.model_dump())
+        except LLMCancelled:
+            raise
+        except Exception as e:
+            breaker.record_exception(model, e)
+            raise
+        breaker.record_success(model)
+        return msg, self._finalize_usage(model, usage, gen_id)
+
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        reasoning_effort: str = "medium",
+        max_tokens: int = 16384,
+        tool_choice: str = "auto",
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Async chat() for run_llm_loop_async. Same breaker and cost handling.
+
+        The request runs on the shared transport loop (http_pool.arun), so any
+        number of concurrent tasks share one keep-alive pool; cancelling the
+        awaiting task cancels the request.
+        """
+        from ouroboros.http_pool import arun
+        kwargs = self._build_chat_kwargs(messages, model, tools, reasoning_effort, max_tokens, tool_choice)
+
+        breaker = get_breaker()
+        allowed, retry_in = breaker.allow(model)
+        if not allowed:
+            raise CircuitOpenError(model, retry_in)
+
+        async def _create() -> Dict[str, Any]:
+            resp = await self._get_async_client().chat.completions.create(**kwargs)
+            return resp.model_dump()
+
+        try:
+            msg, usage, gen_id = self._parse_response(await arun(_create()))
+        except Exception as e:
+            breaker.record_exception(model, e)
+            raise
+        breaker.record_success(model)
+        return msg, self._finalize_usage(model, usage, gen_id)
+
+    @staticmethod
+    def _parse_response(resp_dict: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], str]:
+        usage = resp_dict.get("usage") or {}
+        choices = resp_dict.get("choices") or [{}]
+        msg = (choices[0] if choices else {}).get("message") or {}
+        return msg, usage, resp_dict.get("id") or ""
+
+    @staticmethod
+    def _finalize_usage(model: str, usage: Dict[str, Any], gen_id: str) -> Dict[str, Any]:
+        _normalize_cache_usage(usage)
+
+        # OpenRouter normally includes cost. If it is missing, return an estimate now
+        # and let the caller hand generation_id to cost_reconciler for the real value.
+        if not usage.get("cost"):
+            from ouroboros.pricing import estimate_cost
+            usage["cost"] = estimate_cost(
+                model,
+                int(usage.get("prompt_tokens") or 0),
+                int(usage.get("completion_tokens") or 0),
+                int(usage.get("cached_tokens") or 0),
+                int(usage.get("cache_write_tokens") or 0),
+            )
+            usage["cost_estimated"] = True
+            usage["generation_id"] = gen_id
+        return usage
+
+    @staticmethod
+    def _build_chat_kwargs(
+        messages: List[Dict[str, Any]],
+        model: str,
+        tools: Optional[List[Dict[str, Any]]],
+        reasoning_effort: str,
+        max_tokens: int,
+        tool_choice: str,
+    ) -> Dict[str, Any]:
         effort = normalize_reasoning_effort(reasoning_effort)
 
         extra_body: Dict[str, Any] = {
@@ -194,40 +451,7 @@ class LLMClient:
                 tools_with_cache[-1] = last_tool
             kwargs["tools"] = tools_with_cache
             kwargs["tool_choice"] = tool_choice
-
-        resp = client.chat.completions.create(**kwargs)
-        resp_dict = resp.model_dump()
-        usage = resp_dict.get("usage") or {}
-        choices = resp_dict.get("choices") or [{}]
-        msg = (choices[0] if choices else {}).get("message") or {}
-
-        # Extract cached_tokens from prompt_tokens_details if available
-        if not usage.get("cached_tokens"):
-            prompt_details = usage.get("prompt_tokens_details") or {}
-            if isinstance(prompt_details, dict) and prompt_details.get("cached_tokens"):
-                usage["cached_tokens"] = int(prompt_details["cached_tokens"])
-
-        # Extract cache_write_tokens from prompt_tokens_details if available
-        # OpenRouter: "cache_write_tokens"
-        # Native Anthropic: "cache_creation_tokens" or "cache_creation_input_tokens"
-        if not usage.get("cache_write_tokens"):
-            prompt_details_for_write = usage.get("prompt_tokens_details") or {}
-            if isinstance(prompt_details_for_write, dict):
-                cache_write = (prompt_details_for_write.get("cache_write_tokens")
-                              or prompt_details_for_write.get("cache_creation_tokens")
-                              or prompt_details_for_write.get("cache_creation_input_tokens"))
-                if cache_write:
-                    usage["cache_write_tokens"] = int(cache_write)
-
-        # Ensure cost is present in usage (OpenRouter includes it, but fallback if missing)
-        if not usage.get("cost"):
-            gen_id = resp_dict.get("id") or ""
-            if gen_id:
-                cost = self._fetch_generation_cost(gen_id)
-                if cost is not None:
-                    usage["cost"] = cost
-
-        return msg, usage
+        return kwargs
 
     def vision_query(
         self,
@@ -295,3 +519,16 @@ class LLMClient:
         if light and light != main and light != code:
             models.append(light)
         return models
+
+
+_shared_client: Optional[LLMClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def shared_llm_client() -> LLMClient:
+    """Process-wide LLMClient for helper calls (compaction, summaries, vision, dedup)."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient()
+        return _shared_client
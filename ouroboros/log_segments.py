@@ -0,0 +1,228 @@
+"""
+Ouroboros — Segmented log storage.
+
+Every logs/*.jsonl file is an active segment. Once it grows past
+OUROBOROS_LOG_SEGMENT_MB or its first record is older than
+OUROBOROS_LOG_SEGMENT_HOURS, rotate_if_needed() renames it to
+logs/segments/<stem>/<stem>.<first>_<last>.jsonl (UTC timestamps of its
+first and last record) and writers start a fresh file (JsonlWriter sees
+the inode change). A closed segment is gzip-compressed on a later pass,
+after a grace period, so a writer that raced the rename never appends to
+a file that is about to be deleted.
+
+Reading across segments (newest first, or by time range) lives in
+ouroboros.jsonl_tail; this module only names, lists and maintains them.
+"""
+
+from __future__ import annotations
+
+import datetime
+import gzip
+import json
+import logging
+import os
+import pathlib
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ouroboros.utils import flush_jsonl
+
+log = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        log.warning("Invalid %s, defaulting to %s", name, default)
+        return default
+
+
+SEGMENT_MAX_BYTES = int(_env_float("OUROBOROS_LOG_SEGMENT_MB", 16.0) * 1024 * 1024)
+SEGMENT_MAX_AGE_SEC = _env_float("OUROBOROS_LOG_SEGMENT_HOURS", 24.0 * 7) * 3600
+COMPRESS_GRACE_SEC = 60.0
+ROTATED_MARKER = b"-"  # In a task offset file: earlier records are in closed segments
+
+_TS_FORMAT = "%Y%m%dT%H%M%SZ"
+_SEGMENT_RE = re.compile(r"^(?P<stem>.+)\.(?P<start>\d{8}T\d{6}Z)_(?P<end>\d{8}T\d{6}Z)(?:\.(?P<n>\d+))?\.jsonl(?P<gz>\.gz)?$")
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A closed log segment; start/end are epoch seconds of its first and last record."""
+    path: pathlib.Path
+    start: float
+    end: float
+    compressed: bool
+
+
+def segments_dir(path: pathlib.Path) -> pathlib.Path:
+    """logs/segments/<stem> for logs/<stem>.jsonl."""
+    path = pathlib.Path(path)
+    return path.parent / "segments" / path.stem
+
+
+def parse_ts(value: Any) -> Optional[float]:
+    """Epoch seconds of a record's ISO "ts" (naive means UTC); None if absent or invalid."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+def _fmt(epoch: float) -> str:
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).strftime(_TS_FORMAT)
+
+
+def _unfmt(text: str) -> float:
+    return datetime.datetime.strptime(text, _TS_FORMAT).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def list_segments(path: pathlib.Path) -> List[Segment]:
+    """Closed segments of a log, oldest first."""
+    path = pathlib.Path(path)
+    out: List[Segment] = []
+    try:
+        entries = list(segments_dir(path).iterdir())
+    except FileNotFoundError:
+        return out
+    for p in entries:
+        m = _SEGMENT_RE.match(p.name)
+        if not m or m.group("stem") != path.stem:
+            continue
+        if not m.group("gz") and p.with_name(p.name + ".gz").exists():
+            continue  # Compression finished, original not yet removed
+        out.append(Segment(p, _unfmt(m.group("start")), _unfmt(m.group("end")), bool(m.group("gz"))))
+    out.sort(key=lambda s: (s.start, s.end, s.path.name))
+    return out
+
+
+def open_segment(segment: Segment):
+    """Binary file object with the segment's uncompressed JSONL."""
+    return gzip.open(segment.path, "rb") if segment.compressed else open(segment.path, "rb")
+
+
+def _edge_ts(path: pathlib.Path, last: bool) -> Optional[float]:
+    """ts of the first (or last) parseable record of a plain JSONL file."""
+    try:
+        with open(path, "rb") as f:
+            if last:
+                f.seek(max(0, f.seek(0, os.SEEK_END) - 64 * 1024))
+                lines = f.read().splitlines()[::-1]
+            else:
+                lines = [f.readline(), f.readline()]
+    except OSError:
+        return None
+    for line in lines:
+        try:
+            ts = parse_ts(json.loads(line).get("ts"))
+        except (ValueError, AttributeError):
+            continue
+        if ts is not None:
+            return ts
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Maintenance (supervisor)
+# ---------------------------------------------------------------------------
+
+def rotate_if_needed(path: pathlib.Path, max_bytes: int = SEGMENT_MAX_BYTES,
+                     max_age_sec: float = SEGMENT_MAX_AGE_SEC,
+                     now: Optional[float] = None) -> Optional[pathlib.Path]:
+    """Close the active segment if it is too big or too old; returns the closed segment path."""
+    path = pathlib.Path(path)
+    now = time.time() if now is None else now
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if st.st_size == 0:
+        return None
+    start = _edge_ts(path, last=False)
+    too_old = max_age_sec > 0 and start is not None and now - start >= max_age_sec
+    if st.st_size < max_bytes and not too_old:
+        return None
+
+    flush_jsonl(path)  # Buffered records belong to the closing segment
+    start = start if start is not None else st.st_mtime
+    end = max(start, _edge_ts(path, last=True) or st.st_mtime)
+    target_dir = segments_dir(path)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    base = f"{path.stem}.{_fmt(start)}_{_fmt(end)}"
+    target = target_dir / f"{base}.jsonl"
+    n = 1
+    while target.exists() or target.with_name(target.name + ".gz").exists():
+        target = target_dir / f"{base}.{n}.jsonl"
+        n += 1
+    os.replace(path, target)
+    _drop_task_offsets(path)
+    log.info("Closed log segment %s (%d bytes)", target.name, st.st_size)
+    return target
+
+
+def _drop_task_offsets(path: pathlib.Path) -> None:
+    """Offsets into the closed segment mean nothing in the new file: reset them to a rotation marker."""
+    root = path.parent / ".task_index"
+    try:
+        task_dirs = list(root.iterdir())
+    except FileNotFoundError:
+        return
+    for task_dir in task_dirs:
+        off = task_dir / f"{path.name}.off"
+        try:
+            if off.exists():
+                off.write_bytes(ROTATED_MARKER + b"\n")
+        except OSError:
+            log.debug("Failed to reset task offsets in %s", task_dir, exc_info=True)
+
+
+def compress_closed(path: pathlib.Path, grace_sec: float = COMPRESS_GRACE_SEC,
+                    now: Optional[float] = None) -> int:
+    """gzip closed segments untouched for grace_sec; returns how many were compressed."""
+    now = time.time() if now is None else now
+    done = 0
+    for seg in list_segments(path):
+        if seg.compressed:
+            continue
+        try:
+            st = seg.path.stat()
+            if now - max(st.st_mtime, st.st_ctime) < grace_sec:  # ctime: when it was renamed
+                continue
+            tmp = seg.path.with_name(seg.path.name + ".gz.tmp")
+            with open(seg.path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp, seg.path.with_name(seg.path.name + ".gz"))
+            seg.path.unlink()
+            done += 1
+        except OSError:
+            log.warning("Failed to compress log segment %s", seg.path, exc_info=True)
+    return done
+
+
+def maintain_logs(logs_dir: pathlib.Path, max_bytes: int = SEGMENT_MAX_BYTES,
+                  max_age_sec: float = SEGMENT_MAX_AGE_SEC) -> Dict[str, Any]:
+    """Rotate and compress every logs/*.jsonl; returns what was done."""
+    rotated: List[str] = []
+    compressed = 0
+    logs_dir = pathlib.Path(logs_dir)
+    paths = set(logs_dir.glob("*.jsonl"))
+    if (logs_dir / "segments").is_dir():  # Logs closed and not written since
+        paths.update(logs_dir / f"{d.name}.jsonl" for d in (logs_dir / "segments").iterdir() if d.is_dir())
+    for path in sorted(paths):
+        try:
+            compressed += compress_closed(path)  # Before rotating: a just-closed segment waits a pass
+            closed = rotate_if_needed(path, max_bytes=max_bytes, max_age_sec=max_age_sec)
+            if closed is not None:
+                rotated.append(closed.name)
+        except OSError:
+            log.warning("Log segment maintenance failed for %s", path, exc_info=True)
+    return {"rotated": rotated, "compressed": compressed}
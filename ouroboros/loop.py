@@ -12,355 +12,169 @@ import os
 import pathlib
 import queue
 import threading
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import logging
 
-from ouroboros.llm import LLMClient, normalize_reasoning_effort, add_usage
+from ouroboros import blob_store
+from ouroboros.llm import LLMClient, normalize_reasoning_effort, add_usage, cache_hit_ratio
+from ouroboros.cost_reconciler import get_reconciler, queue_sink, reconcile_estimate
+from ouroboros.pricing import estimate_cost as _estimate_cost
+from ouroboros.hedging import get_tracker, hedged_chat, hedging_enabled, timed_chat
+from ouroboros.circuit_breaker import CircuitOpenError, get_breaker
 from ouroboros.tools.registry import ToolRegistry
-from ouroboros.context import compact_tool_history, compact_tool_history_llm
-from ouroboros.utils import utc_now_iso, append_jsonl, truncate_for_log, sanitize_tool_args_for_log, sanitize_tool_result_for_log, estimate_tokens
+from ouroboros.tool_scheduler import ResourceSets, call_resources, conflicts, schedule_waves
+from ouroboros.tool_executor import _StatefulToolExecutor, _execute_with_timeout, execute_parallel
+from ouroboros.context import (
+    ConversationLog, add_compaction_cache_breakpoint, compact_tool_history, compact_tool_history_llm,
+)
+from ouroboros.tokenizer import messages_tokens
+from ouroboros.utils import utc_now_iso, append_jsonl, truncate_for_log
 
 log = logging.getLogger(__name__)
 
-# Pricing from OpenRouter API (2026-02-17). Update periodically via /api/v1/models.
-_MODEL_PRICING_STATIC = {
-    # Anthropic
-    "anthropic/claude-opus-4": (15.0, 1.5, 75.0),
-    "anthropic/claude-opus-4.1": (15.0, 1.5, 75.0),
-    "anthropic/claude-opus-4.5": (5.0, 0.5, 25.0),
-    "anthropic/claude-opus-4.6": (5.0, 0.5, 25.0),
-    "anthropic/claude-sonnet-4": (3.0, 0.30, 15.0),
-    "anthropic/claude-sonnet-4.5": (3.0, 0.30, 15.0),
-    "anthropic/claude-sonnet-4.6": (3.0, 0.30, 15.0),
-    "anthropic/claude-3.7-sonnet": (3.0, 0.30, 15.0),
-    "anthropic/claude-3.5-sonnet": (6.0, 0.6, 30.0),
-    "anthropic/claude-3.5-haiku": (0.8, 0.08, 4.0),
-    "anthropic/claude-haiku-4.5": (1.0, 0.1, 5.0),
-    "anthropic/claude-3-haiku": (0.25, 0.03, 1.25),
-    # OpenAI
-    "openai/gpt-5": (1.25, 0.125, 10.0),
-    "openai/gpt-5-mini": (0.25, 0.025, 2.0),
-    "openai/gpt-5-nano": (0.05, 0.005, 0.4),
-    "openai/gpt-5-pro": (15.0, 1.5, 120.0),
-    "openai/gpt-4.1": (2.0, 0.50, 8.0),
-    "openai/gpt-4.1-mini": (0.4, 0.1, 1.6),
-    "openai/gpt-4.1-nano": (0.1, 0.025, 0.4),
-    "openai/gpt-4o": (2.5, 1.25, 10.0),
-    "openai/gpt-4o-mini": (0.15, 0.075, 0.6),
-    "openai/o3": (2.0, 0.50, 8.0),
-    "openai/o3-pro": (20.0, 2.0, 80.0),
-    "openai/o3-mini": (1.1, 0.55, 4.4),
-    "openai/o4-mini": (1.10, 0.275, 4.40),
-    "openai/o4-mini-high": (1.1, 0.275, 4.4),
-    # Google
-    "google/gemini-2.5-pro": (1.25, 0.125, 10.0),
-    "google/gemini-2.5-pro-preview": (1.25, 0.125, 10.0),
-    "google/gemini-2.5-flash": (0.3, 0.03, 2.5),
-    "google/gemini-2.5-flash-lite": (0.1, 0.01, 0.4),
-    "google/gemini-2.5-flash-lite-preview-09-2025": (0.1, 0.01, 0.4),
-    "google/gemini-2.0-flash-001": (0.1, 0.025, 0.4),
-    "google/gemini-2.0-flash-lite-001": (0.075, 0.0075, 0.3),
-    # xAI
-    "x-ai/grok-4": (3.0, 0.75, 15.0),
-    "x-ai/grok-3": (3.0, 0.75, 15.0),
-    "x-ai/grok-3-mini": (0.30, 0.075, 0.50),
-    "x-ai/grok-3-beta": (3.0, 0.75, 15.0),
-    "x-ai/grok-3-mini-beta": (0.3, 0.075, 0.5),
-    # Qwen
-    "qwen/qwen3-235b-a22b": (0.455, 0.0455, 1.82),
-    "qwen/qwen3-32b": (0.08, 0.04, 0.24),
-    "qwen/qwen3-30b-a3b": (0.08, 0.008, 0.28),
-    "qwen/qwen3-8b": (0.05, 0.05, 0.4),
-    "qwen/qwen3.5-plus-02-15": (0.26, 0.026, 1.56),
-    # Meta
-    "meta-llama/llama-4-maverick": (0.15, 0.015, 0.6),
-    "meta-llama/llama-4-scout": (0.08, 0.008, 0.3),
-    "meta-llama/llama-3.3-70b-instruct": (0.1, 0.01, 0.32),
-}
-
-_pricing_fetched = False
-_cached_pricing = None
-_pricing_lock = threading.Lock()
-
-def _get_pricing() -> Dict[str, Tuple[float, float, float]]:
-    """
-    Lazy-load pricing. On first call, attempts to fetch from OpenRouter API.
-    Falls back to static pricing if fetch fails.
-    Thread-safe via module-level lock.
-    """
-    global _pricing_fetched, _cached_pricing
+# Hedge losers and cost corrections finish on other threads
+_usage_lock = threading.Lock()
 
-    # Fast path: already fetched (read without lock for performance)
-    if _pricing_fetched:
-        return _cached_pricing or _MODEL_PRICING_STATIC
 
-    # Slow path: fetch pricing (lock required)
-    with _pricing_lock:
-        # Double-check after acquiring lock (another thread may have fetched)
-        if _pricing_fetched:
-            return _cached_pricing or _MODEL_PRICING_STATIC
+def _add_task_usage(accumulated_usage: Dict[str, Any], usage: Dict[str, Any]) -> None:
+    with _usage_lock:
+        add_usage(accumulated_usage, usage)
 
-        _pricing_fetched = True
-        _cached_pricing = dict(_MODEL_PRICING_STATIC)
 
-        try:
-            from ouroboros.llm import fetch_openrouter_pricing
-            _live = fetch_openrouter_pricing()
-            if _live and len(_live) > 5:
-                _cached_pricing.update(_live)
-        except Exception as e:
-            import logging as _log
-            _log.getLogger(__name__).warning("Failed to sync pricing from OpenRouter: %s", e)
-            # Reset flag so we retry next time
-            _pricing_fetched = False
-
-        return _cached_pricing
-
-def _estimate_cost(model: str, prompt_tokens: int, completion_tokens: int,
-                   cached_tokens: int = 0, cache_write_tokens: int = 0) -> float:
-    """Estimate cost from token counts using known pricing. Returns 0 if model unknown."""
-    model_pricing = _get_pricing()
-    # Try exact match first
-    pricing = model_pricing.get(model)
-    if not pricing:
-        # Try longest prefix match
-        best_match = None
-        best_length = 0
-        for key, val in model_pricing.items():
-            if model and model.startswith(key):
-                if len(key) > best_length:
-                    best_match = val
-                    best_length = len(key)
-        pricing = best_match
-    if not pricing:
-        return 0.0
-    input_price, cached_price, output_price = pricing
-    # Non-cached input tokens = prompt_tokens - cached_tokens
-    regular_input = max(0, prompt_tokens - cached_tokens)
-    cost = (
-        regular_input * input_price / 1_000_000
-        + cached_tokens * cached_price / 1_000_000
-        + completion_tokens * output_price / 1_000_000
-    )
-    return round(cost, 6)
-
-READ_ONLY_PARALLEL_TOOLS = frozenset({
-    "repo_read", "repo_list",
-    "drive_read", "drive_list",
-    "web_search", "codebase_digest", "chat_history",
-})
+def _task_correction_sink(event_queue: Optional[queue.Queue], accumulated_usage: Dict[str, Any]):
+    """Reconciler sink: forward the correction to the supervisor and apply its delta to the task."""
+    forward = queue_sink(event_queue) if event_queue is not None else None
 
-# Stateful browser tools require thread-affinity (Playwright sync uses greenlet)
-STATEFUL_BROWSER_TOOLS = frozenset({"browse_page", "browser_action"})
+    def _sink(evt: Dict[str, Any]) -> None:
+        _add_task_usage(accumulated_usage, {"cost": evt.get("cost")})
+        if forward is not None:
+            forward(evt)
+    return _sink
 
 
-def _truncate_tool_result(result: Any) -> str:
+def _truncate_tool_result(result: Any, drive_root: Optional[pathlib.Path] = None) -> str:
     """
-    Hard-cap tool result string to 15000 characters.
-    If truncated, append a note with the original length.
+    Cap a tool result at 15000 characters.
+
+    With a drive_root, the full text goes to the blob store and the LLM gets
+    a preview plus a handle for read_result; otherwise (or if storing fails)
+    it is hard-cut with a note giving the original length.
     """
     result_str = str(result)
     if len(result_str) <= 15000:
         return result_str
+    if drive_root is not None:
+        try:
+            return blob_store.preview(result_str, blob_store.put(drive_root, result_str))
+        except Exception:
+            log.warning("Failed to store oversized tool result, truncating", exc_info=True)
     original_len = len(result_str)
     return result_str[:15000] + f"\n... (truncated from {original_len} chars)"
 
 
-def _execute_single_tool(
-    tools: ToolRegistry,
-    tc: Dict[str, Any],
-    drive_logs: pathlib.Path,
-    task_id: str = "",
-) -> Dict[str, Any]:
-    """
-    Execute a single tool call and return all needed info.
-
-    Returns dict with: tool_call_id, fn_name, result, is_error, args_for_log, is_code_tool
-    """
-    fn_name = tc["function"]["name"]
-    tool_call_id = tc["id"]
-    is_code_tool = fn_name in tools.CODE_TOOLS
-
-    # Parse arguments
-    try:
-        args = json.loads(tc["function"]["arguments"] or "{}")
-    except (json.JSONDecodeError, ValueError) as e:
-        result = f"⚠️ TOOL_ARG_ERROR: Could not parse arguments for '{fn_name}': {e}"
-        return {
-            "tool_call_id": tool_call_id,
-            "fn_name": fn_name,
-            "result": result,
-            "is_error": True,
-            "args_for_log": {},
-            "is_code_tool": is_code_tool,
-        }
-
-    args_for_log = sanitize_tool_args_for_log(fn_name, args if isinstance(args, dict) else {})
-
-    # Execute tool
-    tool_ok = True
-    try:
-        result = tools.execute(fn_name, args)
-    except Exception as e:
-        tool_ok = False
-        result = f"⚠️ TOOL_ERROR ({fn_name}): {type(e).__name__}: {e}"
-        append_jsonl(drive_logs / "events.jsonl", {
-            "ts": utc_now_iso(), "type": "tool_error", "task_id": task_id,
-            "tool": fn_name, "args": args_for_log, "error": repr(e),
-        })
-
-    # Log tool execution (sanitize secrets from result before persisting)
-    append_jsonl(drive_logs / "tools.jsonl", {
-        "ts": utc_now_iso(), "tool": fn_name, "task_id": task_id,
-        "args": args_for_log,
-        "result_preview": sanitize_tool_result_for_log(truncate_for_log(result, 2000)),
-    })
-
-    is_error = (not tool_ok) or str(result).startswith("⚠️")
-
-    return {
-        "tool_call_id": tool_call_id,
-        "fn_name": fn_name,
-        "result": result,
-        "is_error": is_error,
-        "args_for_log": args_for_log,
-        "is_code_tool": is_code_tool,
-    }
-
-
-class _StatefulToolExecutor:
+class _EarlyToolDispatcher:
     """
-    Thread-sticky executor for stateful tools (browser, etc).
-
-    Playwright sync API uses greenlet internally which has strict thread-affinity:
-    once a greenlet starts in a thread, all subsequent calls must happen in the same thread.
-    This executor ensures browse_page/browser_action always run in the same thread.
-
-    On timeout: we shutdown the executor and create a fresh one to reset state.
+    Starts read-only tool calls while the LLM response is still streaming.
+
+    LLMClient.chat(stream=True) hands over each tool call as soon as its
+    arguments are complete. A call that writes nothing and conflicts with no
+    earlier call of the turn (see tool_scheduler) is submitted immediately;
+    _handle_tool_calls later claims the futures instead of running the same
+    call again. Anything else waits for the scheduled execution, so reads
+    never overtake a write that precedes them.
     """
-    def __init__(self):
+    def __init__(self, tools: ToolRegistry, drive_logs: pathlib.Path, task_id: str = ""):
+        self._tools = tools
+        self._drive_logs = drive_logs
+        self._task_id = task_id
         self._executor: Optional[ThreadPoolExecutor] = None
-
-    def submit(self, fn, *args, **kwargs):
-        """Submit work to the sticky thread. Creates executor on first call."""
-        if self._executor is None:
-            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stateful_tool")
-        return self._executor.submit(fn, *args, **kwargs)
-
-    def reset(self):
-        """Shutdown current executor and create a fresh one. Used after timeout/error."""
+        self._futures: Dict[str, Tuple[str, str, Any]] = {}
+        self._seen: List[ResourceSets] = []
+        self._lock = threading.Lock()
+
+    def on_tool_call(self, tc: Dict[str, Any]) -> None:
+        """Callback for LLMClient.chat: submit the call if it is safe to start early."""
+        fn_name = tc.get("function", {}).get("name", "")
+        res = call_resources(self._tools.get_entry(fn_name), tc)
+        with self._lock:
+            blocked = res is None or bool(res[1]) or any(conflicts(prev, res) for prev in self._seen)
+            self._seen.append(res)
+            if blocked:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="early_tool")
+            future = self._executor.submit(
+                _execute_with_timeout, self._tools, tc, self._drive_logs,
+                self._tools.get_timeout(fn_name), self._task_id,
+            )
+            self._futures[tc["id"]] = (fn_name, tc["function"].get("arguments") or "", future)
+
+    def claim(self, tool_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Return {tool_call_id: future} for calls already started with identical arguments."""
+        claimed: Dict[str, Any] = {}
+        with self._lock:
+            for tc in tool_calls:
+                entry = self._futures.pop(tc.get("id", ""), None)
+                if entry is None:
+                    continue
+                fn_name, arguments, future = entry
+                if fn_name == tc["function"]["name"] and arguments == (tc["function"].get("arguments") or ""):
+                    claimed[tc["id"]] = future
+            self._futures.clear()
+            self._seen = []
+        return claimed
+
+    def reset(self) -> None:
+        """Drop anything started by a previous (failed or retried) attempt."""
+        with self._lock:
+            for _, _, future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+            self._seen = []
+
+    def shutdown(self) -> None:
+        self.reset()
         if self._executor is not None:
             self._executor.shutdown(wait=False, cancel_futures=True)
             self._executor = None
 
-    def shutdown(self, wait=True, cancel_futures=False):
-        """Final cleanup."""
-        if self._executor is not None:
-            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
-            self._executor = None
-
-
-def _make_timeout_result(
-    fn_name: str,
-    tool_call_id: str,
-    is_code_tool: bool,
-    tc: Dict[str, Any],
-    drive_logs: pathlib.Path,
-    timeout_sec: int,
-    task_id: str = "",
-    reset_msg: str = "",
-) -> Dict[str, Any]:
-    """
-    Create a timeout error result dictionary and log the timeout event.
-
-    Args:
-        reset_msg: Optional additional message (e.g., "Browser state has been reset. ")
 
-    Returns: Dict with tool_call_id, fn_name, result, is_error, args_for_log, is_code_tool
-    """
-    args_for_log = {}
+def _compaction_checkpoint() -> int:
+    """Rounds collapsed at once by automatic compaction (OUROBOROS_COMPACTION_CHECKPOINT_ROUNDS)."""
     try:
-        args = json.loads(tc["function"]["arguments"] or "{}")
-        args_for_log = sanitize_tool_args_for_log(fn_name, args if isinstance(args, dict) else {})
-    except Exception:
-        pass
+        return max(1, int(os.environ.get("OUROBOROS_COMPACTION_CHECKPOINT_ROUNDS", "8")))
+    except (TypeError, ValueError):
+        log.warning("Invalid OUROBOROS_COMPACTION_CHECKPOINT_ROUNDS, defaulting to 8")
+        return 8
 
-    result = (
-        f"⚠️ TOOL_TIMEOUT ({fn_name}): exceeded {timeout_sec}s limit. "
-        f"The tool is still running in background but control is returned to you. "
-        f"{reset_msg}Try a different approach or inform the owner{' about the issue' if not reset_msg else ''}."
-    )
 
-    append_jsonl(drive_logs / "events.jsonl", {
-        "ts": utc_now_iso(), "type": "tool_timeout",
-        "tool": fn_name, "args": args_for_log,
-        "timeout_sec": timeout_sec,
-    })
-    append_jsonl(drive_logs / "tools.jsonl", {
-        "ts": utc_now_iso(), "tool": fn_name,
-        "args": args_for_log, "result_preview": result,
-    })
+def _request_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Messages as sent: history plus a cache breakpoint after the compacted block."""
+    return add_compaction_cache_breakpoint(messages, keep_recent=6, checkpoint_every=_compaction_checkpoint())
 
-    return {
-        "tool_call_id": tool_call_id,
-        "fn_name": fn_name,
-        "result": result,
-        "is_error": True,
-        "args_for_log": args_for_log,
-        "is_code_tool": is_code_tool,
-    }
 
+def _streaming_enabled() -> bool:
+    return os.environ.get("OUROBOROS_LLM_STREAMING", "0").strip().lower() in ("1", "true", "yes", "on")
 
-def _execute_with_timeout(
+
+def _schedule_tool_calls(
+    tool_calls: List[Dict[str, Any]],
     tools: ToolRegistry,
-    tc: Dict[str, Any],
     drive_logs: pathlib.Path,
-    timeout_sec: int,
-    task_id: str = "",
-    stateful_executor: Optional[_StatefulToolExecutor] = None,
-) -> Dict[str, Any]:
-    """
-    Execute a tool call with a hard timeout.
-
-    On timeout: returns TOOL_TIMEOUT error so the LLM regains control.
-    For stateful tools (browser): resets the sticky executor to recover state.
-    For regular tools: the hung worker thread leaks as daemon — watchdog handles recovery.
-    """
-    fn_name = tc["function"]["name"]
-    tool_call_id = tc["id"]
-    is_code_tool = fn_name in tools.CODE_TOOLS
-    use_stateful = stateful_executor and fn_name in STATEFUL_BROWSER_TOOLS
-
-    # Two distinct paths: stateful (thread-sticky) vs regular (per-call)
-    if use_stateful:
-        # Stateful executor: submit + wait, reset on timeout
-        future = stateful_executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
-        try:
-            return future.result(timeout=timeout_sec)
-        except TimeoutError:
-            stateful_executor.reset()
-            reset_msg = "Browser state has been reset. "
-            return _make_timeout_result(
-                fn_name, tool_call_id, is_code_tool, tc, drive_logs,
-                timeout_sec, task_id, reset_msg
-            )
-    else:
-        # Regular executor: explicit lifecycle to avoid shutdown(wait=True) deadlock
-        executor = ThreadPoolExecutor(max_workers=1)
-        try:
-            future = executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
-            try:
-                return future.result(timeout=timeout_sec)
-            except TimeoutError:
-                return _make_timeout_result(
-                    fn_name, tool_call_id, is_code_tool, tc, drive_logs,
-                    timeout_sec, task_id, reset_msg=""
-                )
-        finally:
-            executor.shutdown(wait=False, cancel_futures=True)
+    task_id: str,
+) -> List[List[int]]:
+    """Waves of non-conflicting call indices (see tool_scheduler); logged when a batch runs in parallel."""
+    resources = [call_resources(tools.get_entry(tc["function"]["name"]), tc) for tc in tool_calls]
+    waves = schedule_waves(resources)
+    if len(waves) < len(tool_calls):
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": "tool_batch_schedule", "task_id": task_id,
+            "calls": len(tool_calls), "waves": len(waves),
+            "max_parallel": max(len(w) for w in waves),
+        })
+    return waves
 
 
 def _handle_tool_calls(
@@ -372,49 +186,30 @@ def _handle_tool_calls(
     messages: List[Dict[str, Any]],
     llm_trace: Dict[str, Any],
     emit_progress: Callable[[str], None],
+    early_dispatch: Optional[_EarlyToolDispatcher] = None,
 ) -> int:
     """
     Execute tool calls and append results to messages.
 
+    Calls run in waves: each call waits for every earlier call it conflicts
+    with (declared resources, see tool_scheduler); calls within a wave run
+    in parallel. Calls already started by early_dispatch during streaming
+    are not run again; their futures are awaited in place.
+
     Returns: Number of errors encountered
     """
-    # Parallelize only for a strict read-only whitelist; all calls wrapped with timeout.
-    can_parallel = (
-        len(tool_calls) > 1 and
-        all(
-            tc.get("function", {}).get("name") in READ_ONLY_PARALLEL_TOOLS
-            for tc in tool_calls
-        )
-    )
+    prestarted = early_dispatch.claim(tool_calls) if early_dispatch is not None else {}
+    results: List[Any] = [None] * len(tool_calls)
 
-    if not can_parallel:
-        results = [
-            _execute_with_timeout(tools, tc, drive_logs,
-                                  tools.get_timeout(tc["function"]["name"]), task_id,
-                                  stateful_executor)
-            for tc in tool_calls
-        ]
-    else:
-        max_workers = min(len(tool_calls), 8)
-        executor = ThreadPoolExecutor(max_workers=max_workers)
-        try:
-            future_to_index = {
-                executor.submit(
-                    _execute_with_timeout, tools, tc, drive_logs,
-                    tools.get_timeout(tc["function"]["name"]), task_id,
-                    stateful_executor,
-                ): idx
-                for idx, tc in enumerate(tool_calls)
-            }
-            results = [None] * len(tool_calls)
-            for future in as_completed(future_to_index):
-                idx = future_to_index[future]
-                results[idx] = future.result()
-        finally:
-            executor.shutdown(wait=False, cancel_futures=True)
+    for wave in _schedule_tool_calls(tool_calls, tools, drive_logs, task_id):
+        wave_results = execute_parallel(
+            tools, [tool_calls[idx] for idx in wave], drive_logs, task_id, stateful_executor, prestarted,
+        )
+        for idx, result in zip(wave, wave_results):
+            results[idx] = result
 
     # Process results in original order
-    return _process_tool_results(results, messages, llm_trace, emit_progress)
+    return _process_tool_results(results, messages, llm_trace, emit_progress, tools.context.drive_root)
 
 
 def _handle_text_response(
@@ -523,12 +318,7 @@ def _maybe_inject_self_check(
     REMINDER_INTERVAL = 50
     if round_idx <= 1 or round_idx % REMINDER_INTERVAL != 0:
         return
-    ctx_tokens = sum(
-        estimate_tokens(str(m.get("content", "")))
-        if isinstance(m.get("content"), str)
-        else sum(estimate_tokens(str(b.get("text", ""))) for b in m.get("content", []) if isinstance(b, dict))
-        for m in messages
-    )
+    ctx_tokens = messages_tokens(messages)
     task_cost = accumulated_usage.get("cost", 0)
     checkpoint_num = round_idx // REMINDER_INTERVAL
 
@@ -718,6 +508,90 @@ def _drain_incoming_messages(
                     pass
 
 
+def _setup_loop(
+    tools: ToolRegistry,
+    messages: List[Dict[str, Any]],
+    event_queue: Optional[queue.Queue],
+    task_id: str,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Per-task loop setup shared by the sync and async loops. Returns (tool_schemas, max_rounds)."""
+    # Wire module-level registry ref so tool_discovery handlers work outside run_llm_loop too
+    from ouroboros.tools import tool_discovery as _td
+    _td.set_registry(tools)
+
+    # Selective tool schemas: core set + meta-tools for discovery.
+    tool_schemas = tools.schemas(core_only=True)
+    tool_schemas, _enabled_extra_tools = _setup_dynamic_tools(tools, tool_schemas, messages)
+
+    # Set budget tracking on tool context for real-time usage events
+    tools._ctx.event_queue = event_queue
+    tools._ctx.task_id = task_id
+    max_rounds = 25
+    try:
+        max_rounds = max(1, int(os.environ.get("OUROBOROS_MAX_ROUNDS", "25")))
+    except Exception:
+        log.warning("Invalid OUROBOROS_MAX_ROUNDS, defaulting to 25")
+    # Inject mandatory progress tracking instruction at task start
+    _inject_progress_tracking_prompt(messages)
+    return tool_schemas, max_rounds
+
+
+def _round_limit_reason(messages: List[Dict[str, Any]], max_rounds: int) -> str:
+    finish_reason = f"⚠️ Task exceeded MAX_ROUNDS ({max_rounds}). Consider decomposing into subtasks via schedule_task."
+    messages.append({"role": "system", "content": f"[ROUND_LIMIT] {finish_reason}"})
+    return finish_reason
+
+
+def _prepare_round(
+    tools: ToolRegistry,
+    messages: List[Dict[str, Any]],
+    round_idx: int,
+    max_rounds: int,
+    accumulated_usage: Dict[str, Any],
+    emit_progress: Callable[[str], None],
+    incoming_messages: queue.Queue,
+    drive_root: Optional[pathlib.Path],
+    task_id: str,
+    event_queue: Optional[queue.Queue],
+    owner_msg_seen: set,
+    active_model: str,
+    active_effort: str,
+) -> Tuple[List[Dict[str, Any]], str, str]:
+    """
+    Everything that happens before a round's LLM call: reminders, model switch,
+    owner messages, compaction. Returns (messages, active_model, active_effort).
+    """
+    # Soft self-check reminder every 50 rounds (LLM-first: agent decides, not code)
+    _maybe_inject_self_check(round_idx, max_rounds, messages, accumulated_usage, emit_progress)
+
+    # Pre-limit checkpoint: save progress before hitting MAX_ROUNDS
+    _maybe_inject_pre_limit_checkpoint(round_idx, max_rounds, messages, emit_progress)
+
+    # Apply LLM-driven model/effort switch (via switch_model tool)
+    ctx = tools._ctx
+    if ctx.active_model_override:
+        active_model = ctx.active_model_override
+        ctx.active_model_override = None
+    if ctx.active_effort_override:
+        active_effort = normalize_reasoning_effort(ctx.active_effort_override, default=active_effort)
+        ctx.active_effort_override = None
+
+    # Inject owner messages (in-process queue + Drive mailbox)
+    _drain_incoming_messages(messages, incoming_messages, drive_root, task_id, event_queue, owner_msg_seen)
+
+    # Compact old tool history when needed
+    # Check for LLM-requested compaction first (via compact_context tool)
+    pending_compaction = getattr(tools._ctx, '_pending_compaction', None)
+    if pending_compaction is not None:
+        messages = compact_tool_history_llm(messages, keep_recent=pending_compaction,
+                                            event_queue=event_queue, task_id=task_id)
+        tools._ctx._pending_compaction = None
+    elif round_idx > 8 or (round_idx > 3 and len(messages) > 60):
+        # Collapse whole checkpoints only, so the cached prompt prefix survives between them
+        messages = compact_tool_history(messages, keep_recent=6, checkpoint_every=_compaction_checkpoint())
+    return messages, active_model, active_effort
+
+
 def run_llm_loop(
     messages: List[Dict[str, Any]],
     tools: ToolRegistry,
@@ -753,28 +627,14 @@ def run_llm_loop(
     llm_trace: Dict[str, Any] = {"assistant_notes": [], "tool_calls": []}
     accumulated_usage: Dict[str, Any] = {}
     max_retries = 3
-    # Wire module-level registry ref so tool_discovery handlers work outside run_llm_loop too
-    from ouroboros.tools import tool_discovery as _td
-    _td.set_registry(tools)
-
-    # Selective tool schemas: core set + meta-tools for discovery.
-    tool_schemas = tools.schemas(core_only=True)
-    tool_schemas, _enabled_extra_tools = _setup_dynamic_tools(tools, tool_schemas, messages)
-
-    # Set budget tracking on tool context for real-time usage events
-    tools._ctx.event_queue = event_queue
-    tools._ctx.task_id = task_id
+    messages = ConversationLog(messages)  # Round-indexed, so compaction is incremental
+    tool_schemas, MAX_ROUNDS = _setup_loop(tools, messages, event_queue, task_id)
     # Thread-sticky executor for browser tools (Playwright sync requires greenlet thread-affinity)
     stateful_executor = _StatefulToolExecutor()
+    # Streaming mode: read-only tools start while the model is still emitting its turn
+    early_dispatch = _EarlyToolDispatcher(tools, drive_logs, task_id) if _streaming_enabled() else None
     # Dedup set for per-task owner messages from Drive mailbox
     _owner_msg_seen: set = set()
-    MAX_ROUNDS = 25
-    try:
-        MAX_ROUNDS = max(1, int(os.environ.get("OUROBOROS_MAX_ROUNDS", "25")))
-    except Exception:
-        log.warning("Invalid OUROBOROS_MAX_ROUNDS, defaulting to 25")
-    # Inject mandatory progress tracking instruction at task start
-    _inject_progress_tracking_prompt(messages)
     round_idx = 0
     try:
         while True:
@@ -782,8 +642,7 @@ def run_llm_loop(
 
             # Hard limit on rounds to prevent runaway tasks
             if round_idx > MAX_ROUNDS:
-                finish_reason = f"⚠️ Task exceeded MAX_ROUNDS ({MAX_ROUNDS}). Consider decomposing into subtasks via schedule_task."
-                messages.append({"role": "system", "content": f"[ROUND_LIMIT] {finish_reason}"})
+                finish_reason = _round_limit_reason(messages, MAX_ROUNDS)
                 try:
                     final_msg, final_cost = _call_llm_with_retry(
                         llm, messages, active_model, None, active_effort,
@@ -796,81 +655,28 @@ def run_llm_loop(
                     log.warning("Failed to get final response after round limit", exc_info=True)
                     return finish_reason, accumulated_usage, llm_trace
 
-            # Soft self-check reminder every 50 rounds (LLM-first: agent decides, not code)
-            _maybe_inject_self_check(round_idx, MAX_ROUNDS, messages, accumulated_usage, emit_progress)
-
-            # Pre-limit checkpoint: save progress before hitting MAX_ROUNDS
-            _maybe_inject_pre_limit_checkpoint(round_idx, MAX_ROUNDS, messages, emit_progress)
-
-            # Apply LLM-driven model/effort switch (via switch_model tool)
-            ctx = tools._ctx
-            if ctx.active_model_override:
-                active_model = ctx.active_model_override
-                ctx.active_model_override = None
-            if ctx.active_effort_override:
-                active_effort = normalize_reasoning_effort(ctx.active_effort_override, default=active_effort)
-                ctx.active_effort_override = None
-
-            # Inject owner messages (in-process queue + Drive mailbox)
-            _drain_incoming_messages(messages, incoming_messages, drive_root, task_id, event_queue, _owner_msg_seen)
-
-            # Compact old tool history when needed
-            # Check for LLM-requested compaction first (via compact_context tool)
-            pending_compaction = getattr(tools._ctx, '_pending_compaction', None)
-            if pending_compaction is not None:
-                messages = compact_tool_history_llm(messages, keep_recent=pending_compaction)
-                tools._ctx._pending_compaction = None
-            elif round_idx > 8:
-                messages = compact_tool_history(messages, keep_recent=6)
-            elif round_idx > 3:
-                # Light compaction: only if messages list is very long (>60 items)
-                if len(messages) > 60:
-                    messages = compact_tool_history(messages, keep_recent=6)
+            messages, active_model, active_effort = _prepare_round(
+                tools, messages, round_idx, MAX_ROUNDS, accumulated_usage, emit_progress,
+                incoming_messages, drive_root, task_id, event_queue, _owner_msg_seen,
+                active_model, active_effort,
+            )
 
             # --- LLM call with retry ---
             msg, cost = _call_llm_with_retry(
                 llm, messages, active_model, tool_schemas, active_effort,
-                max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type
+                max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+                early_dispatch=early_dispatch,
             )
 
             # Fallback to another model if primary model returns empty responses
             if msg is None:
-                # Configurable fallback priority list (Bible P3: no hardcoded behavior)
-                fallback_list_raw = os.environ.get(
-                    "OUROBOROS_MODEL_FALLBACK_LIST",
-                    "google/gemini-2.5-pro-preview,openai/o3,anthropic/claude-sonnet-4.6"
-                )
-                fallback_candidates = [m.strip() for m in fallback_list_raw.split(",") if m.strip()]
-                fallback_model = None
-                for candidate in fallback_candidates:
-                    if candidate != active_model:
-                        fallback_model = candidate
-                        break
-                if fallback_model is None:
-                    return (
-                        f"⚠️ Failed to get a response from model {active_model} after {max_retries} attempts. "
-                        f"All fallback models match the active one. Try rephrasing your request."
-                    ), accumulated_usage, llm_trace
-
-                # Emit progress message so user sees fallback happening
-                fallback_progress = f"⚡ Fallback: {active_model} → {fallback_model} after empty response"
-                emit_progress(fallback_progress)
-
-                # Try fallback model (don't increment round_idx — this is still same logical round)
-                msg, fallback_cost = _call_llm_with_retry(
-                    llm, messages, fallback_model, tool_schemas, active_effort,
-                    max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type
+                msg, failure_text = _call_fallback_model(
+                    llm, messages, active_model, tool_schemas, active_effort,
+                    max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+                    emit_progress, early_dispatch,
                 )
-
-                # If fallback also fails, give up
                 if msg is None:
-                    return (
-                        f"⚠️ Failed to get a response from the model after {max_retries} attempts. "
-                        f"Fallback model ({fallback_model}) also returned no response."
-                    ), accumulated_usage, llm_trace
-
-                # Fallback succeeded — continue processing with this msg
-                # (don't return — fall through to tool_calls processing below)
+                    return failure_text, accumulated_usage, llm_trace
 
             tool_calls = msg.get("tool_calls") or []
             content = msg.get("content")
@@ -887,7 +693,7 @@ def run_llm_loop(
 
             error_count = _handle_tool_calls(
                 tool_calls, tools, drive_logs, task_id, stateful_executor,
-                messages, llm_trace, emit_progress
+                messages, llm_trace, emit_progress, early_dispatch
             )
 
             # --- Budget guard ---
@@ -907,6 +713,8 @@ def run_llm_loop(
                 stateful_executor.shutdown(wait=False, cancel_futures=True)
             except Exception:
                 log.warning("Failed to shutdown stateful executor", exc_info=True)
+        if early_dispatch is not None:
+            early_dispatch.shutdown()
         # Cleanup per-task mailbox
         if drive_root is not None and task_id:
             try:
@@ -916,6 +724,68 @@ def run_llm_loop(
                 log.debug("Failed to cleanup task mailbox", exc_info=True)
 
 
+def _next_fallback_model(active_model: str) -> Optional[str]:
+    """First entry of OUROBOROS_MODEL_FALLBACK_LIST that differs from the active model and has a closed circuit."""
+    # Configurable fallback priority list (Bible P3: no hardcoded behavior)
+    fallback_list_raw = os.environ.get(
+        "OUROBOROS_MODEL_FALLBACK_LIST",
+        "google/gemini-2.5-pro-preview,openai/o3,anthropic/claude-sonnet-4.6"
+    )
+    fallback_candidates = [m.strip() for m in fallback_list_raw.split(",") if m.strip()]
+    for candidate in fallback_candidates:
+        if candidate != active_model and get_breaker().is_available(candidate):
+            return candidate
+    return None
+
+
+def _call_fallback_model(
+    llm: LLMClient,
+    messages: List[Dict[str, Any]],
+    active_model: str,
+    tool_schemas: Optional[List[Dict[str, Any]]],
+    active_effort: str,
+    max_retries: int,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+    event_queue: Optional[queue.Queue],
+    accumulated_usage: Dict[str, Any],
+    task_type: str,
+    emit_progress: Callable[[str], None],
+    early_dispatch: Optional[_EarlyToolDispatcher] = None,
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Retry the round on the first fallback model that differs from the active one.
+
+    Returns: (response_message, "") on success, (None, failure_text) otherwise.
+    """
+    fallback_model = _next_fallback_model(active_model)
+    if fallback_model is None:
+        return None, (
+            f"⚠️ Failed to get a response from model {active_model} after {max_retries} attempts. "
+            f"All fallback models match the active one. Try rephrasing your request."
+        )
+
+    # Emit progress message so user sees fallback happening
+    fallback_progress = f"⚡ Fallback: {active_model} → {fallback_model} after failed attempts"
+    emit_progress(fallback_progress)
+
+    # Try fallback model (don't increment round_idx — this is still same logical round)
+    msg, _fallback_cost = _call_llm_with_retry(
+        llm, messages, fallback_model, tool_schemas, active_effort,
+        max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+        early_dispatch=early_dispatch,
+    )
+
+    # If fallback also fails, give up
+    if msg is None:
+        return None, (
+            f"⚠️ Failed to get a response from the model after {max_retries} attempts. "
+            f"Fallback model ({fallback_model}) also returned no response."
+        )
+    return msg, ""
+
+
 def _emit_llm_usage_event(
     event_queue: Optional[queue.Queue],
     task_id: str,
@@ -923,6 +793,7 @@ def _emit_llm_usage_event(
     usage: Dict[str, Any],
     cost: float,
     category: str = "task",
+    accumulated_usage: Optional[Dict[str, Any]] = None,
 ) -> None:
     """
     Emit llm_usage event to the event queue.
@@ -934,6 +805,7 @@ def _emit_llm_usage_event(
         usage: Usage dict from LLM response
         cost: Calculated cost for this call
         category: Budget category (task, evolution, consciousness, review, summarize, other)
+        accumulated_usage: Task totals that the reconciled cost delta is applied to
     """
     if not event_queue:
         return
@@ -948,12 +820,177 @@ def _emit_llm_usage_event(
             "cached_tokens": int(usage.get("cached_tokens") or 0),
             "cache_write_tokens": int(usage.get("cache_write_tokens") or 0),
             "cost": cost,
-            "cost_estimated": not bool(usage.get("cost")),
+            "cost_estimated": bool(usage.get("cost_estimated")) or not bool(usage.get("cost")),
             "usage": usage,
             "category": category,
         })
     except Exception:
         log.debug("Failed to put llm_usage event to queue", exc_info=True)
+        return
+
+    # Estimated cost: the reconciler sends the billed delta later through the same queue
+    reconcile_estimate(
+        usage, model, task_id=task_id, category=category, cost=cost,
+        sink=_task_correction_sink(event_queue, accumulated_usage)
+        if accumulated_usage is not None else queue_sink(event_queue),
+    )
+
+
+def _chat_once(
+    llm: LLMClient,
+    kwargs: Dict[str, Any],
+    model: str,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+    event_queue: Optional[queue.Queue],
+    category: str,
+    accumulated_usage: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Any], str]:
+    """
+    One chat call with latency tracking; hedged onto the next fallback model
+    when OUROBOROS_LLM_HEDGING=1. Returns (msg, usage, model_that_answered).
+    A hedge loser's cost is added to accumulated_usage as well.
+    """
+    hedge_model = _next_fallback_model(model) if hedging_enabled() else None
+    if hedge_model is None:
+        resp_msg, usage = timed_chat(llm, model, kwargs)
+        return resp_msg, usage, model
+
+    def _on_loser(loser_model: str, usage: Optional[Dict[str, Any]], generation_id: str) -> None:
+        # The losing call is still billed: report finished usage, reconcile aborted streams
+        if usage is not None:
+            _add_task_usage(accumulated_usage, usage)
+            _emit_llm_usage_event(event_queue, task_id, loser_model, usage, float(usage.get("cost") or 0),
+                                  category, accumulated_usage)
+        elif generation_id:
+            get_reconciler().submit(
+                generation_id, loser_model, 0.0, task_id=task_id, category=category,
+                sink=_task_correction_sink(event_queue, accumulated_usage),
+            )
+
+    resp_msg, usage, used_model, hedged = hedged_chat(llm, kwargs, model, hedge_model, on_loser=_on_loser)
+    if hedged:
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": "llm_hedge", "task_id": task_id, "round": round_idx,
+            "primary": model, "hedge": hedge_model, "winner": used_model,
+            "hedge_delay_sec": get_tracker().hedge_delay(model),
+        })
+    return resp_msg, usage, used_model
+
+
+def _llm_category(task_type: str) -> str:
+    return task_type if task_type in ("evolution", "consciousness", "review", "summarize") else "task"
+
+
+def _record_llm_response(
+    msg: Dict[str, Any],
+    usage: Dict[str, Any],
+    used_model: str,
+    effort: str,
+    attempt: int,
+    max_retries: int,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+    event_queue: Optional[queue.Queue],
+    accumulated_usage: Dict[str, Any],
+    category: str,
+) -> Tuple[float, bool]:
+    """
+    Account for one LLM response: usage, cost event, round/empty-response logs.
+
+    Returns: (cost, is_empty). Empty responses are retry-worthy.
+    """
+    _add_task_usage(accumulated_usage, usage)
+
+    # Calculate cost and emit event for EVERY attempt (including retries)
+    cost = float(usage.get("cost") or 0)
+    if not cost:
+        cost = _estimate_cost(
+            used_model,
+            int(usage.get("prompt_tokens") or 0),
+            int(usage.get("completion_tokens") or 0),
+            int(usage.get("cached_tokens") or 0),
+            int(usage.get("cache_write_tokens") or 0),
+        )
+
+    # Emit real-time usage event with category based on task_type
+    _emit_llm_usage_event(event_queue, task_id, used_model, usage, cost, category, accumulated_usage)
+
+    # Empty response = retry-worthy (model sometimes returns empty content with no tool_calls)
+    tool_calls = msg.get("tool_calls") or []
+    content = msg.get("content")
+    if not tool_calls and (not content or not content.strip()):
+        log.warning("LLM returned empty response (no content, no tool_calls), attempt %d/%d", attempt + 1, max_retries)
+
+        # Log raw empty response for debugging
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": "llm_empty_response",
+            "task_id": task_id,
+            "round": round_idx, "attempt": attempt + 1,
+            "model": used_model,
+            "raw_content": repr(content)[:500] if content else None,
+            "raw_tool_calls": repr(tool_calls)[:500] if tool_calls else None,
+            "finish_reason": msg.get("finish_reason") or msg.get("stop_reason"),
+        })
+        return cost, True
+
+    # Count only successful rounds
+    accumulated_usage["rounds"] = accumulated_usage.get("rounds", 0) + 1
+
+    # Log per-round metrics
+    _round_event = {
+        "ts": utc_now_iso(), "type": "llm_round",
+        "task_id": task_id,
+        "round": round_idx, "model": used_model,
+        "reasoning_effort": effort,
+        "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+        "completion_tokens": int(usage.get("completion_tokens") or 0),
+        "cached_tokens": int(usage.get("cached_tokens") or 0),
+        "cache_write_tokens": int(usage.get("cache_write_tokens") or 0),
+        "cache_hit_ratio": cache_hit_ratio(usage),
+        "cost_usd": cost,
+    }
+    append_jsonl(drive_logs / "events.jsonl", _round_event)
+    return cost, False
+
+
+def _record_llm_error(
+    e: Exception,
+    model: str,
+    attempt: int,
+    max_retries: int,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+) -> bool:
+    """Log a failed LLM call. Returns True to retry at once, False to reroute to a fallback model.
+
+    There is no sleeping between attempts: a 429's Retry-After, like repeated
+    failures, opens the model's circuit (open_until), which makes this return
+    False and the round moves to a model whose circuit admits calls.
+    """
+    if isinstance(e, CircuitOpenError):
+        # Fail fast: the caller reroutes to a fallback model whose circuit is closed
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": "llm_circuit_open",
+            "task_id": task_id, "round": round_idx,
+            "model": e.model, "retry_in_sec": round(e.retry_in, 1),
+        })
+        return False
+    append_jsonl(drive_logs / "events.jsonl", {
+        "ts": utc_now_iso(), "type": "llm_api_error",
+        "task_id": task_id,
+        "round": round_idx, "attempt": attempt + 1,
+        "model": model, "error": repr(e),
+    })
+    if attempt >= max_retries - 1:
+        return False
+    # Breaker tripped (or 429): reroute now. Otherwise retry only within the
+    # global retry budget shared by all processes.
+    breaker = get_breaker()
+    return breaker.is_available(model) and breaker.take_retry_token()
 
 
 def _call_llm_with_retry(
@@ -969,92 +1006,46 @@ def _call_llm_with_retry(
     event_queue: Optional[queue.Queue],
     accumulated_usage: Dict[str, Any],
     task_type: str = "",
+    early_dispatch: Optional[_EarlyToolDispatcher] = None,
 ) -> Tuple[Optional[Dict[str, Any]], float]:
     """
     Call LLM with retry logic, usage tracking, and event emission.
 
+    With early_dispatch set (and tools offered), the response is streamed and
+    completed tool calls are handed to the dispatcher before the turn ends.
+
     Returns:
         (response_message, cost) on success
         (None, 0.0) on failure after max_retries
     """
-    msg = None
-    last_error: Optional[Exception] = None
-
+    category = _llm_category(task_type)
     for attempt in range(max_retries):
+        kwargs = {"messages": _request_messages(messages), "model": model, "reasoning_effort": effort}
+        if tools:
+            kwargs["tools"] = tools
+            if early_dispatch is not None:
+                early_dispatch.reset()
+                kwargs["stream"] = True
+                kwargs["on_tool_call"] = early_dispatch.on_tool_call
         try:
-            kwargs = {"messages": messages, "model": model, "reasoning_effort": effort}
-            if tools:
-                kwargs["tools"] = tools
-            resp_msg, usage = llm.chat(**kwargs)
-            msg = resp_msg
-            add_usage(accumulated_usage, usage)
-
-            # Calculate cost and emit event for EVERY attempt (including retries)
-            cost = float(usage.get("cost") or 0)
-            if not cost:
-                cost = _estimate_cost(
-                    model,
-                    int(usage.get("prompt_tokens") or 0),
-                    int(usage.get("completion_tokens") or 0),
-                    int(usage.get("cached_tokens") or 0),
-                    int(usage.get("cache_write_tokens") or 0),
-                )
-
-            # Emit real-time usage event with category based on task_type
-            category = task_type if task_type in ("evolution", "consciousness", "review", "summarize") else "task"
-            _emit_llm_usage_event(event_queue, task_id, model, usage, cost, category)
+            msg, usage, used_model = _chat_once(
+                llm, kwargs, model, drive_logs, task_id, round_idx, event_queue, category, accumulated_usage,
+            )
+            cost, is_empty = _record_llm_response(
+                msg, usage, used_model, effort, attempt, max_retries,
+                drive_logs, task_id, round_idx, event_queue, accumulated_usage, category,
+            )
+        except Exception as e:
+            if not _record_llm_error(e, model, attempt, max_retries, drive_logs, task_id, round_idx):
+                return None, 0.0
+            continue
 
-            # Empty response = retry-worthy (model sometimes returns empty content with no tool_calls)
-            tool_calls = msg.get("tool_calls") or []
-            content = msg.get("content")
-            if not tool_calls and (not content or not content.strip()):
-                log.warning("LLM returned empty response (no content, no tool_calls), attempt %d/%d", attempt + 1, max_retries)
-
-                # Log raw empty response for debugging
-                append_jsonl(drive_logs / "events.jsonl", {
-                    "ts": utc_now_iso(), "type": "llm_empty_response",
-                    "task_id": task_id,
-                    "round": round_idx, "attempt": attempt + 1,
-                    "model": model,
-                    "raw_content": repr(content)[:500] if content else None,
-                    "raw_tool_calls": repr(tool_calls)[:500] if tool_calls else None,
-                    "finish_reason": msg.get("finish_reason") or msg.get("stop_reason"),
-                })
-
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                    continue
-                # Last attempt — return None to trigger "could not get response"
-                return None, cost
-
-            # Count only successful rounds
-            accumulated_usage["rounds"] = accumulated_usage.get("rounds", 0) + 1
-
-            # Log per-round metrics
-            _round_event = {
-                "ts": utc_now_iso(), "type": "llm_round",
-                "task_id": task_id,
-                "round": round_idx, "model": model,
-                "reasoning_effort": effort,
-                "prompt_tokens": int(usage.get("prompt_tokens") or 0),
-                "completion_tokens": int(usage.get("completion_tokens") or 0),
-                "cached_tokens": int(usage.get("cached_tokens") or 0),
-                "cache_write_tokens": int(usage.get("cache_write_tokens") or 0),
-                "cost_usd": cost,
-            }
-            append_jsonl(drive_logs / "events.jsonl", _round_event)
+        if not is_empty:
             return msg, cost
-
-        except Exception as e:
-            last_error = e
-            append_jsonl(drive_logs / "events.jsonl", {
-                "ts": utc_now_iso(), "type": "llm_api_error",
-                "task_id": task_id,
-                "round": round_idx, "attempt": attempt + 1,
-                "model": model, "error": repr(e),
-            })
-            if attempt < max_retries - 1:
-                time.sleep(min(2 ** attempt * 2, 30))
+        if attempt < max_retries - 1:
+            continue  # Retry at once; repeated failures reroute rather than wait
+        # Last attempt — return None to trigger "could not get response"
+        return None, cost
 
     return None, 0.0
 
@@ -1064,6 +1055,7 @@ def _process_tool_results(
     messages: List[Dict[str, Any]],
     llm_trace: Dict[str, Any],
     emit_progress: Callable[[str], None],
+    drive_root: Optional[pathlib.Path] = None,
 ) -> int:
     """
     Process tool execution results and append to messages/trace.
@@ -1073,6 +1065,7 @@ def _process_tool_results(
         messages: Message list to append tool results to
         llm_trace: Trace dict to append tool call info to
         emit_progress: Callback for progress updates
+        drive_root: Where oversized results are stored for read_result
 
     Returns:
         Number of errors encountered
@@ -1087,7 +1080,7 @@ def _process_tool_results(
             error_count += 1
 
         # Truncate tool result before appending to messages
-        truncated_result = _truncate_tool_result(exec_result["result"])
+        truncated_result = _truncate_tool_result(exec_result["result"], drive_root)
 
         # Append tool result message
         messages.append({
@@ -0,0 +1,332 @@
+"""
+Ouroboros — Async LLM tool loop.
+
+run_llm_loop_async() is run_llm_loop() for an event loop, so one worker
+process can drive several tasks at once (OUROBOROS_WORKER_TASK_CONCURRENCY).
+LLM calls await LLMClient.achat(); async tool handlers are awaited directly,
+blocking ones run in the managed tool pool (tool_executor). Browser tools share
+one thread-sticky executor per process (Playwright is process-global). Round
+bookkeeping, compaction and budget checks are the same helpers the sync loop
+uses; the ones that write to Drive run in a thread, off the event loop.
+
+Not supported here (sync loop only): streamed early tool dispatch and hedging.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import pathlib
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ouroboros.context import ConversationLog
+from ouroboros.hedging import get_tracker
+from ouroboros.llm import LLMClient
+from ouroboros.loop import (
+    _check_budget_limits, _handle_text_response, _llm_category, _next_fallback_model,
+    _prepare_round, _process_tool_results, _record_llm_error,
+    _record_llm_response, _request_messages, _round_limit_reason, _schedule_tool_calls, _setup_loop,
+)
+from ouroboros.tool_executor import (
+    STATEFUL_BROWSER_TOOLS, _StatefulToolExecutor, _execute_single_tool, _execute_with_timeout,
+    _finish_tool_call, _make_timeout_result, _parse_tool_call, get_executor, isolation_enabled,
+)
+from ouroboros.tools.registry import ToolRegistry
+from ouroboros.utils import sanitize_tool_args_for_log
+
+log = logging.getLogger(__name__)
+
+_browser_executor: Optional[_StatefulToolExecutor] = None
+_browser_executor_lock = threading.Lock()
+
+
+def shared_browser_executor() -> _StatefulToolExecutor:
+    """Process-wide thread-sticky executor for browser tools and browser cleanup."""
+    global _browser_executor
+    with _browser_executor_lock:
+        if _browser_executor is None:
+            _browser_executor = _StatefulToolExecutor()
+        return _browser_executor
+
+
+# ---------------------------------------------------------------------------
+# Tool execution
+# ---------------------------------------------------------------------------
+
+async def _aexecute_single_tool(
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    task_id: str = "",
+) -> Dict[str, Any]:
+    fn_name = tc["function"]["name"]
+    args, arg_error = _parse_tool_call(tools, tc)
+    if arg_error is not None:
+        return arg_error
+    args_for_log = sanitize_tool_args_for_log(fn_name, args if isinstance(args, dict) else {})
+
+    result: Any = None
+    error: Optional[BaseException] = None
+    cache: Optional[str] = None
+    try:
+        result, cache = await tools.execute_cached_async(fn_name, args)
+    except Exception as e:
+        error = e
+    return await asyncio.to_thread(
+        _finish_tool_call, tools, tc, drive_logs, task_id, args_for_log, result, error, cache)
+
+
+async def _aexecute_with_timeout(
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    timeout_sec: int,
+    task_id: str = "",
+) -> Dict[str, Any]:
+    """Tool call with a hard timeout.
+
+    Async handlers are awaited on the loop. Blocking ones run in the managed
+    tool pool (see tool_executor), so a call that outlives its timeout is
+    cancelled or counted as leaked there; isolated tools are killed.
+    """
+    fn_name = tc["function"]["name"]
+    is_code_tool = fn_name in tools.CODE_TOOLS
+    if fn_name in STATEFUL_BROWSER_TOOLS:
+        executor = shared_browser_executor()
+        future = executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout_sec)
+        except asyncio.TimeoutError:
+            executor.reset()
+            return await asyncio.to_thread(
+                _make_timeout_result, fn_name, tc["id"], is_code_tool, tc, drive_logs,
+                timeout_sec, task_id, "Browser state has been reset. ", lane="browser",
+            )
+    entry = tools.get_entry(fn_name)
+    if entry is not None and entry.isolated and isolation_enabled():
+        return await asyncio.to_thread(_execute_with_timeout, tools, tc, drive_logs, timeout_sec, task_id)
+    if entry is None or not entry.is_async:
+        executor = get_executor()
+        future = executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
+        done, _ = await asyncio.wait({asyncio.wrap_future(future)}, timeout=timeout_sec)
+        if done:
+            return future.result()
+        leaked = executor.abandon(future)
+        return await asyncio.to_thread(
+            _make_timeout_result, fn_name, tc["id"], is_code_tool, tc, drive_logs,
+            timeout_sec, task_id, lane="pool", leaked=leaked,
+        )
+    try:
+        return await asyncio.wait_for(_aexecute_single_tool(tools, tc, drive_logs, task_id), timeout_sec)
+    except asyncio.TimeoutError:
+        return await asyncio.to_thread(
+            _make_timeout_result, fn_name, tc["id"], is_code_tool, tc, drive_logs, timeout_sec, task_id, "")
+
+
+async def _ahandle_tool_calls(
+    tool_calls: List[Dict[str, Any]],
+    tools: ToolRegistry,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    messages: List[Dict[str, Any]],
+    llm_trace: Dict[str, Any],
+    emit_progress: Callable[[str], None],
+) -> int:
+    """Async _handle_tool_calls: same conflict-aware waves, results in original order."""
+    results: List[Any] = [None] * len(tool_calls)
+    # Scheduling and result processing write to Drive (logs, blobs): off the loop
+    waves = await asyncio.to_thread(_schedule_tool_calls, tool_calls, tools, drive_logs, task_id)
+    for wave in waves:
+        done = await asyncio.gather(*(
+            _aexecute_with_timeout(tools, tool_calls[idx], drive_logs,
+                                   tools.get_timeout(tool_calls[idx]["function"]["name"]), task_id)
+            for idx in wave
+        ))
+        for idx, result in zip(wave, done):
+            results[idx] = result
+    return await asyncio.to_thread(
+        _process_tool_results, results, messages, llm_trace, emit_progress, tools.context.drive_root)
+
+
+# ---------------------------------------------------------------------------
+# LLM calls
+# ---------------------------------------------------------------------------
+
+async def _achat_timed(llm: LLMClient, model: str, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """llm.achat() feeding the same latency histograms as the sync loop."""
+    t0 = time.monotonic()
+    result = await llm.achat(**{**kwargs, "model": model})
+    get_tracker().observe(model, time.monotonic() - t0)
+    return result
+
+
+async def _acall_llm_with_retry(
+    llm: LLMClient,
+    messages: List[Dict[str, Any]],
+    model: str,
+    tools: Optional[List[Dict[str, Any]]],
+    effort: str,
+    max_retries: int,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+    event_queue: Optional[queue.Queue],
+    accumulated_usage: Dict[str, Any],
+    task_type: str = "",
+) -> Tuple[Optional[Dict[str, Any]], float]:
+    """Async _call_llm_with_retry: same accounting, breaker and retry-budget rules."""
+    category = _llm_category(task_type)
+    for attempt in range(max_retries):
+        kwargs: Dict[str, Any] = {"messages": _request_messages(messages), "reasoning_effort": effort}
+        if tools:
+            kwargs["tools"] = tools
+        try:
+            msg, usage = await _achat_timed(llm, model, kwargs)
+            cost, is_empty = await asyncio.to_thread(
+                _record_llm_response, msg, usage, model, effort, attempt, max_retries,
+                drive_logs, task_id, round_idx, event_queue, accumulated_usage, category,
+            )
+        except Exception as e:
+            if not await asyncio.to_thread(
+                    _record_llm_error, e, model, attempt, max_retries, drive_logs, task_id, round_idx):
+                return None, 0.0
+            continue
+
+        if not is_empty:
+            return msg, cost
+        if attempt < max_retries - 1:
+            continue
+        return None, cost
+
+    return None, 0.0
+
+
+async def _acall_fallback_model(
+    llm: LLMClient,
+    messages: List[Dict[str, Any]],
+    active_model: str,
+    tool_schemas: Optional[List[Dict[str, Any]]],
+    active_effort: str,
+    max_retries: int,
+    drive_logs: pathlib.Path,
+    task_id: str,
+    round_idx: int,
+    event_queue: Optional[queue.Queue],
+    accumulated_usage: Dict[str, Any],
+    task_type: str,
+    emit_progress: Callable[[str], None],
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    fallback_model = _next_fallback_model(active_model)
+    if fallback_model is None:
+        return None, (
+            f"⚠️ Failed to get a response from model {active_model} after {max_retries} attempts. "
+            f"All fallback models match the active one. Try rephrasing your request."
+        )
+    emit_progress(f"⚡ Fallback: {active_model} → {fallback_model} after failed attempts")
+    msg, _cost = await _acall_llm_with_retry(
+        llm, messages, fallback_model, tool_schemas, active_effort,
+        max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+    )
+    if msg is None:
+        return None, (
+            f"⚠️ Failed to get a response from the model after {max_retries} attempts. "
+            f"Fallback model ({fallback_model}) also returned no response."
+        )
+    return msg, ""
+
+
+# ---------------------------------------------------------------------------
+# Loop
+# ---------------------------------------------------------------------------
+
+async def run_llm_loop_async(
+    messages: List[Dict[str, Any]],
+    tools: ToolRegistry,
+    llm: LLMClient,
+    drive_logs: pathlib.Path,
+    emit_progress: Callable[[str], None],
+    incoming_messages: queue.Queue,
+    task_type: str = "",
+    task_id: str = "",
+    budget_remaining_usd: Optional[float] = None,
+    event_queue: Optional[queue.Queue] = None,
+    initial_effort: str = "medium",
+    initial_model: Optional[str] = None,
+    drive_root: Optional[pathlib.Path] = None,
+) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """
+    Coroutine version of run_llm_loop (same arguments and return value).
+
+    Helpers that may block (compaction LLM calls, Drive mailbox, budget
+    wrap-up calls) run in a thread so sibling tasks keep making progress.
+    """
+    active_model = initial_model if initial_model else llm.default_model()
+    active_effort = initial_effort
+    llm_trace: Dict[str, Any] = {"assistant_notes": [], "tool_calls": []}
+    accumulated_usage: Dict[str, Any] = {}
+    max_retries = 3
+    messages = ConversationLog(messages)
+    tool_schemas, max_rounds = _setup_loop(tools, messages, event_queue, task_id)
+    owner_msg_seen: set = set()
+    round_idx = 0
+    try:
+        while True:
+            round_idx += 1
+            if round_idx > max_rounds:
+                finish_reason = _round_limit_reason(messages, max_rounds)
+                final_msg, _cost = await _acall_llm_with_retry(
+                    llm, messages, active_model, None, active_effort,
+                    max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+                )
+                text = (final_msg.get("content") or finish_reason) if final_msg else finish_reason
+                return text, accumulated_usage, llm_trace
+
+            messages, active_model, active_effort = await asyncio.to_thread(
+                _prepare_round, tools, messages, round_idx, max_rounds, accumulated_usage, emit_progress,
+                incoming_messages, drive_root, task_id, event_queue, owner_msg_seen,
+                active_model, active_effort,
+            )
+
+            msg, _cost = await _acall_llm_with_retry(
+                llm, messages, active_model, tool_schemas, active_effort,
+                max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+            )
+            if msg is None:
+                msg, failure_text = await _acall_fallback_model(
+                    llm, messages, active_model, tool_schemas, active_effort,
+                    max_retries, drive_logs, task_id, round_idx, event_queue, accumulated_usage, task_type,
+                    emit_progress,
+                )
+                if msg is None:
+                    return failure_text, accumulated_usage, llm_trace
+
+            tool_calls = msg.get("tool_calls") or []
+            content = msg.get("content")
+            if not tool_calls:
+                return _handle_text_response(content, llm_trace, accumulated_usage)
+
+            messages.append({"role": "assistant", "content": content or "", "tool_calls": tool_calls})
+            if content and content.strip():
+                emit_progress(content.strip())
+                llm_trace["assistant_notes"].append(content.strip()[:320])
+
+            await _ahandle_tool_calls(tool_calls, tools, drive_logs, task_id, messages, llm_trace, emit_progress)
+
+            budget_result = await asyncio.to_thread(
+                _check_budget_limits,
+                budget_remaining_usd, accumulated_usage, round_idx, messages,
+                llm, active_model, active_effort, max_retries, drive_logs,
+                task_id, event_queue, llm_trace, task_type,
+            )
+            if budget_result is not None:
+                return budget_result
+    finally:
+        if drive_root is not None and task_id:
+            try:
+                from ouroboros.owner_inject import cleanup_task_mailbox
+                cleanup_task_mailbox(drive_root, task_id)
+            except Exception:
+                log.debug("Failed to cleanup task mailbox", exc_info=True)
@@ -8,12 +8,14 @@ Contract: load scratchpad/identity, chat_history().
 from __future__ import annotations
 
 import datetime
-import json
 import logging
 import pathlib
+import sqlite3
 from collections import Counter
 from typing import Any, Dict, List, Optional
 
+from ouroboros import jsonl_tail, telemetry
+from ouroboros.log_segments import list_segments
 from ouroboros.utils import utc_now_iso, read_text, write_text, append_jsonl, short
 
 log = logging.getLogger(__name__)
@@ -82,21 +84,9 @@ class Memory:
             return "(chat history is empty)"
 
         try:
-            raw_lines = chat_path.read_text(encoding="utf-8").strip().split("\n")
-            entries = []
-            for line in raw_lines:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entries.append(json.loads(line))
-                except Exception:
-                    log.debug(f"Failed to parse JSON line in chat_history: {line[:100]}")
-                    continue
-
-            if search:
-                search_lower = search.lower()
-                entries = [e for e in entries if search_lower in str(e.get("text", "")).lower()]
+            search_lower = search.lower()
+            match = (lambda e: search_lower in str(e.get("text", "")).lower()) if search else None
+            entries = jsonl_tail.read_jsonl_tail(chat_path, max(0, count) + max(0, offset), match=match)
 
             if offset > 0:
                 entries = entries[:-offset] if offset < len(entries) else []
@@ -125,28 +115,21 @@ class Memory:
     # --- JSONL tail reading ---
 
     def read_jsonl_tail(self, log_name: str, max_entries: int = 100) -> List[Dict[str, Any]]:
-        """Read the last max_entries records from a JSONL file."""
-        path = self.logs_path(log_name)
-        if not path.exists():
-            return []
+        """Read the last max_entries records from a JSONL file (reads backwards from EOF)."""
         try:
-            lines = path.read_text(encoding="utf-8").strip().split("\n")
-            tail = lines[-max_entries:] if max_entries < len(lines) else lines
-            entries = []
-            for line in tail:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entries.append(json.loads(line))
-                except Exception:
-                    log.debug(f"Failed to parse JSON line in read_jsonl_tail: {line[:100]}", exc_info=True)
-                    continue
-            return entries
+            return jsonl_tail.read_jsonl_tail(self.logs_path(log_name), max_entries)
         except Exception:
             log.warning(f"Failed to read JSONL tail from {log_name}", exc_info=True)
             return []
 
+    def read_task_jsonl(self, log_name: str, task_id: str, max_entries: int = 100) -> List[Dict[str, Any]]:
+        """Read the last max_entries records of one task, via the log's per-task offset index."""
+        try:
+            return jsonl_tail.read_task_jsonl(self.logs_path(log_name), task_id, max_entries)
+        except Exception:
+            log.warning(f"Failed to read task records from {log_name}", exc_info=True)
+            return []
+
     # --- Log summarization ---
 
     def summarize_chat(self, entries: List[Dict[str, Any]]) -> str:
@@ -216,6 +199,25 @@ class Memory:
                 lines.append(f"  {e.get('type', '?')}: {short(str(e.get('error', '')), 120)}")
         return "\n".join(lines)
 
+    def summarize_task_events(self, task_id: str) -> str:
+        """summarize_events() for one task, from the telemetry database when there is one."""
+        store = telemetry.get(self.drive_root)
+        if store is not None:
+            try:
+                counts = store.event_counts(task_id=task_id)
+                errors = store.recent_errors(task_id=task_id)
+            except sqlite3.Error:
+                log.debug("Telemetry query failed, reading events.jsonl", exc_info=True)
+            else:
+                if not counts:
+                    return ""
+                lines = ["Event counts:"] + [f"  {evt_type}: {count}" for evt_type, count in counts]
+                if errors:
+                    lines.append("\nRecent errors:")
+                    lines.extend(f"  {e['type']}: {short(str(e['error'] or ''), 120)}" for e in errors)
+                return "\n".join(lines)
+        return self.summarize_events(self.read_task_jsonl("events.jsonl", task_id, 200))
+
     def summarize_supervisor(self, entries: List[Dict[str, Any]]) -> str:
         if not entries:
             return ""
@@ -234,16 +236,25 @@ class Memory:
     def backup_chat_to_drive(self) -> Dict[str, Any]:
         """Backup chat.jsonl to drive and create a dated milestone snapshot.
 
+        chat.jsonl is segmented (see ouroboros.log_segments), so the milestone
+        holds the closed segments written since the previous milestone followed
+        by the active file; together the milestones cover the whole history.
+
         Returns {"lines": N, "size_bytes": N, "milestone_created": bool}.
         If Drive write fails, logs the error and continues without crashing.
         """
         source_path = self.logs_path("chat.jsonl")
-        if not source_path.exists():
-            log.warning("backup_chat_to_drive: chat.jsonl not found at %s", source_path)
-            return {"lines": 0, "size_bytes": 0, "milestone_created": False}
-
+        milestones_dir = (self.drive_root / "logs" / "milestones").resolve()
         try:
-            content_bytes = source_path.read_bytes()
+            previous = [p.stat().st_mtime for p in milestones_dir.glob("chat_*.jsonl")]
+            since = max(previous) if previous else None
+            parts = [jsonl_tail.read_segment(s) for s in list_segments(source_path)
+                     if since is None or s.end >= since]
+            active_bytes = source_path.read_bytes() if source_path.exists() else b""
+            content_bytes = b"".join(p if p.endswith(b"\n") else p + b"\n" for p in parts if p) + active_bytes
+            if not content_bytes:
+                log.warning("backup_chat_to_drive: no chat history at %s", source_path)
+                return {"lines": 0, "size_bytes": 0, "milestone_created": False}
             size_bytes = len(content_bytes)
             text = content_bytes.decode("utf-8")
             lines = sum(1 for l in text.splitlines() if l.strip())
@@ -251,11 +262,13 @@ class Memory:
             log.error("backup_chat_to_drive: failed to read chat.jsonl: %s", e)
             return {"lines": 0, "size_bytes": 0, "milestone_created": False}
 
-        # Write main backup to drive path logs/chat.jsonl (overwrite)
+        # Write main backup to drive path logs/chat.jsonl (overwrite); only the active
+        # file, since the closed segments stay readable next to it
         try:
             dest = (self.drive_root / "logs" / "chat.jsonl").resolve()
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_bytes(content_bytes)
+            if dest != source_path and active_bytes:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_bytes(active_bytes)
         except Exception as e:
             log.error("backup_chat_to_drive: failed to write drive backup: %s", e)
 
@@ -263,9 +276,7 @@ class Memory:
         milestone_created = False
         try:
             today = datetime.date.today().isoformat()  # e.g. "2026-03-05"
-            milestone_path = (
-                self.drive_root / "logs" / "milestones" / f"chat_{today}.jsonl"
-            ).resolve()
+            milestone_path = milestones_dir / f"chat_{today}.jsonl"
             if not milestone_path.exists():
                 milestone_path.parent.mkdir(parents=True, exist_ok=True)
                 milestone_path.write_bytes(content_bytes)
@@ -0,0 +1,264 @@
+"""
+Ouroboros — Model pricing.
+
+Resolves a model id to (input, cached, output) USD per 1M tokens.
+
+- Static table below is the floor; live OpenRouter prices are layered on top.
+- Live prices are persisted to state/pricing_cache.json on Drive, so worker
+  boot reads a local file and never waits on the network.
+- A stale or missing cache triggers a background refresh; the new table is
+  swapped in atomically (readers keep whatever snapshot they already hold).
+- Lookups are memoized per snapshot: exact id first, then the longest known
+  prefix via a character trie, so estimate_cost is O(1) after the first call
+  for a given model.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ouroboros.utils import write_text
+
+log = logging.getLogger(__name__)
+
+Price = Tuple[float, float, float]
+
+# Pricing from OpenRouter API (2026-02-17). Update periodically via /api/v1/models.
+_MODEL_PRICING_STATIC = {
+    # Anthropic
+    "anthropic/claude-opus-4": (15.0, 1.5, 75.0),
+    "anthropic/claude-opus-4.1": (15.0, 1.5, 75.0),
+    "anthropic/claude-opus-4.5": (5.0, 0.5, 25.0),
+    "anthropic/claude-opus-4.6": (5.0, 0.5, 25.0),
+    "anthropic/claude-sonnet-4": (3.0, 0.30, 15.0),
+    "anthropic/claude-sonnet-4.5": (3.0, 0.30, 15.0),
+    "anthropic/claude-sonnet-4.6": (3.0, 0.30, 15.0),
+    "anthropic/claude-3.7-sonnet": (3.0, 0.30, 15.0),
+    "anthropic/claude-3.5-sonnet": (6.0, 0.6, 30.0),
+    "anthropic/claude-3.5-haiku": (0.8, 0.08, 4.0),
+    "anthropic/claude-haiku-4.5": (1.0, 0.1, 5.0),
+    "anthropic/claude-3-haiku": (0.25, 0.03, 1.25),
+    # OpenAI
+    "openai/gpt-5": (1.25, 0.125, 10.0),
+    "openai/gpt-5-mini": (0.25, 0.025, 2.0),
+    "openai/gpt-5-nano": (0.05, 0.005, 0.4),
+    "openai/gpt-5-pro": (15.0, 1.5, 120.0),
+    "openai/gpt-4.1": (2.0, 0.50, 8.0),
+    "openai/gpt-4.1-mini": (0.4, 0.1, 1.6),
+    "openai/gpt-4.1-nano": (0.1, 0.025, 0.4),
+    "openai/gpt-4o": (2.5, 1.25, 10.0),
+    "openai/gpt-4o-mini": (0.15, 0.075, 0.6),
+    "openai/o3": (2.0, 0.50, 8.0),
+    "openai/o3-pro": (20.0, 2.0, 80.0),
+    "openai/o3-mini": (1.1, 0.55, 4.4),
+    "openai/o4-mini": (1.10, 0.275, 4.40),
+    "openai/o4-mini-high": (1.1, 0.275, 4.4),
+    # Google
+    "google/gemini-2.5-pro": (1.25, 0.125, 10.0),
+    "google/gemini-2.5-pro-preview": (1.25, 0.125, 10.0),
+    "google/gemini-2.5-flash": (0.3, 0.03, 2.5),
+    "google/gemini-2.5-flash-lite": (0.1, 0.01, 0.4),
+    "google/gemini-2.5-flash-lite-preview-09-2025": (0.1, 0.01, 0.4),
+    "google/gemini-2.0-flash-001": (0.1, 0.025, 0.4),
+    "google/gemini-2.0-flash-lite-001": (0.075, 0.0075, 0.3),
+    # xAI
+    "x-ai/grok-4": (3.0, 0.75, 15.0),
+    "x-ai/grok-3": (3.0, 0.75, 15.0),
+    "x-ai/grok-3-mini": (0.30, 0.075, 0.50),
+    "x-ai/grok-3-beta": (3.0, 0.75, 15.0),
+    "x-ai/grok-3-mini-beta": (0.3, 0.075, 0.5),
+    # Qwen
+    "qwen/qwen3-235b-a22b": (0.455, 0.0455, 1.82),
+    "qwen/qwen3-32b": (0.08, 0.04, 0.24),
+    "qwen/qwen3-30b-a3b": (0.08, 0.008, 0.28),
+    "qwen/qwen3-8b": (0.05, 0.05, 0.4),
+    "qwen/qwen3.5-plus-02-15": (0.26, 0.026, 1.56),
+    # Meta
+    "meta-llama/llama-4-maverick": (0.15, 0.015, 0.6),
+    "meta-llama/llama-4-scout": (0.08, 0.008, 0.3),
+    "meta-llama/llama-3.3-70b-instruct": (0.1, 0.01, 0.32),
+}
+
+
+# ---------------------------------------------------------------------------
+# Immutable snapshot with memoized prefix resolution
+# ---------------------------------------------------------------------------
+
+class PricingTable:
+    """One immutable price snapshot. Replaced wholesale on refresh, never mutated."""
+
+    def __init__(self, prices: Dict[str, Price], fetched_at: float = 0.0, source: str = "static"):
+        self.prices: Dict[str, Price] = dict(prices)
+        self.fetched_at = fetched_at
+        self.source = source
+        self._trie: Dict[str, dict] = {}
+        for key, val in self.prices.items():
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = val  # "" marks a complete key
+        self._memo: Dict[str, Optional[Price]] = {}
+
+    def resolve(self, model: str) -> Optional[Price]:
+        """Exact match, else the longest known key that prefixes the model id."""
+        try:
+            return self._memo[model]
+        except KeyError:
+            pass
+        price = self.prices.get(model)
+        if price is None and model:
+            node = self._trie
+            for ch in model:
+                node = node.get(ch)
+                if node is None:
+                    break
+                if "" in node:
+                    price = node[""]
+        self._memo[model] = price  # dict assignment is atomic; races only recompute
+        return price
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide current table, cache file, background refresh
+# ---------------------------------------------------------------------------
+
+_table: PricingTable = PricingTable(_MODEL_PRICING_STATIC)
+_cache_path: Optional[pathlib.Path] = None
+_loaded_from_disk = False
+_refresh_lock = threading.Lock()
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def _ttl_sec() -> float:
+    try:
+        return max(0.0, float(os.environ.get("OUROBOROS_PRICING_TTL_HOURS", "24"))) * 3600
+    except (TypeError, ValueError):
+        log.warning("Invalid OUROBOROS_PRICING_TTL_HOURS, defaulting to 24")
+        return 24 * 3600.0
+
+
+def configure(drive_root: pathlib.Path) -> None:
+    """Point the pricing cache at Drive and load it if present (no network)."""
+    global _cache_path, _loaded_from_disk
+    path = pathlib.Path(drive_root) / "state" / "pricing_cache.json"
+    with _refresh_lock:
+        if _cache_path == path and _loaded_from_disk:
+            return
+        _cache_path = path
+        _loaded_from_disk = False
+    _load_cache_file()
+
+
+def _load_cache_file() -> None:
+    global _table, _loaded_from_disk
+    path = _cache_path
+    if path is None or not path.exists():
+        return
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        live = {k: tuple(float(x) for x in v) for k, v in (data.get("prices") or {}).items() if len(v) == 3}
+        fetched_at = float(data.get("fetched_at") or 0.0)
+    except Exception:
+        log.warning("Failed to read pricing cache %s", path, exc_info=True)
+        return
+    if live:
+        merged = dict(_MODEL_PRICING_STATIC)
+        merged.update(live)
+        _table = PricingTable(merged, fetched_at=fetched_at, source="cache")
+    _loaded_from_disk = True
+
+
+def _is_stale(table: PricingTable) -> bool:
+    return table.source == "static" or (time.time() - table.fetched_at) > _ttl_sec()
+
+
+def refresh_now() -> bool:
+    """Fetch live prices, persist them and swap them in. Returns True on success."""
+    global _table
+    from ouroboros.llm import fetch_openrouter_pricing
+    try:
+        live = fetch_openrouter_pricing()
+    except Exception:
+        log.warning("Failed to sync pricing from OpenRouter", exc_info=True)
+        return False
+    if not live or len(live) <= 5:
+        return False
+    now = time.time()
+    merged = dict(_MODEL_PRICING_STATIC)
+    merged.update(live)
+    _table = PricingTable(merged, fetched_at=now, source="live")
+    if _cache_path is not None:
+        try:
+            write_text(_cache_path, json.dumps(
+                {"fetched_at": now, "prices": {k: list(v) for k, v in live.items()}},
+                ensure_ascii=False, indent=1,
+            ))
+        except Exception:
+            log.warning("Failed to write pricing cache", exc_info=True)
+    return True
+
+
+def _refresh_loop() -> None:
+    global _refresh_thread
+    try:
+        refresh_now()
+    finally:
+        with _refresh_lock:
+            _refresh_thread = None
+
+
+def _maybe_start_refresh(table: PricingTable) -> None:
+    global _refresh_thread
+    if not _is_stale(table):
+        return
+    with _refresh_lock:
+        if _refresh_thread is not None or not _refresh_backoff_ok():
+            return
+        _refresh_thread = threading.Thread(target=_refresh_loop, name="pricing_refresh", daemon=True)
+        _refresh_thread.start()
+
+
+_last_attempt: Optional[float] = None
+
+
+def _refresh_backoff_ok() -> bool:
+    """At most one fetch attempt per max(60s, TTL/6), so outages are not hammered."""
+    global _last_attempt
+    now = time.monotonic()
+    if _last_attempt is not None and now - _last_attempt < max(60.0, _ttl_sec() / 6):
+        return False
+    _last_attempt = now
+    return True
+
+
+def get_table() -> PricingTable:
+    """Current snapshot. Never blocks on the network; schedules a refresh if stale."""
+    table = _table
+    _maybe_start_refresh(table)
+    return table
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int,
+                  cached_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """Estimate cost from token counts using known pricing. Returns 0 if model unknown."""
+    pricing = get_table().resolve(model)
+    if not pricing:
+        return 0.0
+    input_price, cached_price, output_price = pricing
+    # Non-cached input tokens = prompt_tokens - cached_tokens
+    regular_input = max(0, prompt_tokens - cached_tokens)
+    cost = (
+        regular_input * input_price / 1_000_000
+        + cached_tokens * cached_price / 1_000_000
+        + completion_tokens * output_price / 1_000_000
+    )
+    return round(cost, 6)
@@ -11,7 +11,8 @@ import os
 import pathlib
 from typing import Any, Dict, List, Tuple
 
-from ouroboros.utils import clip_text, estimate_tokens
+from ouroboros.tokenizer import count_tokens
+from ouroboros.utils import clip_text
 
 
 _SKIP_EXT = {
@@ -187,7 +188,7 @@ def chunk_sections(sections: List[Tuple[str, str]], chunk_token_cap: int = 70_00
         if not content:
             continue
         part = f"\n## FILE: {path}\n{content}\n"
-        part_tokens = estimate_tokens(part)
+        part_tokens = count_tokens(part)
         if current_parts and (current_tokens + part_tokens) > cap:
             chunks.append("\n".join(current_parts))
             current_parts = []
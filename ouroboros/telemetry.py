@@ -0,0 +1,486 @@
+"""
+Ouroboros — Telemetry database.
+
+Per-task costs, event counts, recent errors and open tasks were each
+computed by scanning JSONL log tails with their own byte heuristics. The
+supervisor now mirrors events.jsonl, supervisor.jsonl and tools.jsonl
+into an SQLite database (WAL mode, Drive/index/telemetry.sqlite3) as the
+records are written: typed tables for LLM rounds, LLM usage, tool calls,
+task lifecycle and errors, plus one row per event for counts, indexed by
+task_id, type and ts. The JSONL logs stay the source of truth.
+
+A background thread (LogMirror) does the ingesting: the JSONL writer only
+wakes it, so SQLite never runs under the writer lock. The thread follows
+each log from a position stored in the database together with the rows
+it produced (inode and byte offset of the active file, or the last closed
+segment read), so at startup it imports exactly what was written since:
+the whole history the first time, and records that workers wrote locally
+while the supervisor was down after a restart. If the file that position
+refers to has since been compressed, records newer than the last ingested
+ts are imported instead.
+
+Other processes open the database read-only through get(). Callers fall
+back to the logs when it is unavailable (OUROBOROS_TELEMETRY_DB=0, or a
+filesystem where SQLite cannot lock).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ouroboros.jsonl_tail import JsonlFollower, iter_segment
+from ouroboros.log_segments import Segment, list_segments, parse_ts
+from ouroboros.utils import set_jsonl_observer, utc_now_iso
+
+log = logging.getLogger(__name__)
+
+INGESTED_LOGS = ("events.jsonl", "supervisor.jsonl", "tools.jsonl")
+TASK_START_TYPES = ("task_received", "task_started")
+TASK_END_TYPES = ("task_done", "task_failed", "task_cancelled")
+ERROR_TYPES = frozenset({"tool_error", "tool_timeout", "telegram_api_error", "task_error",
+                         "tool_rounds_exceeded", "llm_api_error", "worker_crash"})
+POLL_SEC = 5.0  # Also picks up records appended by other processes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, log TEXT NOT NULL, type TEXT NOT NULL, task_id TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS llm_rounds (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, task_id TEXT NOT NULL, model TEXT NOT NULL, round INTEGER,
+    prompt_tokens INTEGER, completion_tokens INTEGER, cached_tokens INTEGER, cost REAL);
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, task_id TEXT NOT NULL, category TEXT NOT NULL, model TEXT NOT NULL,
+    cost REAL, prompt_tokens INTEGER, completion_tokens INTEGER, cached_tokens INTEGER, cost_correction INTEGER);
+CREATE TABLE IF NOT EXISTS tool_calls (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, task_id TEXT NOT NULL, tool TEXT NOT NULL, ok INTEGER, cache TEXT);
+CREATE TABLE IF NOT EXISTS task_events (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, task_id TEXT NOT NULL, type TEXT NOT NULL,
+    task_type TEXT, description TEXT);
+CREATE TABLE IF NOT EXISTS errors (
+    id INTEGER PRIMARY KEY, ts REAL NOT NULL, task_id TEXT NOT NULL, type TEXT NOT NULL, tool TEXT, error TEXT);
+CREATE INDEX IF NOT EXISTS events_task ON events (task_id, type);
+CREATE INDEX IF NOT EXISTS events_type_ts ON events (type, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS llm_rounds_task ON llm_rounds (task_id, ts);
+CREATE INDEX IF NOT EXISTS llm_usage_task ON llm_usage (task_id, ts);
+CREATE INDEX IF NOT EXISTS llm_usage_ts ON llm_usage (ts);
+CREATE INDEX IF NOT EXISTS tool_calls_task ON tool_calls (task_id, ts);
+CREATE INDEX IF NOT EXISTS task_events_task ON task_events (task_id, type);
+CREATE INDEX IF NOT EXISTS task_events_type_ts ON task_events (type, ts);
+CREATE INDEX IF NOT EXISTS errors_task ON errors (task_id, ts);
+CREATE INDEX IF NOT EXISTS errors_ts ON errors (ts);
+"""
+
+_TABLE_COLUMNS = {
+    "events": ("ts", "log", "type", "task_id"),
+    "llm_rounds": ("ts", "task_id", "model", "round", "prompt_tokens", "completion_tokens", "cached_tokens", "cost"),
+    "llm_usage": ("ts", "task_id", "category", "model", "cost", "prompt_tokens", "completion_tokens",
+                  "cached_tokens", "cost_correction"),
+    "tool_calls": ("ts", "task_id", "tool", "ok", "cache"),
+    "task_events": ("ts", "task_id", "type", "task_type", "description"),
+    "errors": ("ts", "task_id", "type", "tool", "error"),
+}
+
+
+def db_path(drive_root: pathlib.Path) -> Optional[pathlib.Path]:
+    """Database location (OUROBOROS_TELEMETRY_DB overrides); None when disabled."""
+    override = os.environ.get("OUROBOROS_TELEMETRY_DB", "").strip()
+    if override in ("0", "off", "false"):
+        return None
+    return pathlib.Path(drive_root) / (override or "index/telemetry.sqlite3")  # An absolute override wins
+
+
+def _num(value: Any, kind: type = int) -> Any:
+    try:
+        return kind(value or 0)
+    except (TypeError, ValueError):
+        return kind(0)
+
+
+def _task_id(rec: Dict[str, Any]) -> str:
+    tid = rec.get("task_id")
+    if not tid and isinstance(rec.get("task"), dict):
+        tid = rec["task"].get("id")  # task_received carries the sanitized task
+    return str(tid or "")
+
+
+def _rows(log_name: str, records: Iterable[Dict[str, Any]],
+          default_ts: Optional[float] = None) -> Dict[str, List[Tuple[Any, ...]]]:
+    """Table rows for a batch of log records (default_ts for records without one, else now)."""
+    rows: Dict[str, List[Tuple[Any, ...]]] = {table: [] for table in _TABLE_COLUMNS}
+    now = time.time() if default_ts is None else default_ts
+    for rec in records:
+        if not isinstance(rec, dict):
+            continue
+        ts = parse_ts(rec.get("ts"))
+        ts = ts if ts is not None else now
+        tid = _task_id(rec)
+        if log_name == "tools.jsonl":
+            preview = str(rec.get("result_preview", ""))
+            ok = 0 if preview.lstrip().startswith("⚠️") else 1
+            rows["tool_calls"].append((ts, tid, str(rec.get("tool") or ""), ok, rec.get("cache")))
+            continue
+        evt_type = str(rec.get("type") or rec.get("event") or "")
+        rows["events"].append((ts, log_name, evt_type, tid))
+        if evt_type == "llm_usage":
+            usage = rec.get("usage") if isinstance(rec.get("usage"), dict) else rec
+            rows["llm_usage"].append((
+                ts, tid or "unknown", str(rec.get("category") or "other"), str(rec.get("model") or "unknown"),
+                _num(usage.get("cost"), float), _num(rec.get("prompt_tokens")), _num(rec.get("completion_tokens")),
+                _num(rec.get("cached_tokens")), 1 if rec.get("cost_correction") else 0,
+            ))
+        elif evt_type == "llm_round":
+            rows["llm_rounds"].append((
+                ts, tid, str(rec.get("model") or ""), _num(rec.get("round")), _num(rec.get("prompt_tokens")),
+                _num(rec.get("completion_tokens")), _num(rec.get("cached_tokens")), _num(rec.get("cost_usd"), float),
+            ))
+        elif evt_type in TASK_START_TYPES or evt_type in TASK_END_TYPES:
+            task = rec.get("task") if isinstance(rec.get("task"), dict) else {}
+            description = str(rec.get("description") or task.get("text") or "")[:200]
+            task_type = rec.get("task_type") or task.get("type")
+            rows["task_events"].append((ts, tid, evt_type, task_type, description))
+        if evt_type in ERROR_TYPES or evt_type.endswith("_error"):
+            rows["errors"].append((ts, tid, evt_type, rec.get("tool"), str(rec.get("error") or "")[:500]))
+    return rows
+
+
+class TelemetryStore:
+    """SQLite mirror of the logs with a small query API."""
+
+    def __init__(self, path: pathlib.Path, readonly: bool = False):
+        self.path = pathlib.Path(path)
+        self.readonly = readonly
+        self._lock = threading.RLock()
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=5.0,
+                                         check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+            mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if str(mode).lower() != "wal":
+                log.warning("Telemetry database is not in WAL mode (%s): readers may block the writer", mode)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Writes (supervisor) ---
+
+    def ingest(self, log_name: str, records: Iterable[Dict[str, Any]],
+               position: Optional[Dict[str, Any]] = None, historical: bool = False) -> int:
+        """Insert rows for log records and, in the same transaction, the log's new position.
+
+        Returns how many records produced rows. Historical records without a
+        ts are dated 0 rather than now, so they stay out of recent windows.
+        """
+        if log_name not in INGESTED_LOGS:
+            return 0
+        rows = _rows(log_name, records, default_ts=0.0 if historical else None)
+        with self._lock, self._conn:
+            for table, values in rows.items():
+                if values:
+                    cols = _TABLE_COLUMNS[table]
+                    self._conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", values)
+            if position is not None:
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                   (f"position:{log_name}", json.dumps(position)))
+        return len(rows["events"]) + len(rows["tool_calls"])
+
+    def position(self, log_name: str) -> Optional[Dict[str, Any]]:
+        """Where ingestion of a log stopped: {inode, offset, segment, ts}, or None if never started."""
+        raw = self.meta(f"position:{log_name}")
+        try:
+            return json.loads(raw) if raw else None
+        except ValueError:
+            return None
+
+    def clear(self) -> None:
+        """Drop every mirrored row and position (before importing the logs from scratch)."""
+        with self._lock, self._conn:
+            for table in _TABLE_COLUMNS:
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("DELETE FROM meta WHERE key LIKE 'position:%' OR key = 'backfilled_until'")
+
+    def meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # --- Queries ---
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def task_costs(self, limit: int = 10, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """[{task_id, cost, rounds, model, last_ts}] of tasks with usage since `since`, most expensive first."""
+        rows = self._query(
+            "SELECT task_id, SUM(cost), COUNT(*), "
+            "(SELECT model FROM llm_usage f WHERE f.task_id = u.task_id ORDER BY id LIMIT 1), MAX(ts) "
+            "FROM llm_usage u WHERE ts >= ? GROUP BY task_id ORDER BY SUM(cost) DESC LIMIT ?",
+            (since if since is not None else 0.0, limit))
+        return [{"task_id": r[0], "cost": r[1] or 0.0, "rounds": r[2], "model": r[3] or "", "last_ts": r[4]}
+                for r in rows]
+
+    def event_counts(self, task_id: Optional[str] = None, since: Optional[float] = None,
+                     limit: int = 10) -> List[Tuple[str, int]]:
+        """Most common event types (of one task, and/or since a time), most frequent first."""
+        where, params = self._filter(task_id, since)
+        rows = self._query(f"SELECT type, COUNT(*) FROM events{where} GROUP BY type "
+                           f"ORDER BY COUNT(*) DESC, type LIMIT ?", params + (limit,))
+        return [(r[0] or "unknown", r[1]) for r in rows]
+
+    def recent_errors(self, task_id: Optional[str] = None, since: Optional[float] = None,
+                      limit: int = 10) -> List[Dict[str, Any]]:
+        """Last errors, oldest first."""
+        where, params = self._filter(task_id, since)
+        rows = self._query(f"SELECT ts, task_id, type, tool, error FROM errors{where} "
+                           f"ORDER BY ts DESC, id DESC LIMIT ?", params + (limit,))
+        return [{"ts": r[0], "task_id": r[1], "type": r[2], "tool": r[3], "error": r[4]} for r in reversed(rows)]
+
+    def open_tasks(self, since: float, limit: int = 10) -> List[Dict[str, Any]]:
+        """Tasks started since `since` with no terminal event, newest first."""
+        start = ", ".join("?" * len(TASK_START_TYPES))
+        end = ", ".join("?" * len(TASK_END_TYPES))
+        rows = self._query(
+            f"SELECT task_id, MAX(ts), description FROM task_events s "
+            f"WHERE type IN ({start}) AND ts >= ? AND task_id != '' AND NOT EXISTS ("
+            f"  SELECT 1 FROM task_events e WHERE e.task_id = s.task_id AND e.type IN ({end})) "
+            f"GROUP BY task_id ORDER BY MAX(ts) DESC LIMIT ?",
+            TASK_START_TYPES + (since,) + TASK_END_TYPES + (limit,))
+        return [{"task_id": r[0], "ts": r[1], "description": r[2] or ""} for r in rows]
+
+    def usage_totals(self) -> Dict[str, Any]:
+        """Per-category and per-model totals, shaped like the running totals in supervisor state."""
+        by_category = {r[0]: r[1] for r in self._query(
+            "SELECT category, SUM(cost) FROM llm_usage WHERE cost != 0 GROUP BY category")}
+        by_model = {r[0]: {"cost": r[1] or 0.0, "calls": r[2], "prompt_tokens": r[3],
+                           "completion_tokens": r[4], "cached_tokens": r[5]} for r in self._query(
+            "SELECT model, SUM(cost), SUM(1 - cost_correction), SUM(prompt_tokens), SUM(completion_tokens), "
+            "SUM(cached_tokens) FROM llm_usage GROUP BY model")}
+        return {"budget_by_category": by_category, "budget_by_model": by_model}
+
+    def is_complete(self) -> bool:
+        """True once the mirror has caught up with what was written before it started."""
+        return self.meta("caught_up") == "1"
+
+    @staticmethod
+    def _filter(task_id: Optional[str], since: Optional[float]) -> Tuple[str, Tuple[Any, ...]]:
+        clauses, params = [], []
+        if task_id is not None:
+            clauses.append("task_id = ?")
+            params.append(str(task_id))
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+
+# ---------------------------------------------------------------------------
+# Ingestion (supervisor)
+# ---------------------------------------------------------------------------
+
+def _inode(path: pathlib.Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
+
+
+def _segment_name(segment: Segment) -> str:
+    name = segment.path.name
+    return name[:-3] if segment.compressed else name  # Stable across compression
+
+
+class LogMirror:
+    """Keeps a TelemetryStore in step with the logs from one background thread.
+
+    notify() is the JSONL writer's observer: it only wakes the thread, which
+    reads what was appended (JsonlFollower per log) and ingests it.
+    """
+
+    def __init__(self, store: TelemetryStore, logs_dir: pathlib.Path, poll_sec: float = POLL_SEC):
+        self.store = store
+        self.logs_dir = pathlib.Path(logs_dir)
+        self.poll_sec = poll_sec
+        self._followers: Optional[Dict[str, JsonlFollower]] = None
+        self._ts: Dict[str, float] = {}
+        self._segment: Dict[str, Optional[str]] = {}  # Last closed segment read, per log
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self, log_name: str, records: List[Dict[str, Any]]) -> None:
+        if log_name in INGESTED_LOGS:
+            self._wake.set()
+
+    def start(self) -> None:
+        self.store.set_meta("caught_up", "0")
+        self._thread = threading.Thread(target=self._run, name="telemetry_ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                log.warning("Telemetry ingest failed; resuming from the stored positions", exc_info=True)
+                self._reset()
+            self._wake.wait(self.poll_sec)
+            self._wake.clear()
+
+    def poll(self) -> int:
+        """Ingest records appended since the last call (catching up first if needed)."""
+        if self._followers is None:
+            return self.catch_up()
+        total = 0
+        for name, follower in self._followers.items():
+            total += self._ingest_active(name, follower, historical=False)
+        return total
+
+    def catch_up(self) -> int:
+        """Import everything written since the stored positions, then follow the active files."""
+        self._reset()
+        if not any(self.store.position(name) for name in INGESTED_LOGS):
+            self.store.clear()  # New database, or rows without positions: start over
+        total = 0
+        followers: Dict[str, JsonlFollower] = {}
+        for name in INGESTED_LOGS:
+            path = self.logs_dir / name
+            pos = self.store.position(name) or {}
+            self._ts[name] = float(pos.get("ts") or 0.0)
+            self._segment[name] = pos.get("segment")
+            segments = list_segments(path)
+            offset = 0
+            if not pos:
+                pending, seg_offset, since = segments, 0, None
+            elif pos.get("inode") is not None and pos["inode"] == _inode(path):
+                pending, seg_offset, since = [], 0, None
+                offset = int(pos.get("offset") or 0)
+            else:
+                pending, seg_offset, since = self._segments_after(segments, pos)
+            for i, segment in enumerate(pending):
+                records = list(iter_segment(segment, offset=seg_offset if i == 0 else 0))
+                if since is not None:
+                    records = [r for r in records if (parse_ts(r.get("ts")) or 0.0) > since]
+                self._segment[name] = _segment_name(segment)
+                total += self.store.ingest(name, records, historical=True, position=self._position(name, records))
+            followers[name] = JsonlFollower(path, offset=offset)
+            total += self._ingest_active(name, followers[name], historical=True)
+        self._followers = followers
+        self.store.set_meta("caught_up", "1")
+        if total:
+            log.info("Telemetry mirror imported %d log records written since its last run", total)
+        return total
+
+    @staticmethod
+    def _segments_after(segments: List[Segment],
+                        pos: Dict[str, Any]) -> Tuple[List[Segment], int, Optional[float]]:
+        """Closed segments still to read: (segments, byte offset into the first, ts filter)."""
+        for i, segment in enumerate(segments):
+            if pos.get("inode") is not None and not segment.compressed and _inode(segment.path) == pos["inode"]:
+                return segments[i:], int(pos.get("offset") or 0), None  # The followed file was rotated
+        if pos.get("segment"):
+            for i, segment in enumerate(segments):
+                if _segment_name(segment) == pos["segment"]:
+                    return segments[i + 1:], 0, None
+        since = float(pos.get("ts") or 0.0)  # The position's file is gone or compressed: go by time
+        return [s for s in segments if s.end >= since], 0, since
+
+    def _ingest_active(self, name: str, follower: JsonlFollower, historical: bool) -> int:
+        records = follower.read_new()
+        return self.store.ingest(name, records, historical=historical, position=self._position(
+            name, records, inode=follower.inode(), offset=follower.offset))
+
+    def _position(self, name: str, records: List[Dict[str, Any]], inode: Optional[int] = None,
+                  offset: int = 0) -> Dict[str, Any]:
+        stamps = [ts for ts in (parse_ts(r.get("ts")) for r in records) if ts is not None]
+        self._ts[name] = max([self._ts.get(name, 0.0)] + stamps)
+        if inode is not None:
+            self._segment[name] = None  # The active file's position supersedes it
+        return {"inode": inode, "offset": offset, "segment": self._segment.get(name), "ts": self._ts[name]}
+
+    def _reset(self) -> None:
+        for follower in (self._followers or {}).values():
+            follower.close()
+        self._followers = None
+
+
+# ---------------------------------------------------------------------------
+# Module-level store (set via init() in the supervisor, get() elsewhere)
+# ---------------------------------------------------------------------------
+_store: Optional[TelemetryStore] = None
+_mirror: Optional[LogMirror] = None
+_store_lock = threading.Lock()
+
+
+def init(drive_root: pathlib.Path, follow: bool = True) -> Optional[TelemetryStore]:
+    """In the supervisor: open the database and start mirroring the logs into it."""
+    global _store, _mirror
+    path = db_path(drive_root)
+    if path is None:
+        return None
+    try:
+        store = TelemetryStore(path)
+    except sqlite3.Error:
+        log.warning("Telemetry database unavailable at %s; callers read the logs", path, exc_info=True)
+        return None
+    mirror = LogMirror(store, pathlib.Path(drive_root) / "logs")
+    with _store_lock:
+        _store, _mirror = store, mirror
+    set_jsonl_observer(mirror.logs_dir, mirror.notify)
+    store.set_meta("writer_started_at", utc_now_iso())
+    if follow:
+        mirror.start()
+    return store
+
+
+def get(drive_root: Optional[pathlib.Path] = None) -> Optional[TelemetryStore]:
+    """This process's store: the supervisor's writer, or a read-only connection; None if unavailable."""
+    global _store
+    with _store_lock:
+        if _store is not None or drive_root is None:
+            return _store
+        path = db_path(drive_root)
+        if path is None or not path.exists():
+            return None
+        try:
+            _store = TelemetryStore(path, readonly=True)
+        except sqlite3.Error:
+            log.debug("Telemetry database not readable at %s", path, exc_info=True)
+            return None
+        return _store
+
+
+def _after_fork_in_child() -> None:
+    # SQLite connections must not cross fork(); the child opens its own read-only one on demand
+    global _store, _mirror, _store_lock
+    _store = None
+    _mirror = None  # Its thread does not exist here
+    _store_lock = threading.Lock()
+    set_jsonl_observer(None, None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,149 @@
+"""
+Ouroboros — Token counting.
+
+count_tokens() approximates what a model's BPE tokenizer would produce,
+without network access or model files. Text is pre-tokenized the way
+BPE tokenizers do it (a word with its leading space, digit groups,
+punctuation runs, whitespace runs) and each piece is priced by script:
+Latin words are cheap, Cyrillic costs several times more per character
+than chars/4 assumes, CJK is roughly a token per character, JSON
+punctuation about one per two characters. Ratios are per model family.
+If tiktoken is installed, OpenAI models are counted exactly.
+
+Counts are cached by content hash, so the same system prompt or tool
+result is only counted once per process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# BPE-style pre-tokenization: " word", digit groups, " punctuation", whitespace
+_PIECE_RE = re.compile(r" ?[A-Za-z]+| ?[\u0400-\u04FF]+| ?[^\W\d_]+|\d{1,3}| ?[^\w\s]+|\s+")
+_CJK_RE = re.compile(r"[\u3040-\u30FF\u3400-\u4DBF\u4E00-\u9FFF\uAC00-\uD7AF]")
+
+# Characters per token for each kind of piece, per model family
+_FAMILY_RATIOS: Dict[str, Dict[str, float]] = {
+    "anthropic": {"latin": 5.5, "cyrillic": 3.0, "letters": 3.5, "punct": 2.0},
+    "openai": {"latin": 6.0, "cyrillic": 4.0, "letters": 4.0, "punct": 2.0},
+    "google": {"latin": 6.0, "cyrillic": 4.0, "letters": 4.0, "punct": 2.0},
+    "default": {"latin": 5.5, "cyrillic": 3.0, "letters": 3.5, "punct": 2.0},
+}
+_MESSAGE_OVERHEAD = 6
+_IMAGE_TOKENS = 1000
+_CACHE_MIN_CHARS = 256
+_CACHE_MAX_ENTRIES = 20000
+
+_cache: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+_cache_lock = threading.Lock()
+_tiktoken_encoding: Any = None
+_tiktoken_checked = False
+
+
+def model_family(model: Optional[str] = None) -> str:
+    """Tokenizer family for an OpenRouter model id (default: OUROBOROS_MODEL)."""
+    model = (model or os.environ.get("OUROBOROS_MODEL", "anthropic/claude-sonnet-4.6")).lower()
+    vendor = model.split("/", 1)[0]
+    return vendor if vendor in _FAMILY_RATIOS else "default"
+
+
+def _get_tiktoken() -> Any:
+    global _tiktoken_encoding, _tiktoken_checked
+    if not _tiktoken_checked:
+        _tiktoken_checked = True
+        try:
+            import tiktoken
+            _tiktoken_encoding = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            _tiktoken_encoding = None
+        except Exception:
+            log.debug("tiktoken unavailable, using the approximate counter", exc_info=True)
+            _tiktoken_encoding = None
+    return _tiktoken_encoding
+
+
+def _piece_tokens(piece: str, ratios: Dict[str, float]) -> int:
+    body = piece.lstrip(" ")
+    if not body:
+        return 1
+    first = body[0]
+    if first.isspace():
+        return 1 + body.count("\n") // 2  # Runs of spaces merge; blank lines mostly do too
+    if first.isdigit():
+        return 1
+    if "a" <= first.lower() <= "z":
+        return max(1, math.ceil(len(body) / ratios["latin"]))
+    if "\u0400" <= first <= "\u04FF":
+        return max(1, math.ceil(len(body) / ratios["cyrillic"]))
+    if first.isalpha():
+        cjk = len(_CJK_RE.findall(body))
+        return cjk + max(0 if cjk else 1, math.ceil((len(body) - cjk) / ratios["letters"]))
+    return max(1, math.ceil(len(body) / ratios["punct"]))
+
+
+def _count_uncached(text: str, family: str) -> int:
+    if family == "openai":
+        enc = _get_tiktoken()
+        if enc is not None:
+            return len(enc.encode(text, disallowed_special=()))
+    ratios = _FAMILY_RATIOS[family]
+    return sum(_piece_tokens(m.group(0), ratios) for m in _PIECE_RE.finditer(text))
+
+
+def count_tokens(text: Any, model: Optional[str] = None) -> int:
+    """Approximate token count of text for the given model."""
+    text = str(text or "")
+    if not text:
+        return 0
+    family = model_family(model)
+    if len(text) < _CACHE_MIN_CHARS:
+        return _count_uncached(text, family)
+    key = (family, hashlib.blake2b(text.encode("utf-8", "replace"), digest_size=16).digest())
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    n = _count_uncached(text, family)
+    with _cache_lock:
+        _cache[key] = n
+        while len(_cache) > _CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return n
+
+
+def message_tokens(msg: Dict[str, Any], model: Optional[str] = None) -> int:
+    """Tokens of one chat message: text blocks, tool call arguments and per-message overhead."""
+    content = msg.get("content")
+    total = _MESSAGE_OVERHEAD
+    if isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "text":
+                total += count_tokens(block.get("text", ""), model)
+            elif block.get("type") in ("image_url", "image"):
+                total += _IMAGE_TOKENS
+    elif content:
+        total += count_tokens(content, model)
+    for tc in msg.get("tool_calls") or []:
+        fn = tc.get("function") or {}
+        total += count_tokens(fn.get("name", ""), model) + count_tokens(fn.get("arguments", ""), model)
+    return total
+
+
+def messages_tokens(messages: Iterable[Dict[str, Any]], model: Optional[str] = None) -> int:
+    """Total tokens of a message list (uses a ConversationLog's per-message counts when given one)."""
+    per_message = getattr(messages, "token_count", None)
+    if per_message is not None:
+        return per_message(model)
+    return sum(message_tokens(m, model) for m in messages)
@@ -0,0 +1,160 @@
+"""
+Ouroboros — Per-task tool result cache.
+
+Tools marked ToolEntry(cacheable=True) (repo_read, drive_read,
+codebase_digest) have their results remembered for the rest of the
+task, keyed by tool name and normalized arguments. An entry is served only
+while its stamp still matches: stat() (mtime, size) of every file the call
+reads, a digest of (path, mtime, size) over every file below a directory
+it reads (a directory's own mtime misses edits to nested files), plus
+HEAD/index state for "git". Tools whose stamp would cost about as much as
+running them (listings, git status/diff) are not marked cacheable.
+
+Writers invalidate through the same resource declarations the scheduler
+uses (see tool_scheduler.py): a call that writes drops every cached read
+it overlaps, and an undeclared tool (run_shell, claude_code_edit, ...)
+clears the whole cache. The cache is cleared when a new task starts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from ouroboros.tool_scheduler import conflicts, resource_sets
+
+log = logging.getLogger(__name__)
+
+_MAX_ENTRIES = 256
+_MAX_TREE_FILES = 20000  # Larger trees are not worth stamping
+
+
+def _stat_stamp(path: Any) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _tree_stamp(root: Any) -> str:
+    """Digest of (relative path, mtime, size) of every file below root, .git excluded."""
+    digest = hashlib.blake2b(digest_size=16)
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(str(root)):
+        dirnames[:] = sorted(d for d in dirnames if d != ".git")
+        for name in sorted(filenames):
+            count += 1
+            if count > _MAX_TREE_FILES:
+                raise ValueError(f"more than {_MAX_TREE_FILES} files below {root}: not cacheable")
+            path = os.path.join(dirpath, name)
+            digest.update(f"{os.path.relpath(path, str(root))}\0{_stat_stamp(path)}\n".encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+def _path_stamp(path: Any) -> Any:
+    return _tree_stamp(path) if os.path.isdir(path) else _stat_stamp(path)
+
+
+def _git_stamp(repo_dir: Any) -> Tuple[Any, ...]:
+    git_dir = os.path.join(str(repo_dir), ".git")
+    head_ref = ""
+    try:
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+            head_ref = f.read().strip()
+    except OSError:
+        pass
+    ref_path = os.path.join(git_dir, head_ref[5:].strip()) if head_ref.startswith("ref:") else ""
+    return (head_ref, _stat_stamp(ref_path) if ref_path else None,
+            _stat_stamp(os.path.join(git_dir, "index")), _stat_stamp(os.path.join(git_dir, "packed-refs")))
+
+
+def _stamp(reads: FrozenSet[str], ctx: Any) -> Tuple[Any, ...]:
+    """Validity stamp for a set of read resources."""
+    parts = []
+    for key in sorted(reads):
+        kind, _, path = key.partition(":")
+        if kind == "repo":
+            parts.append((key, _path_stamp(ctx.repo_path(path) if path else ctx.repo_dir)))
+        elif kind == "drive":
+            parts.append((key, _path_stamp(ctx.drive_path(path) if path else ctx.drive_root)))
+        elif kind == "git":
+            parts.append((key, _git_stamp(ctx.repo_dir)))
+        else:
+            parts.append((key, None))
+    return tuple(parts)
+
+
+class ToolResultCache:
+    """Results of cacheable tool calls, validated by stamp and invalidated by writers."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (reads, stamp, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[FrozenSet[str], Tuple[Any, ...], str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+        return name, json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def lookup(self, entry: Any, args: Dict[str, Any], ctx: Any) -> Tuple[Optional[str], Optional[Tuple[Any, ...]]]:
+        """
+        (cached_result, None) on a hit, (None, stamp) on a miss, (None, None) if not cacheable.
+
+        The stamp is taken before the tool runs, so a change made while it runs
+        makes the stored result stale rather than wrongly fresh.
+        """
+        if entry is None or not getattr(entry, "cacheable", False):
+            return None, None
+        res = resource_sets(entry, args)
+        if res is None:
+            return None, None
+        try:
+            stamp = _stamp(res[0], ctx)
+        except Exception:
+            log.debug("Failed to stamp %s", entry.name, exc_info=True)
+            return None, None
+        key = self._key(entry.name, args)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[1] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[2], None
+            self.misses += 1
+            return None, stamp
+
+    def record(self, entry: Any, args: Dict[str, Any], stamp: Optional[Tuple[Any, ...]], result: Any) -> None:
+        """After a call ran: invalidate what it may have written, then store its result if cacheable."""
+        res = resource_sets(entry, args) if entry is not None else None
+        with self._lock:
+            if res is None:
+                self._entries.clear()
+            elif res[1]:
+                stale = [k for k, (reads, _, _) in self._entries.items()
+                         if conflicts((reads, frozenset()), res)]
+                for k in stale:
+                    del self._entries[k]
+            if stamp is None or res is None or not isinstance(result, str) or result.startswith("⚠️"):
+                return
+            self._entries[self._key(entry.name, args)] = (res[0], stamp, result)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"cache_hits": self.hits, "cache_misses": self.misses, "cache_entries": len(self._entries)}
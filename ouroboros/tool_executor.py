@@ -0,0 +1,586 @@
+"""
+Ouroboros — Tool execution lanes.
+
+Every tool call from the LLM loop runs with a hard timeout in one of three lanes:
+
+  browser   — a thread-sticky executor (Playwright sync API needs thread
+              affinity); reset on timeout.
+  isolated  — tools marked ToolEntry(isolated=True) run in a child process
+              (forkserver start method, so the threaded worker is never
+              forked) in its own process group when OUROBOROS_TOOL_ISOLATION=1.
+              On timeout the whole group (shell commands, CLI subprocesses)
+              is SIGKILLed, so nothing keeps running behind the LLM's back.
+  pool      — everything else: one reused thread pool per process
+              (OUROBOROS_TOOL_POOL_SIZE). Python threads cannot be killed,
+              so a call that times out is cancelled if it has not started
+              and counted as leaked otherwise; once leaked calls hold half
+              the pool, new calls go to a fresh pool.
+
+executor_stats() reports queueing delay and leaked/killed counts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+import pickle
+import signal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ouroboros.tools.registry import ToolContext, ToolEntry, ToolRegistry, call_handler
+from ouroboros.utils import (
+    append_jsonl, sanitize_tool_args_for_log, sanitize_tool_result_for_log, truncate_for_log, utc_now_iso,
+)
+
+log = logging.getLogger(__name__)
+
+# Stateful browser tools require thread-affinity (Playwright sync uses greenlet)
+STATEFUL_BROWSER_TOOLS = frozenset({"browse_page", "browser_action"})
+
+_DEFAULT_POOL_SIZE = 16
+
+
+def _pool_size() -> int:
+    try:
+        return max(2, int(os.environ.get("OUROBOROS_TOOL_POOL_SIZE", str(_DEFAULT_POOL_SIZE))))
+    except (TypeError, ValueError):
+        log.warning("Invalid OUROBOROS_TOOL_POOL_SIZE, defaulting to %d", _DEFAULT_POOL_SIZE)
+        return _DEFAULT_POOL_SIZE
+
+
+def isolation_enabled() -> bool:
+    return (os.environ.get("OUROBOROS_TOOL_ISOLATION", "0").strip().lower() in ("1", "true", "yes", "on")
+            and "forkserver" in multiprocessing.get_all_start_methods())
+
+
+# ---------------------------------------------------------------------------
+# Single call
+# ---------------------------------------------------------------------------
+
+def _parse_tool_call(tools: ToolRegistry, tc: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """(args, None) for a well-formed call, or (None, error_result) when the arguments do not parse."""
+    fn_name = tc["function"]["name"]
+    try:
+        args = json.loads(tc["function"]["arguments"] or "{}")
+    except (json.JSONDecodeError, ValueError) as e:
+        result = f"⚠️ TOOL_ARG_ERROR: Could not parse arguments for '{fn_name}': {e}"
+        return None, {
+            "tool_call_id": tc["id"],
+            "fn_name": fn_name,
+            "result": result,
+            "is_error": True,
+            "args_for_log": {},
+            "is_code_tool": fn_name in tools.CODE_TOOLS,
+        }
+    return args, None
+
+
+def _finish_tool_call(
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    task_id: str,
+    args_for_log: Dict[str, Any],
+    result: Any,
+    error: Optional[BaseException],
+    cache: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Log one executed tool call and build its result dict (cache: "hit"/"miss" for cacheable tools)."""
+    fn_name = tc["function"]["name"]
+    if error is not None:
+        result = f"⚠️ TOOL_ERROR ({fn_name}): {type(error).__name__}: {error}"
+        append_jsonl(drive_logs / "events.jsonl", {
+            "ts": utc_now_iso(), "type": "tool_error", "task_id": task_id,
+            "tool": fn_name, "args": args_for_log, "error": repr(error),
+        })
+
+    # Log tool execution (sanitize secrets from result before persisting)
+    record = {
+        "ts": utc_now_iso(), "tool": fn_name, "task_id": task_id,
+        "args": args_for_log,
+        "result_preview": sanitize_tool_result_for_log(truncate_for_log(result, 2000)),
+    }
+    if cache is not None:
+        record["cache"] = cache
+        record.update(tools.result_cache.stats())
+    append_jsonl(drive_logs / "tools.jsonl", record)
+
+    return {
+        "tool_call_id": tc["id"],
+        "fn_name": fn_name,
+        "result": result,
+        "is_error": error is not None or str(result).startswith("⚠️"),
+        "args_for_log": args_for_log,
+        "is_code_tool": fn_name in tools.CODE_TOOLS,
+    }
+
+
+def _execute_single_tool(
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    task_id: str = "",
+) -> Dict[str, Any]:
+    """
+    Execute a single tool call and return all needed info.
+
+    Returns dict with: tool_call_id, fn_name, result, is_error, args_for_log, is_code_tool
+    """
+    fn_name = tc["function"]["name"]
+    args, arg_error = _parse_tool_call(tools, tc)
+    if arg_error is not None:
+        return arg_error
+    args_for_log = sanitize_tool_args_for_log(fn_name, args if isinstance(args, dict) else {})
+
+    result: Any = None
+    error: Optional[BaseException] = None
+    cache: Optional[str] = None
+    try:
+        result, cache = tools.execute_cached(fn_name, args)
+    except Exception as e:
+        error = e
+    return _finish_tool_call(tools, tc, drive_logs, task_id, args_for_log, result, error, cache)
+
+
+def _make_timeout_result(
+    fn_name: str,
+    tool_call_id: str,
+    is_code_tool: bool,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    timeout_sec: int,
+    task_id: str = "",
+    reset_msg: str = "",
+    lane: str = "pool",
+    leaked: bool = False,
+    killed: bool = False,
+) -> Dict[str, Any]:
+    """
+    Create a timeout error result dictionary and log the timeout event.
+
+    Args:
+        reset_msg: Optional additional message (e.g., "Browser state has been reset. ")
+        lane/leaked/killed: How the call was run and what happened to it (logged)
+
+    Returns: Dict with tool_call_id, fn_name, result, is_error, args_for_log, is_code_tool
+    """
+    args_for_log = {}
+    try:
+        args = json.loads(tc["function"]["arguments"] or "{}")
+        args_for_log = sanitize_tool_args_for_log(fn_name, args if isinstance(args, dict) else {})
+    except Exception:
+        pass
+
+    fate = ("The tool process was killed and control is returned to you. " if killed
+            else "The tool is still running in background but control is returned to you. ")
+    result = (
+        f"⚠️ TOOL_TIMEOUT ({fn_name}): exceeded {timeout_sec}s limit. {fate}"
+        f"{reset_msg}Try a different approach or inform the owner{' about the issue' if not reset_msg else ''}."
+    )
+
+    append_jsonl(drive_logs / "events.jsonl", {
+        "ts": utc_now_iso(), "type": "tool_timeout", "task_id": task_id,
+        "tool": fn_name, "args": args_for_log,
+        "timeout_sec": timeout_sec, "lane": lane, "leaked": leaked, "killed": killed,
+    })
+    append_jsonl(drive_logs / "tools.jsonl", {
+        "ts": utc_now_iso(), "tool": fn_name,
+        "args": args_for_log, "result_preview": result,
+    })
+
+    return {
+        "tool_call_id": tool_call_id,
+        "fn_name": fn_name,
+        "result": result,
+        "is_error": True,
+        "args_for_log": args_for_log,
+        "is_code_tool": is_code_tool,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Browser lane
+# ---------------------------------------------------------------------------
+
+class _StatefulToolExecutor:
+    """
+    Thread-sticky executor for stateful tools (browser, etc).
+
+    Playwright sync API uses greenlet internally which has strict thread-affinity:
+    once a greenlet starts in a thread, all subsequent calls must happen in the same thread.
+    This executor ensures browse_page/browser_action always run in the same thread.
+
+    On timeout: we shutdown the executor and create a fresh one to reset state.
+    """
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit work to the sticky thread. Creates executor on first call."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stateful_tool")
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def reset(self):
+        """Shutdown current executor and create a fresh one. Used after timeout/error."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Final cleanup."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+            self._executor = None
+
+
+# ---------------------------------------------------------------------------
+# Pool lane
+# ---------------------------------------------------------------------------
+
+class ManagedToolExecutor:
+    """Reused thread pool for tool calls, with leak tracking and queueing metrics."""
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._leaked: Set[Future] = set()
+        self._stats: Dict[str, Any] = {
+            "submitted": 0, "started": 0, "timeouts": 0, "cancelled": 0,
+            "leaked_total": 0, "pool_rotations": 0,
+            "isolated_runs": 0, "killed": 0,
+            "queue_delay_sec_total": 0.0, "queue_delay_sec_max": 0.0,
+        }
+
+    def submit(self, fn, *args) -> Future:
+        t_submit = time.monotonic()
+
+        def _run():
+            self._note_start(time.monotonic() - t_submit)
+            return fn(*args)
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="tool")
+            self._stats["submitted"] += 1
+            return self._pool.submit(_run)
+
+    def _note_start(self, delay: float) -> None:
+        with self._lock:
+            self._stats["started"] += 1
+            self._stats["queue_delay_sec_total"] += delay
+            self._stats["queue_delay_sec_max"] = max(self._stats["queue_delay_sec_max"], delay)
+
+    def abandon(self, future: Future) -> bool:
+        """Give up on a timed-out call. Returns True if it is still running (leaked)."""
+        if future.cancel():
+            with self._lock:
+                self._stats["timeouts"] += 1
+                self._stats["cancelled"] += 1
+            return False
+        old_pool: Optional[ThreadPoolExecutor] = None
+        with self._lock:
+            self._stats["timeouts"] += 1
+            self._stats["leaked_total"] += 1
+            self._leaked.add(future)
+            if len(self._leaked) >= max(1, self._max_workers // 2):
+                # Hung threads are starving the pool: route new calls to a fresh one
+                old_pool, self._pool = self._pool, None
+                self._stats["pool_rotations"] += 1
+        future.add_done_callback(self._forget)
+        if old_pool is not None:
+            log.warning("Tool pool has %d leaked calls; starting a fresh pool", len(self._leaked))
+            old_pool.shutdown(wait=False)
+        return True
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._leaked.discard(future)
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s["leaked_running"] = len(self._leaked)
+        started = s.pop("started")
+        total = s.pop("queue_delay_sec_total")
+        s["queue_delay_ms_avg"] = round(total / started * 1000, 2) if started else 0.0
+        s["queue_delay_ms_max"] = round(s.pop("queue_delay_sec_max") * 1000, 2)
+        return s
+
+
+_executor: Optional[ManagedToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ManagedToolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ManagedToolExecutor(_pool_size())
+        return _executor
+
+
+def executor_stats() -> Dict[str, Any]:
+    return get_executor().stats()
+
+
+# ---------------------------------------------------------------------------
+# Isolated lane
+# ---------------------------------------------------------------------------
+
+# Modules of the isolated tools, imported once in the fork server
+_FORKSERVER_PRELOAD = ["ouroboros.tool_executor", "ouroboros.tools.shell", "ouroboros.tools.core"]
+# ToolContext fields a child needs; queues, callbacks and browser state stay in the worker
+_CHILD_CONTEXT_FIELDS = ("repo_dir", "drive_root", "branch_dev", "current_chat_id", "current_task_type",
+                         "task_id", "task_depth", "is_direct_chat")
+
+_mp_context: Any = None
+_mp_context_lock = threading.Lock()
+
+
+def _isolation_context() -> Any:
+    """Fork-server start method: children are forked from a single-threaded server process,
+    never from this (threaded) worker, so no lock held by another thread is inherited."""
+    global _mp_context
+    with _mp_context_lock:
+        if _mp_context is None:
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(_FORKSERVER_PRELOAD)
+            _mp_context = ctx
+        return _mp_context
+
+
+def _can_isolate(entry: ToolEntry) -> bool:
+    """The handler is sent to the child by reference, so it must be a module-level function."""
+    try:
+        pickle.dumps(entry.handler)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        log.debug("Tool %s has a handler that cannot be sent to a child; using the pool", entry.name)
+        return False
+    return True
+
+
+def _isolated_main(conn: Any, entry: ToolEntry, ctx_fields: Dict[str, Any], args: Dict[str, Any]) -> None:
+    """Child process: run the tool, stream progress, send back result and new ctx events."""
+    os.setsid()
+    ctx = ToolContext(**ctx_fields)
+    ctx.emit_progress_fn = lambda text: conn.send(("progress", text, None))
+    try:
+        reply: Tuple[str, Any, Any] = ("result", call_handler(entry, ctx, args), None)
+    except Exception as e:
+        reply = ("error", f"{type(e).__name__}: {e}", None)
+    conn.send((reply[0], reply[1], ctx.pending_events))
+    conn.close()
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        # The child may not have called setsid() yet
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def _execute_isolated(
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    timeout_sec: int,
+    task_id: str = "",
+) -> Dict[str, Any]:
+    """Run one call in a child process; SIGKILL its process group on timeout."""
+    fn_name = tc["function"]["name"]
+    args, arg_error = _parse_tool_call(tools, tc)
+    if arg_error is not None:
+        return arg_error
+    args_for_log = sanitize_tool_args_for_log(fn_name, args if isinstance(args, dict) else {})
+    ctx = tools.context
+    entry = tools.get_entry(fn_name)
+    hit, stamp = tools.result_cache.lookup(entry, args, ctx)
+    if hit is not None:
+        return _finish_tool_call(tools, tc, drive_logs, task_id, args_for_log, hit, None, "hit")
+    cache = "miss" if stamp is not None else None
+    get_executor().count("isolated_runs")
+
+    mp = _isolation_context()
+    recv_conn, send_conn = mp.Pipe(duplex=False)
+    ctx_fields = {name: getattr(ctx, name) for name in _CHILD_CONTEXT_FIELDS}
+    proc = mp.Process(target=_isolated_main, args=(send_conn, entry, ctx_fields, args), daemon=True)
+    proc.start()
+    send_conn.close()
+
+    deadline = time.monotonic() + timeout_sec
+    reply: Optional[Tuple[str, Any, Any]] = None
+    try:
+        while reply is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not recv_conn.poll(remaining):
+                break
+            try:
+                kind, value, events = recv_conn.recv()
+            except EOFError:
+                break
+            if kind == "progress":
+                ctx.emit_progress_fn(value)
+            else:
+                reply = (kind, value, events)
+    finally:
+        recv_conn.close()
+
+    if reply is None and time.monotonic() >= deadline:
+        _kill_group(proc.pid)
+        proc.join()
+        tools.result_cache.record(entry, args, None, None)  # It may have written before dying
+        get_executor().count("killed")
+        return _make_timeout_result(
+            fn_name, tc["id"], fn_name in tools.CODE_TOOLS, tc, drive_logs,
+            timeout_sec, task_id, lane="isolated", killed=True,
+        )
+
+    proc.join()
+    if reply is None:
+        tools.result_cache.record(entry, args, None, None)
+        error: Optional[BaseException] = RuntimeError(f"isolated tool process exited with code {proc.exitcode}")
+        return _finish_tool_call(tools, tc, drive_logs, task_id, args_for_log, None, error)
+    kind, value, events = reply
+    ctx.pending_events.extend(events or [])
+    # The child's cache died with it: invalidate and store on this side
+    tools.result_cache.record(entry, args, stamp, value if kind == "result" else None)
+    error = RuntimeError(value) if kind == "error" else None
+    return _finish_tool_call(tools, tc, drive_logs, task_id, args_for_log, value, error, cache)
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+def _execute_with_timeout(
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    timeout_sec: int,
+    task_id: str = "",
+    stateful_executor: Optional[_StatefulToolExecutor] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a tool call with a hard timeout.
+
+    On timeout: returns TOOL_TIMEOUT error so the LLM regains control.
+    For stateful tools (browser): resets the sticky executor to recover state.
+    For isolated tools: the child's process group is killed.
+    For regular tools: the call is cancelled if queued, otherwise counted as leaked.
+    """
+    fn_name = tc["function"]["name"]
+    tool_call_id = tc["id"]
+    is_code_tool = fn_name in tools.CODE_TOOLS
+    lane = _lane(tools, fn_name, stateful_executor)
+
+    if lane == "browser":
+        future = stateful_executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
+        try:
+            return future.result(timeout=timeout_sec)
+        except TimeoutError:
+            stateful_executor.reset()
+            return _make_timeout_result(
+                fn_name, tool_call_id, is_code_tool, tc, drive_logs,
+                timeout_sec, task_id, "Browser state has been reset. ", lane="browser",
+            )
+
+    if lane == "isolated":
+        return _execute_isolated(tools, tc, drive_logs, timeout_sec, task_id)
+
+    executor = get_executor()
+    future = executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
+    return _pool_result(executor, future, tools, tc, drive_logs, timeout_sec, task_id)
+
+
+def _lane(tools: ToolRegistry, fn_name: str, stateful_executor: Optional[_StatefulToolExecutor]) -> str:
+    if stateful_executor and fn_name in STATEFUL_BROWSER_TOOLS:
+        return "browser"
+    entry = tools.get_entry(fn_name)
+    if entry is not None and entry.isolated and isolation_enabled() and _can_isolate(entry):
+        return "isolated"
+    return "pool"
+
+
+def _pool_result(
+    executor: ManagedToolExecutor,
+    future: Future,
+    tools: ToolRegistry,
+    tc: Dict[str, Any],
+    drive_logs: pathlib.Path,
+    timeout_sec: int,
+    task_id: str,
+    wait_sec: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Wait for a pool-lane call (wait_sec: what is left of its timeout); on timeout cancel it or count it as leaked."""
+    try:
+        return future.result(timeout=max(0.0, timeout_sec if wait_sec is None else wait_sec))
+    except TimeoutError:
+        fn_name = tc["function"]["name"]
+        leaked = executor.abandon(future)
+        return _make_timeout_result(
+            fn_name, tc["id"], fn_name in tools.CODE_TOOLS, tc, drive_logs,
+            timeout_sec, task_id, lane="pool", leaked=leaked,
+        )
+
+
+def execute_parallel(
+    tools: ToolRegistry,
+    tool_calls: List[Dict[str, Any]],
+    drive_logs: pathlib.Path,
+    task_id: str = "",
+    stateful_executor: Optional[_StatefulToolExecutor] = None,
+    prestarted: Optional[Dict[str, Future]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run independent tool calls concurrently; results in call order.
+
+    Pool-lane calls go straight to the managed executor and are waited on
+    here against their own deadlines, so no thread is spent per call just
+    to wait. Browser and isolated calls bound their own waits and run as
+    _execute_with_timeout in the same executor. prestarted maps call ids
+    to futures already running (early dispatch).
+    """
+    if len(tool_calls) == 1 and not (prestarted and tool_calls[0]["id"] in prestarted):
+        tc = tool_calls[0]
+        return [_execute_with_timeout(tools, tc, drive_logs, tools.get_timeout(tc["function"]["name"]),
+                                      task_id, stateful_executor)]
+    executor = get_executor()
+    started: List[Tuple[Future, Optional[float]]] = []  # (future, deadline for pool-lane calls)
+    for tc in tool_calls:
+        if prestarted and tc["id"] in prestarted:
+            started.append((prestarted[tc["id"]], None))
+            continue
+        fn_name = tc["function"]["name"]
+        timeout_sec = tools.get_timeout(fn_name)
+        if _lane(tools, fn_name, stateful_executor) == "pool":
+            future = executor.submit(_execute_single_tool, tools, tc, drive_logs, task_id)
+            started.append((future, time.monotonic() + timeout_sec))
+        else:
+            future = executor.submit(_execute_with_timeout, tools, tc, drive_logs, timeout_sec, task_id,
+                                     stateful_executor)
+            started.append((future, None))
+    results = []
+    for tc, (future, deadline) in zip(tool_calls, started):
+        if deadline is None:
+            results.append(future.result())
+        else:
+            results.append(_pool_result(executor, future, tools, tc, drive_logs,
+                                        tools.get_timeout(tc["function"]["name"]), task_id,
+                                        wait_sec=deadline - time.monotonic()))
+    return results
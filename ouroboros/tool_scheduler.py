@@ -0,0 +1,114 @@
+"""
+Ouroboros — Resource-aware tool call scheduling.
+
+Tools declare the resources they read and write on their ToolEntry
+(`reads=` / `writes=`). Resource keys:
+
+  repo:<path>    file or directory in the repo ("repo:" = whole tree)
+  drive:<path>   file or directory on Drive
+  git            git index/refs/remote
+  browser        the Playwright browser
+  network        outbound web access (reads never conflict)
+  <other>        any other shared name (e.g. owner_chat, ctx:model)
+
+`{arg}` in a key is filled from the call's arguments ("repo:{path}"); a
+list argument expands to one key per item, a missing one to the root.
+Two calls conflict when they touch overlapping resources and at least one
+of them writes. A tool with no declaration conflicts with everything.
+
+schedule_waves() turns a batch into waves: a call runs after every earlier
+call it conflicts with, and calls in the same wave run in parallel.
+"""
+
+from __future__ import annotations
+
+import json
+import posixpath
+import re
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ouroboros.tools.registry import ToolEntry
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_PATH_KINDS = frozenset({"repo", "drive"})
+
+# (reads, writes), or None for an exclusive call
+ResourceSets = Optional[Tuple[FrozenSet[str], FrozenSet[str]]]
+
+
+def _normalize_path(value: Any) -> str:
+    path = str(value or "").strip().replace("\\", "/").lstrip("/")
+    path = posixpath.normpath(path) if path else ""
+    if path in (".", "") or path.startswith(".."):
+        return ""  # Root, or something that escapes it: assume the whole tree
+    return path
+
+
+def _expand(template: str, args: Dict[str, Any]) -> List[str]:
+    match = _PLACEHOLDER.search(template)
+    if match is None:
+        return [template]
+    value = args.get(match.group(1))
+    values = value if isinstance(value, (list, tuple)) and value else [value]
+    return [template[:match.start()] + _normalize_path(v) + template[match.end():] for v in values]
+
+
+def resource_sets(entry: Optional[ToolEntry], args: Any) -> ResourceSets:
+    """Concrete resources touched by one call, or None if the tool is undeclared."""
+    if entry is None or not (entry.reads or entry.writes):
+        return None
+    args = args if isinstance(args, dict) else {}
+    reads = frozenset(k for t in entry.reads for k in _expand(t, args))
+    writes = frozenset(k for t in entry.writes for k in _expand(t, args))
+    return reads, writes
+
+
+def _overlaps(a: str, b: str) -> bool:
+    kind_a, _, path_a = a.partition(":")
+    kind_b, _, path_b = b.partition(":")
+    if kind_a != kind_b:
+        return False
+    if kind_a not in _PATH_KINDS:
+        return a == b
+    if not path_a or not path_b or path_a == path_b:
+        return True
+    return path_a.startswith(path_b + "/") or path_b.startswith(path_a + "/")
+
+
+def _any_overlap(xs: Iterable[str], ys: Iterable[str]) -> bool:
+    ys = list(ys)
+    return any(_overlaps(x, y) for x in xs for y in ys)
+
+
+def conflicts(a: ResourceSets, b: ResourceSets) -> bool:
+    if a is None or b is None:
+        return True
+    reads_a, writes_a = a
+    reads_b, writes_b = b
+    return (_any_overlap(writes_a, writes_b) or _any_overlap(writes_a, reads_b)
+            or _any_overlap(reads_a, writes_b))
+
+
+def call_resources(entry: Optional[ToolEntry], tc: Dict[str, Any]) -> ResourceSets:
+    """resource_sets() for a raw tool call; unparseable arguments make it exclusive."""
+    try:
+        args = json.loads(tc.get("function", {}).get("arguments") or "{}")
+    except (TypeError, ValueError):
+        return None
+    return resource_sets(entry, args)
+
+
+def schedule_waves(resources: List[ResourceSets]) -> List[List[int]]:
+    """Group call indices into waves; order is kept between conflicting calls."""
+    levels: List[int] = []
+    for j, res in enumerate(resources):
+        level = 0
+        for i in range(j):
+            if levels[i] >= level and conflicts(resources[i], res):
+                level = levels[i] + 1
+        levels.append(level)
+    waves: List[List[int]] = [[] for _ in range(max(levels) + 1)] if levels else []
+    for idx, level in enumerate(levels):
+        waves[level].append(idx)
+    return waves
@@ -365,6 +365,8 @@ def get_tools() -> List[ToolEntry]:
             },
             handler=_browse_page,
             timeout_sec=60,
+            reads=("network",),
+            writes=("browser",),
         ),
         ToolEntry(
             name="browser_action",
@@ -402,5 +404,7 @@ def get_tools() -> List[ToolEntry]:
             },
             handler=_browser_action,
             timeout_sec=60,
+            reads=("network",),
+            writes=("browser",),
         ),
     ]
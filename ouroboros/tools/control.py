@@ -207,8 +207,8 @@ def _switch_model(ctx: ToolContext, model: str = "", effort: str = "") -> str:
 
     Stored in ToolContext, applied on the next LLM call in the loop.
     """
-    from ouroboros.llm import LLMClient, normalize_reasoning_effort
-    available = LLMClient().available_models()
+    from ouroboros.llm import shared_llm_client, normalize_reasoning_effort
+    available = shared_llm_client().available_models()
     changes = []
 
     if model:
@@ -291,7 +291,7 @@ def get_tools() -> List[ToolEntry]:
                 "offset": {"type": "integer", "default": 0, "description": "Skip N from end (pagination)"},
                 "search": {"type": "string", "default": "", "description": "Text filter"},
             }, "required": []},
-        }, _chat_history),
+        }, _chat_history, reads=("drive:logs/chat.jsonl",)),
         ToolEntry("update_scratchpad", {
             "name": "update_scratchpad",
             "description": "Update your working memory. Write freely — any format you find useful. "
@@ -299,7 +299,7 @@ def get_tools() -> List[ToolEntry]:
             "parameters": {"type": "object", "properties": {
                 "content": {"type": "string", "description": "Full scratchpad content"},
             }, "required": ["content"]},
-        }, _update_scratchpad),
+        }, _update_scratchpad, writes=("drive:memory/scratchpad.md", "drive:memory/scratchpad_journal.jsonl")),
         ToolEntry("send_owner_message", {
             "name": "send_owner_message",
             "description": "Send a proactive message to the owner. Use when you have something "
@@ -309,7 +309,7 @@ def get_tools() -> List[ToolEntry]:
                 "text": {"type": "string", "description": "Message text"},
                 "reason": {"type": "string", "description": "Why you're reaching out (logged, not sent)"},
             }, "required": ["text"]},
-        }, _send_owner_message),
+        }, _send_owner_message, writes=("owner_chat",)),
         ToolEntry("update_identity", {
             "name": "update_identity",
             "description": "Update your identity manifest (who you are, who you want to become). "
@@ -317,7 +317,7 @@ def get_tools() -> List[ToolEntry]:
             "parameters": {"type": "object", "properties": {
                 "content": {"type": "string", "description": "Full identity content"},
             }, "required": ["content"]},
-        }, _update_identity),
+        }, _update_identity, writes=("drive:memory/identity.md",)),
         ToolEntry("toggle_evolution", {
             "name": "toggle_evolution",
             "description": "Enable or disable evolution mode. When enabled, Ouroboros runs continuous self-improvement cycles.",
@@ -342,7 +342,7 @@ def get_tools() -> List[ToolEntry]:
                 "effort": {"type": "string", "enum": ["low", "medium", "high", "xhigh"],
                            "description": "Reasoning effort level. Leave empty to keep current."},
             }, "required": []},
-        }, _switch_model),
+        }, _switch_model, writes=("ctx:model",)),
         ToolEntry("get_task_result", {
             "name": "get_task_result",
             "description": "Read the result of a completed subtask. Use after schedule_task to collect results.",
@@ -10,6 +10,8 @@ import pathlib
 import uuid
 from typing import Any, Dict, List, Tuple
 
+from ouroboros.cost_reconciler import queue_sink, reconcile_estimate
+from ouroboros.jsonl_tail import read_jsonl_tail
 from ouroboros.tools.registry import ToolContext, ToolEntry
 from ouroboros.utils import read_text, safe_relpath, utc_now_iso
 
@@ -201,7 +203,7 @@ def _codebase_digest(ctx: ToolContext) -> str:
 
 def _summarize_dialogue(ctx: ToolContext, last_n: int = 200) -> str:
     """Summarize dialogue history into key moments, decisions, and creator preferences."""
-    from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
+    from ouroboros.llm import shared_llm_client, DEFAULT_LIGHT_MODEL
 
     # Read last_n messages from chat.jsonl
     chat_path = ctx.drive_root / "logs" / "chat.jsonl"
@@ -209,19 +211,7 @@ def _summarize_dialogue(ctx: ToolContext, last_n: int = 200) -> str:
         return "⚠️ chat.jsonl not found"
 
     try:
-        entries = []
-        with chat_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        log.debug("Failed to parse chat.jsonl line in summarize_dialogue", exc_info=True)
-                        continue
-
-        # Take last N entries
-        entries = entries[-last_n:] if len(entries) > last_n else entries
+        entries = read_jsonl_tail(chat_path, last_n)
 
         if not entries:
             return "⚠️ No chat entries found"
@@ -257,7 +247,7 @@ Dialogue history ({len(entries)} messages):
 Now write a comprehensive summary:"""
 
         # Call LLM
-        llm = LLMClient()
+        llm = shared_llm_client()
         model = os.environ.get("OUROBOROS_MODEL_LIGHT", "") or DEFAULT_LIGHT_MODEL
 
         messages = [
@@ -291,6 +281,8 @@ Now write a comprehensive summary:"""
                         ctx.pending_events.append(usage_event)
             elif hasattr(ctx, "pending_events"):
                 ctx.pending_events.append(usage_event)
+            reconcile_estimate(usage, model, task_id=usage_event["task_id"], category="summarize",
+                               sink=queue_sink(ctx.event_queue) if ctx.event_queue is not None else None)
 
         summary = response.get("content", "")
         if not summary:
@@ -330,7 +322,7 @@ def get_tools() -> List[ToolEntry]:
             "name": "repo_read",
             "description": "Read a UTF-8 text file from the GitHub repo (relative path).",
             "parameters": {"type": "object", "properties": {"path": {"type": "string"}}, "required": ["path"]},
-        }, _repo_read),
+        }, _repo_read, reads=("repo:{path}",), cacheable=True),
         ToolEntry("repo_list", {
             "name": "repo_list",
             "description": "List files under a repo directory (relative path).",
@@ -338,12 +330,12 @@ def get_tools() -> List[ToolEntry]:
                 "dir": {"type": "string", "default": "."},
                 "max_entries": {"type": "integer", "default": 500},
             }, "required": []},
-        }, _repo_list),
+        }, _repo_list, reads=("repo:{dir}",)),
         ToolEntry("drive_read", {
             "name": "drive_read",
             "description": "Read a UTF-8 text file from Google Drive (relative to MyDrive/Ouroboros/).",
             "parameters": {"type": "object", "properties": {"path": {"type": "string"}}, "required": ["path"]},
-        }, _drive_read),
+        }, _drive_read, reads=("drive:{path}",), cacheable=True),
         ToolEntry("drive_list", {
             "name": "drive_list",
             "description": "List files under a Drive directory.",
@@ -351,7 +343,7 @@ def get_tools() -> List[ToolEntry]:
                 "dir": {"type": "string", "default": "."},
                 "max_entries": {"type": "integer", "default": 500},
             }, "required": []},
-        }, _drive_list),
+        }, _drive_list, reads=("drive:{dir}",)),
         ToolEntry("drive_write", {
             "name": "drive_write",
             "description": "Write a UTF-8 text file on Google Drive.",
@@ -360,7 +352,7 @@ def get_tools() -> List[ToolEntry]:
                 "content": {"type": "string"},
                 "mode": {"type": "string", "enum": ["overwrite", "append"], "default": "overwrite"},
             }, "required": ["path", "content"]},
-        }, _drive_write),
+        }, _drive_write, writes=("drive:{path}",)),
         ToolEntry("send_photo", {
             "name": "send_photo",
             "description": (
@@ -372,19 +364,20 @@ def get_tools() -> List[ToolEntry]:
                 "image_base64": {"type": "string", "description": "Base64-encoded PNG image data"},
                 "caption": {"type": "string", "description": "Optional caption for the photo"},
             }, "required": ["image_base64"]},
-        }, _send_photo),
+        }, _send_photo, writes=("owner_chat",)),
         ToolEntry("codebase_digest", {
             "name": "codebase_digest",
             "description": "Get a compact digest of the entire codebase: files, sizes, classes, functions. One call instead of many repo_read calls.",
             "parameters": {"type": "object", "properties": {}, "required": []},
-        }, _codebase_digest),
+        }, _codebase_digest, reads=("repo:",), isolated=True, cacheable=True),
         ToolEntry("summarize_dialogue", {
             "name": "summarize_dialogue",
             "description": "Summarize dialogue history into key moments, decisions, and creator preferences. Writes to memory/dialogue_summary.md.",
             "parameters": {"type": "object", "properties": {
                 "last_n": {"type": "integer", "description": "Number of recent messages to summarize (default 200)"},
             }, "required": []},
-        }, _summarize_dialogue),
+        }, _summarize_dialogue, reads=("drive:logs/chat.jsonl", "network"),
+           writes=("drive:memory/dialogue_summary.md",)),
         ToolEntry("forward_to_worker", {
             "name": "forward_to_worker",
             "description": (
@@ -274,7 +274,7 @@ def get_tools() -> List[ToolEntry]:
                 },
                 "required": ["topic"]
             },
-        }, _knowledge_read),
+        }, _knowledge_read, reads=("drive:memory/knowledge/{topic}.md",)),
         ToolEntry("knowledge_write", {
             "name": "knowledge_write",
             "description": "Write or append to a knowledge topic. Use for recipes, gotchas, patterns learned from experience.",
@@ -297,7 +297,7 @@ def get_tools() -> List[ToolEntry]:
                 },
                 "required": ["topic", "content"]
             },
-        }, _knowledge_write),
+        }, _knowledge_write, writes=("drive:memory/knowledge",)),
         ToolEntry("knowledge_list", {
             "name": "knowledge_list",
             "description": "List all topics in the knowledge base with summaries.",
@@ -306,5 +306,5 @@ def get_tools() -> List[ToolEntry]:
                 "properties": {},
                 "required": []
             },
-        }, _knowledge_list),
+        }, _knowledge_list, reads=("drive:memory/knowledge",)),
     ]
@@ -0,0 +1,80 @@
+"""
+read_result tool — page through a stored oversized tool result.
+
+Tool results too long to inline are kept in the blob store
+(ouroboros/blob_store.py) and replaced in the conversation by a preview
+and a handle. This tool reads a character window of the full text, or
+the lines matching a regex, without re-running the original command.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import List, Optional
+
+from ouroboros import blob_store
+from ouroboros.tools.registry import ToolContext, ToolEntry
+
+log = logging.getLogger(__name__)
+
+_MAX_LENGTH = 14000  # Plus the footer, a page stays under the 15000-char inline cap (loop._truncate_tool_result)
+
+
+def _read_result(ctx: ToolContext, handle: str, offset: int = 0, length: int = 8000,
+                 grep: Optional[str] = None) -> str:
+    text = blob_store.get(ctx.drive_root, handle)
+    if text is None:
+        return f"⚠️ Unknown or expired result handle: {handle}"
+    length = max(1, min(int(length or 8000), _MAX_LENGTH))
+    offset = max(0, int(offset or 0))
+
+    if grep:
+        try:
+            pattern = re.compile(grep)
+        except re.error as e:
+            return f"⚠️ Invalid grep pattern: {e}"
+        hits: List[str] = []
+        size = 0
+        lines = text.splitlines()
+        n_matches = 0
+        for lineno, line in enumerate(lines, 1):
+            if not pattern.search(line):
+                continue
+            n_matches += 1
+            if n_matches <= offset:
+                continue
+            entry = f"{lineno}: {line}"
+            if size + len(entry) > length:
+                hits.append(f"...(more matches; continue with offset={n_matches - 1})")
+                break
+            hits.append(entry)
+            size += len(entry) + 1
+        if not hits:
+            return f"No lines match {grep!r} ({len(lines)} lines searched)."
+        return "\n".join(hits)
+
+    chunk = text[offset:offset + length]
+    end = offset + len(chunk)
+    footer = (f"\n[chars {offset}-{end} of {len(text)}; next offset={end}]" if end < len(text)
+              else f"\n[chars {offset}-{end} of {len(text)}; end of result]")
+    return chunk + footer
+
+
+def get_tools() -> List[ToolEntry]:
+    return [
+        ToolEntry("read_result", {
+            "name": "read_result",
+            "description": (
+                "Read more of a long tool result that was shortened to a preview. "
+                "Pass the blob:... handle from the preview; page with offset/length (characters), "
+                "or pass grep (regex) to get matching lines with line numbers (offset then skips matches)."
+            ),
+            "parameters": {"type": "object", "properties": {
+                "handle": {"type": "string", "description": "Handle from the preview, e.g. blob:3f2a..."},
+                "offset": {"type": "integer", "default": 0},
+                "length": {"type": "integer", "default": 8000, "description": f"Max characters to return (<= {_MAX_LENGTH})"},
+                "grep": {"type": "string", "description": "Optional regex; return matching lines instead of a window"},
+            }, "required": ["handle"]},
+        }, _read_result, reads=("blobs",), timeout_sec=30),
+    ]
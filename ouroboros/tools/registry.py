@@ -3,15 +3,21 @@ Ouroboros — Tool registry (SSOT).
 
 Plugin architecture: each module in tools/ exports get_tools().
 ToolRegistry collects all tools, provides schemas() and execute().
+Handlers may be plain functions or coroutine functions (async def); both
+work from execute() and execute_cached_async(). Results of cacheable tools are
+memoized per task (see tool_cache.py).
 """
 
 from __future__ import annotations
 
+import asyncio
+import inspect
 import json
 import pathlib
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from ouroboros.tool_cache import ToolResultCache
 from ouroboros.utils import safe_relpath
 
 
@@ -71,9 +77,34 @@ class ToolEntry:
 
     name: str
     schema: Dict[str, Any]
-    handler: Callable  # fn(ctx: ToolContext, **args) -> str
+    handler: Callable  # fn(ctx: ToolContext, **args) -> str, or async def returning str
     is_code_tool: bool = False
     timeout_sec: int = 120
+    # Resource keys for parallel scheduling (see tool_scheduler.py), e.g. "repo:{path}".
+    # A tool that declares neither runs alone.
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    # Run in a killable child process when OUROBOROS_TOOL_ISOLATION=1 (see tool_executor.py)
+    isolated: bool = False
+    # Memoize results for the task while the files it reads are unchanged (see tool_cache.py)
+    cacheable: bool = False
+
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.handler)
+
+
+def call_handler(entry: ToolEntry, ctx: ToolContext, args: Dict[str, Any]) -> str:
+    """Run a tool handler synchronously; handler errors become a tool error string."""
+    try:
+        if entry.is_async:
+            from ouroboros.http_pool import run_async
+            return run_async(entry.handler(ctx, **args))
+        return entry.handler(ctx, **args)
+    except TypeError as e:
+        return f"⚠️ TOOL_ARG_ERROR ({entry.name}): {e}"
+    except Exception as e:
+        return f"⚠️ TOOL_ERROR ({entry.name}): {e}"
 
 
 CORE_TOOL_NAMES = {
@@ -89,6 +120,7 @@ CORE_TOOL_NAMES = {
     "knowledge_read", "knowledge_write",
     "browse_page", "browser_action", "analyze_screenshot",
     "run_ops_check", "restart_service", "read_service_logs",
+    "read_result",
 }
 
 
@@ -102,6 +134,7 @@ class ToolRegistry:
     def __init__(self, repo_dir: pathlib.Path, drive_root: pathlib.Path):
         self._entries: Dict[str, ToolEntry] = {}
         self._ctx = ToolContext(repo_dir=repo_dir, drive_root=drive_root)
+        self.result_cache = ToolResultCache()
         self._load_modules()
 
     def _load_modules(self) -> None:
@@ -124,6 +157,11 @@ class ToolRegistry:
 
     def set_context(self, ctx: ToolContext) -> None:
         self._ctx = ctx
+        self.result_cache.clear()  # New task: nothing carries over
+
+    @property
+    def context(self) -> ToolContext:
+        return self._ctx
 
     def register(self, entry: ToolEntry) -> None:
         """Register a new tool (for extension by Ouroboros)."""
@@ -160,32 +198,59 @@ class ToolRegistry:
             return {"type": "function", "function": entry.schema}
         return None
 
+    def get_entry(self, name: str) -> Optional[ToolEntry]:
+        return self._entries.get(name)
+
     def get_timeout(self, name: str) -> int:
         """Return timeout_sec for the named tool (default 120)."""
         entry = self._entries.get(name)
         return entry.timeout_sec if entry is not None else 120
 
     def execute(self, name: str, args: Dict[str, Any]) -> str:
+        return self.execute_cached(name, args)[0]
+
+    def execute_cached(self, name: str, args: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """execute() plus the cache outcome: "hit", "miss", or None for tools that are not cached."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return f"⚠️ Unknown tool: {name}. Available: {', '.join(sorted(self._entries.keys()))}", None
+        hit, stamp = self.result_cache.lookup(entry, args, self._ctx)
+        if hit is not None:
+            return hit, "hit"
+        result = call_handler(entry, self._ctx, args)
+        self.result_cache.record(entry, args, stamp, result)
+        return result, ("miss" if stamp is not None else None)
+
+    async def execute_cached_async(self, name: str, args: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """execute_cached() for event-loop callers: async handlers are awaited, blocking ones run in the loop's executor."""
         entry = self._entries.get(name)
         if entry is None:
-            return f"⚠️ Unknown tool: {name}. Available: {', '.join(sorted(self._entries.keys()))}"
+            return f"⚠️ Unknown tool: {name}. Available: {', '.join(sorted(self._entries.keys()))}", None
+        ctx = self._ctx
+        loop = asyncio.get_running_loop()
+        if entry.cacheable:
+            hit, stamp = await loop.run_in_executor(None, self.result_cache.lookup, entry, args, ctx)
+        else:
+            hit, stamp = None, None
+        if hit is not None:
+            return hit, "hit"
         try:
-            return entry.handler(self._ctx, **args)
+            if entry.is_async:
+                result = await entry.handler(ctx, **args)
+            else:
+                result = await loop.run_in_executor(None, lambda: entry.handler(ctx, **args))
         except TypeError as e:
-            return f"⚠️ TOOL_ARG_ERROR ({name}): {e}"
+            result = f"⚠️ TOOL_ARG_ERROR ({name}): {e}"
         except Exception as e:
-            return f"⚠️ TOOL_ERROR ({name}): {e}"
+            result = f"⚠️ TOOL_ERROR ({name}): {e}"
+        self.result_cache.record(entry, args, stamp, result)
+        return result, ("miss" if stamp is not None else None)
 
     def override_handler(self, name: str, handler) -> None:
         """Override the handler for a registered tool (used for closure injection)."""
         entry = self._entries.get(name)
         if entry:
-            self._entries[name] = ToolEntry(
-                name=entry.name,
-                schema=entry.schema,
-                handler=handler,
-                timeout_sec=entry.timeout_sec,
-            )
+            self._entries[name] = replace(entry, handler=handler)
 
     @property
     def CODE_TOOLS(self) -> frozenset:
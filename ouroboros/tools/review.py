@@ -8,8 +8,9 @@ import os
 import json
 import asyncio
 import logging
-import httpx
 
+from ouroboros.circuit_breaker import get_breaker, parse_retry_after
+from ouroboros.http_pool import arun, get_async_http_client
 from ouroboros.utils import utc_now_iso
 from ouroboros.tools.registry import ToolEntry, ToolContext
 
@@ -63,24 +64,18 @@ def get_tools():
                 },
             },
             handler=_handle_multi_model_review,
+            reads=("network",),
         )
     ]
 
 
-def _handle_multi_model_review(ctx: ToolContext, content: str = "", prompt: str = "", models: list = None) -> str:
-    """Sync wrapper around async multi-model review. Registry calls this."""
+async def _handle_multi_model_review(ctx: ToolContext, content: str = "", prompt: str = "", models: list = None) -> str:
+    """Async handler: awaited by run_llm_loop_async, run via run_async() by the sync registry path."""
     if models is None:
         models = []
     try:
-        try:
-            asyncio.get_running_loop()
-            # Already in async context — run in a separate thread
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                result = pool.submit(asyncio.run, _multi_model_review_async(content, prompt, models, ctx)).result()
-        except RuntimeError:
-            # No running loop — safe to use asyncio.run directly
-            result = asyncio.run(_multi_model_review_async(content, prompt, models, ctx))
+        # Runs on the shared transport loop so the pooled AsyncClient keeps its connections
+        result = await arun(_multi_model_review_async(content, prompt, models, ctx))
         return json.dumps(result, ensure_ascii=False)
     except Exception as e:
         log.error("Multi-model review failed: %s", e, exc_info=True)
@@ -89,6 +84,10 @@ def _handle_multi_model_review(ctx: ToolContext, content: str = "", prompt: str
 
 async def _query_model(client, model, messages, api_key, semaphore):
     """Query a single model with semaphore-based concurrency control. Returns (model, response_dict, headers_dict) or (model, error_str, None)."""
+    breaker = get_breaker()
+    allowed, retry_in = breaker.allow(model)
+    if not allowed:
+        return model, f"Error: circuit open for {model}, retry in {retry_in:.0f}s", None
     async with semaphore:
         try:
             resp = await client.post(
@@ -110,6 +109,11 @@ async def _query_model(client, model, messages, api_key, semaphore):
             response_text = resp.text
             response_headers = dict(resp.headers)
 
+            if status_code == 429 or status_code >= 500:
+                breaker.record_failure(model, status_code, parse_retry_after(resp.headers.get("retry-after")))
+            elif status_code == 200:
+                breaker.record_success(model)
+
             if status_code != 200:
                 error_text = response_text[:200]
                 if len(response_text) > 200:
@@ -121,6 +125,7 @@ async def _query_model(client, model, messages, api_key, semaphore):
         except asyncio.TimeoutError:
             return model, "Error: Timeout after 120s", None
         except Exception as e:
+            breaker.record_exception(model, e)
             error_msg = str(e)[:200]
             if len(str(e)) > 200:
                 error_msg += " [truncated]"
@@ -157,9 +162,9 @@ async def _multi_model_review_async(content: str, prompt: str, models: list, ctx
 
     # Query all models with bounded concurrency
     semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-    async with httpx.AsyncClient() as client:
-        tasks = [_query_model(client, m, messages, api_key, semaphore) for m in models]
-        results = await asyncio.gather(*tasks)
+    client = get_async_http_client()
+    tasks = [_query_model(client, m, messages, api_key, semaphore) for m in models]
+    results = await asyncio.gather(*tasks)
 
     # Parse and process results
     review_results = []
@@ -46,5 +46,5 @@ def get_tools() -> List[ToolEntry]:
             "parameters": {"type": "object", "properties": {
                 "query": {"type": "string"},
             }, "required": ["query"]},
-        }, _web_search),
+        }, _web_search, reads=("network",)),
     ]
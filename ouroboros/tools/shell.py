@@ -150,8 +150,9 @@ def _run_shell(ctx: ToolContext, cmd, cwd: str = "", timeout: int = 120) -> str:
             capture_output=True, text=True, timeout=timeout,
         )
         out = res.stdout + ("\n--- STDERR ---\n" + res.stderr if res.stderr else "")
-        if len(out) > 50000:
-            out = out[:25000] + "\n...(truncated)...\n" + out[-25000:]
+        # The loop keeps long output in the blob store; this only bounds memory
+        if len(out) > 2_000_000:
+            out = out[:1_000_000] + "\n...(truncated)...\n" + out[-1_000_000:]
         prefix = f"exit_code={res.returncode}\n"
         return prefix + out
     except subprocess.TimeoutExpired:
@@ -365,7 +366,7 @@ def get_tools() -> List[ToolEntry]:
                 "cmd": {"type": "array", "items": {"type": "string"}},
                 "cwd": {"type": "string", "default": ""},
             }, "required": ["cmd"]},
-        }, _run_shell, is_code_tool=True),
+        }, _run_shell, is_code_tool=True, isolated=True),
         ToolEntry("claude_code_edit", {
             "name": "claude_code_edit",
             "description": "Delegate code edits to Claude Code CLI. Preferred for multi-file changes and refactors. Follow with repo_commit_push.",
@@ -373,5 +374,5 @@ def get_tools() -> List[ToolEntry]:
                 "prompt": {"type": "string"},
                 "cwd": {"type": "string", "default": ""},
             }, "required": ["prompt"]},
-        }, _claude_code_edit, is_code_tool=True, timeout_sec=300),
+        }, _claude_code_edit, is_code_tool=True, timeout_sec=300, isolated=True),
     ]
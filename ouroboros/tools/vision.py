@@ -16,6 +16,7 @@ import logging
 import os
 from typing import Any, Dict, List
 
+from ouroboros.cost_reconciler import queue_sink, reconcile_estimate
 from ouroboros.tools.registry import ToolContext, ToolEntry
 
 log = logging.getLogger(__name__)
@@ -29,9 +30,9 @@ def _get_vlm_model() -> str:
 
 
 def _get_llm_client():
-    """Lazy-import LLMClient to avoid circular imports."""
-    from ouroboros.llm import LLMClient
-    return LLMClient()
+    """Lazy-import the shared LLMClient to avoid circular imports."""
+    from ouroboros.llm import shared_llm_client
+    return shared_llm_client()
 
 
 def _analyze_screenshot(ctx: ToolContext, prompt: str = "Describe what you see in this screenshot. Note any important UI elements, text, errors, or visual issues.", model: str = "") -> str:
@@ -105,6 +106,7 @@ def _emit_usage(ctx: ToolContext, usage: Dict[str, Any], model: str) -> None:
     """Emit LLM usage event for budget tracking."""
     if ctx.event_queue is None:
         return
+    category = ctx.current_task_type or "task"
     try:
         event = {
             "type": "llm_usage",
@@ -113,12 +115,17 @@ def _emit_usage(ctx: ToolContext, usage: Dict[str, Any], model: str) -> None:
             "completion_tokens": usage.get("completion_tokens", 0),
             "cached_tokens": usage.get("cached_tokens", 0),
             "cost": usage.get("cost", 0.0),
+            "usage": usage,  # What the supervisor budgets
+            "category": category,
             "task_id": ctx.task_id,
-            "task_type": ctx.current_task_type or "task",
+            "task_type": category,
         }
         ctx.event_queue.put_nowait(event)
     except Exception:
         log.debug("Failed to emit VLM usage event", exc_info=True)
+        return
+    reconcile_estimate(usage, model, task_id=ctx.task_id or "", category=category,
+                       sink=queue_sink(ctx.event_queue))
 
 
 def get_tools() -> List[ToolEntry]:
@@ -150,6 +157,7 @@ def get_tools() -> List[ToolEntry]:
             },
             handler=_analyze_screenshot,
             timeout_sec=30,
+            reads=("browser", "network"),
         ),
         ToolEntry(
             name="vlm_query",
@@ -189,5 +197,6 @@ def get_tools() -> List[ToolEntry]:
             },
             handler=_vlm_query,
             timeout_sec=30,
+            reads=("network",),
         ),
     ]
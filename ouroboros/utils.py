@@ -7,15 +7,25 @@ Does not import anything from ouroboros.* (zero dependency level).
 
 from __future__ import annotations
 
+import atexit
+import contextlib
 import datetime as _dt
 import hashlib
 import json
 import logging
 import os
 import pathlib
+import re
 import subprocess
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND only
+    fcntl = None  # type: ignore[assignment]
 
 log = logging.getLogger(__name__)
 
@@ -60,79 +70,339 @@ def write_text(path: pathlib.Path, content: str) -> None:
         path.write_text(content, encoding="utf-8")
 
 
-def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
-    """Append a JSON object as a line to a JSONL file (concurrent-safe)."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    line = json.dumps(obj, ensure_ascii=False)
-    data = (line + "\n").encode("utf-8")
+def task_index_path(log_path: pathlib.Path, task_id: str) -> pathlib.Path:
+    """Sidecar with the byte offsets of one task's records in a log (logs/.task_index/<task>/<log>.off)."""
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", str(task_id))[:64].strip(".")
+    if not name:
+        name = hashlib.sha256(str(task_id).encode("utf-8")).hexdigest()[:16]
+    return log_path.parent / ".task_index" / name / f"{log_path.name}.off"
 
-    lock_timeout_sec = 2.0
-    lock_stale_sec = 10.0
-    lock_sleep_sec = 0.01
-    write_retries = 3
-    retry_sleep_base_sec = 0.01
 
-    path_hash = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
-    lock_path = path.parent / f".append_jsonl_{path_hash}.lock"
-    lock_fd = None
-    lock_acquired = False
+def _index_task_offsets(path: pathlib.Path, records: List[Tuple[Dict[str, Any], int]]) -> None:
+    """Record byte offsets of task-tagged records (see task_index_path)."""
+    if path.parent.name != "logs":
+        return
+    by_task: Dict[str, List[int]] = {}
+    for obj, offset in records:
+        if obj.get("task_id"):
+            by_task.setdefault(str(obj["task_id"]), []).append(offset)
+    for task_id, offsets in by_task.items():
+        try:
+            idx = task_index_path(path, task_id)
+            idx.parent.mkdir(parents=True, exist_ok=True)
+            _writer.write_raw(idx, "".join(f"{o}\n" for o in offsets).encode("ascii"))
+        except Exception:
+            log.debug("Failed to index %s offsets for task %s", path.name, task_id, exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# JSONL writer
+# ---------------------------------------------------------------------------
 
+def _env_float(name: str, default: float) -> float:
     try:
-        start = time.time()
-        while time.time() - start < lock_timeout_sec:
-            try:
-                lock_fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
-                lock_acquired = True
-                break
-            except FileExistsError:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        log.warning("Invalid %s, defaulting to %s", name, default)
+        return default
+
+
+class JsonlWriter:
+    """Appends JSONL records through cached O_APPEND descriptors.
+
+    Each batch of lines goes out in a single write() on an O_APPEND
+    descriptor (under flock() when use_flock is set, for mounts where
+    O_APPEND alone is not atomic across processes), so lines from
+    concurrent writers never interleave. Descriptors stay open, up to
+    max_open files; a file renamed or deleted underneath (log rotation)
+    is detected by inode and reopened.
+
+    With flush_interval > 0 records are group-committed: buffered per file
+    and written by a background thread every flush_interval seconds, when
+    a file's buffer reaches max_buffer bytes, on flush()/close() and at
+    exit. flush_interval 0 writes through on every append.
+    """
+
+    def __init__(self, flush_interval: float = 0.0, use_flock: bool = True,
+                 max_open: int = 32, max_buffer: int = 256 * 1024):
+        self.flush_interval = max(0.0, flush_interval)
+        self.use_flock = use_flock
+        self.max_open = max_open
+        self.max_buffer = max_buffer
+        self._lock = threading.RLock()
+        self._fds: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()  # path -> (fd, dev, ino)
+        self._pending: Dict[str, List[Tuple[Dict[str, Any], bytes]]] = {}
+        self._pending_bytes: Dict[str, int] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._holds = 0
+
+    # --- Public API ---
+
+    def append(self, path: pathlib.Path, obj: Dict[str, Any]) -> None:
+        data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+        key = str(path)
+        with self._lock:
+            if (self.flush_interval <= 0 and not self._holds) or self._closed:
+                self._commit(key, [(obj, data)])
+                return
+            self._pending.setdefault(key, []).append((obj, data))
+            self._pending_bytes[key] = self._pending_bytes.get(key, 0) + len(data)
+            if self._pending_bytes[key] >= self.max_buffer:
+                self._flush_path(key)
+            if self.flush_interval > 0:
+                self._ensure_flusher()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Buffer appends made inside the block and write them per file at its end."""
+        with self._lock:
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._holds -= 1
+                if not self._holds:
+                    self.flush()
+
+    def flush(self, path: Optional[pathlib.Path] = None) -> None:
+        """Write buffered records (of one file, or all)."""
+        with self._lock:
+            for key in ([str(path)] if path is not None else list(self._pending)):
+                self._flush_path(key)
+
+    def close(self) -> None:
+        """Flush and release every descriptor; later appends write through."""
+        with self._lock:
+            self.flush()
+            self._closed = True
+            for fd, _dev, _ino in self._fds.values():
                 try:
-                    stat = lock_path.stat()
-                    if time.time() - stat.st_mtime > lock_stale_sec:
-                        lock_path.unlink()
-                        continue
-                except Exception:
-                    log.debug("Failed to read lock stat during lock acquisition retry", exc_info=True)
+                    os.close(fd)
+                except OSError:
                     pass
-                time.sleep(lock_sleep_sec)
-            except Exception:
-                log.debug("Failed to acquire file lock for jsonl append", exc_info=True)
-                break
+            self._fds.clear()
+        self._wake.set()
+
+    def write_raw(self, path: pathlib.Path, data: bytes) -> int:
+        """Append bytes in one write; returns the end offset of the write."""
+        with self._lock:
+            return self._write(str(path), data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_files": len(self._fds),
+                "pending_records": sum(len(v) for v in self._pending.values()),
+                "flush_interval_sec": self.flush_interval,
+            }
 
-        for attempt in range(write_retries):
+    # --- Internals (caller holds self._lock) ---
+
+    def _flush_path(self, key: str) -> None:
+        batch = self._pending.pop(key, None)
+        self._pending_bytes.pop(key, None)
+        if batch:
+            self._commit(key, batch)
+
+    def _commit(self, key: str, batch: List[Tuple[Dict[str, Any], bytes]]) -> None:
+        data = b"".join(d for _obj, d in batch)
+        path = pathlib.Path(key)
+        try:
+            end = self._write(key, data)
+        except Exception:
+            log.warning("append_jsonl: all write attempts failed for %s", path, exc_info=True)
+            return
+        offset = end - len(data)
+        records = []
+        for obj, line in batch:
+            records.append((obj, offset))
+            offset += len(line)
+        _index_task_offsets(path, records)
+        _notify_observer(key, [obj for obj, _line in batch])
+
+    def _write(self, key: str, data: bytes) -> int:
+        last_exc: Optional[BaseException] = None
+        for attempt in range(3):
             try:
-                fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                fd = self._fd_for(key)
+                if self.use_flock and fcntl is not None:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    except OSError:
+                        self.use_flock = False  # Filesystem without flock: O_APPEND only
                 try:
-                    os.write(fd, data)
+                    view = memoryview(data)
+                    while view:
+                        n = os.write(fd, view)
+                        view = view[n:]
+                    return os.lseek(fd, 0, os.SEEK_CUR)  # O_APPEND: end of this write
                 finally:
-                    os.close(fd)
-                return
-            except Exception:
-                if attempt < write_retries - 1:
-                    time.sleep(retry_sleep_base_sec * (2 ** attempt))
-
-        for attempt in range(write_retries):
-            try:
-                with path.open("a", encoding="utf-8") as f:
-                    f.write(line + "\n")
-                return
-            except Exception:
-                if attempt < write_retries - 1:
-                    time.sleep(retry_sleep_base_sec * (2 ** attempt))
-    except Exception:
-        log.warning("append_jsonl: all write attempts failed for %s", path, exc_info=True)
-    finally:
-        if lock_fd is not None:
+                    if self.use_flock and fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+            except OSError as e:
+                last_exc = e
+                self._drop_fd(key)  # Stale handle (e.g. remounted drive): reopen
+                time.sleep(0.01 * (2 ** attempt))
+        raise last_exc if last_exc else OSError(f"write failed: {key}")
+
+    def _fd_for(self, key: str) -> int:
+        cached = self._fds.get(key)
+        try:
+            st = os.stat(key)
+        except FileNotFoundError:
+            st = None
+        if cached is not None:
+            if st is not None and (st.st_dev, st.st_ino) == cached[1:]:
+                self._fds.move_to_end(key)
+                return cached[0]
+            self._drop_fd(key)  # Rotated or deleted: the name points elsewhere now
+        if st is None:
+            pathlib.Path(key).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(key, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        fst = os.fstat(fd)
+        self._fds[key] = (fd, fst.st_dev, fst.st_ino)
+        while len(self._fds) > self.max_open:
+            old_key = next(iter(self._fds))
+            self._drop_fd(old_key)
+        return fd
+
+    def _drop_fd(self, key: str) -> None:
+        cached = self._fds.pop(key, None)
+        if cached is not None:
             try:
-                os.close(lock_fd)
-            except Exception:
-                log.debug("Failed to close lock fd after jsonl append", exc_info=True)
+                os.close(cached[0])
+            except OSError:
                 pass
-        if lock_acquired:
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="jsonl_writer", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
             try:
-                lock_path.unlink()
+                self.flush()
             except Exception:
-                log.debug("Failed to unlink lock file after jsonl append", exc_info=True)
+                log.warning("JSONL group commit failed", exc_info=True)
+
+    def _after_fork_in_child(self) -> None:
+        # Buffered records belong to the parent, which will write them; descriptors are re-opened lazily
+        self._lock = threading.RLock()
+        self._pending.clear()
+        self._pending_bytes.clear()
+        for fd, _dev, _ino in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
                 pass
+        self._fds.clear()
+        self._flusher = None
+        self._wake = threading.Event()
+
+
+_writer = JsonlWriter(
+    flush_interval=_env_float("OUROBOROS_JSONL_FLUSH_MS", 0.0) / 1000.0,
+    use_flock=os.environ.get("OUROBOROS_JSONL_FLOCK", "1") != "0",
+)
+atexit.register(_writer.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_writer._after_fork_in_child)
+
+
+_sink: Optional[Callable[[str, Dict[str, Any]], bool]] = None
+_sink_dirs: Tuple[str, ...] = ()
+
+
+def set_jsonl_sink(logs_dir: Optional[pathlib.Path],
+                   sink: Optional[Callable[[str, Dict[str, Any]], bool]]) -> None:
+    """Route appends to files directly in logs_dir through sink(file name, record).
+
+    A sink returning False (or raising) falls back to a local write. Worker
+    processes use this to hand their logs to the supervisor's single writer.
+    """
+    global _sink, _sink_dirs
+    if logs_dir is None or sink is None:
+        _sink, _sink_dirs = None, ()
+        return
+    _sink_dirs = tuple({os.path.abspath(str(logs_dir)), os.path.realpath(str(logs_dir))})
+    _sink = sink
+
+
+def _clear_sink_in_child() -> None:
+    # A forked child has no feeder thread for the parent's log queue, and exits
+    # with os._exit, so records put there would be lost: it writes locally
+    # unless it installs a sink of its own (as worker processes do)
+    set_jsonl_sink(None, None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_sink_in_child)
+
+
+_observer: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None
+_observer_dirs: Tuple[str, ...] = ()
+
+
+def set_jsonl_observer(logs_dir: Optional[pathlib.Path],
+                       observer: Optional[Callable[[str, List[Dict[str, Any]]], None]]) -> None:
+    """Call observer(file name, records) after records are written to files directly in logs_dir.
+
+    It runs under the writer's lock, so it must not block: the supervisor
+    uses it to wake the thread that mirrors its logs into the telemetry database.
+    """
+    global _observer, _observer_dirs
+    if logs_dir is None or observer is None:
+        _observer, _observer_dirs = None, ()
+        return
+    _observer_dirs = tuple({os.path.abspath(str(logs_dir)), os.path.realpath(str(logs_dir))})
+    _observer = observer
+
+
+def _notify_observer(key: str, records: List[Dict[str, Any]]) -> None:
+    observer = _observer
+    if observer is None or os.path.dirname(os.path.abspath(key)) not in _observer_dirs:
+        return
+    try:
+        observer(os.path.basename(key), records)
+    except Exception:
+        log.debug("JSONL observer failed for %s", key, exc_info=True)
+
+
+def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
+    """Append a JSON object as a line to a JSONL file (concurrent-safe, see JsonlWriter)."""
+    sink = _sink
+    if sink is not None and os.path.dirname(os.path.abspath(str(path))) in _sink_dirs:
+        try:
+            if sink(os.path.basename(str(path)), obj):
+                return
+        except Exception:
+            log.debug("JSONL sink failed, writing %s locally", path, exc_info=True)
+    _writer.append(path, obj)
+
+
+def append_jsonl_local(path: pathlib.Path, obj: Dict[str, Any]) -> None:
+    """append_jsonl that always writes in this process (bypasses the sink)."""
+    _writer.append(path, obj)
+
+
+def batched_jsonl():
+    """Context manager: appends inside the block are written per file, in one write each, at its end."""
+    return _writer.batch()
+
+
+def flush_jsonl(path: Optional[pathlib.Path] = None) -> None:
+    """Write group-committed records now (of one file, or all)."""
+    _writer.flush(path)
+
+
+def close_jsonl() -> None:
+    """Flush and close cached log descriptors (also runs at exit)."""
+    _writer.close()
 
 
 # ---------------------------------------------------------------------------
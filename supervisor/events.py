@@ -23,12 +23,15 @@ log = logging.getLogger(__name__)
 
 def _handle_llm_usage(evt: Dict[str, Any], ctx: Any) -> None:
     usage = evt.get("usage") or {}
-    ctx.update_budget_from_usage(usage)
+    ctx.update_budget_from_usage(
+        usage, category=evt.get("category", "other"), model=evt.get("model", ""),
+        cost_correction=bool(evt.get("cost_correction")),
+    )
 
     # Log to events.jsonl for audit trail
     from ouroboros.utils import utc_now_iso, append_jsonl
     try:
-        append_jsonl(ctx.DRIVE_ROOT / "logs" / "events.jsonl", {
+        record = {
             "ts": evt.get("ts", utc_now_iso()),
             "type": "llm_usage",
             "task_id": evt.get("task_id", ""),
@@ -37,7 +40,13 @@ def _handle_llm_usage(evt: Dict[str, Any], ctx: Any) -> None:
             "cost": usage.get("cost", 0),
             "prompt_tokens": usage.get("prompt_tokens", 0),
             "completion_tokens": usage.get("completion_tokens", 0),
-        })
+            "cached_tokens": usage.get("cached_tokens", 0),
+        }
+        if evt.get("cost_correction"):
+            # Billed-minus-estimated delta from ouroboros.cost_reconciler
+            record["cost_correction"] = True
+            record["generation_id"] = evt.get("generation_id", "")
+        append_jsonl(ctx.DRIVE_ROOT / "logs" / "events.jsonl", record)
     except Exception:
         log.warning("Failed to log llm_usage event to events.jsonl", exc_info=True)
         pass
@@ -238,7 +247,7 @@ def _handle_promote_to_stable(evt: Dict[str, Any], ctx: Any) -> None:
             )
 
 
-def _find_duplicate_task(desc: str, pending: list, running: dict) -> Optional[str]:
+def _find_duplicate_task(desc: str, pending: list, running: dict, ctx: Any = None) -> Optional[str]:
     """Check if a semantically similar task already exists using a light LLM call.
 
     Bible P3 (LLM-first): dedup decisions are cognitive judgments, not hardcoded
@@ -246,6 +255,7 @@ def _find_duplicate_task(desc: str, pending: list, running: dict) -> Optional[st
 
     Returns task_id of the duplicate if found, None otherwise.
     On any error (API, timeout, import) — returns None (accept the task).
+    With ctx, the call's usage is budgeted under "other".
     """
     existing = []
     for task in pending:
@@ -272,15 +282,19 @@ def _find_duplicate_task(desc: str, pending: list, running: dict) -> Optional[st
     )
 
     try:
-        from ouroboros.llm import LLMClient, DEFAULT_LIGHT_MODEL
+        from ouroboros.llm import shared_llm_client, DEFAULT_LIGHT_MODEL
         light_model = os.environ.get("OUROBOROS_MODEL_LIGHT") or DEFAULT_LIGHT_MODEL
-        client = LLMClient()
+        client = shared_llm_client()
         resp_msg, usage = client.chat(
             messages=[{"role": "user", "content": prompt}],
             model=light_model,
             reasoning_effort="low",
             max_tokens=50,
         )
+        if ctx is not None:
+            from ouroboros.cost_reconciler import reconcile_estimate
+            _handle_llm_usage({"type": "llm_usage", "model": light_model, "usage": usage, "category": "other"}, ctx)
+            reconcile_estimate(usage, light_model, category="other")  # Default sink: the supervisor's event queue
         answer = (resp_msg.get("content") or "NONE").strip()
         if answer.upper() == "NONE" or not answer:
             return None
@@ -311,7 +325,7 @@ def _handle_schedule_task(evt: Dict[str, Any], ctx: Any) -> None:
     if owner_chat_id and desc:
         # --- Task deduplication (Bible P3: LLM-first, not hardcoded heuristics) ---
         from supervisor.queue import PENDING, RUNNING
-        dup_id = _find_duplicate_task(desc, PENDING, RUNNING)
+        dup_id = _find_duplicate_task(desc, PENDING, RUNNING, ctx)
         if dup_id:
             log.info("Rejected duplicate task: new='%s' duplicates='%s'", desc[:100], dup_id)
             ctx.send_with_budget(int(owner_chat_id), f"⚠️ Task rejected: semantically similar to already active task {dup_id}")
@@ -478,6 +492,13 @@ def dispatch_event(evt: Dict[str, Any], ctx: Any) -> None:
         )
         return
 
+    observe_health = getattr(ctx, "observe_health_event", None)
+    if observe_health is not None:
+        try:
+            observe_health(evt)
+        except Exception:
+            log.debug("Failed to feed health tracker", exc_info=True)
+
     try:
         handler(evt, ctx)
     except Exception as e:
@@ -0,0 +1,305 @@
+"""
+Supervisor — Health invariants snapshot.
+
+The context builder shows the agent a "Health Invariants" section (version
+sync, budget drift, high-cost tasks, stale identity, duplicate processing
+of owner messages). Computing it meant scanning the tails of events.jsonl
+and supervisor.jsonl on every task start. Instead the supervisor keeps
+per-task costs and injected-message hashes up to date from the events it
+dispatches, seeds them once at startup (per-task costs from the telemetry
+database when it exists, otherwise from the logs), and publishes the
+checks to state/health.json (see ouroboros/context.py for the reader).
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ouroboros import telemetry
+from ouroboros.log_segments import parse_ts
+from supervisor.state import atomic_write_text, json_load_file
+
+log = logging.getLogger(__name__)
+
+HIGH_COST_USD = 5.0
+STALE_IDENTITY_HOURS = 8
+REFRESH_SEC = 30.0  # Time-based checks (identity age, budget drift, version files)
+HEARTBEAT_SEC = 300.0  # Rewrite unchanged checks so readers can tell the snapshot is live
+_MAX_TASKS = 500
+_SEED_TAIL_BYTES = 512_000
+WINDOW_SEC = 86400.0  # Costs and injections older than this no longer count (the old tail scans saw about a day)
+
+
+def health_path(drive_root: pathlib.Path) -> pathlib.Path:
+    return drive_root / "state" / "health.json"
+
+
+def _message_hash(text: str) -> str:
+    return hashlib.md5(text.encode()).hexdigest()[:12]
+
+
+def _read_version_pair(repo_dir: pathlib.Path) -> Optional[List[str]]:
+    try:
+        ver_file = (repo_dir / "VERSION").read_text(encoding="utf-8").strip()
+        pyproject_ver = ""
+        for line in (repo_dir / "pyproject.toml").read_text(encoding="utf-8").splitlines():
+            if line.strip().startswith("version"):
+                pyproject_ver = line.split("=", 1)[1].strip().strip('"').strip("'")
+                break
+        return [ver_file, pyproject_ver]
+    except (OSError, IndexError):
+        return None
+
+
+def _event_time(evt: Dict[str, Any]) -> float:
+    """Epoch seconds of an event's ts; now for a live event without one."""
+    ts = parse_ts(evt.get("ts"))
+    return ts if ts is not None else time.time()
+
+
+def _iter_tail(path: pathlib.Path, tail_bytes: int):
+    """Parsed records in the last tail_bytes of a JSONL file."""
+    if not path.exists():
+        return
+    size = path.stat().st_size
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        if size > tail_bytes:
+            f.seek(size - tail_bytes)
+            f.readline()  # Skip partial first line
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                evt = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(evt, dict):
+                yield evt
+
+
+class HealthTracker:
+    """Incrementally maintained inputs for the health checks."""
+
+    def __init__(self, drive_root: pathlib.Path, repo_dir: pathlib.Path):
+        self.drive_root = pathlib.Path(drive_root)
+        self.repo_dir = pathlib.Path(repo_dir)
+        self._lock = threading.Lock()
+        self._task_costs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # Oldest activity first
+        self._injected: Dict[str, Dict[str, float]] = {}  # message hash -> {task_id: last seen}
+        self._dirty = True
+        self._computed_at = 0.0
+        self._published_at = 0.0
+        self._last_checks: List[str] = []
+
+    # --- Inputs ---
+
+    def seed_from_logs(self, tail_bytes: int = _SEED_TAIL_BYTES) -> None:
+        """One-time catch-up from the log tails (events before this process started).
+
+        Task costs come from the telemetry database when it holds the full
+        history (the last day of usage); otherwise from the events.jsonl tail.
+        """
+        logs = self.drive_root / "logs"
+        costs_seeded = self._seed_costs_from_telemetry()
+        try:
+            for evt in _iter_tail(logs / "events.jsonl", tail_bytes):
+                if not (costs_seeded and evt.get("type") == "llm_usage"):
+                    self.observe(evt)
+            for evt in _iter_tail(logs / "supervisor.jsonl", tail_bytes // 2):
+                # Historical entries in supervisor.jsonl lack "text"; event_repr at least marks presence
+                if evt.get("event_type") == "owner_message_injected":
+                    self._observe_injected(evt.get("task_id"), str(evt.get("event_repr", ""))[:200],
+                                           _event_time(evt))
+        except Exception:
+            log.warning("Failed to seed health tracker from logs", exc_info=True)
+
+    def _seed_costs_from_telemetry(self) -> bool:
+        store = telemetry.get(self.drive_root)
+        try:
+            if store is None or not store.is_complete():
+                return False
+            tasks = store.task_costs(limit=_MAX_TASKS, since=time.time() - WINDOW_SEC)
+        except sqlite3.Error:
+            log.debug("Telemetry task costs unavailable, seeding from logs", exc_info=True)
+            return False
+        with self._lock:
+            for t in sorted(tasks, key=lambda t: t["last_ts"]):
+                self._task_costs[str(t["task_id"])] = dict(t)
+            self._dirty = True
+        return True
+
+    def observe(self, evt: Dict[str, Any]) -> None:
+        """Feed one event (dispatched or read back from events.jsonl)."""
+        evt_type = evt.get("type")
+        if evt_type == "llm_usage":
+            usage = evt.get("usage") if isinstance(evt.get("usage"), dict) else evt
+            tid = str(evt.get("task_id") or "unknown")
+            try:
+                cost = float(usage.get("cost", 0) or 0)
+            except (TypeError, ValueError):
+                return
+            with self._lock:
+                entry = self._task_costs.pop(tid, None) or {
+                    "task_id": tid, "cost": 0.0, "rounds": 0, "model": evt.get("model", ""),
+                }
+                entry["cost"] += cost
+                entry["rounds"] += 1
+                entry["last_ts"] = max(float(entry.get("last_ts") or 0.0), _event_time(evt))
+                self._task_costs[tid] = entry  # Most recently active last
+                while len(self._task_costs) > _MAX_TASKS:
+                    self._task_costs.popitem(last=False)
+                if entry["cost"] > HIGH_COST_USD:
+                    self._dirty = True
+        elif evt_type == "owner_message_injected":
+            self._observe_injected(evt.get("task_id"), str(evt.get("text", ""))[:200], _event_time(evt))
+
+    def _observe_injected(self, task_id: Any, text: str, ts: float) -> None:
+        if not text:
+            return
+        with self._lock:
+            tasks = self._injected.setdefault(_message_hash(text), {})
+            key = task_id or "unknown"
+            if key not in tasks:
+                self._dirty = self._dirty or len(tasks) > 0
+            tasks[key] = max(tasks.get(key, 0.0), ts)
+
+    def _expire_locked(self, now: float) -> None:
+        """Drop task costs and injections that fell out of WINDOW_SEC."""
+        cutoff = now - WINDOW_SEC
+        for tid in [tid for tid, t in self._task_costs.items() if float(t.get("last_ts") or 0.0) < cutoff]:
+            del self._task_costs[tid]
+        for digest in list(self._injected):
+            tasks = {tid: ts for tid, ts in self._injected[digest].items() if ts >= cutoff}
+            if tasks:
+                self._injected[digest] = tasks
+            else:
+                del self._injected[digest]
+
+    # --- Checks ---
+
+    def compute_checks(self) -> List[str]:
+        checks: List[str] = []
+
+        # 1. Version sync: VERSION file vs pyproject.toml
+        versions = _read_version_pair(self.repo_dir)
+        if versions:
+            ver_file, pyproject_ver = versions
+            if ver_file and pyproject_ver and ver_file != pyproject_ver:
+                checks.append(f"CRITICAL: VERSION DESYNC — VERSION={ver_file}, pyproject.toml={pyproject_ver}")
+            elif ver_file:
+                checks.append(f"OK: version sync ({ver_file})")
+
+        # 2. Budget drift
+        state_data = json_load_file(self.drive_root / "state" / "state.json")
+        if state_data is not None:
+            if state_data.get("budget_drift_alert"):
+                drift_pct = state_data.get("budget_drift_pct", 0) or 0
+                our = state_data.get("spent_usd", 0) or 0
+                theirs = state_data.get("openrouter_total_usd", 0) or 0
+                checks.append(f"WARNING: BUDGET DRIFT {drift_pct:.1f}% — tracked=${our:.2f} vs OpenRouter=${theirs:.2f}")
+            else:
+                checks.append("OK: budget drift within tolerance")
+
+        with self._lock:
+            self._expire_locked(time.time())
+            top = sorted(self._task_costs.values(), key=lambda t: t["cost"], reverse=True)[:5]
+            dupes = [sorted(map(str, tids)) for tids in self._injected.values() if len(tids) > 1]
+
+        # 3. Per-task cost anomalies
+        costly = [t for t in top if t["cost"] > HIGH_COST_USD]
+        for t in costly:
+            checks.append(
+                f"WARNING: HIGH-COST TASK — task_id={t['task_id']} "
+                f"cost=${t['cost']:.2f} rounds={t['rounds']}"
+            )
+        if not costly:
+            checks.append(f"OK: no high-cost tasks (>${HIGH_COST_USD:.0f})")
+
+        # 4. Stale identity.md
+        try:
+            age_hours = (time.time() - (self.drive_root / "memory" / "identity.md").stat().st_mtime) / 3600
+            if age_hours > STALE_IDENTITY_HOURS:
+                checks.append(f"WARNING: STALE IDENTITY — identity.md last updated {age_hours:.0f}h ago")
+            else:
+                checks.append("OK: identity.md recent")
+        except OSError:
+            pass
+
+        # 5. Duplicate processing: same owner message text injected into multiple tasks
+        if dupes:
+            checks.append(
+                f"CRITICAL: DUPLICATE PROCESSING — {len(dupes)} message(s) "
+                f"appeared in multiple tasks: {', '.join(str(tids) for tids in dupes)}"
+            )
+        else:
+            checks.append("OK: no duplicate message processing detected")
+        return checks
+
+    def publish_if_due(self, force: bool = False) -> bool:
+        """Recompute when inputs changed or REFRESH_SEC passed; write health.json if checks changed."""
+        now = time.time()
+        with self._lock:
+            due = force or self._dirty or now - self._computed_at >= REFRESH_SEC
+            self._dirty = False
+        if not due:
+            return False
+        checks = self.compute_checks()
+        self._computed_at = now
+        if checks == self._last_checks and now - self._published_at < HEARTBEAT_SEC and not force:
+            return False
+        snapshot = {
+            "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "updated_at": now,
+            "pid": os.getpid(),
+            "checks": checks,
+        }
+        try:
+            atomic_write_text(health_path(self.drive_root), json.dumps(snapshot, ensure_ascii=False))
+        except OSError:
+            log.warning("Failed to publish health snapshot", exc_info=True)
+            return False
+        self._last_checks = checks
+        self._published_at = now
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Module-level tracker (set via init())
+# ---------------------------------------------------------------------------
+_tracker: Optional[HealthTracker] = None
+
+
+def init(drive_root: pathlib.Path, repo_dir: pathlib.Path) -> HealthTracker:
+    global _tracker
+    _tracker = HealthTracker(drive_root, repo_dir)
+    _tracker.seed_from_logs()
+    _tracker.publish_if_due(force=True)
+    return _tracker
+
+
+def observe_event(evt: Dict[str, Any]) -> None:
+    if _tracker is not None:
+        _tracker.observe(evt)
+
+
+def publish_if_due() -> None:
+    if _tracker is not None:
+        _tracker.publish_if_due()
+
+
+def snapshot_from_logs(drive_root: pathlib.Path, repo_dir: pathlib.Path) -> List[str]:
+    """Checks computed directly from the logs, for when no supervisor publishes them."""
+    tracker = HealthTracker(drive_root, repo_dir)
+    tracker.seed_from_logs()
+    return tracker.compute_checks()
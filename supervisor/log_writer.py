@@ -0,0 +1,160 @@
+"""
+Supervisor — Central log writer.
+
+Workers do not append to Drive/logs themselves: install_worker_sink()
+routes their append_jsonl() calls for files in logs/ onto a dedicated
+multiprocessing queue, and LogWriterService in the supervisor drains it
+on its own thread, orders each batch by timestamp and writes it with one
+write() per file (ouroboros.utils.batched_jsonl). The supervisor process
+(direct chat, consciousness, the main loop) already writes through the
+same in-process writer, so logs/ has a single writer process and no
+cross-process lock traffic on the mount.
+
+If the supervisor is gone, a worker writes locally, as before.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pathlib
+import queue as _queue_mod
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ouroboros.utils import append_jsonl_local, batched_jsonl, set_jsonl_sink
+
+log = logging.getLogger(__name__)
+
+_MAX_BATCH = 2000
+_ALIVE_CHECK_SEC = 1.0
+
+
+def _valid_log_name(name: Any) -> bool:
+    return isinstance(name, str) and name.endswith(".jsonl") and name == os.path.basename(name)
+
+
+def _ordered(batch: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Batch sorted by record timestamp (stable); arrival order if some record has no ts."""
+    if all(isinstance(obj.get("ts"), str) for _name, obj in batch):
+        return sorted(batch, key=lambda item: item[1]["ts"])
+    return batch
+
+
+class LogWriterService:
+    """Drains worker log records and writes them in ordered batches."""
+
+    def __init__(self, drive_root: pathlib.Path, get_queue: Callable[[], Any]):
+        self.logs_dir = pathlib.Path(drive_root) / "logs"
+        self._get_queue = get_queue
+        self._queue: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats = {"records": 0, "batches": 0, "max_batch": 0, "rejected": 0}
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="log_writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            current = self._get_queue()
+            if current is not self._queue:
+                if self._queue is not None:  # Workers respawned: finish the old queue first
+                    self.drain_once(self._queue, block=False)
+                self._queue = current
+            try:
+                self.drain_once(current, block=True)
+            except Exception:
+                log.warning("Log writer batch failed", exc_info=True)
+                time.sleep(0.5)
+        if self._queue is not None:
+            self.drain_once(self._queue, block=False)
+
+    def drain_once(self, q: Any, block: bool = True) -> int:
+        """Write everything currently queued (waiting up to 0.5s for the first record)."""
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        try:
+            batch.append(q.get(timeout=0.5) if block else q.get_nowait())
+            while len(batch) < _MAX_BATCH:
+                batch.append(q.get_nowait())
+        except _queue_mod.Empty:
+            pass
+        except (EOFError, OSError):
+            log.debug("Log queue closed", exc_info=True)
+        if batch:
+            self.write_batch(batch)
+        return len(batch)
+
+    def write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        with batched_jsonl():
+            for item in _ordered([i for i in batch if self._accept(i)]):
+                append_jsonl_local(self.logs_dir / item[0], item[1])
+        self._stats["records"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+    def _accept(self, item: Any) -> bool:
+        ok = (isinstance(item, tuple) and len(item) == 2
+              and _valid_log_name(item[0]) and isinstance(item[1], dict))
+        if not ok:
+            self._stats["rejected"] += 1
+        return ok
+
+
+def _queue_sink(log_q: Any, supervisor_pid: int) -> Callable[[str, Dict[str, Any]], bool]:
+    state = {"checked_at": 0.0, "alive": True}
+
+    def sink(name: str, obj: Dict[str, Any]) -> bool:
+        now = time.monotonic()
+        if now - state["checked_at"] > _ALIVE_CHECK_SEC:
+            state["checked_at"] = now
+            try:
+                os.kill(supervisor_pid, 0)
+                state["alive"] = True
+            except ProcessLookupError:
+                state["alive"] = False
+            except PermissionError:
+                state["alive"] = True
+        if not state["alive"]:
+            return False  # Supervisor down: write locally
+        log_q.put_nowait((name, obj))
+        return True
+
+    return sink
+
+
+def install_worker_sink(log_q: Any, drive_root: pathlib.Path, supervisor_pid: Optional[int] = None) -> None:
+    """In a worker process: send appends to Drive/logs/*.jsonl to the supervisor's writer."""
+    if log_q is None:
+        return
+    set_jsonl_sink(pathlib.Path(drive_root) / "logs", _queue_sink(log_q, supervisor_pid or os.getppid()))
+
+
+# ---------------------------------------------------------------------------
+# Module-level service (set via start())
+# ---------------------------------------------------------------------------
+_service: Optional[LogWriterService] = None
+
+
+def start(drive_root: pathlib.Path, get_queue: Callable[[], Any]) -> LogWriterService:
+    global _service
+    if _service is None:
+        _service = LogWriterService(drive_root, get_queue)
+    _service.start()
+    return _service
+
+
+def stats() -> Dict[str, Any]:
+    return _service.stats() if _service is not None else {}
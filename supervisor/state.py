@@ -1,16 +1,21 @@
 """
 Supervisor — State management.
 
-Persistent state: load, save, atomic writes, file locks.
+Persistent state: load, save (in memory, WAL + snapshots), atomic writes,
+file locks.
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
 import datetime
 import json
 import logging
 import os
 import pathlib
+import sqlite3
+import threading
 import time
 import uuid
 from typing import Any, Dict, Optional
@@ -24,17 +29,21 @@ log = logging.getLogger(__name__)
 DRIVE_ROOT: pathlib.Path = pathlib.Path(os.path.expanduser("~/ouroboros-data"))
 STATE_PATH: pathlib.Path = DRIVE_ROOT / "state" / "state.json"
 STATE_LAST_GOOD_PATH: pathlib.Path = DRIVE_ROOT / "state" / "state.last_good.json"
-STATE_LOCK_PATH: pathlib.Path = DRIVE_ROOT / "locks" / "state.lock"
+STATE_WAL_PATH: pathlib.Path = DRIVE_ROOT / "state" / "state.wal.jsonl"
 QUEUE_SNAPSHOT_PATH: pathlib.Path = DRIVE_ROOT / "state" / "queue_snapshot.json"
 
 
 def init(drive_root: pathlib.Path, total_budget_limit: float = 0.0) -> None:
-    global DRIVE_ROOT, STATE_PATH, STATE_LAST_GOOD_PATH, STATE_LOCK_PATH, QUEUE_SNAPSHOT_PATH
-    DRIVE_ROOT = drive_root
-    STATE_PATH = drive_root / "state" / "state.json"
-    STATE_LAST_GOOD_PATH = drive_root / "state" / "state.last_good.json"
-    STATE_LOCK_PATH = drive_root / "locks" / "state.lock"
-    QUEUE_SNAPSHOT_PATH = drive_root / "state" / "queue_snapshot.json"
+    global DRIVE_ROOT, STATE_PATH, STATE_LAST_GOOD_PATH, STATE_WAL_PATH, QUEUE_SNAPSHOT_PATH, _mem
+    with _state_lock:
+        if _mem is not None:
+            flush_state()
+        _mem = None  # Recovered from the new root on first access
+        DRIVE_ROOT = drive_root
+        STATE_PATH = drive_root / "state" / "state.json"
+        STATE_LAST_GOOD_PATH = drive_root / "state" / "state.last_good.json"
+        STATE_WAL_PATH = drive_root / "state" / "state.wal.jsonl"
+        QUEUE_SNAPSHOT_PATH = drive_root / "state" / "queue_snapshot.json"
     set_budget_limit(total_budget_limit)
 
 
@@ -115,8 +124,11 @@ def release_file_lock(lock_path: pathlib.Path, lock_fd: Optional[int]) -> None:
         pass
 
 
+from ouroboros import telemetry
+from ouroboros.jsonl_tail import iter_jsonl_range
+from ouroboros.log_segments import maintain_logs
 # Re-export append_jsonl from ouroboros.utils (single source of truth)
-from ouroboros.utils import append_jsonl  # noqa: F401
+from ouroboros.utils import append_jsonl, append_jsonl_local, flush_jsonl  # noqa: F401
 
 
 # ---------------------------------------------------------------------------
@@ -161,48 +173,135 @@ def default_state_dict() -> Dict[str, Any]:
 # ---------------------------------------------------------------------------
 # Load / Save
 # ---------------------------------------------------------------------------
+# The supervisor process owns state in memory. save_state() appends only
+# the keys that changed to state/state.wal.jsonl (absolute values, so
+# replaying a record twice is harmless); a compacted snapshot goes to
+# state.json and state.last_good.json at most every STATE_SNAPSHOT_SEC
+# (flush_state_if_due() from the main loop, and at exit), after which the
+# WAL is truncated. Startup recovers snapshot + WAL. Workers and the agent
+# read state.json, which lags the supervisor by at most STATE_SNAPSHOT_SEC.
+
+def _env_snapshot_sec() -> float:
+    try:
+        return max(0.0, float(os.environ.get("OUROBOROS_STATE_SNAPSHOT_SEC", "10")))
+    except ValueError:
+        log.warning("Invalid OUROBOROS_STATE_SNAPSHOT_SEC, defaulting to 10")
+        return 10.0
 
-def _load_state_unlocked() -> Dict[str, Any]:
-    """Load state without acquiring lock. Caller must hold STATE_LOCK."""
-    recovered = False
-    st_obj = json_load_file(STATE_PATH)
-    if st_obj is None:
-        st_obj = json_load_file(STATE_LAST_GOOD_PATH)
-        recovered = st_obj is not None
 
-    if st_obj is None:
-        st = ensure_state_defaults(default_state_dict())
-        _save_state_unlocked(st)
-        return st
+STATE_SNAPSHOT_SEC = _env_snapshot_sec()
+
+_state_lock = threading.RLock()
+_mem: Optional[Dict[str, Any]] = None
+_snapshot_dirty = False
+_last_snapshot_at = 0.0
+
+
+def _replay_wal(st: Dict[str, Any]) -> int:
+    """Apply WAL records on top of a snapshot; returns how many were applied."""
+    applied = 0
+    try:
+        with STATE_WAL_PATH.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # Torn last write
+                if not isinstance(rec, dict):
+                    continue
+                st.update(rec.get("set") or {})
+                for key in rec.get("del") or []:
+                    st.pop(key, None)
+                applied += 1
+    except FileNotFoundError:
+        pass
+    return applied
+
 
+def _recover_state() -> Dict[str, Any]:
+    """Snapshot (state.json, else state.last_good.json) plus the WAL written since."""
+    st_obj = json_load_file(STATE_PATH)
+    recovered = st_obj is None
+    if st_obj is None:
+        st_obj = json_load_file(STATE_LAST_GOOD_PATH) or {}
+    replayed = _replay_wal(st_obj)
     st = ensure_state_defaults(st_obj)
-    if recovered:
-        _save_state_unlocked(st)
+    if recovered or replayed:
+        _write_snapshot(st)
     return st
 
 
-def _save_state_unlocked(st: Dict[str, Any]) -> None:
-    """Save state without acquiring lock. Caller must hold STATE_LOCK."""
-    st = ensure_state_defaults(st)
+def _write_snapshot(st: Dict[str, Any]) -> None:
+    """Compacted state to state.json and state.last_good.json, then an empty WAL. Caller holds the lock."""
+    global _snapshot_dirty, _last_snapshot_at
     payload = json.dumps(st, ensure_ascii=False, indent=2)
     atomic_write_text(STATE_PATH, payload)
     atomic_write_text(STATE_LAST_GOOD_PATH, payload)
+    flush_jsonl(STATE_WAL_PATH)
+    try:
+        os.truncate(STATE_WAL_PATH, 0)  # In place: the writer's O_APPEND descriptor stays valid
+    except FileNotFoundError:
+        pass
+    _snapshot_dirty = False
+    _last_snapshot_at = time.monotonic()
+
+
+def _load_state_unlocked() -> Dict[str, Any]:
+    """A copy of the in-memory state. Caller must hold the state lock."""
+    global _mem
+    if _mem is None:
+        _mem = _recover_state()
+    return copy.deepcopy(_mem)
+
+
+def _save_state_unlocked(st: Dict[str, Any]) -> None:
+    """Log the changed keys to the WAL and adopt st. Caller must hold the state lock."""
+    global _mem, _snapshot_dirty
+    st = ensure_state_defaults(st)
+    if _mem is None:
+        _mem = _recover_state()
+    changed = {k: v for k, v in st.items() if k not in _mem or _mem[k] != v}
+    removed = [k for k in _mem if k not in st]
+    if not changed and not removed:
+        return
+    rec: Dict[str, Any] = {"set": changed}
+    if removed:
+        rec["del"] = removed
+    append_jsonl_local(STATE_WAL_PATH, rec)
+    flush_jsonl(STATE_WAL_PATH)  # Durable before os.execv restarts, even with group commit
+    _mem = copy.deepcopy(st)
+    _snapshot_dirty = True
+    flush_state_if_due()
 
 
 def load_state() -> Dict[str, Any]:
-    lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-    try:
+    with _state_lock:
         return _load_state_unlocked()
-    finally:
-        release_file_lock(STATE_LOCK_PATH, lock_fd)
 
 
 def save_state(st: Dict[str, Any]) -> None:
-    lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-    try:
+    with _state_lock:
         _save_state_unlocked(st)
-    finally:
-        release_file_lock(STATE_LOCK_PATH, lock_fd)
+
+
+def flush_state_if_due() -> None:
+    """Write the snapshot if state changed and STATE_SNAPSHOT_SEC passed since the last one."""
+    with _state_lock:
+        if _snapshot_dirty and _mem is not None and time.monotonic() - _last_snapshot_at >= STATE_SNAPSHOT_SEC:
+            try:
+                _write_snapshot(_mem)
+            except OSError:
+                log.warning("Failed to write state snapshot", exc_info=True)
+
+
+def flush_state() -> None:
+    """Write the snapshot now if anything changed since the last one."""
+    with _state_lock:
+        if _snapshot_dirty and _mem is not None:
+            _write_snapshot(_mem)
+
+
+atexit.register(flush_state)
 
 
 def init_state() -> Dict[str, Any]:
@@ -212,8 +311,7 @@ def init_state() -> Dict[str, Any]:
     Fetches OpenRouter ground truth and stores session_daily_snapshot and
     session_spent_snapshot for drift calculation.
     """
-    lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-    try:
+    with _state_lock:
         st = _load_state_unlocked()
 
         # Capture session snapshots for drift detection
@@ -236,8 +334,6 @@ def init_state() -> Dict[str, Any]:
 
         _save_state_unlocked(st)
         return st
-    finally:
-        release_file_lock(STATE_LOCK_PATH, lock_fd)
 
 
 # ---------------------------------------------------------------------------
@@ -285,16 +381,17 @@ def check_openrouter_ground_truth() -> Optional[Dict[str, float]]:
     Returns dict with total_usd and daily_usd spent according to OpenRouter, or None on error.
     """
     try:
-        import urllib.request
+        from ouroboros.http_pool import get_http_client
         api_key = os.environ.get("OPENROUTER_API_KEY", "").strip()
         if not api_key:
             return None
-        req = urllib.request.Request(
+        resp = get_http_client().get(
             "https://openrouter.ai/api/v1/auth/key",
             headers={"Authorization": f"Bearer {api_key}"},
+            timeout=10,
         )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
+        resp.raise_for_status()
+        data = resp.json()
         # OpenRouter API returns usage already in dollars (not cents)
         usage_total = data.get("data", {}).get("usage", 0)
         usage_daily = data.get("data", {}).get("usage_daily", 0)
@@ -316,11 +413,14 @@ def budget_pct(st: Dict[str, Any]) -> float:
     return (spent / total) * 100.0
 
 
-def update_budget_from_usage(usage: Dict[str, Any]) -> None:
+def update_budget_from_usage(usage: Dict[str, Any], category: Optional[str] = None,
+                             model: Optional[str] = None, cost_correction: bool = False) -> None:
     """Update state with LLM usage costs and tokens.
 
     Uses a single lock scope for the read-modify-write cycle to prevent
-    concurrent writes from losing budget updates.
+    concurrent writes from losing budget updates. With a category or model
+    (llm_usage events, which are also logged to events.jsonl) the running
+    per-category and per-model totals are updated in the same write.
 
     Every 50 calls, fetches OpenRouter ground truth for comparison.
     """
@@ -339,8 +439,7 @@ def update_budget_from_usage(usage: Dict[str, Any]) -> None:
             return default
 
     # Step 1: Update budget counters under lock (fast, no I/O beyond Drive)
-    lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-    try:
+    with _state_lock:
         st = _load_state_unlocked()
         cost = usage.get("cost") if isinstance(usage, dict) else None
         if cost is None:
@@ -354,17 +453,23 @@ def update_budget_from_usage(usage: Dict[str, Any]) -> None:
             usage.get("completion_tokens") if isinstance(usage, dict) else 0)
         st["spent_tokens_cached"] = _to_int(st.get("spent_tokens_cached") or 0) + _to_int(
             usage.get("cached_tokens") if isinstance(usage, dict) else 0)
-        should_check_ground_truth = (st["spent_calls"] % 50 == 0)
+        if (category is not None or model is not None) and isinstance(st.get("budget_by_model"), dict):
+            _add_to_aggregates(
+                st, category, model, _to_float(cost),
+                _to_int(usage.get("prompt_tokens") if isinstance(usage, dict) else 0),
+                _to_int(usage.get("completion_tokens") if isinstance(usage, dict) else 0),
+                _to_int(usage.get("cached_tokens") if isinstance(usage, dict) else 0),
+                cost_correction=cost_correction,
+            )
+        # Cost corrections carry rounds=0 and must not re-trigger the periodic check
+        should_check_ground_truth = rounds > 0 and (st["spent_calls"] % 50 == 0)
         _save_state_unlocked(st)
-    finally:
-        release_file_lock(STATE_LOCK_PATH, lock_fd)
 
     # Step 2: HTTP to OpenRouter OUTSIDE the lock (can take up to 10s)
     if should_check_ground_truth:
         ground_truth = check_openrouter_ground_truth()
         if ground_truth is not None:
-            lock_fd = acquire_file_lock(STATE_LOCK_PATH)
-            try:
+            with _state_lock:
                 st = _load_state_unlocked()
                 st["openrouter_total_usd"] = ground_truth["total_usd"]
                 st["openrouter_daily_usd"] = ground_truth["daily_usd"]
@@ -405,61 +510,107 @@ def update_budget_from_usage(usage: Dict[str, Any]) -> None:
                         st["budget_drift_alert"] = False
 
                 _save_state_unlocked(st)
-            finally:
-                release_file_lock(STATE_LOCK_PATH, lock_fd)
 
 
 # ---------------------------------------------------------------------------
-# Budget breakdown by category
+# Budget breakdown by category and model
 # ---------------------------------------------------------------------------
-
-def budget_breakdown(st: Dict[str, Any]) -> Dict[str, float]:
+# Running totals live in state.json ("budget_by_category", "budget_by_model")
+# and are updated with every llm_usage event (update_budget_from_usage), so
+# /status does not re-read the event log. They are built from events.jsonl
+# on first use and by rebuild_budget_aggregates() (/status rebuild).
+
+def _event_cost(event: Dict[str, Any]) -> float:
+    """Cost from either top-level "cost" or nested "usage.cost"."""
+    if "cost" in event:
+        return float(event.get("cost") or 0)
+    if isinstance(event.get("usage"), dict):
+        return float(event["usage"].get("cost") or 0)
+    return 0.0
+
+
+def _add_to_aggregates(agg: Dict[str, Any], category: Any, model: Any, cost: float,
+                       prompt_tokens: int, completion_tokens: int, cached_tokens: int,
+                       cost_correction: bool = False) -> None:
+    by_category = agg.setdefault("budget_by_category", {})
+    # Negative values are cost corrections from the reconciler
+    if cost:
+        category = str(category or "other")
+        by_category[category] = by_category.get(category, 0.0) + cost
+    by_model = agg.setdefault("budget_by_model", {})
+    entry = by_model.setdefault(str(model or "unknown"), {
+        "cost": 0.0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+    })
+    entry["cost"] += cost
+    if not cost_correction:
+        entry["calls"] += 1
+    entry["prompt_tokens"] += prompt_tokens
+    entry["completion_tokens"] += completion_tokens
+    entry["cached_tokens"] += cached_tokens
+
+
+def aggregates_from_logs() -> Dict[str, Any]:
+    """Category and model totals recomputed from every llm_usage event in events.jsonl.
+
+    Served by the telemetry database once it holds the full history.
     """
-    Calculate budget breakdown by category from events.jsonl.
+    store = telemetry.get(DRIVE_ROOT)
+    if store is not None:
+        try:
+            if store.is_complete():
+                return store.usage_totals()
+        except sqlite3.Error:
+            log.warning("Telemetry usage totals failed, reading events.jsonl", exc_info=True)
+    agg: Dict[str, Any] = {"budget_by_category": {}, "budget_by_model": {}}
+    for event in iter_jsonl_range(DRIVE_ROOT / "logs" / "events.jsonl"):
+        if event.get("type") != "llm_usage":
+            continue
+        try:
+            _add_to_aggregates(
+                agg, event.get("category", "other"), event.get("model"), _event_cost(event),
+                int(event.get("prompt_tokens", 0) or 0),
+                int(event.get("completion_tokens", 0) or 0),
+                int(event.get("cached_tokens", 0) or 0),
+                cost_correction=bool(event.get("cost_correction")),
+            )
+        except (ValueError, TypeError):
+            continue
+    return agg
 
-    Reads llm_usage events and aggregates cost_usd by category field.
-    Returns dict like {"task": 12.5, "evolution": 45.2, ...}
-    """
-    events_path = DRIVE_ROOT / "logs" / "events.jsonl"
-    if not events_path.exists():
-        return {}
 
-    breakdown: Dict[str, float] = {}
-    try:
-        with events_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                    if event.get("type") != "llm_usage":
-                        continue
+def rebuild_budget_aggregates() -> Dict[str, Any]:
+    """Replace the running totals in state with ones recomputed from the logs."""
+    agg = aggregates_from_logs()  # Outside the lock: may read a long history
+    with _state_lock:
+        st = _load_state_unlocked()
+        st.update(agg)
+        st["budget_aggregates_rebuilt_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        _save_state_unlocked(st)
+    return agg
 
-                    # Get category (default to "other" if not present)
-                    category = event.get("category", "other")
 
-                    # Get cost from either top-level "cost" or nested "usage.cost"
-                    cost = 0.0
-                    if "cost" in event:
-                        cost = float(event.get("cost", 0))
-                    elif "usage" in event and isinstance(event["usage"], dict):
-                        cost = float(event["usage"].get("cost", 0))
+def _budget_aggregates(st: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(st.get("budget_by_category"), dict) or not isinstance(st.get("budget_by_model"), dict):
+        try:
+            st.update(rebuild_budget_aggregates())  # State from before running totals existed
+        except Exception:
+            log.warning("Failed to rebuild budget aggregates", exc_info=True)
+            return {"budget_by_category": {}, "budget_by_model": {}}
+    return st
 
-                    if cost > 0:
-                        breakdown[category] = breakdown.get(category, 0.0) + cost
 
-                except (json.JSONDecodeError, ValueError, TypeError):
-                    continue
-    except Exception:
-        log.warning("Failed to calculate budget breakdown", exc_info=True)
+def budget_breakdown(st: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Budget breakdown by category from the running totals in state.
 
-    return breakdown
+    Returns dict like {"task": 12.5, "evolution": 45.2, ...}
+    """
+    return dict(_budget_aggregates(st)["budget_by_category"])
 
 
 def model_breakdown(st: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
     """
-    Calculate budget breakdown by model from events.jsonl.
+    Budget breakdown by model from the running totals in state.
 
     Returns dict like:
     {
@@ -467,64 +618,27 @@ def model_breakdown(st: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
         "openai/gpt-4o": {"cost": 3.2, "calls": 15, ...},
     }
     """
-    events_path = DRIVE_ROOT / "logs" / "events.jsonl"
-    if not events_path.exists():
-        return {}
-
-    breakdown: Dict[str, Dict[str, float]] = {}
-    try:
-        with events_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                    if event.get("type") != "llm_usage":
-                        continue
-
-                    model = event.get("model") or "unknown"
-                    if not model:
-                        model = "unknown"
+    return {model: dict(totals) for model, totals in _budget_aggregates(st)["budget_by_model"].items()}
 
-                    # Get cost
-                    cost = 0.0
-                    if "cost" in event:
-                        cost = float(event.get("cost", 0))
-                    elif "usage" in event and isinstance(event["usage"], dict):
-                        cost = float(event["usage"].get("cost", 0))
 
-                    # Get tokens
-                    prompt_tokens = int(event.get("prompt_tokens", 0) or 0)
-                    completion_tokens = int(event.get("completion_tokens", 0) or 0)
-                    cached_tokens = int(event.get("cached_tokens", 0) or 0)
+def per_task_cost_summary(max_tasks: int = 10, tail_bytes: int = 512_000,
+                          recent_sec: float = 86400.0) -> List[Dict[str, Any]]:
+    """Return cost summary for recent tasks.
 
-                    if model not in breakdown:
-                        breakdown[model] = {"cost": 0.0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
-
-                    breakdown[model]["cost"] += cost
-                    breakdown[model]["calls"] += 1
-                    breakdown[model]["prompt_tokens"] += prompt_tokens
-                    breakdown[model]["completion_tokens"] += completion_tokens
-                    breakdown[model]["cached_tokens"] += cached_tokens
-
-                except (json.JSONDecodeError, ValueError, TypeError):
-                    continue
-    except Exception:
-        log.warning("Failed to calculate model breakdown", exc_info=True)
-
-    return breakdown
-
-
-def per_task_cost_summary(max_tasks: int = 10, tail_bytes: int = 512_000) -> List[Dict[str, Any]]:
-    """Return cost summary for recent tasks from events.jsonl.
-
-    Only reads the last `tail_bytes` of the file to avoid scanning
-    megabytes of history on every LLM round.
+    Queries the telemetry database (tasks with usage in the last
+    `recent_sec`); without it, reads only the last `tail_bytes` of
+    events.jsonl to avoid scanning megabytes of history on every LLM round.
 
     Returns list of dicts: [{task_id, cost, rounds, model}, ...]
     sorted by cost descending, limited to max_tasks.
     """
+    store = telemetry.get(DRIVE_ROOT)
+    if store is not None:
+        try:
+            return store.task_costs(limit=max_tasks, since=time.time() - recent_sec)
+        except sqlite3.Error:
+            log.warning("Telemetry task costs failed, reading events.jsonl", exc_info=True)
+
     events_path = DRIVE_ROOT / "logs" / "events.jsonl"
     if not events_path.exists():
         return []
@@ -664,15 +778,25 @@ def status_text(workers_dict: Dict[int, Any], pending_list: list, running_dict:
     return "\n".join(lines)
 
 
-def rotate_chat_log_if_needed(drive_root: pathlib.Path, max_bytes: int = 800_000) -> None:
-    """Rotate chat log if it exceeds max_bytes."""
-    chat = drive_root / "logs" / "chat.jsonl"
-    if not chat.exists():
+_LOG_MAINTENANCE_INTERVAL_SEC = 60.0
+_last_log_maintenance = 0.0
+
+
+def rotate_logs_if_needed(drive_root: pathlib.Path) -> None:
+    """Close oversized or old log segments and compress closed ones (at most once a minute)."""
+    global _last_log_maintenance
+    now = time.time()
+    if now - _last_log_maintenance < _LOG_MAINTENANCE_INTERVAL_SEC:
         return
-    if chat.stat().st_size < max_bytes:
+    _last_log_maintenance = now
+    try:
+        result = maintain_logs(drive_root / "logs")
+    except Exception:
+        log.warning("Log segment maintenance failed", exc_info=True)
         return
-    ts = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d_%H%M%S")
-    archive_path = drive_root / "archive" / f"chat_{ts}.jsonl"
-    archive_path.parent.mkdir(parents=True, exist_ok=True)
-    archive_path.write_bytes(chat.read_bytes())
-    chat.write_text("", encoding="utf-8")
+    if result["rotated"]:
+        append_jsonl(drive_root / "logs" / "supervisor.jsonl", {
+            "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "type": "log_segments_closed",
+            "segments": result["rotated"],
+        })
@@ -21,6 +21,7 @@ import uuid
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from ouroboros.jsonl_tail import JsonlFollower, read_jsonl_tail
 from supervisor.state import load_state, append_jsonl
 from supervisor import git_ops
 from supervisor.telegram import send_with_budget
@@ -87,10 +88,21 @@ def init(repo_dir: pathlib.Path, drive_root: pathlib.Path, max_workers: int,
 
 @dataclass
 class Worker:
+    """One task slot. Slots in the same `group` share a process (multi-task workers)."""
     wid: int
     proc: mp.Process
     in_q: Any
     busy_task_id: Optional[str] = None
+    group: Tuple[int, ...] = ()
+
+
+def _task_concurrency() -> int:
+    """Tasks one worker process runs at once (OUROBOROS_WORKER_TASK_CONCURRENCY, default 1)."""
+    try:
+        return max(1, int(os.environ.get("OUROBOROS_WORKER_TASK_CONCURRENCY", "1")))
+    except (TypeError, ValueError):
+        log.warning("Invalid OUROBOROS_WORKER_TASK_CONCURRENCY, defaulting to 1")
+        return 1
 
 
 _EVENT_Q = None
@@ -104,6 +116,17 @@ def get_event_q():
     return _EVENT_Q
 
 
+_LOG_Q = None
+
+
+def get_log_q():
+    """Get the current LOG_Q (worker log records for supervisor/log_writer.py), creating if needed."""
+    global _LOG_Q
+    if _LOG_Q is None:
+        _LOG_Q = _get_ctx().Queue()
+    return _LOG_Q
+
+
 WORKERS: Dict[int, Worker] = {}
 PENDING: List[Dict[str, Any]] = []
 RUNNING: Dict[str, Dict[str, Any]] = {}
@@ -216,11 +239,7 @@ def auto_resume_after_restart() -> None:
             sup_log = DRIVE_ROOT / "logs" / "supervisor.jsonl"
             if sup_log.exists():
                 try:
-                    lines = sup_log.read_text(encoding="utf-8").strip().split("\n")
-                    for line in reversed(lines[-20:]):
-                        if not line.strip():
-                            continue
-                        evt = json.loads(line)
+                    for evt in read_jsonl_tail(sup_log, 20):
                         if evt.get("type") in ("launcher_start", "restart"):
                             recent_restart = True
                             break
@@ -296,13 +315,56 @@ def auto_resume_after_restart() -> None:
 # Worker process
 # ---------------------------------------------------------------------------
 
-def worker_main(wid: int, in_q: Any, out_q: Any, repo_dir: str, drive_root: str) -> None:
+def _reject_destructive_task(wid: int, task: Dict[str, Any], out_q: Any, drive: pathlib.Path) -> bool:
+    """Guard: destructive operations are forbidden in background workers. True if the task was refused."""
+    # Refactoring, file deletion, renaming — only via claude_code_edit in direct chat.
+    from supervisor.state import append_jsonl as _append_jsonl
+    _task_text = str(task.get("text") or "").lower()
+    _DESTRUCTIVE_KEYWORDS = [
+        "удал", "удали", "удаляй", "рефактор", "рефакторинг",
+        "почист", "очист", "перепиши", "переименуй",
+        "delete file", "remove file", "refactor", "cleanup",
+        "clean up", "rename file", "overwrite",
+    ]
+    _is_destructive = any(kw in _task_text for kw in _DESTRUCTIVE_KEYWORDS)
+    if not _is_destructive or task.get("_allow_destructive"):
+        return False
+    _warn_msg = (
+        "⛔ WORKER GUARD: Эта задача содержит деструктивные операции "
+        "(удаление/рефакторинг файлов). Воркеры не могут выполнять такие задачи. "
+        "Используй claude_code_edit в прямом диалоге с Sergey."
+    )
+    out_q.put({
+        "type": "send_message",
+        "chat_id": task.get("chat_id"),
+        "text": _warn_msg,
+        "worker_id": wid,
+        "is_worker": True,
+    })
+    _append_jsonl(
+        drive / "logs" / "supervisor.jsonl",
+        {
+            "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "type": "worker_destructive_blocked",
+            "task_id": task.get("id"),
+            "text_snippet": _task_text[:200],
+        },
+    )
+    return True
+
+
+def worker_main(wid: int, in_q: Any, out_q: Any, repo_dir: str, drive_root: str,
+                log_q: Any = None) -> None:
     import sys as _sys
     import traceback as _tb
     import pathlib as _pathlib
     _sys.path.insert(0, repo_dir)
     _drive = _pathlib.Path(drive_root)
-    from supervisor.state import append_jsonl as _append_jsonl
+    try:
+        from supervisor.log_writer import install_worker_sink
+        install_worker_sink(log_q, _drive)
+    except Exception:
+        log.warning("Failed to route worker logs to the supervisor, writing locally", exc_info=True)
     try:
         from ouroboros.agent import make_agent
         agent = make_agent(repo_dir=repo_dir, drive_root=drive_root, event_queue=out_q)
@@ -314,40 +376,7 @@ def worker_main(wid: int, in_q: Any, out_q: Any, repo_dir: str, drive_root: str)
             task = in_q.get()
             if task is None or task.get("type") == "shutdown":
                 break
-
-            # Guard: destructive operations are forbidden in background workers.
-            # Refactoring, file deletion, renaming — only via claude_code_edit in direct chat.
-            _task_text = str(task.get("text") or "").lower()
-            _DESTRUCTIVE_KEYWORDS = [
-                "удал", "удали", "удаляй", "рефактор", "рефакторинг",
-                "почист", "очист", "перепиши", "переименуй",
-                "delete file", "remove file", "refactor", "cleanup",
-                "clean up", "rename file", "overwrite",
-            ]
-            _is_destructive = any(kw in _task_text for kw in _DESTRUCTIVE_KEYWORDS)
-            if _is_destructive and not task.get("_allow_destructive"):
-                import datetime as _dt
-                _warn_msg = (
-                    "⛔ WORKER GUARD: Эта задача содержит деструктивные операции "
-                    "(удаление/рефакторинг файлов). Воркеры не могут выполнять такие задачи. "
-                    "Используй claude_code_edit в прямом диалоге с Sergey."
-                )
-                out_q.put({
-                    "type": "send_message",
-                    "chat_id": task.get("chat_id"),
-                    "text": _warn_msg,
-                    "worker_id": wid,
-                    "is_worker": True,
-                })
-                _append_jsonl(
-                    _drive / "logs" / "supervisor.jsonl",
-                    {
-                        "ts": _dt.datetime.now(_dt.timezone.utc).isoformat(),
-                        "type": "worker_destructive_blocked",
-                        "task_id": task.get("id"),
-                        "text_snippet": _task_text[:200],
-                    },
-                )
+            if _reject_destructive_task(wid, task, out_q, _drive):
                 continue
 
             events = agent.handle_task(task)
@@ -359,6 +388,62 @@ def worker_main(wid: int, in_q: Any, out_q: Any, repo_dir: str, drive_root: str)
             _log_worker_crash(wid, _drive, "handle_task", _e, _tb.format_exc())
 
 
+def worker_main_async(wids: List[int], in_qs: List[Any], out_q: Any, repo_dir: str, drive_root: str,
+                      log_q: Any = None) -> None:
+    """Multi-task worker: one event loop, one agent and input queue per slot."""
+    import asyncio as _asyncio
+    import sys as _sys
+    import traceback as _tb
+    import pathlib as _pathlib
+    _sys.path.insert(0, repo_dir)
+    _drive = _pathlib.Path(drive_root)
+    try:
+        from supervisor.log_writer import install_worker_sink
+        install_worker_sink(log_q, _drive)
+    except Exception:
+        log.warning("Failed to route worker logs to the supervisor, writing locally", exc_info=True)
+    try:
+        from ouroboros.agent import make_agent
+        agents = [make_agent(repo_dir=repo_dir, drive_root=drive_root, event_queue=out_q) for _ in wids]
+    except Exception as _e:
+        _log_worker_crash(wids[0], _drive, "make_agent", _e, _tb.format_exc())
+        return
+    _asyncio.run(_serve_slots(wids, in_qs, agents, out_q, _drive))
+
+
+async def _serve_slots(wids: List[int], in_qs: List[Any], agents: List[Any], out_q: Any,
+                       drive: pathlib.Path) -> None:
+    import asyncio as _asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    # Each idle slot parks a thread on in_q.get(); the rest is for blocking tools
+    _asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=len(wids) * 4 + 4, thread_name_prefix="worker_slot"))
+    await _asyncio.gather(*(
+        _serve_slot(wid, in_q, agent, out_q, drive) for wid, in_q, agent in zip(wids, in_qs, agents)
+    ))
+
+
+async def _serve_slot(wid: int, in_q: Any, agent: Any, out_q: Any, drive: pathlib.Path) -> None:
+    import asyncio as _asyncio
+    import traceback as _tb
+    loop = _asyncio.get_running_loop()
+    while True:
+        try:
+            task = await loop.run_in_executor(None, in_q.get)
+            if task is None or task.get("type") == "shutdown":
+                break
+            if _reject_destructive_task(wid, task, out_q, drive):
+                continue
+
+            events = await agent.handle_task_async(task)
+            for e in events:
+                e2 = dict(e)
+                e2["worker_id"] = wid
+                out_q.put(e2)
+        except Exception as _e:
+            _log_worker_crash(wid, drive, "handle_task", _e, _tb.format_exc())
+
+
 def _log_worker_crash(wid: int, drive_root: pathlib.Path, phase: str, exc: Exception, tb: str) -> None:
     """Best-effort: write crash info to supervisor.jsonl from inside worker process."""
     import os as _os
@@ -380,33 +465,14 @@ def _log_worker_crash(wid: int, drive_root: pathlib.Path, phase: str, exc: Excep
         log.debug("Suppressed exception", exc_info=True)
 
 
-def _first_worker_boot_event_since(offset_bytes: int) -> Optional[Dict[str, Any]]:
-    """Read first worker_boot event written after the given file offset."""
-    path = DRIVE_ROOT / "logs" / "events.jsonl"
-    if not path.exists():
-        return None
+def _first_worker_boot_event_since(follower: JsonlFollower) -> Optional[Dict[str, Any]]:
+    """First worker_boot event among those appended since the follower's last read."""
     try:
-        with path.open("rb") as f:
-            f.seek(0, 2)
-            size = f.tell()
-            safe_offset = offset_bytes if 0 <= offset_bytes <= size else 0
-            f.seek(safe_offset)
-            data = f.read().decode("utf-8", errors="replace")
+        for evt in follower.read_new():
+            if str(evt.get("type") or "") == "worker_boot":
+                return evt
     except Exception:
         log.debug("Suppressed exception", exc_info=True)
-        return None
-
-    for line in data.splitlines():
-        raw = line.strip()
-        if not raw:
-            continue
-        try:
-            evt = json.loads(raw)
-        except Exception:
-            log.debug("Suppressed exception in loop", exc_info=True)
-            continue
-        if isinstance(evt, dict) and str(evt.get("type") or "") == "worker_boot":
-            return evt
     return None
 
 
@@ -427,11 +493,15 @@ def _verify_worker_sha_after_spawn(events_offset: int, timeout_sec: float = 90.0
 
     deadline = time.time() + max(float(timeout_sec), 1.0)
     boot_evt = None
-    while time.time() < deadline:
-        boot_evt = _first_worker_boot_event_since(events_offset)
-        if boot_evt is not None:
-            break
-        time.sleep(0.25)
+    follower = JsonlFollower(DRIVE_ROOT / "logs" / "events.jsonl", offset=events_offset)
+    try:
+        while time.time() < deadline:
+            boot_evt = _first_worker_boot_event_since(follower)
+            if boot_evt is not None:
+                break
+            time.sleep(0.25)
+    finally:
+        follower.close()
 
     if boot_evt is None:
         append_jsonl(
@@ -465,10 +535,11 @@ def _verify_worker_sha_after_spawn(events_offset: int, timeout_sec: float = 90.0
 
 
 def spawn_workers(n: int = 0) -> None:
-    global _CTX, _EVENT_Q
+    global _CTX, _EVENT_Q, _LOG_Q
     # Force fresh context to ensure workers use latest code
     _CTX = mp.get_context(_WORKER_START_METHOD)
     _EVENT_Q = _CTX.Queue()
+    _LOG_Q = _CTX.Queue()  # The log writer finishes the old queue before switching
     events_path = DRIVE_ROOT / "logs" / "events.jsonl"
     try:
         events_offset = int(events_path.stat().st_size)
@@ -476,6 +547,7 @@ def spawn_workers(n: int = 0) -> None:
         events_offset = 0
 
     count = n or MAX_WORKERS
+    slots = _task_concurrency()
     append_jsonl(
         DRIVE_ROOT / "logs" / "supervisor.jsonl",
         {
@@ -483,16 +555,12 @@ def spawn_workers(n: int = 0) -> None:
             "type": "worker_spawn_start",
             "start_method": _WORKER_START_METHOD,
             "count": count,
+            "tasks_per_worker": slots,
         },
     )
     WORKERS.clear()
     for i in range(count):
-        in_q = _CTX.Queue()
-        proc = _CTX.Process(target=worker_main,
-                           args=(i, in_q, _EVENT_Q, str(REPO_DIR), str(DRIVE_ROOT)))
-        proc.daemon = True
-        proc.start()
-        WORKERS[i] = Worker(wid=i, proc=proc, in_q=in_q, busy_task_id=None)
+        _start_worker_process(tuple(range(i * slots, (i + 1) * slots)))
     global _LAST_SPAWN_TIME
     _LAST_SPAWN_TIME = time.time()
     # Run SHA verification in background to avoid blocking the main loop for up to 90s
@@ -521,15 +589,50 @@ def kill_workers() -> None:
         )
 
 
-def respawn_worker(wid: int) -> None:
-    global _LAST_SPAWN_TIME
+def _start_worker_process(wids: Tuple[int, ...]) -> None:
+    """Start one worker process serving the given slots and register them in WORKERS."""
     ctx = _get_ctx()
-    in_q = ctx.Queue()
-    proc = ctx.Process(target=worker_main,
-                       args=(wid, in_q, get_event_q(), str(REPO_DIR), str(DRIVE_ROOT)))
+    in_qs = [ctx.Queue() for _ in wids]
+    if len(wids) == 1:
+        proc = ctx.Process(target=worker_main,
+                           args=(wids[0], in_qs[0], get_event_q(), str(REPO_DIR), str(DRIVE_ROOT), get_log_q()))
+    else:
+        proc = ctx.Process(target=worker_main_async,
+                           args=(list(wids), in_qs, get_event_q(), str(REPO_DIR), str(DRIVE_ROOT), get_log_q()))
     proc.daemon = True
     proc.start()
-    WORKERS[wid] = Worker(wid=wid, proc=proc, in_q=in_q, busy_task_id=None)
+    for wid, in_q in zip(wids, in_qs):
+        WORKERS[wid] = Worker(wid=wid, proc=proc, in_q=in_q, busy_task_id=None, group=wids)
+
+
+def _requeue_sibling_tasks(wid: int, group: Tuple[int, ...]) -> None:
+    """Tasks on other slots of a process that is being replaced go back to the front of the queue."""
+    from supervisor import queue
+    for sid in group:
+        sw = WORKERS.get(sid)
+        if sid == wid or sw is None or not sw.busy_task_id or sw.busy_task_id not in RUNNING:
+            continue
+        meta = RUNNING.pop(sw.busy_task_id) or {}
+        task = meta.get("task") if isinstance(meta, dict) else None
+        if isinstance(task, dict):
+            queue.enqueue_task(task, front=True)
+        append_jsonl(
+            DRIVE_ROOT / "logs" / "supervisor.jsonl",
+            {
+                "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "type": "worker_sibling_requeued",
+                "worker_id": sid, "respawned_for": wid, "task_id": sw.busy_task_id,
+            },
+        )
+
+
+def respawn_worker(wid: int) -> None:
+    """Replace the process behind slot wid (and every slot sharing it)."""
+    global _LAST_SPAWN_TIME
+    w = WORKERS.get(wid)
+    group = w.group if w is not None and w.group else (wid,)
+    _requeue_sibling_tasks(wid, group)
+    _start_worker_process(group)
     # Give freshly respawned workers the same init grace as startup workers.
     _LAST_SPAWN_TIME = time.time()
 
@@ -584,8 +687,10 @@ def ensure_workers_healthy() -> None:
         return
     busy_crashes = 0
     dead_detections = 0
-    for wid, w in list(WORKERS.items()):
-        if not w.proc.is_alive():
+    for wid in list(WORKERS):
+        # Re-read: respawning one slot replaces every slot of its process
+        w = WORKERS.get(wid)
+        if w is not None and not w.proc.is_alive():
             dead_detections += 1
             if w.busy_task_id is not None:
                 busy_crashes += 1
@@ -0,0 +1,198 @@
+"""
+Tests for conversation context management: checkpointed tool-history
+compaction, the prompt-cache breakpoint after the compacted block and the
+round-indexed ConversationLog, token counting, the sectioned
+system prompt budget and the context file cache.
+
+Run: pytest tests/test_context.py -v
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _conversation(n_rounds):
+    messages = [
+        {"role": "system", "content": [{"type": "text", "text": "sys", "cache_control": {"type": "ephemeral"}}]},
+        {"role": "user", "content": "task"},
+    ]
+    for r in range(n_rounds):
+        messages.append({"role": "assistant", "content": f"note {r}", "tool_calls": [{
+            "id": f"c{r}", "type": "function",
+            "function": {"name": "repo_read", "arguments": json.dumps({"path": f"f{r}.py"})},
+        }]})
+        messages.append({"role": "tool", "tool_call_id": f"c{r}", "content": f"result {r}\n" + "x" * 500})
+    return messages
+
+
+class TestCheckpointCompaction(unittest.TestCase):
+    """History changes only at checkpoints, and compaction is idempotent."""
+
+    def test_prefix_stable_between_checkpoints(self):
+        from ouroboros.context import compact_tool_history
+        history = _conversation(14)  # 8 rounds beyond keep_recent: one checkpoint
+        first = compact_tool_history(history, keep_recent=6, checkpoint_every=8)
+        self.assertEqual(first[1 + 2 * 8]["content"], "result 7... (509 chars)")
+        self.assertTrue(first[3 + 2 * 8]["content"].startswith("result 8\n"))  # Round 8 is kept intact
+
+        grown = first + _conversation(20)[2 + 2 * 14:]  # Six more rounds: still below the next checkpoint
+        second = compact_tool_history(grown, keep_recent=6, checkpoint_every=8)
+        self.assertEqual(second[:len(first)], first)
+
+    def test_every_round_mode_matches_previous_behaviour(self):
+        from ouroboros.context import compact_tool_history
+        out = compact_tool_history(_conversation(9), keep_recent=6)
+        self.assertTrue(out[2 * 3 + 1]["content"].endswith("chars)"))
+        self.assertTrue(out[2 * 4 + 1]["content"].startswith("result 3\n"))
+
+    def test_breakpoint_after_compacted_block(self):
+        from ouroboros.context import add_compaction_cache_breakpoint
+        history = _conversation(15)
+        out = add_compaction_cache_breakpoint(history, keep_recent=6, checkpoint_every=8)
+        marked = [i for i, m in enumerate(out) if isinstance(m.get("content"), list) and m["role"] != "system"]
+        self.assertEqual(marked, [1 + 2 * 8])
+        self.assertEqual(out[marked[0]]["content"][0]["cache_control"], {"type": "ephemeral"})
+        self.assertIsInstance(history[marked[0]]["content"], str)  # History itself is untouched
+
+class TestConversationLog(unittest.TestCase):
+    """Rounds are indexed on append and compaction only visits new rounds."""
+
+    def test_matches_list_compaction(self):
+        from ouroboros.context import ConversationLog, compact_tool_history
+        history = _conversation(12)
+        conv = ConversationLog(history)
+        self.assertEqual(conv.round_starts, [2 + 2 * r for r in range(12)])
+        self.assertEqual(list(compact_tool_history(conv, keep_recent=6)), compact_tool_history(history, keep_recent=6))
+        self.assertEqual(conv.compacted_rounds, 6)
+
+    def test_compacted_rounds_are_not_revisited(self):
+        from ouroboros.context import ConversationLog
+        conv = ConversationLog(_conversation(10)).compact(keep_recent=6)
+        conv[3] = {"role": "tool", "tool_call_id": "c0", "content": "y" * 1000}  # Would be re-compacted by a rescan
+        conv.extend(_conversation(12)[2 + 2 * 10:])
+        conv.compact(keep_recent=6)
+        self.assertEqual(conv[3]["content"], "y" * 1000)
+        self.assertTrue(conv[1 + 2 * 6]["content"].endswith("chars)"))  # Round 5: newly compacted
+        self.assertEqual(conv.pending_results(keep_recent=6), [])
+
+
+class TestTokenizer(unittest.TestCase):
+    """Script-aware counts and per-message caching."""
+
+    def test_cyrillic_and_json_cost_more_than_chars_over_four(self):
+        from ouroboros.tokenizer import count_tokens
+        ru = "Пожалуйста, исправь ошибку в функции загрузки конфигурации и добавь тест."
+        js = json.dumps({"path": "a/b.py", "mode": "overwrite", "items": [1, 2, 3]})
+        self.assertGreater(count_tokens(ru, "anthropic/claude-sonnet-4.6"), len(ru) // 4)
+        self.assertGreater(count_tokens(js, "anthropic/claude-sonnet-4.6"), len(js) // 4)
+        en = "The agent reads the file, edits one function and commits the change."
+        self.assertLessEqual(abs(count_tokens(en, "anthropic/claude-sonnet-4.6") - len(en) // 4), 5)
+
+    def test_conversation_log_counts_each_message_once(self):
+        from unittest import mock
+        import ouroboros.context as context
+        conv = context.ConversationLog(_conversation(3))
+        calls = []
+        real = context.message_tokens
+
+        def _counting(msg, model=None):
+            calls.append(msg.get("role"))
+            return real(msg, model)
+
+        with mock.patch.object(context, "message_tokens", _counting):
+            total = conv.token_count()
+            self.assertEqual(len(calls), len(conv))
+            self.assertEqual(conv.token_count(), total)
+            self.assertEqual(len(calls), len(conv))
+            conv[3] = {"role": "tool", "tool_call_id": "c0", "content": "short"}
+            self.assertLess(conv.token_count(), total)
+            self.assertEqual(len(calls), len(conv) + 1)
+
+
+
+class TestSectionedContext(unittest.TestCase):
+    """The allocator keeps required sections and trims by priority."""
+
+    def _context(self, task_type="evolution"):
+        from ouroboros.context_sections import SectionedContext
+        ctx = SectionedContext(task_type=task_type)
+        ctx.add("static", "You are Ouroboros. " * 400, name="System prompt")
+        ctx.add("semi", "## Identity\n\n" + "I am. " * 400)
+        ctx.add("dynamic", "## Recent chat\n\n" + "\n".join(f"line {i} " + "w " * 40 for i in range(200)))
+        ctx.add("dynamic", "## Supervisor\n\n" + "event " * 2000)
+        return ctx
+
+    def test_under_budget_is_untouched(self):
+        from ouroboros.context_sections import fit_messages
+        ctx = self._context()
+        texts = [s.text for s in ctx.sections]
+        messages, info = fit_messages(ctx, {"role": "user", "content": "hi"}, 10 ** 6)
+        self.assertEqual([s.text for s in ctx.sections], texts)
+        self.assertEqual(info["trimmed_sections"], [])
+        self.assertEqual([b.get("cache_control") for b in messages[0]["content"]],
+                         [{"type": "ephemeral", "ttl": "1h"}, {"type": "ephemeral"}, None])
+
+    def test_over_budget_fits_by_priority(self):
+        from ouroboros.context_sections import fit_messages
+        ctx = self._context()
+        required = {s.name: s.text for s in ctx.sections if s.required}
+        chat = next(s for s in ctx.sections if s.name == "Recent chat")
+        budget = sum(s.tokens for s in ctx.sections if s.required) + chat.tokens // 2 + 50
+        messages, info = fit_messages(ctx, {"role": "user", "content": "hi"}, budget)
+        self.assertEqual(info["trimmed_sections"], ["Supervisor"])
+        self.assertIn("Recent chat", info["truncated_sections"])
+        self.assertLessEqual(info["estimated_tokens_after"], budget + 100)
+        self.assertEqual({s.name: s.text for s in ctx.sections if s.required}, required)
+        dynamic = messages[0]["content"][2]["text"]
+        self.assertTrue(dynamic.startswith("## Recent chat\n\n...("))
+        self.assertIn("line 199 ", dynamic)  # Log sections keep their newest lines
+        self.assertNotIn("line 0 ", dynamic)
+
+
+
+class TestFileCache(unittest.TestCase):
+    """Rendered sections are reused until the file's mtime or size changes."""
+
+    def test_section_reused_until_file_changes(self):
+        import tempfile
+        import time
+        from unittest import mock
+        from ouroboros import file_cache
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "identity.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("I am Ouroboros.")
+            old = time.time() - 60
+            os.utime(path, (old, old))
+            reads = []
+            real = file_cache.read_text
+
+            def _counting(p):
+                reads.append(p)
+                return real(p)
+
+            with mock.patch.object(file_cache, "read_text", _counting):
+                first = file_cache.section(path, "Identity", 1000)
+                self.assertEqual(file_cache.section(path, "Identity", 1000), first)
+                self.assertEqual(len(reads), 1)
+                self.assertEqual(first, "## Identity\n\nI am Ouroboros.")
+
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("I am Ouroboros, changed.")
+                self.assertTrue(file_cache.section(path, "Identity", 1000).endswith("changed."))
+                file_cache.section(path, "Identity", 1000)
+                self.assertEqual(len(reads), 3)  # Just modified: not stored yet
+
+                os.utime(path, (old, old))
+                file_cache.section(path, "Identity", 1000)
+                file_cache.section(path, "Identity", 1000)
+                self.assertEqual(len(reads), 4)
+            self.assertEqual(file_cache.section(os.path.join(tmp, "missing.md"), "Wisdom", 10), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
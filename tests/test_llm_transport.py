@@ -0,0 +1,804 @@
+"""
+Tests for the LLM transport layer: streamed response assembly, early
+dispatch of read-only tool calls, conflict-aware tool scheduling, the
+shared HTTP pool, cost
+reconciliation, pricing, hedged requests, the circuit breaker, the
+managed tool executor, the tool result cache, the blob store for
+oversized results and the async tool loop.
+
+Run: pytest tests/test_llm_transport.py -v
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _tool_delta(index, id=None, name=None, arguments=None):
+    fn = {}
+    if name:
+        fn["name"] = name
+    if arguments:
+        fn["arguments"] = arguments
+    delta = {"index": index, "function": fn}
+    if id:
+        delta["id"] = id
+    return {"id": "gen-1", "choices": [{"delta": {"tool_calls": [delta]}}]}
+
+
+class TestStreamAssembler(unittest.TestCase):
+    """_StreamAssembler rebuilds messages and emits tool calls once, in order."""
+
+    def test_content_and_usage(self):
+        from ouroboros.llm import _StreamAssembler
+        asm = _StreamAssembler()
+        asm.feed({"id": "gen-1", "choices": [{"delta": {"role": "assistant", "content": "Hel"}}]})
+        asm.feed({"id": "gen-1", "choices": [{"delta": {"content": "lo"}}]})
+        asm.feed({"id": "gen-1", "choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 2}})
+        msg, usage, gen_id = asm.finish()
+        self.assertEqual(msg["content"], "Hello")
+        self.assertNotIn("tool_calls", msg)
+        self.assertEqual(usage["prompt_tokens"], 10)
+        self.assertEqual(gen_id, "gen-1")
+
+    def test_tool_call_emitted_when_next_index_starts(self):
+        from ouroboros.llm import _StreamAssembler
+        emitted = []
+        asm = _StreamAssembler(on_tool_call=emitted.append)
+        asm.feed(_tool_delta(0, id="call_a", name="repo_read", arguments='{"path": '))
+        asm.feed(_tool_delta(0, arguments='"README.md"}'))
+        self.assertEqual(emitted, [])
+        asm.feed(_tool_delta(1, id="call_b", name="repo_list", arguments='{"dir": "."}'))
+        self.assertEqual([tc["id"] for tc in emitted], ["call_a"])
+        self.assertEqual(emitted[0]["function"]["arguments"], '{"path": "README.md"}')
+        msg, _, _ = asm.finish()
+        self.assertEqual([tc["id"] for tc in emitted], ["call_a", "call_b"])
+        self.assertEqual(len(msg["tool_calls"]), 2)
+
+    def test_incomplete_arguments_wait_for_stream_end(self):
+        from ouroboros.llm import _StreamAssembler
+        emitted = []
+        asm = _StreamAssembler(on_tool_call=emitted.append)
+        asm.feed(_tool_delta(0, id="call_a", name="repo_read", arguments='{"path": '))
+        asm.feed(_tool_delta(1, id="call_b", name="repo_list", arguments='{}'))
+        self.assertEqual(emitted, [])
+        asm.finish()
+        self.assertEqual(len(emitted), 2)
+
+
+class _FakeRegistry:
+    CODE_TOOLS = frozenset()
+    _DECLARED = {
+        "repo_read": {"reads": ("repo:{path}",)},
+        "repo_list": {"reads": ("repo:{dir}",)},
+        "drive_write": {"writes": ("drive:{path}",)},
+        "web_search": {"reads": ("network",)},
+        "repo_write_commit": {"writes": ("repo:", "git")},
+    }
+
+    def __init__(self):
+        self.calls = []
+
+    def get_entry(self, name):
+        from ouroboros.tools.registry import ToolEntry
+        if name not in self._DECLARED:
+            return None
+        return ToolEntry(name=name, schema={}, handler=None, **self._DECLARED[name])
+
+    def execute(self, name, args):
+        self.calls.append(name)
+        return f"ok:{name}"
+
+    def execute_cached(self, name, args):
+        return self.execute(name, args), None
+
+    def get_timeout(self, name):
+        return 5
+
+
+class TestEarlyToolDispatcher(unittest.TestCase):
+    """Read-only calls start early; anything after a write waits."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.drive_logs = pathlib.Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _tc(self, id, name, arguments="{}"):
+        return {"id": id, "type": "function", "function": {"name": name, "arguments": arguments}}
+
+    def test_read_only_calls_are_claimed(self):
+        from ouroboros.loop import _EarlyToolDispatcher
+        reg = _FakeRegistry()
+        dispatcher = _EarlyToolDispatcher(reg, self.drive_logs)
+        try:
+            tc = self._tc("c1", "repo_read", '{"path": "a"}')
+            dispatcher.on_tool_call(tc)
+            claimed = dispatcher.claim([tc])
+            self.assertIn("c1", claimed)
+            self.assertEqual(claimed["c1"].result()["result"], "ok:repo_read")
+        finally:
+            dispatcher.shutdown()
+
+    def test_reads_after_write_are_not_started(self):
+        from ouroboros.loop import _EarlyToolDispatcher
+        reg = _FakeRegistry()
+        dispatcher = _EarlyToolDispatcher(reg, self.drive_logs)
+        try:
+            write = self._tc("c1", "repo_write_commit")
+            read = self._tc("c2", "repo_read")
+            dispatcher.on_tool_call(write)
+            dispatcher.on_tool_call(read)
+            self.assertEqual(dispatcher.claim([write, read]), {})
+            self.assertEqual(reg.calls, [])
+        finally:
+            dispatcher.shutdown()
+
+    def test_changed_arguments_are_not_claimed(self):
+        from ouroboros.loop import _EarlyToolDispatcher
+        dispatcher = _EarlyToolDispatcher(_FakeRegistry(), self.drive_logs)
+        try:
+            dispatcher.on_tool_call(self._tc("c1", "repo_read", '{"path": "a"}'))
+            self.assertEqual(dispatcher.claim([self._tc("c1", "repo_read", '{"path": "b"}')]), {})
+        finally:
+            dispatcher.shutdown()
+
+
+class TestSharedHttpPool(unittest.TestCase):
+    """All OpenRouter callers share one pooled transport per process."""
+
+    def test_client_is_shared(self):
+        from ouroboros.http_pool import get_http_client
+        from ouroboros.llm import LLMClient
+        self.assertIs(get_http_client(), get_http_client())
+        a = LLMClient(api_key="k")._get_client()
+        b = LLMClient(api_key="k")._get_client()
+        self.assertIs(a._client, b._client)
+        self.assertIs(a._client, get_http_client())
+
+    def test_shared_llm_client_singleton(self):
+        from ouroboros.llm import shared_llm_client
+        self.assertIs(shared_llm_client(), shared_llm_client())
+
+    def test_per_host_stats(self):
+        import httpx
+        from ouroboros import http_pool
+        req = httpx.Request("GET", "https://stats-test.example/x")
+        http_pool._record_request(req)
+        http_pool._record_response(httpx.Response(503, request=req))
+        host = http_pool.pool_stats()["hosts"]["stats-test.example"]
+        self.assertEqual(host["requests"], 1)
+        self.assertEqual(host["errors"], 1)
+
+    def test_run_async_uses_shared_loop(self):
+        import asyncio
+        from ouroboros.http_pool import run_async, get_async_http_client
+
+        async def probe():
+            return get_async_http_client(), asyncio.get_running_loop()
+
+        c1, loop1 = run_async(probe(), timeout=5)
+        c2, loop2 = run_async(probe(), timeout=5)
+        self.assertIs(c1, c2)
+        self.assertIs(loop1, loop2)
+
+
+class TestCostReconciler(unittest.TestCase):
+    """Estimated costs are corrected later by the billed delta."""
+
+    def test_correction_carries_delta(self):
+        from ouroboros.cost_reconciler import CostReconciler
+        events = []
+        rec = CostReconciler(fetch_fn=lambda gen_id: 0.05, first_delay_sec=0.0)
+        rec.submit("gen-1", "openai/gpt-4.1", 0.03, task_id="t1", category="task", sink=events.append)
+        rec.flush(timeout=5)
+        self.assertEqual(len(events), 1)
+        evt = events[0]
+        self.assertTrue(evt["cost_correction"])
+        self.assertAlmostEqual(evt["usage"]["cost"], 0.02)
+        self.assertEqual(evt["usage"]["rounds"], 0)
+        self.assertEqual(evt["task_id"], "t1")
+
+    def test_retries_until_available_then_gives_up(self):
+        from ouroboros.cost_reconciler import CostReconciler
+        answers = iter([None, 0.01])
+        events = []
+        rec = CostReconciler(fetch_fn=lambda gen_id: next(answers), first_delay_sec=0.0)
+        rec.submit("gen-2", "m", 0.01, sink=events.append)
+        rec.flush(timeout=5)
+        self.assertEqual(events, [])  # exact estimate: nothing to correct
+        self.assertEqual(rec.stats()["reconciled"], 1)
+
+        rec = CostReconciler(fetch_fn=lambda gen_id: None, first_delay_sec=0.0, max_attempts=2)
+        rec.submit("gen-3", "m", 0.01, sink=events.append)
+        rec.flush(timeout=5)
+        self.assertEqual(rec.stats()["gave_up"], 1)
+
+    def test_aborted_hedge_loser_is_billed_to_the_task(self):
+        import queue
+        from ouroboros.cost_reconciler import CostReconciler
+        from ouroboros.loop import _task_correction_sink
+        events, usage = queue.Queue(), {"cost": 0.01}
+        rec = CostReconciler(fetch_fn=lambda gen_id: 0.04, first_delay_sec=0.0)
+        rec.submit("gen-loser", "slow", 0.0, task_id="t1", sink=_task_correction_sink(events, usage))
+        rec.flush(timeout=5)
+        self.assertAlmostEqual(usage["cost"], 0.05)
+        self.assertAlmostEqual(events.get_nowait()["cost"], 0.04)
+
+    def test_helper_call_estimate_is_reconciled(self):
+        import queue
+        import types
+        from ouroboros import cost_reconciler
+        from ouroboros.tools.vision import _emit_usage
+        saved = cost_reconciler._reconciler
+        cost_reconciler._reconciler = rec = cost_reconciler.CostReconciler(
+            fetch_fn=lambda gen_id: 0.03, first_delay_sec=0.0)
+        try:
+            events = queue.Queue()
+            ctx = types.SimpleNamespace(event_queue=events, task_id="t1", current_task_type="task")
+            _emit_usage(ctx, {"cost": 0.01, "cost_estimated": True, "generation_id": "gen-vlm"}, "vlm")
+            rec.flush(timeout=5)
+        finally:
+            cost_reconciler._reconciler = saved
+        reported, correction = events.get_nowait(), events.get_nowait()
+        self.assertAlmostEqual(reported["usage"]["cost"], 0.01)
+        self.assertTrue(correction["cost_correction"])
+        self.assertAlmostEqual(correction["usage"]["cost"], 0.02)
+        self.assertEqual((correction["task_id"], correction["category"]), ("t1", "task"))
+
+
+class TestPricing(unittest.TestCase):
+    """Memoized prefix resolution and the Drive-backed price cache."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        from ouroboros import pricing
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.drive_root = pathlib.Path(self._tmpdir.name)
+        self._saved = (pricing._table, pricing._cache_path, pricing._loaded_from_disk, pricing._last_attempt)
+
+    def tearDown(self):
+        from ouroboros import pricing
+        pricing._table, pricing._cache_path, pricing._loaded_from_disk, pricing._last_attempt = self._saved
+        self._tmpdir.cleanup()
+
+    def test_longest_prefix_wins(self):
+        from ouroboros.pricing import PricingTable
+        table = PricingTable({"a/model": (1.0, 0.1, 2.0), "a/model-pro": (5.0, 0.5, 10.0)})
+        self.assertEqual(table.resolve("a/model-pro:beta"), (5.0, 0.5, 10.0))
+        self.assertEqual(table.resolve("a/model-x"), (1.0, 0.1, 2.0))
+        self.assertIsNone(table.resolve("b/other"))
+        self.assertIn("a/model-x", table._memo)
+
+    def test_estimate_cost_uses_cached_rate(self):
+        from ouroboros.pricing import estimate_cost
+        # sonnet-4.6: 3.0 in, 0.30 cached, 15.0 out per 1M
+        cost = estimate_cost("anthropic/claude-sonnet-4.6", 1_000_000, 100_000, cached_tokens=500_000)
+        self.assertAlmostEqual(cost, 1.5 + 0.15 + 1.5)
+
+    def test_fresh_cache_file_loads_without_network(self):
+        import json
+        import time
+        from unittest.mock import patch
+        from ouroboros import pricing
+        cache = self.drive_root / "state" / "pricing_cache.json"
+        cache.parent.mkdir(parents=True)
+        cache.write_text(json.dumps({"fetched_at": time.time(), "prices": {"z/new-model": [7.0, 0.7, 21.0]}}))
+        with patch("ouroboros.llm.fetch_openrouter_pricing", side_effect=AssertionError("network")) as fetch:
+            pricing.configure(self.drive_root)
+            table = pricing.get_table()
+            self.assertEqual(table.source, "cache")
+            self.assertEqual(table.resolve("z/new-model"), (7.0, 0.7, 21.0))
+            self.assertIsNotNone(table.resolve("openai/gpt-4.1"))  # static floor kept
+            fetch.assert_not_called()
+
+    def test_refresh_swaps_table_and_writes_cache(self):
+        from unittest.mock import patch
+        from ouroboros import pricing
+        pricing.configure(self.drive_root)
+        live = {f"x/m{i}": (1.0, 0.1, 2.0) for i in range(10)}
+        before = pricing._table
+        with patch("ouroboros.llm.fetch_openrouter_pricing", return_value=live):
+            self.assertTrue(pricing.refresh_now())
+        self.assertIsNot(pricing._table, before)
+        self.assertEqual(pricing._table.resolve("x/m3"), (1.0, 0.1, 2.0))
+        self.assertTrue((self.drive_root / "state" / "pricing_cache.json").exists())
+
+
+class _SlowFastLLM:
+    """Fake LLMClient: the 'slow' model blocks until cancelled, others answer at once."""
+
+    def chat(self, messages=None, model="", cancel=None, **kwargs):
+        import time
+        from ouroboros.llm import LLMCancelled
+        if model == "slow":
+            for _ in range(500):
+                if cancel is not None and cancel.is_set():
+                    raise LLMCancelled("gen-slow")
+                time.sleep(0.01)
+        return {"role": "assistant", "content": f"from {model}"}, {"cost": 0.01}
+
+
+class TestHedging(unittest.TestCase):
+    """Latency histograms and first-answer-wins hedging."""
+
+    def test_percentiles_from_histogram(self):
+        from ouroboros.hedging import LatencyTracker
+        tracker = LatencyTracker()
+        for _ in range(95):
+            tracker.observe("m", 0.8)
+        for _ in range(5):
+            tracker.observe("m", 40.0)
+        self.assertEqual(tracker.percentile("m", 50), 1.0)
+        self.assertEqual(tracker.percentile("m", 95), 1.0)
+        self.assertEqual(tracker.percentile("m", 99), 45.0)
+        self.assertIsNone(tracker.percentile("unknown", 95))
+
+    def test_hedge_wins_and_loser_is_cancelled(self):
+        import threading
+        from unittest.mock import patch
+        from ouroboros.hedging import LatencyTracker, hedged_chat
+        losers = []
+        settled = threading.Event()
+
+        def on_loser(model, usage, gen_id):
+            losers.append((model, usage, gen_id))
+            settled.set()
+
+        with patch.dict(os.environ, {"OUROBOROS_HEDGE_DEFAULT_DELAY_SEC": "0.05"}):
+            msg, usage, winner, hedged = hedged_chat(
+                _SlowFastLLM(), {"messages": []}, "slow", "fast",
+                on_loser=on_loser, tracker=LatencyTracker(),
+            )
+        self.assertTrue(hedged)
+        self.assertEqual(winner, "fast")
+        self.assertEqual(msg["content"], "from fast")
+        self.assertTrue(settled.wait(5))
+        self.assertEqual(losers, [("slow", None, "gen-slow")])
+
+    def test_fast_primary_does_not_hedge(self):
+        from unittest.mock import patch
+        from ouroboros.hedging import LatencyTracker, hedged_chat
+        with patch.dict(os.environ, {"OUROBOROS_HEDGE_DEFAULT_DELAY_SEC": "5"}):
+            _, _, winner, hedged = hedged_chat(
+                _SlowFastLLM(), {"messages": []}, "fast", "slow", tracker=LatencyTracker(),
+            )
+        self.assertFalse(hedged)
+        self.assertEqual(winner, "fast")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Shared open/half-open/closed state and the global retry budget."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmpdir.name) / "state" / "circuit_breakers.json"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_opens_after_threshold_and_is_shared(self):
+        from unittest.mock import patch
+        from ouroboros.circuit_breaker import CircuitBreakerStore
+        a, b = CircuitBreakerStore(self.path), CircuitBreakerStore(self.path)
+        with patch.dict(os.environ, {"OUROBOROS_BREAKER_FAILURES": "2"}):
+            self.assertEqual(a.record_failure("m", 503), "closed")
+            self.assertEqual(a.record_failure("m", 503), "open")
+        allowed, retry_in = b.allow("m")  # second "process" sees it through the file
+        self.assertFalse(allowed)
+        self.assertGreater(retry_in, 0)
+        self.assertTrue(b.allow("other")[0])
+
+    def test_429_honours_retry_after_then_half_open_probe(self):
+        import json
+        import time
+        from ouroboros.circuit_breaker import CircuitBreakerStore
+        store = CircuitBreakerStore(self.path)
+        store.record_failure("m", 429, retry_after=120)
+        entry = json.loads(self.path.read_text())["circuits"]["m"]
+        self.assertAlmostEqual(entry["open_until"] - time.time(), 120, delta=5)
+
+        # Expire the cooldown: exactly one caller gets the probe
+        data = json.loads(self.path.read_text())
+        data["circuits"]["m"]["open_until"] = time.time() - 1
+        self.path.write_text(json.dumps(data))
+        other = CircuitBreakerStore(self.path)
+        self.assertTrue(other.is_available("m"))  # Cooldown over, probe not taken yet
+        self.assertTrue(store.allow("m")[0])
+        self.assertFalse(other.allow("m")[0])
+        self.assertFalse(other.is_available("m"))  # Probe in flight
+        other.record_success("m")
+        self.assertTrue(other.allow("m")[0])
+
+    def test_client_errors_are_ignored(self):
+        from ouroboros.circuit_breaker import CircuitBreakerStore
+
+        class _BadRequest(Exception):
+            status_code = 400
+
+        store = CircuitBreakerStore(self.path)
+        for _ in range(10):
+            self.assertIsNone(store.record_exception("m", _BadRequest()))
+        self.assertTrue(store.allow("m")[0])
+
+    def test_retry_budget_is_finite(self):
+        from unittest.mock import patch
+        from ouroboros.circuit_breaker import CircuitBreakerStore
+        store = CircuitBreakerStore(self.path)
+        with patch.dict(os.environ, {"OUROBOROS_RETRY_BUDGET_PER_MIN": "3"}):
+            taken = [store.take_retry_token() for _ in range(5)]
+        self.assertEqual(taken, [True, True, True, False, False])
+
+
+class TestToolScheduler(unittest.TestCase):
+    """Declared resources decide which calls of a batch may run together."""
+
+    def _tc(self, name, **args):
+        import json
+        return {"id": name, "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+
+    def _waves(self, *calls):
+        from ouroboros.tool_scheduler import call_resources, schedule_waves
+        reg = _FakeRegistry()
+        return schedule_waves([call_resources(reg.get_entry(tc["function"]["name"]), tc) for tc in calls])
+
+    def test_independent_writes_and_reads_share_a_wave(self):
+        waves = self._waves(
+            self._tc("drive_write", path="notes/a.md"), self._tc("drive_write", path="notes/b.md"),
+            self._tc("web_search", query="x"), self._tc("repo_read", path="README.md"),
+        )
+        self.assertEqual(waves, [[0, 1, 2, 3]])
+
+    def test_conflicts_keep_order(self):
+        waves = self._waves(
+            self._tc("drive_write", path="notes"), self._tc("drive_write", path="./notes/a.md"),
+            self._tc("repo_read", path="a.py"), self._tc("repo_write_commit", path="b.py"),
+            self._tc("repo_list", dir="."),
+        )
+        self.assertEqual(waves, [[0, 2], [1, 3], [4]])
+
+    def test_undeclared_tools_run_alone(self):
+        waves = self._waves(self._tc("repo_read", path="a"), self._tc("run_shell"), self._tc("repo_read", path="b"))
+        self.assertEqual(waves, [[0], [1], [2]])
+
+
+def _isolated_probe(ctx, pid_file=None, take_lock=False):
+    """Isolated-lane test tool (module level, so it can be sent to the child)."""
+    import subprocess
+    if take_lock:  # A module lock held by another worker thread must not be inherited
+        from ouroboros import jsonl_tail
+        if not jsonl_tail._prune_lock.acquire(timeout=2):
+            return "inherited a held lock"
+    if pid_file:
+        proc = subprocess.Popen(["sleep", "30"])
+        with open(pid_file, "w") as f:
+            f.write(str(proc.pid))
+        proc.wait()
+    ctx.pending_events.append({"type": "llm_usage", "pid": os.getpid(), "task_id": ctx.task_id})
+    return "ok"
+
+
+class _IsolatedRegistry(_FakeRegistry):
+    """Registry whose tools run in the isolated lane."""
+
+    def __init__(self, drive_root):
+        super().__init__()
+        import pathlib
+        from ouroboros.tool_cache import ToolResultCache
+        from ouroboros.tools.registry import ToolContext
+        self.context = ToolContext(repo_dir=pathlib.Path(drive_root), drive_root=pathlib.Path(drive_root),
+                                   task_id="t1")
+        self.result_cache = ToolResultCache()
+
+    def get_entry(self, name):
+        from ouroboros.tools.registry import ToolEntry
+        return ToolEntry(name=name, schema={}, handler=_isolated_probe, isolated=True)
+
+
+class TestToolExecutor(unittest.TestCase):
+    """Shared tool pool accounting and the killable subprocess lane."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.drive_logs = pathlib.Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_leaked_calls_rotate_pool(self):
+        import threading
+        import time
+        from ouroboros.tool_executor import ManagedToolExecutor
+        ex = ManagedToolExecutor(2)
+        started, release = threading.Event(), threading.Event()
+        hung = ex.submit(lambda: (started.set(), release.wait()))
+        self.assertTrue(started.wait(2))
+        self.assertTrue(ex.abandon(hung))
+        self.assertEqual(ex.stats()["leaked_running"], 1)
+        self.assertEqual(ex.stats()["pool_rotations"], 1)
+        self.assertEqual(ex.submit(lambda: 7).result(timeout=2), 7)
+        release.set()
+        hung.result(timeout=2)
+        time.sleep(0.05)
+        self.assertEqual(ex.stats()["leaked_running"], 0)
+        self.assertEqual(ex.stats()["submitted"], 2)
+
+    def test_parallel_wave_runs_in_managed_pool(self):
+        import threading
+        from ouroboros.tool_executor import execute_parallel, get_executor
+        from ouroboros.tools.registry import ToolEntry, ToolRegistry
+        release = threading.Event()
+        reg = ToolRegistry(repo_dir=self.drive_logs, drive_root=self.drive_logs)
+        reg.register(ToolEntry(name="fast", schema={"name": "fast", "parameters": {}},
+                               handler=lambda ctx, **kw: "fast ok"))
+        reg.register(ToolEntry(name="hang", schema={"name": "hang", "parameters": {}}, timeout_sec=1,
+                               handler=lambda ctx, **kw: release.wait(5) and "late"))
+        calls = [{"id": f"c{i}", "function": {"name": name, "arguments": "{}"}}
+                 for i, name in enumerate(["hang", "fast"])]
+        before = get_executor().stats()
+        try:
+            hung, fast = execute_parallel(reg, calls, self.drive_logs, "t1")
+        finally:
+            release.set()
+        self.assertIn("TOOL_TIMEOUT", hung["result"])
+        self.assertEqual(fast["result"], "fast ok")
+        after = get_executor().stats()
+        self.assertEqual(after["submitted"] - before["submitted"], 2)
+        self.assertEqual(after["leaked_total"] - before["leaked_total"], 1)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs forkserver")
+    def test_isolated_call_returns_result_and_events(self):
+        from unittest import mock
+        from ouroboros.tool_executor import _execute_with_timeout
+        reg = _IsolatedRegistry(self._tmpdir.name)
+        tc = {"id": "c1", "function": {"name": "quick", "arguments": "{}"}}
+        with mock.patch.dict(os.environ, {"OUROBOROS_TOOL_ISOLATION": "1"}):
+            out = _execute_with_timeout(reg, tc, self.drive_logs, 10)
+        self.assertEqual(out["result"], "ok")
+        [event] = reg.context.pending_events
+        self.assertEqual(event["task_id"], "t1")
+        self.assertNotEqual(event["pid"], os.getpid())  # Ran in the child only
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs forkserver")
+    def test_isolated_child_does_not_inherit_held_locks(self):
+        from unittest import mock
+        from ouroboros import jsonl_tail
+        from ouroboros.tool_executor import _execute_with_timeout
+        reg = _IsolatedRegistry(self._tmpdir.name)
+        tc = {"id": "c1", "function": {"name": "quick", "arguments": '{"take_lock": true}'}}
+        with jsonl_tail._prune_lock, mock.patch.dict(os.environ, {"OUROBOROS_TOOL_ISOLATION": "1"}):
+            out = _execute_with_timeout(reg, tc, self.drive_logs, 10)
+        self.assertEqual(out["result"], "ok")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs forkserver")
+    def test_isolated_timeout_kills_process_group(self):
+        import json
+        import time
+        from unittest import mock
+        from ouroboros.tool_executor import _execute_with_timeout
+        reg = _IsolatedRegistry(self._tmpdir.name)
+        pid_file = os.path.join(self._tmpdir.name, "pid")
+        tc = {"id": "c1", "function": {"name": "hang", "arguments": json.dumps({"pid_file": pid_file})}}
+        with mock.patch.dict(os.environ, {"OUROBOROS_TOOL_ISOLATION": "1"}):
+            out = _execute_with_timeout(reg, tc, self.drive_logs, 1)
+        self.assertIn("TOOL_TIMEOUT", out["result"])
+        self.assertIn("killed", out["result"])
+        with open(pid_file) as f:
+            grandchild = int(f.read())
+        time.sleep(0.2)
+        try:
+            with open(f"/proc/{grandchild}/stat") as f:
+                state = f.read().rsplit(")", 1)[1].split()[0]
+        except FileNotFoundError:
+            state = "gone"
+        self.assertIn(state, ("Z", "X", "gone"))
+
+
+class TestToolResultCache(unittest.TestCase):
+    """Cacheable tool results are reused until a stamp changes or a writer touches them."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        from ouroboros.tools.registry import ToolRegistry
+        self._tmpdir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self._tmpdir.name)
+        (root / "repo").mkdir()
+        (root / "drive").mkdir()
+        (root / "repo" / "a.txt").write_text("one", encoding="utf-8")
+        self.root = root
+        self.reg = ToolRegistry(repo_dir=root / "repo", drive_root=root / "drive")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_hit_then_miss_after_file_change(self):
+        self.assertEqual(self.reg.execute_cached("repo_read", {"path": "a.txt"}), ("one", "miss"))
+        self.assertEqual(self.reg.execute_cached("repo_read", {"path": "a.txt"}), ("one", "hit"))
+        path = self.root / "repo" / "a.txt"
+        path.write_text("two!", encoding="utf-8")
+        self.assertEqual(self.reg.execute_cached("repo_read", {"path": "a.txt"}), ("two!", "miss"))
+
+    def test_nested_file_edit_invalidates_directory_read(self):
+        (self.root / "repo" / "pkg").mkdir()
+        (self.root / "repo" / "pkg" / "m.py").write_text("x = 1\n", encoding="utf-8")
+        self.assertEqual(self.reg.execute_cached("codebase_digest", {})[1], "miss")
+        self.assertEqual(self.reg.execute_cached("codebase_digest", {})[1], "hit")
+        (self.root / "repo" / "pkg" / "m.py").write_text("x = 1\ny = 2\n", encoding="utf-8")
+        self.assertEqual(self.reg.execute_cached("codebase_digest", {})[1], "miss")
+
+    def test_writers_invalidate_overlapping_reads(self):
+        self.reg.execute("drive_write", {"path": "notes/x.md", "content": "v1"})
+        self.reg.execute("drive_write", {"path": "other.md", "content": "o"})
+        self.reg.execute_cached("drive_read", {"path": "notes/x.md"})
+        self.reg.execute_cached("drive_read", {"path": "other.md"})
+        self.reg.execute("drive_write", {"path": "notes/x.md", "content": "v2"})
+        self.assertEqual(self.reg.execute_cached("drive_read", {"path": "other.md"})[1], "hit")
+        self.assertEqual(self.reg.execute_cached("drive_read", {"path": "notes/x.md"}), ("v2", "miss"))
+
+    def test_undeclared_tool_clears_cache(self):
+        from ouroboros.tools.registry import ToolEntry
+        self.reg.register(ToolEntry("poke", {"name": "poke"}, lambda ctx: "ok"))
+        self.reg.execute_cached("repo_read", {"path": "a.txt"})
+        self.reg.execute("poke", {})
+        self.assertEqual(self.reg.execute_cached("repo_read", {"path": "a.txt"})[1], "miss")
+        self.assertEqual(self.reg.result_cache.stats()["cache_hits"], 0)
+
+
+class TestBlobStore(unittest.TestCase):
+    """Oversized tool results become a preview plus a handle that read_result can page."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_preview_handle_and_paging(self):
+        import re
+        from ouroboros.loop import _truncate_tool_result
+        from ouroboros.tools.read_result import _read_result
+        from ouroboros.tools.registry import ToolContext
+        text = "\n".join(f"line {i}" + (" NEEDLE" if i == 4321 else "") for i in range(5000))
+        shown = _truncate_tool_result(text, self.root)
+        self.assertLess(len(shown), 15000)
+        handle = re.search(r"blob:[0-9a-f]+", shown).group(0)
+        self.assertEqual(_truncate_tool_result(text, self.root), shown)  # Content-addressed
+        ctx = ToolContext(repo_dir=self.root, drive_root=self.root)
+        page = _read_result(ctx, handle, offset=10, length=20)
+        self.assertTrue(page.startswith(text[10:30]))
+        self.assertIn("next offset=30", page)
+        self.assertEqual(_read_result(ctx, handle, grep="NEEDLE"), "4322: line 4321 NEEDLE")
+        self.assertTrue(_read_result(ctx, "blob:0000000000000000").startswith("⚠️"))
+
+    def test_max_length_page_reaches_the_model_unmodified(self):
+        from ouroboros import blob_store
+        from ouroboros.loop import _truncate_tool_result
+        from ouroboros.tools.read_result import _read_result
+        from ouroboros.tools.registry import ToolContext
+        text = "\n".join(f"line {i:06d} " + "x" * 80 for i in range(2000))
+        handle = blob_store.put(self.root, text)
+        ctx = ToolContext(repo_dir=self.root, drive_root=self.root)
+        for page in (_read_result(ctx, handle, offset=10 ** 5, length=10 ** 6),
+                     _read_result(ctx, handle, grep="line", length=10 ** 6)):
+            self.assertEqual(_truncate_tool_result(page, self.root), page)
+
+    def test_without_drive_root_hard_truncates(self):
+        from ouroboros.loop import _truncate_tool_result
+        self.assertIn("truncated from 20000 chars", _truncate_tool_result("x" * 20000))
+
+
+class _AsyncFakeLLM:
+    """achat(): a tool call on the first round, then a final answer."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def default_model(self):
+        return "test/model"
+
+    async def achat(self, messages, model, tools=None, reasoning_effort="medium", **kwargs):
+        import asyncio
+        await asyncio.sleep(self.delay)
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "cost": 0.001}
+        if not any(m.get("role") == "tool" for m in messages):
+            tc = {"id": "c1", "type": "function", "function": {"name": "slow_tool", "arguments": "{}"}}
+            return {"role": "assistant", "content": "", "tool_calls": [tc]}, usage
+        return {"role": "assistant", "content": "done"}, usage
+
+
+class TestAsyncLoop(unittest.TestCase):
+    """run_llm_loop_async: async/sync handlers, and tasks overlapping on one loop."""
+
+    def setUp(self):
+        import pathlib
+        import tempfile
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmpdir.name)
+        (self.root / "logs").mkdir()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _registry(self, delay):
+        import asyncio
+        from ouroboros.tools.registry import ToolEntry, ToolRegistry
+
+        async def _slow(ctx, **kwargs):
+            await asyncio.sleep(delay)
+            return "slow ok"
+
+        reg = ToolRegistry(repo_dir=self.root, drive_root=self.root)
+        reg.register(ToolEntry(name="slow_tool", schema={"name": "slow_tool", "parameters": {}}, handler=_slow))
+        reg.register(ToolEntry(name="sync_tool", schema={"name": "sync_tool", "parameters": {}},
+                               handler=lambda ctx, **kw: "sync ok"))
+        return reg
+
+    def test_registry_runs_both_handler_kinds(self):
+        import asyncio
+        reg = self._registry(0.01)
+        self.assertEqual(asyncio.run(reg.execute_cached_async("slow_tool", {})), ("slow ok", None))
+        self.assertEqual(asyncio.run(reg.execute_cached_async("sync_tool", {})), ("sync ok", None))
+        self.assertEqual(reg.execute("slow_tool", {}), "slow ok")
+
+    def test_hung_blocking_tool_is_tracked_by_the_managed_pool(self):
+        import asyncio
+        import threading
+        from ouroboros.loop_async import _aexecute_with_timeout
+        from ouroboros.tool_executor import get_executor
+        from ouroboros.tools.registry import ToolEntry
+        release = threading.Event()
+        reg = self._registry(0.01)
+        reg.register(ToolEntry(name="hang", schema={"name": "hang", "parameters": {}},
+                               handler=lambda ctx, **kw: release.wait(5) and "late"))
+        before = get_executor().stats()["leaked_total"]
+        tc = {"id": "c1", "function": {"name": "hang", "arguments": "{}"}}
+        try:
+            result = asyncio.run(_aexecute_with_timeout(reg, tc, self.root / "logs", 0.2))
+        finally:
+            release.set()
+        self.assertTrue(result["is_error"])
+        self.assertEqual(get_executor().stats()["leaked_total"], before + 1)
+
+    def test_tasks_overlap_on_one_loop(self):
+        import asyncio
+        import queue
+        import time
+        from ouroboros.loop_async import run_llm_loop_async
+
+        async def _run_all(n):
+            return await asyncio.gather(*(
+                run_llm_loop_async(
+                    messages=[{"role": "user", "content": "hi"}], tools=self._registry(0.2),
+                    llm=_AsyncFakeLLM(0.2), drive_logs=self.root / "logs",
+                    emit_progress=lambda _: None, incoming_messages=queue.Queue(), task_id=f"t{i}",
+                )
+                for i in range(n)
+            ))
+
+        t0 = time.monotonic()
+        results = asyncio.run(_run_all(4))
+        elapsed = time.monotonic() - t0
+        self.assertEqual([r[0] for r in results], ["done"] * 4)
+        self.assertEqual(results[0][1]["rounds"], 2)
+        self.assertEqual(results[0][2]["tool_calls"][0]["result"], "slow ok")
+        # Each task needs ~0.6s of waiting; run back to back that would be 2.4s
+        self.assertLess(elapsed, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,485 @@
+"""
+Tests for JSONL logs: the writer, the supervisor's central log writer, the
+segmented storage, the backwards tail reader, the offset follower, the
+per-task offset index, the budget totals and health snapshot derived from
+log events, and the telemetry database mirroring them.
+
+Run: pytest tests/test_logs.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _write(path, records, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        f.write(tail)
+
+
+class TestJsonlTail(unittest.TestCase):
+    """Backwards block reads return the same records as a full read."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._tmp.name) / "events.jsonl"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_tail_across_block_boundaries(self):
+        from ouroboros.jsonl_tail import iter_lines_reverse, read_jsonl_tail
+        records = [{"i": i, "text": "ж" * (i % 37)} for i in range(500)]
+        _write(self.path, records[:250], "not json\n\n")
+        with open(self.path, "a", encoding="utf-8") as f:
+            for r in records[250:]:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        self.assertEqual(read_jsonl_tail(self.path, 300), records[200:])
+        lines = list(iter_lines_reverse(self.path, block_size=7))
+        self.assertEqual(json.loads(lines[0]), records[-1])
+        self.assertEqual(len(lines), 501)
+        evens = read_jsonl_tail(self.path, 3, match=lambda r: r["i"] % 2 == 0)
+        self.assertEqual([r["i"] for r in evens], [494, 496, 498])
+        self.assertEqual(read_jsonl_tail(self.path.with_name("missing.jsonl"), 10), [])
+
+    def test_follower_reads_only_new_complete_lines(self):
+        from ouroboros.jsonl_tail import JsonlFollower
+        _write(self.path, [{"i": 0}])
+        follower = JsonlFollower(self.path)
+        self.assertEqual(follower.read_new(), [])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"i": 1}\n{"i": ')
+        self.assertEqual(follower.read_new(), [{"i": 1}])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('2}\n')
+        self.assertEqual(follower.read_new(), [{"i": 2}])
+        _write(self.path, [{"i": 9}])  # Rotated: shorter than the offset
+        self.assertEqual(follower.read_new(), [{"i": 9}])
+
+
+class TestLogSegments(unittest.TestCase):
+    """Rotation into compressed segments keeps every record readable."""
+
+    def test_rotation_compression_and_readers(self):
+        from ouroboros.jsonl_tail import JsonlFollower, iter_jsonl_range, read_jsonl_tail, read_task_jsonl
+        from ouroboros.log_segments import compress_closed, list_segments, maintain_logs, parse_ts
+        from ouroboros.utils import append_jsonl
+        with tempfile.TemporaryDirectory() as tmp:
+            logs = pathlib.Path(tmp) / "logs"
+            path = logs / "events.jsonl"
+
+            def _day(i):
+                return f"2026-01-{i + 1:02d}T12:00:00+00:00"
+
+            for i in range(3):
+                append_jsonl(path, {"ts": _day(i), "task_id": "t", "i": i})
+            follower = JsonlFollower(path, offset=0)
+            self.assertEqual(len(follower.read_new()), 3)
+            append_jsonl(path, {"ts": _day(3), "task_id": "t", "i": 3})
+
+            self.assertEqual(maintain_logs(logs, max_bytes=1, max_age_sec=0)["rotated"], ["events.20260101T120000Z_20260104T120000Z.jsonl"])
+            append_jsonl(path, {"ts": _day(4), "task_id": "t", "i": 4})
+            self.assertEqual([r["i"] for r in follower.read_new()], [3, 4])  # Rest of the old file, then the new one
+            follower.close()
+
+            (seg,) = list_segments(path)
+            os.utime(seg.path, (0, 0))
+            self.assertEqual(maintain_logs(logs, max_bytes=10 ** 9, max_age_sec=0)["compressed"], 0)  # Renamed just now: grace period
+            self.assertEqual(compress_closed(path, grace_sec=0), 1)
+            (seg,) = list_segments(path)
+            self.assertTrue(seg.compressed)
+
+            self.assertEqual([r["i"] for r in read_jsonl_tail(path, 3)], [2, 3, 4])
+            self.assertEqual([r["i"] for r in iter_jsonl_range(path)], [0, 1, 2, 3, 4])
+            ranged = iter_jsonl_range(path, since=parse_ts(_day(1)), until=parse_ts(_day(3)))
+            self.assertEqual([r["i"] for r in ranged], [1, 2, 3])
+            self.assertEqual([r["i"] for r in read_task_jsonl(path, "t", 10)], [0, 1, 2, 3, 4])
+            self.assertEqual([r["i"] for r in read_task_jsonl(path, "t", 2)], [3, 4])
+
+    def test_rotated_chat_stays_visible(self):
+        from ouroboros.consciousness import BackgroundConsciousness
+        from ouroboros.log_segments import rotate_if_needed
+        from ouroboros.memory import Memory
+        from ouroboros.utils import append_jsonl, utc_now_iso
+        with tempfile.TemporaryDirectory() as tmp:
+            drive = pathlib.Path(tmp)
+            chat = drive / "logs" / "chat.jsonl"
+            append_jsonl(chat, {"ts": utc_now_iso(), "direction": "in", "text": "Good night"})
+            self.assertIsNotNone(rotate_if_needed(chat, max_bytes=1))
+            self.assertFalse(chat.exists())  # Not recreated until the next write
+            bg = BackgroundConsciousness(drive, drive, None, lambda: None)
+            self.assertTrue(bg._is_quiet_mode())
+            self.assertTrue(bg._is_active_dialogue())
+
+            result = Memory(drive).backup_chat_to_drive()
+            self.assertEqual((result["lines"], result["milestone_created"]), (1, True))
+            (milestone,) = (drive / "logs" / "milestones").glob("chat_*.jsonl")
+            self.assertIn("Good night", milestone.read_text())
+
+
+class TestJsonlWriter(unittest.TestCase):
+    """Cached descriptors, rotation handling and group commit."""
+
+    def test_concurrent_appends_and_rotation(self):
+        import threading
+        from ouroboros.utils import JsonlWriter
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "logs" / "events.jsonl"
+            writer = JsonlWriter()
+
+            def _spam(n):
+                for i in range(200):
+                    writer.append(path, {"t": n, "i": i, "pad": "x" * 300})
+
+            threads = [threading.Thread(target=_spam, args=(n,)) for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            lines = path.read_text().splitlines()
+            self.assertEqual(len(lines), 800)
+            self.assertTrue(all(json.loads(line)["pad"] for line in lines))
+            self.assertEqual(writer.stats()["open_files"], 1)
+
+            path.rename(path.with_name("events.1.jsonl"))  # Rotated underneath the cached fd
+            writer.append(path, {"after": True})
+            self.assertEqual(path.read_text().splitlines(), ['{"after": true}'])
+            writer.close()
+
+    def test_group_commit_flushes_with_offsets(self):
+        from ouroboros.jsonl_tail import read_task_jsonl
+        from ouroboros.utils import JsonlWriter
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "logs" / "tools.jsonl"
+            writer = JsonlWriter(flush_interval=60)
+            for i in range(5):
+                writer.append(path, {"task_id": "a" if i % 2 else "b", "i": i})
+            self.assertFalse(path.exists())
+            self.assertEqual(writer.stats()["pending_records"], 5)
+            writer.flush()
+            self.assertEqual(len(path.read_text().splitlines()), 5)
+            self.assertEqual([r["i"] for r in read_task_jsonl(path, "a")], [1, 3])
+            writer.append(path, {"task_id": "a", "i": 5})
+            writer.close()  # Flushes
+            self.assertEqual([r["i"] for r in read_task_jsonl(path, "a")], [1, 3, 5])
+
+
+class TestCentralLogWriter(unittest.TestCase):
+    """Worker appends go through the supervisor's queue, or locally if it is gone."""
+
+    def tearDown(self):
+        from ouroboros.utils import set_jsonl_sink
+        set_jsonl_sink(None, None)
+
+    def test_worker_records_written_in_order(self):
+        import queue
+        from ouroboros.utils import append_jsonl
+        from supervisor.log_writer import LogWriterService, install_worker_sink
+        with tempfile.TemporaryDirectory() as tmp:
+            drive = pathlib.Path(tmp)
+            log_q = queue.Queue()
+            install_worker_sink(log_q, drive, supervisor_pid=os.getpid())
+            append_jsonl(drive / "logs" / "tools.jsonl", {"ts": "2026-01-01T00:00:02", "n": 2})
+            append_jsonl(drive / "logs" / "tools.jsonl", {"ts": "2026-01-01T00:00:01", "n": 1})
+            append_jsonl(drive / "memory" / "other.jsonl", {"n": 0})  # Outside logs/: written directly
+            self.assertFalse((drive / "logs" / "tools.jsonl").exists())
+            self.assertTrue((drive / "memory" / "other.jsonl").exists())
+            log_q.put(("../escape.jsonl", {"n": -1}))
+
+            service = LogWriterService(drive, lambda: log_q)
+            self.assertEqual(service.drain_once(log_q, block=False), 3)
+            rows = [json.loads(line)["n"] for line in (drive / "logs" / "tools.jsonl").read_text().splitlines()]
+            self.assertEqual(rows, [1, 2])
+            self.assertFalse((drive / "escape.jsonl").exists())
+            self.assertEqual(service.stats()["rejected"], 1)
+
+    def test_local_fallback_when_supervisor_is_gone(self):
+        import queue
+        import subprocess
+        from ouroboros.utils import append_jsonl
+        from supervisor.log_writer import install_worker_sink
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        with tempfile.TemporaryDirectory() as tmp:
+            drive = pathlib.Path(tmp)
+            log_q = queue.Queue()
+            install_worker_sink(log_q, drive, supervisor_pid=dead.pid)
+            append_jsonl(drive / "logs" / "events.jsonl", {"n": 1})
+            self.assertTrue(log_q.empty())
+            self.assertEqual(json.loads((drive / "logs" / "events.jsonl").read_text()), {"n": 1})
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_forked_child_writes_locally(self):
+        import queue
+        from ouroboros.utils import append_jsonl
+        from supervisor.log_writer import install_worker_sink
+        with tempfile.TemporaryDirectory() as tmp:
+            drive = pathlib.Path(tmp)
+            log_q = queue.Queue()
+            install_worker_sink(log_q, drive, supervisor_pid=os.getpid())
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    append_jsonl(drive / "logs" / "events.jsonl", {"n": 1})
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            self.assertTrue(log_q.empty())
+            self.assertEqual(json.loads((drive / "logs" / "events.jsonl").read_text()), {"n": 1})
+
+
+class TestTaskIndex(unittest.TestCase):
+    """append_jsonl records task offsets; task reads ignore other traffic."""
+
+    def test_task_records_survive_busy_neighbours(self):
+        from ouroboros.jsonl_tail import read_task_jsonl
+        from ouroboros.utils import append_jsonl, task_index_path
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "logs" / "tools.jsonl"
+            for i in range(600):
+                append_jsonl(path, {"task_id": "mine" if i % 100 == 0 else f"other{i % 7}", "i": i})
+            mine = read_task_jsonl(path, "mine", 100)
+            self.assertEqual([r["i"] for r in mine], [0, 100, 200, 300, 400, 500])
+            self.assertEqual([r["i"] for r in read_task_jsonl(path, "mine", 2)], [400, 500])
+            self.assertEqual(len(task_index_path(path, "other3").read_text().split()), 85)
+
+            _write(path, [{"task_id": "other1", "i": -1}] * 700)  # Replaced log: stale offsets
+            self.assertEqual(read_task_jsonl(path, "mine", 100), [])
+            # No index (records written before indexing): filtered tail
+            self.assertEqual(len(read_task_jsonl(path, "unindexed", 100)), 0)
+            _write(path, [{"task_id": "unindexed", "i": 1}])
+            self.assertEqual(read_task_jsonl(path, "unindexed", 100), [{"task_id": "unindexed", "i": 1}])
+
+
+
+class TestBudgetAggregates(unittest.TestCase):
+    """Category and model totals are kept in state and rebuilt from events.jsonl."""
+
+    def setUp(self):
+        import supervisor.state as state
+        self._tmp = tempfile.TemporaryDirectory()
+        self._prev_root = state.DRIVE_ROOT
+        self.drive = pathlib.Path(self._tmp.name)
+        state.init(self.drive)
+
+    def tearDown(self):
+        import supervisor.state as state
+        state.init(self._prev_root)
+        self._tmp.cleanup()
+
+    def test_running_totals_match_rebuild(self):
+        from supervisor import state
+        events = self.drive / "logs" / "events.jsonl"
+        events.parent.mkdir(parents=True)
+        _write(events, [
+            {"type": "llm_usage", "category": "task", "model": "m1", "cost": 1.5, "prompt_tokens": 10},
+            {"type": "llm_usage", "category": "task", "model": "m1", "cost": -0.5, "cost_correction": True},
+            {"type": "tool_error", "cost": 99},
+        ])
+        self.assertEqual(state.budget_breakdown(state.load_state()), {"task": 1.0})  # Built from the log once
+
+        events.unlink()
+        state.update_budget_from_usage({"cost": 2.0, "completion_tokens": 5, "cached_tokens": 3},
+                                       category="evolution", model="m2")
+        st = state.load_state()
+        self.assertEqual(state.budget_breakdown(st), {"task": 1.0, "evolution": 2.0})
+        models = state.model_breakdown(st)
+        self.assertEqual(models["m1"]["calls"], 1)
+        self.assertEqual(models["m2"], {"cost": 2.0, "calls": 1, "prompt_tokens": 0,
+                                        "completion_tokens": 5, "cached_tokens": 3})
+
+        _write(events, [{"type": "llm_usage", "category": "task", "model": "m1", "cost": 4.0}])
+        state.rebuild_budget_aggregates()
+        self.assertEqual(state.budget_breakdown(state.load_state()), {"task": 4.0})
+
+
+class TestStateWal(unittest.TestCase):
+    """State lives in memory; changes go to a WAL and reach state.json in snapshots."""
+
+    def setUp(self):
+        import supervisor.state as state
+        self._tmp = tempfile.TemporaryDirectory()
+        self._prev_root = state.DRIVE_ROOT
+        self.drive = pathlib.Path(self._tmp.name)
+        state.init(self.drive)
+
+    def tearDown(self):
+        import supervisor.state as state
+        state.init(self._prev_root)
+        self._tmp.cleanup()
+
+    def test_wal_recovery_and_snapshot(self):
+        from supervisor import state
+        st = state.load_state()
+        snapshot = json.loads(state.STATE_PATH.read_text())
+        st["tg_offset"] = 42
+        state.save_state(st)
+        st["tg_offset"] += 1
+        st["owner_hold"] = True
+        state.save_state(st)
+        state.save_state(st)  # Unchanged: nothing logged
+
+        wal = [json.loads(line) for line in state.STATE_WAL_PATH.read_text().splitlines()]
+        self.assertEqual(wal, [{"set": {"tg_offset": 42}}, {"set": {"tg_offset": 43, "owner_hold": True}}])
+        self.assertEqual(json.loads(state.STATE_PATH.read_text()), snapshot)  # Write-behind
+        st["tg_offset"] = 0  # Callers get copies
+        self.assertEqual(state.load_state()["tg_offset"], 43)
+
+        state._mem = None  # Crash: recover from snapshot + WAL
+        self.assertEqual(state.load_state()["tg_offset"], 43)
+        self.assertEqual(json.loads(state.STATE_PATH.read_text())["tg_offset"], 43)
+        self.assertEqual(state.STATE_WAL_PATH.read_text(), "")
+
+
+
+class TestTelemetry(unittest.TestCase):
+    """Log records are mirrored into SQLite from stored positions, off the writer's lock."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.drive = pathlib.Path(self._tmp.name)
+        self.logs = self.drive / "logs"
+        self.logs.mkdir()
+
+    def tearDown(self):
+        from ouroboros import telemetry
+        from ouroboros.utils import set_jsonl_observer
+        set_jsonl_observer(None, None)
+        if telemetry._store is not None:
+            telemetry._store.close()
+            telemetry._store = None
+        self._tmp.cleanup()
+
+    def test_mirror_catch_up_and_queries(self):
+        from ouroboros import telemetry
+        from ouroboros.utils import append_jsonl, utc_now_iso
+        _write(self.logs / "events.jsonl", [
+            {"ts": "2024-01-01T00:00:00+00:00", "type": "task_received", "task": {"id": "t1", "text": "old"}},
+            {"ts": "2024-01-01T00:00:01+00:00", "type": "llm_usage", "task_id": "t1", "category": "task",
+             "model": "m1", "cost": 1.0, "prompt_tokens": 10},
+            {"ts": "2024-01-01T00:00:02+00:00", "type": "task_done", "task_id": "t1"},
+        ])
+        store = telemetry.init(self.drive, follow=False)
+        mirror = telemetry.LogMirror(store, self.logs)
+        self.assertFalse(store.is_complete())
+        self.assertEqual(mirror.poll(), 3)
+        self.assertTrue(store.is_complete())
+
+        append_jsonl(self.logs / "events.jsonl", {"ts": utc_now_iso(), "type": "task_received",
+                                                  "task": {"id": "t2", "text": "new task"}})
+        append_jsonl(self.logs / "events.jsonl", {"ts": utc_now_iso(), "type": "llm_usage", "task_id": "t2",
+                                                  "category": "task", "model": "m2", "cost": 2.5})
+        append_jsonl(self.logs / "events.jsonl", {"ts": utc_now_iso(), "type": "tool_error",
+                                                  "task_id": "t2", "tool": "shell", "error": "boom"})
+        append_jsonl(self.logs / "tools.jsonl", {"ts": utc_now_iso(), "task_id": "t2", "tool": "shell"})
+        append_jsonl(self.drive / "other.jsonl", {"type": "llm_usage", "cost": 99})  # Not in logs/
+        self.assertEqual([t["task_id"] for t in store.task_costs()], ["t1"])  # The writer only wakes the mirror
+        self.assertEqual(mirror.poll(), 4)
+
+        self.assertEqual([t["task_id"] for t in store.task_costs()], ["t2", "t1"])
+        self.assertEqual([t["task_id"] for t in store.task_costs(since=time.time() - 60)], ["t2"])
+        self.assertEqual([(t["task_id"], t["description"]) for t in store.open_tasks(since=0)], [("t2", "new task")])
+        self.assertEqual(dict(store.event_counts(task_id="t2")),
+                         {"task_received": 1, "llm_usage": 1, "tool_error": 1})
+        self.assertEqual([e["error"] for e in store.recent_errors(task_id="t2")], ["boom"])
+        self.assertEqual(store.usage_totals()["budget_by_category"], {"task": 3.5})
+
+        from ouroboros.memory import Memory
+        summary = Memory(self.drive).summarize_task_events("t2")
+        self.assertIn("  tool_error: 1", summary)
+        self.assertIn("Recent errors:\n  tool_error: boom", summary)
+
+        self.assertEqual(mirror.poll(), 0)
+        self.assertEqual(telemetry.LogMirror(store, self.logs).catch_up(), 0)  # Restart: no duplicates
+        self.assertEqual(store.usage_totals()["budget_by_category"], {"task": 3.5})
+
+    def test_restart_imports_records_written_while_down(self):
+        from ouroboros import telemetry
+        from ouroboros.log_segments import rotate_if_needed
+        from ouroboros.utils import append_jsonl_local, utc_now_iso
+        events = self.logs / "events.jsonl"
+
+        def usage(task_id, cost):
+            append_jsonl_local(events, {"ts": utc_now_iso(), "type": "llm_usage", "task_id": task_id,
+                                        "category": "task", "model": "m", "cost": cost})
+
+        store = telemetry.init(self.drive, follow=False)
+        usage("t1", 1.0)
+        self.assertEqual(telemetry.LogMirror(store, self.logs).catch_up(), 1)
+        usage("t2", 2.0)  # Written locally by a worker while the supervisor is down
+        self.assertIsNotNone(rotate_if_needed(events, max_bytes=1))
+        usage("t3", 4.0)
+        self.assertEqual(telemetry.LogMirror(store, self.logs).catch_up(), 2)
+        self.assertEqual(store.usage_totals()["budget_by_category"], {"task": 7.0})
+        self.assertEqual(telemetry.LogMirror(store, self.logs).catch_up(), 0)
+        self.assertEqual(store.usage_totals()["budget_by_category"], {"task": 7.0})
+
+
+class TestHealthSnapshot(unittest.TestCase):
+    """The supervisor tracks health inputs from events and publishes health.json."""
+
+    def test_tracker_publishes_incremental_checks(self):
+        import types
+        from supervisor.health import HealthTracker, health_path
+        from ouroboros.context import _build_health_invariants
+        with tempfile.TemporaryDirectory() as tmp:
+            drive, repo = pathlib.Path(tmp) / "drive", pathlib.Path(tmp) / "repo"
+            repo.mkdir()
+            (repo / "VERSION").write_text("1.2.3\n")
+            (repo / "pyproject.toml").write_text('[project]\nversion = "1.2.3"\n')
+            logs = drive / "logs"
+            logs.mkdir(parents=True)
+            _write(logs / "events.jsonl", [
+                {"type": "llm_usage", "task_id": "t1", "cost": 3.0},
+                {"type": "owner_message_injected", "task_id": "t1", "text": "stop"},
+            ])
+            tracker = HealthTracker(drive, repo)
+            tracker.seed_from_logs()
+            self.assertTrue(tracker.publish_if_due(force=True))
+            first = json.loads(health_path(drive).read_text())["checks"]
+            self.assertIn("OK: version sync (1.2.3)", first)
+            self.assertIn("OK: no high-cost tasks (>$5)", first)
+            self.assertFalse(tracker.publish_if_due())  # Nothing changed
+
+            tracker.observe({"type": "llm_usage", "task_id": "t1", "usage": {"cost": 2.5}})
+            tracker.observe({"type": "owner_message_injected", "task_id": "t2", "text": "stop"})
+            self.assertTrue(tracker.publish_if_due())
+            checks = json.loads(health_path(drive).read_text())["checks"]
+            self.assertIn("WARNING: HIGH-COST TASK — task_id=t1 cost=$5.50 rounds=2", checks)
+            self.assertTrue(any(c.startswith("CRITICAL: DUPLICATE PROCESSING — 1 message(s)") for c in checks))
+
+            env = types.SimpleNamespace(drive_root=drive, repo_dir=repo,
+                                        drive_path=lambda rel: drive / rel)
+            section = _build_health_invariants(env)
+            self.assertEqual(section, "## Health Invariants\n\n" + "\n".join(f"- {c}" for c in checks))
+
+    def test_old_costs_and_injections_expire(self):
+        from unittest import mock
+        from supervisor import health
+        with tempfile.TemporaryDirectory() as tmp:
+            drive = pathlib.Path(tmp)
+            tracker = health.HealthTracker(drive, drive)
+            old = "2020-01-01T00:00:00+00:00"
+            tracker.observe({"type": "llm_usage", "task_id": "t1", "cost": 9.0, "ts": old})
+            tracker.observe({"type": "owner_message_injected", "task_id": "t1", "text": "stop", "ts": old})
+            tracker.observe({"type": "owner_message_injected", "task_id": "t2", "text": "stop", "ts": old})
+            checks = tracker.compute_checks()
+            self.assertIn("OK: no high-cost tasks (>$5)", checks)
+            self.assertIn("OK: no duplicate message processing detected", checks)
+            self.assertEqual((len(tracker._task_costs), len(tracker._injected)), (0, 0))
+
+            with mock.patch.object(health, "WINDOW_SEC", 1e12):  # Everything is recent
+                tracker.observe({"type": "llm_usage", "task_id": "t1", "cost": 9.0, "ts": old})
+                self.assertTrue(any(c.startswith("WARNING: HIGH-COST TASK") for c in tracker.compute_checks()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -112,6 +112,7 @@ EXPECTED_TOOLS = [
     "forward_to_worker",
     # Context management
     "compact_context",
+    "read_result",
     "list_available_tools",
     "enable_tools",
 ]